@@ -0,0 +1,9 @@
+from ode_explorer.benchmarks.harness import (
+    measure,
+    save_results,
+    load_results,
+    compare_results,
+    print_results,
+    print_comparison
+)
+from ode_explorer.benchmarks.problems import TestProblem, problems
@@ -0,0 +1,159 @@
+"""
+Benchmark of the right-hand side call overhead of ODE models.
+
+On cheap scalar right-hand sides, the cost of a step is dominated by the function call
+itself rather than by the arithmetic. This benchmark compares evaluating the right-hand
+side by unpacking the model arguments into keyword arguments on every call with evaluating
+the bound right-hand side ``ODEModel.rhs``, for right-hand sides with no, one and several
+scalar arguments and with a parameter vector. It also runs a short scalar RK4 integration
+for each case to show the effect on the step throughput.
+
+Usage:
+    python -m ode_explorer.benchmarks.call_overhead --output call_overhead.json
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import timeit
+from typing import Any, Dict, List, Text
+
+import numpy as np
+
+from ode_explorer.benchmarks.harness import measure, save_results, load_results, \
+    compare_results, print_results, print_comparison
+from ode_explorer.constants import RunKeys, PerformanceKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import RungeKutta4
+
+__all__ = ["run_call_overhead", "main"]
+
+NUM_CALLS = 200000
+NUM_STEPS = 20000
+
+
+def decay(t: float, y):
+    return -0.5 * y
+
+
+def decay_one_arg(t: float, y, lamb: float = 0.5):
+    return - lamb * y
+
+
+def decay_three_args(t: float, y, lamb: float = 0.5, offset: float = 0.0, scale: float = 1.0):
+    return - scale * lamb * (y - offset)
+
+
+def decay_params(t: float, y, params: np.ndarray = None):
+    return - params[0] * y
+
+
+_CASES = {
+    "no_args": (decay, {}),
+    "one_arg": (decay_one_arg, {"lamb": 0.5}),
+    "three_args": (decay_three_args, {"lamb": 0.5, "offset": 0.0, "scale": 1.0}),
+    "param_vector": (decay_params, {"params": np.array([0.5])}),
+}
+
+
+def _time_calls(fn, num_calls: int) -> float:
+    # best of three, in seconds per call
+    return min(timeit.repeat(lambda: fn(0.0, 1.0), number=num_calls, repeat=3)) / num_calls
+
+
+def run_call_overhead(cases: List[Text] = None,
+                      num_calls: int = NUM_CALLS,
+                      num_steps: int = NUM_STEPS) -> List[Dict[Text, Any]]:
+    """
+    Run the call overhead benchmark.
+
+    Args:
+        cases: Names of the right-hand side cases, by default all cases.
+        num_calls: Number of right-hand side calls per timing.
+        num_steps: Number of RK4 steps of the integration benchmark.
+
+    Returns:
+        A list of benchmark results with the right-hand side calls per second with keyword
+        unpacking and with the bound right-hand side, and the steps per second of a scalar
+        RK4 integration.
+
+    Raises:
+        ValueError: If an unknown case is requested.
+    """
+    cases = cases or list(_CASES)
+
+    unknown = [case for case in cases if case not in _CASES]
+    if unknown:
+        raise ValueError(f"Unknown cases: {', '.join(unknown)}. Available cases are: "
+                         f"{', '.join(_CASES)}.")
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        integrator = Integrator(base_log_dir=tmp_dir, base_output_dir=tmp_dir)
+
+        for case in cases:
+            ode_fn, fn_args = _CASES[case]
+            model = ODEModel(ode_fn=ode_fn, fn_args=dict(fn_args))
+
+            def unpacking(t, y):
+                return model.ode_fn(t, y, **model.fn_args)
+
+            unpacked = _time_calls(unpacking, num_calls)
+            bound = _time_calls(model.rhs, num_calls)
+
+            def integrate():
+                integrator.integrate_const(model=model,
+                                           step_func=RungeKutta4(),
+                                           initial_state=(0.0, 1.0),
+                                           h=1e-4,
+                                           max_steps=num_steps,
+                                           reset=True,
+                                           verbosity=logging.ERROR)
+
+                performance = integrator.runs[-1][RunKeys.PERFORMANCE]
+                return {"steps": performance[PerformanceKeys.ACCEPTED_STEPS]}
+
+            result = measure(integrate, repeat=3, trace_memory=False)
+
+            results.append({"name": case,
+                            "unpacked_calls_per_second": 1.0 / unpacked,
+                            "calls_per_second": 1.0 / bound,
+                            "speedup": unpacked / bound,
+                            "steps_per_second": result["steps_per_second"]})
+
+        integrator.close()
+
+    return results
+
+
+def main(argv: List[Text] = None):
+    parser = argparse.ArgumentParser(description="Benchmark of the right-hand side call "
+                                                 "overhead of ODE models.")
+    parser.add_argument("--cases", nargs="+", choices=list(_CASES), help="Cases to run.")
+    parser.add_argument("--output", help="JSON file to save the results to.")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two result files and flag regressions.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change flagged as a regression, default 0.1.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = (load_results(path) for path in args.compare)
+        regressed = print_comparison(compare_results(baseline, current, args.threshold))
+        return 1 if regressed else 0
+
+    results = run_call_overhead(cases=args.cases)
+
+    print_results(results, columns=["unpacked_calls_per_second", "calls_per_second", "speedup",
+                                    "steps_per_second"])
+
+    if args.output:
+        save_results(results, args.output, suite="call_overhead")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
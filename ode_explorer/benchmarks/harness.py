@@ -0,0 +1,204 @@
+import datetime
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Text
+
+import numpy as np
+import scipy
+from tabulate import tabulate
+
+from ode_explorer.version import PACKAGE_VERSION
+
+__all__ = ["measure", "save_results", "load_results", "compare_results",
+           "print_results", "print_comparison"]
+
+# result fields compared between two benchmark runs, and whether larger is better
+_COMPARED_FIELDS = {"steps_per_second": True,
+                    "rhs_calls_per_second": True,
+                    "peak_memory": False,
+                    "bytes_per_state": False,
+                    "startup_time": False,
+                    "calls_per_second": True}
+
+
+def measure(fn: Callable[[], Dict[Text, Any]],
+            repeat: int = 3,
+            warmup: bool = True,
+            trace_memory: bool = True) -> Dict[Text, Any]:
+    """
+    Measure the wall time and peak memory of a benchmark function.
+
+    The function is timed ``repeat`` times and the fastest run is reported, since slower runs
+    are only ever slowed down by other processes. An optional untimed warm-up run fills caches,
+    e.g. of lazily imported modules, before timing. The peak memory is measured in one additional
+    run with tracemalloc, which is not timed because tracing slows down allocations.
+
+    Args:
+        fn: Benchmark function without arguments. It can return a dict of counts, e.g. the
+         number of steps taken, which are added to the result along with their rates.
+        repeat: Number of timed runs.
+        warmup: Bool, whether to call the function once before timing it.
+        trace_memory: Bool, whether to measure the peak memory allocated by the function.
+
+    Returns:
+        A dict with the best wall time in seconds, the peak memory in bytes, the counts
+        returned by the function and the count rates per second.
+    """
+    times = []
+    counts = {}
+
+    if warmup:
+        fn()
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        counts = fn() or {}
+        times.append(time.perf_counter() - start)
+
+    result = {"time": min(times), "times": times}
+
+    for name, count in counts.items():
+        result[name] = count
+        result[name + "_per_second"] = count / result["time"] if result["time"] > 0 else None
+
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_memory"] = peak
+
+    return result
+
+
+def _environment() -> Dict[Text, Any]:
+    return {"timestamp": datetime.datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "ode_explorer": PACKAGE_VERSION,
+            "numpy": np.__version__,
+            "scipy": scipy.__version__}
+
+
+def save_results(results: List[Dict[Text, Any]], path: Text, suite: Text = None):
+    """
+    Save benchmark results to a JSON file, along with the versions of Python and the numerical
+    libraries, so that result files from different environments can be told apart.
+
+    Args:
+        results: List of benchmark results, each with a unique "name".
+        path: Path of the JSON file.
+        suite: Optional name of the benchmark suite.
+    """
+    with open(path, "w") as f:
+        json.dump({"suite": suite, "environment": _environment(), "results": results},
+                  f, indent=2, default=float)
+
+
+def load_results(path: Text) -> Dict[Text, Any]:
+    """
+    Load benchmark results saved with ``save_results``.
+
+    Args:
+        path: Path of the JSON file.
+
+    Returns:
+        A dict holding the suite name, environment and list of results.
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict[Text, Any],
+                    current: Dict[Text, Any],
+                    threshold: float = 0.1) -> List[Dict[Text, Any]]:
+    """
+    Compare two sets of benchmark results and flag regressions. A benchmark regressed if its
+    throughput dropped, or its peak memory grew, by more than the relative threshold. A
+    benchmark that was measured in the baseline, but is skipped, e.g. because it raised an
+    error, or missing in the current results, is flagged as well.
+
+    Args:
+        baseline: Baseline results, as returned by ``load_results``.
+        current: Current results, as returned by ``load_results``.
+        threshold: Relative change above which a difference is flagged, e.g. 0.1 for 10%.
+
+    Returns:
+        A list of comparisons of all benchmarks measured in the baseline, each holding the
+        benchmark name, field, baseline and current values, relative change and a regression
+        flag. Current values and changes of benchmarks that were not measured are None.
+    """
+    current_by_name = {r["name"]: r for r in current["results"]}
+
+    comparisons = []
+
+    for base in baseline["results"]:
+        result = current_by_name.get(base["name"], {})
+
+        for field, larger_is_better in _COMPARED_FIELDS.items():
+            old, new = base.get(field), result.get(field)
+
+            # benchmarks skipped in the baseline and missing fields are not compared
+            if not old:
+                continue
+
+            if new is None:
+                change, regression = None, True
+            else:
+                change = (new - old) / old
+                regression = -change > threshold if larger_is_better else change > threshold
+
+            comparisons.append({"name": base["name"],
+                                "field": field,
+                                "baseline": old,
+                                "current": new,
+                                "change": change,
+                                "regression": regression})
+
+    return comparisons
+
+
+def print_results(results: List[Dict[Text, Any]], columns: List[Text]):
+    """
+    Print benchmark results as a table.
+
+    Args:
+        results: List of benchmark results.
+        columns: Result fields to print, in addition to the benchmark name. Skipped
+         benchmarks are listed with the reason they were skipped.
+    """
+    rows = [[r["name"]] + [r.get(c, "") for c in columns] + [r.get("skipped", "")]
+            for r in results]
+
+    print(tabulate(rows, headers=["name"] + columns + ["skipped"], floatfmt=".4g"))
+
+
+def print_comparison(comparisons: List[Dict[Text, Any]]) -> bool:
+    """
+    Print a comparison of two sets of benchmark results.
+
+    Args:
+        comparisons: Comparisons as returned by ``compare_results``.
+
+    Returns:
+        True if any benchmark regressed, False otherwise.
+    """
+    rows = [[c["name"], c["field"], c["baseline"],
+             "missing" if c["current"] is None else c["current"],
+             "" if c["change"] is None else f"{100 * c['change']:+.1f}%",
+             "REGRESSION" if c["regression"] else ""] for c in comparisons]
+
+    print(tabulate(rows, headers=["name", "field", "baseline", "current", "change", ""],
+                   floatfmt=".4g"))
+
+    regressions = [c for c in comparisons if c["regression"]]
+
+    print(f"\n{len(regressions)} regression(s) in {len(comparisons)} comparisons.")
+
+    return len(regressions) > 0
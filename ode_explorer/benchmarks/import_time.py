@@ -0,0 +1,130 @@
+"""
+Cold-start benchmark of importing ode_explorer and constructing an Integrator.
+
+Every case runs in a fresh interpreter, so that no module is cached from a previous case,
+and reports the time from the first ode_explorer import until the case finished, together
+with the heavy optional dependencies it loaded on the way.
+
+Usage:
+    python -m ode_explorer.benchmarks.import_time --output import_time.json
+    python -m ode_explorer.benchmarks.import_time --compare baseline.json import_time.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Text
+
+from ode_explorer.benchmarks.harness import save_results, load_results, compare_results, \
+    print_results, print_comparison
+
+__all__ = ["run_import_benchmark", "main"]
+
+# heavy dependencies which should only be imported when they are used
+HEAVY_MODULES = ["pandas", "scipy", "tabulate", "absl", "tqdm", "matplotlib"]
+
+_CASES = {
+    "import": "import ode_explorer.integrators",
+    "import_all": "import ode_explorer.integrators, ode_explorer.models, "
+                  "ode_explorer.stepfunctions, ode_explorer.metrics",
+    "integrator": "from ode_explorer.integrators import Integrator\n"
+                  "Integrator()",
+    "integrator_in_memory": "from ode_explorer.integrators import Integrator\n"
+                            "Integrator(in_memory=True)",
+    "first_run_in_memory": "from ode_explorer.integrators import Integrator\n"
+                           "from ode_explorer.models import ODEModel\n"
+                           "from ode_explorer.stepfunctions import ForwardEulerMethod\n"
+                           "Integrator(in_memory=True).integrate_const(\n"
+                           "    model=ODEModel(ode_fn=lambda t, y: -y),\n"
+                           "    step_func=ForwardEulerMethod(),\n"
+                           "    initial_state=(0.0, 1.0), h=0.01, max_steps=100,\n"
+                           "    verbosity=40)",
+}
+
+_TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"time": elapsed, "loaded": loaded}}))
+"""
+
+
+def _run_case(code: Text, cwd: Text) -> Dict[Text, Any]:
+    script = _TEMPLATE.format(code=code, heavy=HEAVY_MODULES)
+
+    proc = subprocess.run([sys.executable, "-c", script], cwd=cwd, capture_output=True,
+                          text=True, check=True)
+
+    # the result is on the last line, log output might precede it
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_import_benchmark(cases: List[Text] = None, repeat: int = 5) -> List[Dict[Text, Any]]:
+    """
+    Run the import time benchmark.
+
+    Args:
+        cases: Names of the cases to run, by default all cases.
+        repeat: Number of fresh interpreters per case, the fastest one is reported.
+
+    Returns:
+        A list of benchmark results with the best time of each case in seconds and the heavy
+        dependencies it imported.
+
+    Raises:
+        ValueError: If an unknown case is requested.
+    """
+    cases = cases or list(_CASES)
+
+    unknown = [case for case in cases if case not in _CASES]
+    if unknown:
+        raise ValueError(f"Unknown cases: {', '.join(unknown)}. Available cases are: "
+                         f"{', '.join(_CASES)}.")
+
+    results = []
+
+    # Integrators constructed in default mode create their directories in the cwd
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for case in cases:
+            runs = [_run_case(_CASES[case], cwd=tmp_dir) for _ in range(repeat)]
+
+            results.append({"name": case,
+                            "startup_time": min(r["time"] for r in runs),
+                            "heavy_imports": ", ".join(runs[0]["loaded"]) or "-"})
+
+    return results
+
+
+def main(argv: List[Text] = None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark of importing "
+                                                 "ode_explorer.")
+    parser.add_argument("--cases", nargs="+", choices=list(_CASES), help="Cases to run.")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Number of fresh interpreters per case, default 5.")
+    parser.add_argument("--output", help="JSON file to save the results to.")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two result files and flag regressions.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change flagged as a regression, default 0.1.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = (load_results(path) for path in args.compare)
+        regressed = print_comparison(compare_results(baseline, current, args.threshold))
+        return 1 if regressed else 0
+
+    results = run_import_benchmark(cases=args.cases, repeat=args.repeat)
+
+    print_results(results, columns=["startup_time", "heavy_imports"])
+
+    if args.output:
+        save_results(results, args.output, suite="import_time")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Memory-scaling benchmark of integration runs.
+
+Runs a constant step size integration for a sweep of step counts and state dimensions, with
+the result data held in memory or in a memory-mapped file, and measures the peak and retained
+memory of every run with tracemalloc. The retained memory per stored state, compared to the
+raw size of a state as floats, shows the overhead of the run bookkeeping.
+
+Usage:
+    python -m ode_explorer.benchmarks.memory --output memory.json
+    python -m ode_explorer.benchmarks.memory --compare baseline.json memory.json
+"""
+import argparse
+import logging
+import sys
+import tempfile
+from typing import Any, Dict, List, Text
+
+import numpy as np
+
+from ode_explorer.benchmarks.harness import save_results, load_results, compare_results, \
+    print_results, print_comparison
+from ode_explorer.constants import RunKeys, PerformanceKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import ForwardEulerMethod
+
+__all__ = ["run_memory_benchmark", "main"]
+
+STEPS = [1000, 10000, 100000]
+DIMS = [1, 10, 100, 1000]
+STORAGES = ["memory", "memmap"]
+
+# larger sweeps would need several GB of memory for in-memory storage
+MAX_COMPONENTS = 10 ** 7
+
+
+def decay(t: float, y, lamb: float = 0.5):
+    return - lamb * y
+
+
+def run_memory_benchmark(steps: List[int] = None,
+                         dims: List[int] = None,
+                         storages: List[Text] = None) -> List[Dict[Text, Any]]:
+    """
+    Run the memory-scaling benchmark.
+
+    Args:
+        steps: Step counts to benchmark.
+        dims: State dimensions to benchmark.
+        storages: Result storages to benchmark, "memory" and/or "memmap".
+
+    Returns:
+        A list of benchmark results with the peak and retained memory of each run in bytes,
+        the retained bytes per stored state and their ratio to the raw size of a state.
+    """
+    steps = steps or STEPS
+    dims = dims or DIMS
+    storages = storages or STORAGES
+
+    model = ODEModel(ode_fn=decay, fn_args={"lamb": 0.5})
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for storage in storages:
+            integrator = Integrator(base_log_dir=tmp_dir,
+                                    base_output_dir=tmp_dir,
+                                    result_storage=storage,
+                                    trace_memory=True)
+
+            for num_steps in steps:
+                for dim in dims:
+                    result = {"name": f"{storage}/steps={num_steps}/dim={dim}",
+                              "storage": storage, "steps": num_steps, "dim": dim}
+
+                    if num_steps * dim > MAX_COMPONENTS:
+                        result["skipped"] = f"steps x dim > {MAX_COMPONENTS:g}"
+                        results.append(result)
+                        continue
+
+                    integrator.integrate_const(model=model,
+                                               step_func=ForwardEulerMethod(),
+                                               initial_state=(0.0, 1.0 if dim == 1
+                                                              else np.ones(dim)),
+                                               h=1.0 / num_steps,
+                                               max_steps=num_steps,
+                                               reset=True,
+                                               verbosity=logging.ERROR)
+
+                    performance = integrator.runs[-1][RunKeys.PERFORMANCE]
+
+                    # time and state components as 64 bit floats
+                    raw_bytes = 8 * (dim + 1)
+                    retained = performance[PerformanceKeys.RETAINED_MEMORY]
+
+                    result.update({"peak_memory": performance[PerformanceKeys.PEAK_MEMORY],
+                                   "retained_memory": retained,
+                                   "bytes_per_state": retained / num_steps,
+                                   "raw_bytes_per_state": raw_bytes,
+                                   "overhead": retained / num_steps / raw_bytes})
+
+                    results.append(result)
+
+            integrator.close()
+
+    return results
+
+
+def main(argv: List[Text] = None):
+    parser = argparse.ArgumentParser(description="Memory-scaling benchmark of integration "
+                                                 "runs.")
+    parser.add_argument("--steps", nargs="+", type=int, help="Step counts to benchmark.")
+    parser.add_argument("--dims", nargs="+", type=int, help="State dimensions to benchmark.")
+    parser.add_argument("--storages", nargs="+", choices=STORAGES,
+                        help="Result storages to benchmark.")
+    parser.add_argument("--output", help="JSON file to save the results to.")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two result files and flag regressions.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change flagged as a regression, default 0.1.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = (load_results(path) for path in args.compare)
+        regressed = print_comparison(compare_results(baseline, current, args.threshold))
+        return 1 if regressed else 0
+
+    results = run_memory_benchmark(steps=args.steps, dims=args.dims, storages=args.storages)
+
+    print_results(results, columns=["peak_memory", "retained_memory", "bytes_per_state",
+                                    "raw_bytes_per_state", "overhead"])
+
+    if args.output:
+        save_results(results, args.output, suite="memory")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
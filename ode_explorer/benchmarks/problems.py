@@ -0,0 +1,287 @@
+from typing import Any, Callable, Dict, List, Text
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from ode_explorer.models import ODEModel, HamiltonianSystem
+from ode_explorer.types import StateVariable
+
+__all__ = ["TestProblem", "problems"]
+
+
+class TestProblem:
+    """
+    Initial value problem with a reference solution at the end of the integration interval,
+    used to measure the global error of step functions in benchmarks.
+
+    Problems without a closed-form solution get a reference solution computed once with a
+    tight-tolerance scipy solver, Radau for stiff and DOP853 for non-stiff problems.
+
+    Besides the plain right-hand side, a problem can be given in split form for IMEX step
+    functions, and as a separable Hamiltonian system for symplectic step functions. The state
+    of the Hamiltonian form is y = (q, p), split in half, and its canonical equations are the
+    ones of the plain right-hand side, so that all forms share the reference solution.
+    """
+
+    def __init__(self,
+                 name: Text,
+                 ode_fn: Callable,
+                 y_0: StateVariable,
+                 end: float,
+                 fn_args: Dict[Text, Any] = None,
+                 stiff: bool = False,
+                 num_steps: int = 100,
+                 solution: Callable = None,
+                 explicit_fn: Callable = None,
+                 implicit_fn: Callable = None,
+                 hamiltonian: Callable = None,
+                 q_derivative: Callable = None,
+                 p_derivative: Callable = None):
+        """
+        TestProblem constructor.
+
+        Args:
+            name: Name of the problem.
+            ode_fn: Right-hand side with signature ode_fn(t, y, **fn_args).
+            y_0: Initial value at time 0.
+            end: End of the integration interval.
+            fn_args: Additional keyword arguments for the right-hand side.
+            stiff: Bool, whether the problem is stiff.
+            num_steps: Number of constant steps of the coarsest run of a step size sweep.
+            solution: Optional closed-form solution with signature solution(t, **fn_args).
+            explicit_fn: Optional non-stiff part of the right-hand side, with the same
+             signature as the ode_fn.
+            implicit_fn: Optional stiff part of the right-hand side, summing up to the ode_fn
+             together with the explicit_fn.
+            hamiltonian: Optional separable Hamiltonian with signature
+             hamiltonian(t, q, p, **fn_args).
+            q_derivative: q-derivative of the Hamiltonian, with signature
+             q_derivative(t, q, **fn_args).
+            p_derivative: p-derivative of the Hamiltonian, with signature
+             p_derivative(t, p, **fn_args).
+        """
+        self.name = name
+        self.ode_fn = ode_fn
+        self.y_0 = np.asarray(y_0, dtype=float)
+        self.end = end
+        self.fn_args = fn_args or {}
+        self.stiff = stiff
+        self.num_steps = num_steps
+        self.solution = solution
+        self.explicit_fn = explicit_fn
+        self.implicit_fn = implicit_fn
+        self.hamiltonian = hamiltonian
+        self.q_derivative = q_derivative
+        self.p_derivative = p_derivative
+
+        self._reference = None
+
+    @property
+    def forms(self) -> List[Text]:
+        """
+        Returns:
+            The forms the problem is available in.
+        """
+        forms = ["ode"]
+
+        if self.explicit_fn is not None and self.implicit_fn is not None:
+            forms.append("split")
+
+        if all(fn is not None for fn in [self.hamiltonian, self.q_derivative,
+                                         self.p_derivative]):
+            forms.append("hamiltonian")
+
+        return forms
+
+    def make_model(self, form: Text = "ode"):
+        """
+        Construct a model of the problem.
+
+        Args:
+            form: Form of the model, one of "ode", "split" and "hamiltonian".
+
+        Returns:
+            An ODEModel instance, or a HamiltonianSystem instance for the Hamiltonian form.
+
+        Raises:
+            ValueError: If the problem is not available in the requested form.
+        """
+        if form not in self.forms:
+            raise ValueError(f"Problem {self.name} is not available in {form} form. Available "
+                             f"forms are: {', '.join(self.forms)}.")
+
+        if form == "split":
+            return ODEModel(explicit_fn=self.explicit_fn, implicit_fn=self.implicit_fn,
+                            fn_args=dict(self.fn_args))
+
+        if form == "hamiltonian":
+            return HamiltonianSystem(hamiltonian=self.hamiltonian,
+                                     q_derivative=self.q_derivative,
+                                     p_derivative=self.p_derivative,
+                                     h_args=dict(self.fn_args),
+                                     is_separable=True)
+
+        return ODEModel(ode_fn=self.ode_fn, fn_args=dict(self.fn_args))
+
+    def initial_state(self, form: Text = "ode"):
+        """
+        Args:
+            form: Form of the model, one of "ode", "split" and "hamiltonian".
+
+        Returns:
+            The initial state of the problem, (t, q, p) for the Hamiltonian form.
+        """
+        if form == "hamiltonian":
+            q, p = np.split(self.y_0.copy(), 2)
+            return 0.0, q, p
+
+        return 0.0, self.y_0.copy()
+
+    def reference(self) -> np.ndarray:
+        """
+        Return the reference solution at the end of the integration interval.
+
+        Returns:
+            The reference solution.
+        """
+        if self._reference is None:
+            if self.solution is not None:
+                self._reference = np.asarray(self.solution(self.end, **self.fn_args))
+            else:
+                sol = solve_ivp(lambda t, y: self.ode_fn(t, y, **self.fn_args),
+                                t_span=(0.0, self.end),
+                                y0=self.y_0,
+                                method="Radau" if self.stiff else "DOP853",
+                                rtol=1e-12,
+                                atol=1e-14)
+                self._reference = sol.y[:, -1]
+
+        return self._reference
+
+    def error(self, y: StateVariable) -> float:
+        """
+        Global error of a solution at the end of the integration interval, in the maximum norm
+        relative to the maximum norm of the reference solution.
+
+        Args:
+            y: Solution at the end of the integration interval.
+
+        Returns:
+            The relative global error.
+        """
+        reference = self.reference()
+        return float(np.max(np.abs(y - reference)) / np.max(np.abs(reference)))
+
+
+def decay(t: float, y: np.ndarray, lamb: float = 0.5):
+    return - lamb * y
+
+
+def decay_solution(t: float, lamb: float = 0.5):
+    return np.exp(-lamb * t) * np.ones(10)
+
+
+def robertson(t: float, y: np.ndarray, k1: float = 0.04, k2: float = 3e7, k3: float = 1e4):
+    r1, r2, r3 = k1 * y[0], k2 * y[1] ** 2, k3 * y[1] * y[2]
+    return np.array([-r1 + r3, r1 - r2 - r3, r2])
+
+
+def robertson_explicit(t: float, y: np.ndarray, k1: float = 0.04, k2: float = 3e7,
+                       k3: float = 1e4):
+    # the slow reaction
+    r1 = k1 * y[0]
+    return np.array([-r1, r1, 0.0])
+
+
+def robertson_implicit(t: float, y: np.ndarray, k1: float = 0.04, k2: float = 3e7,
+                       k3: float = 1e4):
+    # the fast reactions, which make the problem stiff
+    r2, r3 = k2 * y[1] ** 2, k3 * y[1] * y[2]
+    return np.array([r3, -r2 - r3, r2])
+
+
+def van_der_pol(t: float, y: np.ndarray, mu: float = 1.0):
+    return np.array([y[1], mu * (1 - y[0] ** 2) * y[1] - y[0]])
+
+
+def van_der_pol_scaled(t: float, y: np.ndarray, eps: float = 1e-3):
+    # singularly perturbed form, stiffness grows with 1 / eps
+    return np.array([y[1], ((1 - y[0] ** 2) * y[1] - y[0]) / eps])
+
+
+def van_der_pol_scaled_explicit(t: float, y: np.ndarray, eps: float = 1e-3):
+    return np.array([y[1], 0.0])
+
+
+def van_der_pol_scaled_implicit(t: float, y: np.ndarray, eps: float = 1e-3):
+    return np.array([0.0, ((1 - y[0] ** 2) * y[1] - y[0]) / eps])
+
+
+def hires(t: float, y: np.ndarray):
+    return np.array([
+        -1.71 * y[0] + 0.43 * y[1] + 8.32 * y[2] + 0.0007,
+        1.71 * y[0] - 8.75 * y[1],
+        -10.03 * y[2] + 0.43 * y[3] + 0.035 * y[4],
+        8.32 * y[1] + 1.71 * y[2] - 1.12 * y[3],
+        -1.745 * y[4] + 0.43 * y[5] + 0.43 * y[6],
+        -280.0 * y[5] * y[7] + 0.69 * y[3] + 1.71 * y[4] - 0.43 * y[5] + 0.69 * y[6],
+        280.0 * y[5] * y[7] - 1.81 * y[6],
+        -280.0 * y[5] * y[7] + 1.81 * y[6]])
+
+
+def brusselator(t: float, y: np.ndarray, a: float = 1.0, b: float = 3.0):
+    return np.array([a + y[0] ** 2 * y[1] - (b + 1) * y[0], b * y[0] - y[0] ** 2 * y[1]])
+
+
+def lorenz(t: float, y: np.ndarray, sigma: float = 10.0, rho: float = 28.0,
+           beta: float = 8 / 3):
+    return np.array([sigma * (y[1] - y[0]),
+                     y[0] * (rho - y[2]) - y[1],
+                     y[0] * y[1] - beta * y[2]])
+
+
+def kepler(t: float, y: np.ndarray):
+    q, p = y[:2], y[2:]
+    return np.concatenate([p, - q / np.linalg.norm(q) ** 3])
+
+
+# an eccentric orbit, which returns to its initial state after one period of 2 pi
+_e = 0.5
+_kepler_y_0 = np.array([1 - _e, 0.0, 0.0, np.sqrt((1 + _e) / (1 - _e))])
+
+
+def kepler_hamiltonian(t: float, q: np.ndarray, p: np.ndarray):
+    return 0.5 * np.dot(p, p) - 1 / np.linalg.norm(q)
+
+
+def kepler_q_derivative(t: float, q: np.ndarray):
+    return q / np.linalg.norm(q) ** 3
+
+
+def kepler_p_derivative(t: float, p: np.ndarray):
+    return p
+
+
+def kepler_solution(t: float):
+    return _kepler_y_0
+
+
+problems = {p.name: p for p in [
+    TestProblem("decay", decay, np.ones(10), end=10.0, fn_args={"lamb": 0.5},
+                num_steps=10, solution=decay_solution),
+    TestProblem("robertson", robertson, [1.0, 0.0, 0.0], end=40.0, stiff=True,
+                num_steps=40, explicit_fn=robertson_explicit, implicit_fn=robertson_implicit),
+    TestProblem("van_der_pol", van_der_pol, [2.0, 0.0], end=10.0, fn_args={"mu": 1.0},
+                num_steps=100),
+    TestProblem("van_der_pol_stiff", van_der_pol_scaled, [2.0, -2 / 3], end=2.0,
+                fn_args={"eps": 1e-3}, stiff=True, num_steps=200,
+                explicit_fn=van_der_pol_scaled_explicit,
+                implicit_fn=van_der_pol_scaled_implicit),
+    TestProblem("hires", hires, [1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0057], end=321.8122,
+                stiff=True, num_steps=400),
+    TestProblem("brusselator", brusselator, [1.5, 3.0], end=20.0, num_steps=100),
+    TestProblem("lorenz", lorenz, [1.0, 1.0, 1.0], end=5.0, num_steps=500),
+    TestProblem("kepler", kepler, _kepler_y_0, end=2 * np.pi, num_steps=100,
+                solution=kepler_solution, hamiltonian=kepler_hamiltonian,
+                q_derivative=kepler_q_derivative, p_derivative=kepler_p_derivative),
+]}
@@ -0,0 +1,327 @@
+"""
+Benchmark suite of the built-in step functions.
+
+Every built-in step function is run in the constant step size loop, except for DOPRI45,
+which is run in the adaptive loop, on a linear decay problem of state dimensions ranging from a scalar to
+10^6 components. The right-hand side is either cheap, a single vectorized multiplication, or
+expensive, with several transcendental function evaluations per component, or the cheap one
+in in-place form f(t, y, out), which shows the allocation savings of in-place kernels. Each benchmark
+reports steps per second, right-hand side calls per second and the peak memory allocated
+during integration.
+
+Usage:
+    python -m ode_explorer.benchmarks.step_functions --output results.json
+    python -m ode_explorer.benchmarks.step_functions --compare baseline.json results.json
+"""
+import argparse
+import logging
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Text
+
+import numpy as np
+
+from ode_explorer.benchmarks.harness import measure, save_results, load_results, \
+    compare_results, print_results, print_comparison
+from ode_explorer.constants import RunKeys, PerformanceKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel, HamiltonianSystem, MultirateModel, SplitModel
+from ode_explorer.stepfunctions import ForwardEulerMethod, HeunMethod, RungeKutta4, DOPRI45, \
+    BackwardEulerMethod, AdamsBashforth2, BDF2, EulerA, EulerB, MultirateMethod, IMEXEuler, \
+    ARS222, ARS343, ARK3, ARK4, ARK5, ExactFlow, LinearFlow, LieSplitting, StrangSplitting
+from ode_explorer.stepsize_control import DOPRI45Controller
+
+__all__ = ["run_suite", "main"]
+
+DIMS = [1, 10, 1000, 10 ** 6]
+QUICK_DIMS = [1, 100]
+
+RHS_COSTS = ["cheap", "expensive", "inplace"]
+
+# number of steps is chosen so that every benchmark processes a similar number of components
+TOTAL_COMPONENTS = 2 * 10 ** 6
+MIN_STEPS = 5
+MAX_STEPS = 2000
+
+# implicit methods solve dense non-linear systems, which is infeasible for large dimensions
+MAX_IMPLICIT_DIM = 100
+
+lamb = 0.5
+
+
+def cheap_decay(t: float, y, lamb: float = 0.5):
+    return - lamb * y
+
+
+def expensive_decay(t: float, y, lamb: float = 0.5):
+    # same solution as the cheap decay, with a few transcendental passes over the state
+    work = np.sin(y)
+    for _ in range(4):
+        work = np.tanh(np.exp(-work * work))
+    return - lamb * y + 0.0 * work
+
+
+def inplace_decay(t: float, y, out, lamb: float = 0.5):
+    np.multiply(y, -lamb, out=out)
+
+
+def decay_flow(t: float, y, h: float, lamb: float = 0.5):
+    return np.exp(-lamb * h) * y
+
+
+def hamiltonian(t: float, q, p, k: float = 1.0):
+    return 0.5 * (np.dot(p, p) + k * np.dot(q, q))
+
+
+def q_derivative(t: float, q, k: float = 1.0):
+    return k * q
+
+
+def p_derivative(t: float, p, k: float = 1.0):
+    return p
+
+
+def _initial_y(dim: int):
+    return 1.0 if dim == 1 else np.ones(dim)
+
+
+def _decay_model(rhs: Callable, **kwargs):
+    return ODEModel(ode_fn=rhs, fn_args={"lamb": lamb}, **kwargs)
+
+
+def slow_decay(t: float, y, lamb: float = 0.5, half: int = 1, rhs: Callable = cheap_decay):
+    return rhs(t, y[:half], lamb=lamb)
+
+
+def fast_decay(t: float, y, lamb: float = 0.5, half: int = 1, rhs: Callable = cheap_decay):
+    return rhs(t, y[half:], lamb=lamb)
+
+
+def _multirate_model(rhs: Callable, dim: int):
+    half = dim // 2
+    return MultirateModel(slow_fn=slow_decay, fast_fn=fast_decay, slow_idx=np.arange(half),
+                          fast_idx=np.arange(half, dim),
+                          fn_args={"lamb": lamb, "half": half, "rhs": rhs})
+
+
+# step function constructor, model constructor and state constructor for every step function
+_CASES = {
+    "ForwardEulerMethod": (ForwardEulerMethod, _decay_model, None),
+    "HeunMethod": (HeunMethod, _decay_model, None),
+    "RungeKutta4": (RungeKutta4, _decay_model, None),
+    "DOPRI45": (DOPRI45, _decay_model, None),
+    "BackwardEulerMethod": (BackwardEulerMethod, _decay_model, None),
+    "AdamsBashforth2": (lambda: AdamsBashforth2(startup=RungeKutta4()), _decay_model, None),
+    "BDF2": (lambda: BDF2(startup=RungeKutta4()), _decay_model, None),
+    "EulerA": (EulerA, None, "hamiltonian"),
+    "EulerB": (EulerB, None, "hamiltonian"),
+    "MultirateMethod": (lambda: MultirateMethod(slow_step=RungeKutta4(),
+                                                fast_step=RungeKutta4(),
+                                                num_substeps=4), None, "multirate"),
+    "IMEXEuler": (IMEXEuler, None, "imex"),
+    "ARS222": (ARS222, None, "imex"),
+    "ARS343": (ARS343, None, "imex"),
+    "ARK3": (ARK3, None, "imex"),
+    "ARK4": (ARK4, None, "imex"),
+    "ARK5": (ARK5, None, "imex"),
+    "ExactFlow": (lambda: ExactFlow(flow=decay_flow), _decay_model, None),
+    "LinearFlow": (lambda: LinearFlow(matrix=-lamb), _decay_model, None),
+    "LieSplitting": (lambda: LieSplitting(step_funcs=[ExactFlow(flow=decay_flow),
+                                                      RungeKutta4()]), None, "split"),
+    "StrangSplitting": (lambda: StrangSplitting(step_funcs=[ExactFlow(flow=decay_flow),
+                                                            RungeKutta4()]), None, "split"),
+}
+
+_IMPLICIT = ["BackwardEulerMethod", "BDF2", "IMEXEuler", "ARS222", "ARS343", "ARK3", "ARK4",
+             "ARK5"]
+
+
+def _make_problem(name: Text, dim: int, rhs: Callable):
+    _, make_model, kind = _CASES[name]
+
+    y_0 = _initial_y(dim)
+
+    if kind == "hamiltonian":
+        # phase space of dimension dim, split evenly into positions and momenta
+        half = np.ones(max(dim // 2, 1))
+        model = HamiltonianSystem(hamiltonian=hamiltonian, q_derivative=q_derivative,
+                                  p_derivative=p_derivative, h_args={"k": 1.0})
+        return model, (0.0, half, half.copy())
+
+    if kind == "multirate":
+        return _multirate_model(rhs, dim), (0.0, y_0)
+
+    if kind == "imex":
+        model = ODEModel(explicit_fn=rhs, implicit_fn=cheap_decay, fn_args={"lamb": lamb})
+        return model, (0.0, y_0)
+
+    if kind == "split":
+        # the decay split into two halves, each with half the decay rate
+        models = [ODEModel(ode_fn=rhs, fn_args={"lamb": lamb / 2}) for _ in range(2)]
+        return SplitModel(models=models), (0.0, y_0)
+
+    if rhs is inplace_decay:
+        return make_model(rhs, inplace=True), (0.0, y_0)
+
+    return make_model(rhs), (0.0, y_0)
+
+
+def _skip_reason(name: Text, dim: int) -> Text:
+    if name in _IMPLICIT and dim > MAX_IMPLICIT_DIM:
+        return f"implicit, dim > {MAX_IMPLICIT_DIM}"
+    if name == "MultirateMethod" and dim < 2:
+        return "needs slow and fast components"
+    return None
+
+
+def _rhs_skip_reason(name: Text, cost: Text) -> Text:
+    if cost == "inplace" and _CASES[name][2] is not None:
+        return "in-place right-hand sides need a single ODE model"
+    return None
+
+
+def _run_benchmark(integrator: Integrator,
+                   name: Text,
+                   loop: Text,
+                   dim: int,
+                   cost: Text,
+                   repeat: int,
+                   steps_scale: float) -> Dict[Text, Any]:
+    result = {"name": f"{name}/{loop}/dim={dim}/{cost}",
+              "step_func": name, "loop": loop, "dim": dim, "rhs": cost}
+
+    reason = _skip_reason(name, dim) or _rhs_skip_reason(name, cost)
+    if reason is not None:
+        result["skipped"] = reason
+        return result
+
+    rhs = {"cheap": cheap_decay, "expensive": expensive_decay, "inplace": inplace_decay}[cost]
+
+    num_steps = int(np.clip(TOTAL_COMPONENTS // dim, MIN_STEPS, MAX_STEPS) * steps_scale)
+    num_steps = max(num_steps, MIN_STEPS)
+
+    h = 1.0 / num_steps
+
+    def integrate():
+        model, initial_state = _make_problem(name, dim, rhs)
+
+        if loop == "adaptive":
+            integrator.integrate_adaptively(model=model,
+                                            step_func=_CASES[name][0](),
+                                            sc=DOPRI45Controller(atol=1e-6),
+                                            initial_state=initial_state,
+                                            initial_h=h,
+                                            end=1.0,
+                                            max_steps=10 * num_steps,
+                                            reset=True,
+                                            verbosity=logging.ERROR)
+        else:
+            step_func, _, _ = _CASES[name]
+            integrator.integrate_const(model=model,
+                                       step_func=step_func(),
+                                       initial_state=initial_state,
+                                       h=h,
+                                       max_steps=num_steps,
+                                       reset=True,
+                                       verbosity=logging.ERROR)
+
+        performance = integrator.runs[-1][RunKeys.PERFORMANCE]
+
+        return {"steps": performance[PerformanceKeys.ACCEPTED_STEPS] +
+                performance[PerformanceKeys.REJECTED_STEPS],
+                "rhs_calls": performance[PerformanceKeys.RHS_CALLS]}
+
+    try:
+        result.update(measure(integrate, repeat=repeat))
+    except Exception as e:
+        # a failing step function should not abort the whole suite
+        result["skipped"] = f"error: {e}"
+
+    return result
+
+
+def run_suite(dims: List[int] = None,
+              rhs_costs: List[Text] = None,
+              step_funcs: List[Text] = None,
+              repeat: int = 3,
+              steps_scale: float = 1.0) -> List[Dict[Text, Any]]:
+    """
+    Run the step function benchmark suite.
+
+    Args:
+        dims: State dimensions to benchmark.
+        rhs_costs: Right-hand side costs to benchmark, "cheap", "expensive" and/or "inplace".
+        step_funcs: Names of the step functions to benchmark, by default all built-in ones.
+         DOPRI45 is benchmarked in the adaptive loop, all others in the constant loop.
+        repeat: Number of timed runs per benchmark, the fastest one is reported.
+        steps_scale: Factor scaling the number of steps of each benchmark.
+
+    Returns:
+        A list of benchmark results.
+
+    Raises:
+        ValueError: If an unknown step function is requested.
+    """
+    dims = dims or DIMS
+    rhs_costs = rhs_costs or RHS_COSTS
+    step_funcs = step_funcs or list(_CASES)
+
+    unknown = [name for name in step_funcs if name not in _CASES]
+    if unknown:
+        raise ValueError(f"Unknown step functions: {', '.join(unknown)}. Available step "
+                         f"functions are: {', '.join(_CASES)}.")
+
+    # DOPRI45 returns a pair of estimates and runs in the adaptive loop only
+    cases = [(name, "adaptive" if name == "DOPRI45" else "constant") for name in step_funcs]
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        integrator = Integrator(base_log_dir=tmp_dir, base_output_dir=tmp_dir)
+
+        for name, loop in cases:
+            for dim in dims:
+                for cost in rhs_costs:
+                    result = _run_benchmark(integrator, name, loop, dim, cost,
+                                            repeat=repeat, steps_scale=steps_scale)
+                    results.append(result)
+
+        integrator.close()
+
+    return results
+
+
+def main(argv: List[Text] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the built-in step functions.")
+    parser.add_argument("--output", help="JSON file to save the results to.")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two result files and flag regressions.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change flagged as a regression, default 0.1.")
+    parser.add_argument("--step-funcs", nargs="+", help="Step functions to benchmark.")
+    parser.add_argument("--dims", nargs="+", type=int, help="State dimensions to benchmark.")
+    parser.add_argument("--quick", action="store_true",
+                        help="Small dimensions and fewer steps, e.g. for a smoke test.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = (load_results(path) for path in args.compare)
+        regressed = print_comparison(compare_results(baseline, current, args.threshold))
+        return 1 if regressed else 0
+
+    if args.quick:
+        results = run_suite(dims=args.dims or QUICK_DIMS, step_funcs=args.step_funcs,
+                            steps_scale=0.1)
+    else:
+        results = run_suite(dims=args.dims, step_funcs=args.step_funcs)
+
+    print_results(results, columns=["steps_per_second", "rhs_calls_per_second", "peak_memory"])
+
+    if args.output:
+        save_results(results, args.output, suite="step_functions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Work-precision benchmark of the built-in step functions on standard test problems.
+
+Constant step size methods are run with a sweep of step sizes, each halving the previous one,
+and DOPRI45 is run adaptively with a sweep of tolerances. Every run reports the global error
+at the end of the integration interval against a reference solution, together with the
+number of right-hand side calls and the wall time it took. From these, the cheapest step
+function reaching a target accuracy is picked for every problem.
+
+Step functions for special model forms run on the problems available in that form: the
+symplectic EulerA and EulerB on problems given as a separable Hamiltonian system (Kepler), and
+the IMEX methods on problems split into a non-stiff and a stiff part (Robertson and the stiff
+Van der Pol oscillator). HIRES has no split, since its fast non-linear reaction is stiff as
+well, which leaves no non-stiff part worth treating explicitly. Multirate and splitting methods are not part of the sweep, since they
+need a problem-specific partition of the model into sub-models or exact sub-flows.
+
+Usage:
+    python -m ode_explorer.benchmarks.work_precision --output wp.json --plot wp_plots
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Text
+
+import numpy as np
+from tabulate import tabulate
+
+from ode_explorer.benchmarks.harness import save_results, print_results
+from ode_explorer.benchmarks.problems import TestProblem, problems
+from ode_explorer.constants import RunKeys, PerformanceKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.stepfunctions import ForwardEulerMethod, HeunMethod, RungeKutta4, DOPRI45, \
+    BackwardEulerMethod, AdamsBashforth2, BDF2, EulerA, EulerB, IMEXEuler, ARS222, ARS343, \
+    ARK3, ARK4, ARK5
+from ode_explorer.stepsize_control import DOPRI45Controller
+
+__all__ = ["run_work_precision", "cheapest", "plot_work_precision", "main"]
+
+STEP_FUNCS = {
+    "ForwardEulerMethod": ForwardEulerMethod,
+    "HeunMethod": HeunMethod,
+    "RungeKutta4": RungeKutta4,
+    "AdamsBashforth2": lambda: AdamsBashforth2(startup=RungeKutta4()),
+    "BackwardEulerMethod": BackwardEulerMethod,
+    "BDF2": lambda: BDF2(startup=RungeKutta4()),
+    "DOPRI45": DOPRI45,
+    "EulerA": EulerA,
+    "EulerB": EulerB,
+    "IMEXEuler": IMEXEuler,
+    "ARS222": ARS222,
+    "ARS343": ARS343,
+    "ARK3": ARK3,
+    "ARK4": ARK4,
+    "ARK5": ARK5,
+}
+
+# model forms of step functions which do not integrate the plain right-hand side
+MODEL_FORMS = {
+    "EulerA": "hamiltonian",
+    "EulerB": "hamiltonian",
+    "IMEXEuler": "split",
+    "ARS222": "split",
+    "ARS343": "split",
+    "ARK3": "split",
+    "ARK4": "split",
+    "ARK5": "split",
+}
+
+# step functions run adaptively with a tolerance sweep instead of a step size sweep
+ADAPTIVE = ["DOPRI45"]
+
+NUM_REFINEMENTS = 5
+TOLERANCES = [1e-3, 1e-4, 1e-5, 1e-6, 1e-7, 1e-8, 1e-9]
+
+# maximum number of adaptive steps, reached by explicit methods on stiff problems
+MAX_ADAPTIVE_STEPS = 50000
+
+TARGET_ERRORS = [1e-2, 1e-4, 1e-6]
+
+
+def _run(integrator: Integrator, problem: TestProblem, step_func: Text,
+         setting: float) -> Dict[Text, Any]:
+    result = {"name": f"{problem.name}/{step_func}/{setting:g}", "problem": problem.name,
+              "step_func": step_func}
+
+    form = MODEL_FORMS.get(step_func, "ode")
+
+    kwargs = dict(model=problem.make_model(form=form),
+                  step_func=STEP_FUNCS[step_func](),
+                  initial_state=problem.initial_state(form=form),
+                  reset=True,
+                  verbosity=logging.ERROR)
+
+    try:
+        # diverging explicit methods on stiff problems overflow
+        with np.errstate(all="ignore"):
+            if step_func in ADAPTIVE:
+                result["tol"] = setting
+                integrator.integrate_adaptively(sc=DOPRI45Controller(atol=setting,
+                                                                     rtol=setting),
+                                                initial_h=problem.end / problem.num_steps,
+                                                end=problem.end,
+                                                max_steps=MAX_ADAPTIVE_STEPS,
+                                                **kwargs)
+            else:
+                result["h"] = problem.end / setting
+                integrator.integrate_const(h=problem.end / setting,
+                                           max_steps=int(setting),
+                                           **kwargs)
+    except Exception as e:
+        result["skipped"] = f"error: {e}"
+        return result
+
+    run = integrator.runs[-1]
+    performance = run[RunKeys.PERFORMANCE]
+    # states of Hamiltonian systems are (t, q, p)
+    t, *state_vectors = run[RunKeys.RESULT_DATA][-1]
+    y = np.concatenate([np.atleast_1d(v) for v in state_vectors])
+
+    result.update({"steps": performance[PerformanceKeys.ACCEPTED_STEPS] +
+                   performance[PerformanceKeys.REJECTED_STEPS],
+                   "rhs_calls": performance[PerformanceKeys.RHS_CALLS],
+                   "time": performance[PerformanceKeys.TOTAL_TIME]})
+
+    if not np.isclose(t, problem.end):
+        result["skipped"] = f"stopped at t={t:.4g} after {result['steps']} steps"
+    elif not np.all(np.isfinite(y)):
+        result["skipped"] = "diverged"
+    else:
+        result["error"] = problem.error(y)
+
+    return result
+
+
+def run_work_precision(problem_names: List[Text] = None,
+                       step_funcs: List[Text] = None,
+                       num_refinements: int = NUM_REFINEMENTS,
+                       tolerances: List[float] = None) -> List[Dict[Text, Any]]:
+    """
+    Run the work-precision benchmark.
+
+    Args:
+        problem_names: Names of the test problems, by default all problems.
+        step_funcs: Names of the step functions, by default all supported ones.
+        num_refinements: Number of step sizes of constant step size sweeps. The coarsest step
+         size is set per problem, every further one halves the previous one.
+        tolerances: Tolerances of adaptive sweeps.
+
+    Returns:
+        A list of results, one per problem, step function and step size or tolerance. Runs
+        which diverged, failed or did not reach the end of the interval are marked as skipped.
+        Step functions for special model forms are only run on the problems available in
+        their form.
+
+    Raises:
+        ValueError: If an unknown problem or step function is requested.
+    """
+    problem_names = problem_names or list(problems)
+    step_funcs = step_funcs or list(STEP_FUNCS)
+    tolerances = tolerances or TOLERANCES
+
+    for names, available, kind in [(problem_names, problems, "problems"),
+                                   (step_funcs, STEP_FUNCS, "step functions")]:
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown {kind}: {', '.join(unknown)}. Available {kind} are: "
+                             f"{', '.join(available)}.")
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        integrator = Integrator(base_log_dir=tmp_dir, base_output_dir=tmp_dir)
+
+        for problem_name in problem_names:
+            problem = problems[problem_name]
+
+            for step_func in step_funcs:
+                if MODEL_FORMS.get(step_func, "ode") not in problem.forms:
+                    continue
+
+                if step_func in ADAPTIVE:
+                    settings = tolerances
+                else:
+                    settings = [problem.num_steps * 2 ** i for i in range(num_refinements)]
+
+                for setting in settings:
+                    results.append(_run(integrator, problem, step_func, setting))
+
+        integrator.close()
+
+    return results
+
+
+def cheapest(results: List[Dict[Text, Any]],
+             target_errors: List[float] = None,
+             cost: Text = "rhs_calls") -> List[Dict[Text, Any]]:
+    """
+    Pick the cheapest step function reaching each target error on each problem.
+
+    Args:
+        results: Work-precision results, as returned by ``run_work_precision``.
+        target_errors: Target global errors.
+        cost: Cost measure to minimize, "rhs_calls" or "time".
+
+    Returns:
+        A list holding the cheapest run for every problem and target error, or no step
+        function if no run reached the target error.
+    """
+    target_errors = target_errors or TARGET_ERRORS
+
+    picks = []
+
+    for problem in dict.fromkeys(r["problem"] for r in results):
+        runs = [r for r in results if r["problem"] == problem and "error" in r]
+
+        for target in target_errors:
+            candidates = [r for r in runs if r["error"] <= target]
+            best = min(candidates, key=lambda r: r[cost]) if candidates else {}
+
+            picks.append({"problem": problem, "target_error": target,
+                          "step_func": best.get("step_func"), "error": best.get("error"),
+                          "h": best.get("h"), "tol": best.get("tol"),
+                          cost: best.get(cost)})
+
+    return picks
+
+
+def plot_work_precision(results: List[Dict[Text, Any]], output_dir: Text):
+    """
+    Plot the global error over right-hand side calls and wall time for every problem, one
+    figure per problem saved as PNG.
+
+    Args:
+        results: Work-precision results, as returned by ``run_work_precision``.
+        output_dir: Directory to save the figures to.
+
+    Raises:
+        ImportError: If matplotlib is not installed.
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        raise ImportError("Plotting work-precision diagrams requires matplotlib. You can "
+                          "install it by running \"pip install matplotlib\".")
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    for problem in dict.fromkeys(r["problem"] for r in results):
+        fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+
+        for step_func in dict.fromkeys(r["step_func"] for r in results):
+            runs = [r for r in results
+                    if r["problem"] == problem and r["step_func"] == step_func and "error" in r]
+
+            if not runs:
+                continue
+
+            errors = [r["error"] for r in runs]
+
+            for ax, cost in zip(axes, ["rhs_calls", "time"]):
+                ax.loglog([r[cost] for r in runs], errors, marker="o", label=step_func)
+
+        for ax, label in zip(axes, ["right-hand side calls", "wall time [s]"]):
+            ax.set_xlabel(label)
+            ax.set_ylabel("relative global error")
+            ax.grid(True, which="both", alpha=0.3)
+
+        axes[0].legend()
+        fig.suptitle(problem)
+        fig.savefig(os.path.join(output_dir, f"{problem}.png"), dpi=100)
+        plt.close(fig)
+
+
+def main(argv: List[Text] = None):
+    parser = argparse.ArgumentParser(description="Work-precision benchmark of the built-in "
+                                                 "step functions.")
+    parser.add_argument("--problems", nargs="+", help="Test problems to run.")
+    parser.add_argument("--step-funcs", nargs="+", help="Step functions to run.")
+    parser.add_argument("--refinements", type=int, default=NUM_REFINEMENTS,
+                        help="Number of step sizes per constant step size sweep.")
+    parser.add_argument("--cost", choices=["rhs_calls", "time"], default="rhs_calls",
+                        help="Cost measure for picking the cheapest step function.")
+    parser.add_argument("--output", help="JSON file to save the results to.")
+    parser.add_argument("--plot", metavar="DIR", help="Directory to save plots to.")
+    args = parser.parse_args(argv)
+
+    results = run_work_precision(problem_names=args.problems,
+                                 step_funcs=args.step_funcs,
+                                 num_refinements=args.refinements)
+
+    print_results(results, columns=["h", "tol", "error", "rhs_calls", "time"])
+
+    print("\nCheapest step function per target error:\n")
+    print(tabulate(cheapest(results, cost=args.cost), headers="keys", floatfmt=".4g"))
+
+    if args.output:
+        save_results(results, args.output, suite="work_precision")
+
+    if args.plot:
+        plot_work_precision(results, args.plot)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
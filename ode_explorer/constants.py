@@ -3,6 +3,10 @@ class RunKeys:
     METRICS = "metrics"
     RUN_CONFIG = "run_config"
     MODEL_METADATA = "model_metadata"
+    PARAREAL_INFO = "parareal_info"
+    STORAGE = "storage"
+    PERFORMANCE = "performance"
+    SENSITIVITIES = "sensitivities"
 
 
 class RunConfigKeys:
@@ -12,6 +16,7 @@ class RunConfigKeys:
     STEP_SIZE = "h"
     METRIC_NAMES = "metric_names"
     CALLBACK_NAMES = "callback_names"
+    SENSITIVITY_PARAMS = "sensitivity_params"
 
 
 TIMESTAMP = "timestamp"
@@ -21,3 +26,80 @@ RUN_ID = "run_id"
 class ModelMetadataKeys:
     DIM_NAMES = "dim_names"
     VARIABLE_NAMES = "variable_names"
+
+
+class PararealKeys:
+    NUM_SLICES = "num_slices"
+    NUM_WORKERS = "num_workers"
+    ITERATIONS = "iterations"
+    CONVERGED = "converged"
+    CORRECTIONS = "corrections"
+    WALL_TIME = "wall_time"
+    SERIAL_TIME = "serial_time"
+    FINE_TIME = "fine_time"
+    SPEEDUP = "speedup"
+
+
+class AdjointKeys:
+    LOSS = "loss"
+    INITIAL_STATE_GRADIENT = "initial_state_gradient"
+    PARAM_GRADIENTS = "param_gradients"
+    NUM_STEPS = "num_steps"
+    NUM_CHECKPOINTS = "num_checkpoints"
+    STORED_STATES = "stored_states"
+    FORWARD_STEPS = "forward_steps"
+
+
+class CatalogKeys:
+    RUN_ID = "run_id"
+    TIMESTAMP = "timestamp"
+    CREATED = "created"
+    OUTPUT_DIR = "output_dir"
+    NUM_STATES = "num_states"
+    FINAL_TIME = "final_time"
+    SUMMARY = "summary"
+
+
+class StorageKeys:
+    FORMAT = "format"
+    FILE = "file"
+    OPTIONS = "options"
+    COLUMNS = "columns"
+    VARIABLE_SHAPES = "variable_shapes"
+    NUM_STATES = "num_states"
+    FINAL_TIME = "final_time"
+
+
+class CheckpointKeys:
+    LOOP_TYPE = "loop_type"
+    ITERATION = "iteration"
+    STATE = "state"
+    STEP_SIZE = "h"
+    MAX_STEPS = "max_steps"
+    RUN = "run"
+    STEP_FUNC = "step_func"
+    STEP_SIZE_CONTROLLER = "sc"
+    CALLBACKS = "callbacks"
+    METRICS = "metrics"
+    OUTPUT_DIR = "output_dir"
+    INTERVAL = "interval"
+    COUNTERS = "counters"
+    NUM_STATES = "num_states"
+    NUM_METRIC_ROWS = "num_metric_rows"
+    ROWS_OFFSET = "rows_offset"
+
+
+class PerformanceKeys:
+    RHS_CALLS = "rhs_calls"
+    JACOBIAN_EVALS = "jacobian_evals"
+    NONLINEAR_SOLVES = "nonlinear_solves"
+    NEWTON_ITERATIONS = "newton_iterations"
+    ACCEPTED_STEPS = "accepted_steps"
+    REJECTED_STEPS = "rejected_steps"
+    RHS_TIME = "rhs_time"
+    STEP_FUNC_TIME = "step_func_time"
+    CALLBACK_TIME = "callback_time"
+    BOOKKEEPING_TIME = "bookkeeping_time"
+    TOTAL_TIME = "total_time"
+    PEAK_MEMORY = "peak_memory"
+    RETAINED_MEMORY = "retained_memory"
@@ -2,6 +2,34 @@
 MAX_STEPS = 10000
 INITIAL_H = 0.01
 
+# parareal convergence tolerance on the maximal correction
+PARAREAL_TOL = 1e-8
+
+# file name of the run catalog database in the base output directory
+CATALOG_FILE = "runs.db"
+
+# file format for saving run result data
+OUTPUT_FORMAT = "csv"
+
+# memory-mapped result storage, directory in the base output directory
+# and number of states the storage file grows by when full
+MEMMAP_DIR = "trajectories"
+MEMMAP_CHUNK_SIZE = 65536
+
+# maximum number of runs waiting to be saved in the background
+IO_QUEUE_SIZE = 8
+
+# minimum time in seconds between two checkpoints of a running integration
+CHECKPOINT_INTERVAL = 600.0
+
+# live metrics export, default host of the HTTP endpoint
+# and time in seconds between two metrics snapshot files
+EXPORTER_HOST = "127.0.0.1"
+SNAPSHOT_INTERVAL = 5.0
+
+# directory of the generated code of models defined by SymPy expressions
+CODEGEN_CACHE_DIR = "~/.cache/ode_explorer/codegen"
+
 # standard function signatures for normal ODEs
 # and Hamiltonian systems
 standard_rhs = ["t", "y"]
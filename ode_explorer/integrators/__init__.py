@@ -1,6 +1,12 @@
 from ode_explorer.integrators.integrator_loops import (
     constant_h_loop,
-    adaptive_h_loop
+    adaptive_h_loop,
+    constant_h_steps,
+    adaptive_h_steps,
+    iter_chunks
 )
+from ode_explorer.integrators.parareal import parareal_loop
+from ode_explorer.integrators.adjoint import adjoint_loop
+from ode_explorer.integrators.checkpoint import Checkpointer
 from ode_explorer.integrators.integrator import Integrator
 from ode_explorer.integrators.loop_factory import loop_factory
@@ -0,0 +1,189 @@
+import logging
+from typing import Any, Callable, Dict, Text
+
+import numpy as np
+
+from ode_explorer.constants import AdjointKeys
+from ode_explorer.models import AdjointModel
+from ode_explorer.stepfunctions import SingleStepMethod
+from ode_explorer.types import ModelState, StateVariable
+
+__all__ = ["binomial_split", "adjoint_loop"]
+
+logger = logging.getLogger(__name__)
+
+
+def _binomial(n: int, k: int) -> int:
+    # math.comb is only available from Python 3.8
+    result = 1
+    for i in range(1, k + 1):
+        result = result * (n - k + i) // i
+    return result
+
+
+def binomial_split(num_steps: int, num_checkpoints: int) -> int:
+    """
+    Number of steps to advance from a stored state before storing the next one, in the
+    binomial checkpointing schedule of Griewank's revolve algorithm. With s free checkpoints
+    and r the smallest number with binomial(s + r, s) >= num_steps, the remaining steps are
+    reversed with s - 1 free checkpoints and the leading steps with s, so that no step is
+    recomputed more than r times.
+
+    Args:
+        num_steps: Number of steps between the stored state and the state to reverse from.
+        num_checkpoints: Number of free checkpoints.
+
+    Returns:
+        The number of steps to advance, between 1 and num_steps - 1.
+    """
+    if num_checkpoints < 1:
+        return num_steps - 1
+
+    repetitions = 1
+    while _binomial(num_checkpoints + repetitions, num_checkpoints) < num_steps:
+        repetitions += 1
+
+    return max(1, num_steps - _binomial(num_checkpoints - 1 + repetitions, num_checkpoints - 1))
+
+
+def _loss_gradient(loss_fn: Callable, t: StateVariable, y: StateVariable,
+                   fd_step: float) -> np.ndarray:
+    # central differences, one pair of loss evaluations per state dimension
+    y_vec = np.atleast_1d(np.asarray(y, dtype=float))
+    grad = np.empty(len(y_vec))
+
+    for i in range(len(y_vec)):
+        delta = fd_step * max(1.0, abs(y_vec[i]))
+        plus, minus = y_vec.copy(), y_vec.copy()
+        plus[i] += delta
+        minus[i] -= delta
+        if np.ndim(y) == 0:
+            plus, minus = plus[0], minus[0]
+        grad[i] = (loss_fn(t, plus) - loss_fn(t, minus)) / (2 * delta)
+
+    return grad
+
+
+def _step(step_func: SingleStepMethod, model, state: ModelState, h: float) -> ModelState:
+    updated_state = step_func.forward(model, state, h)
+
+    # e.g. DOPRI45 returns a tuple of estimates, use the higher order one
+    if isinstance(updated_state[0], (tuple, list)):
+        updated_state = updated_state[-1]
+
+    return updated_state
+
+
+def adjoint_loop(model: AdjointModel,
+                 step_func: SingleStepMethod,
+                 adjoint_step_func: SingleStepMethod,
+                 state: ModelState,
+                 h: float,
+                 num_steps: int,
+                 loss_fn: Callable,
+                 loss_grad_fn: Callable = None,
+                 num_checkpoints: int = None) -> Dict[Text, Any]:
+    """
+    Compute the gradient of a loss summed over the states of a constant step size
+    integration, by integrating the adjoint system backwards in time. The forward states
+    needed by the backward integration are recomputed from a fixed number of stored states,
+    placed by binomial checkpointing. Memory is thus logarithmic in the number of steps with
+    the default number of checkpoints, at the price of recomputing each forward step a
+    small number of times.
+
+    Args:
+        model: Adjoint model of the integrated ODE model.
+        step_func: Single-step method used for the forward integration.
+        adjoint_step_func: Single-step method used for the backward integration.
+        state: Initial state of the ODE model.
+        h: Constant step size.
+        num_steps: Number of steps to take.
+        loss_fn: Loss loss_fn(t, y) evaluated at every state of the trajectory, including the
+         initial state. The total loss is the sum over all states.
+        loss_grad_fn: Optional gradient of the loss with respect to y, taking the same
+         arguments. Approximated by central differences if not given.
+        num_checkpoints: Number of forward states stored in addition to the initial state,
+         defaults to the binary logarithm of the number of steps.
+
+    Returns:
+        A dict holding the loss, the gradients with respect to the initial state and the
+        parameters, the number of checkpoints, the maximal number of forward states stored at
+        once, and the number of forward steps taken including recomputations.
+    """
+    if num_checkpoints is None:
+        num_checkpoints = max(1, int(np.ceil(np.log2(max(num_steps, 2)))))
+
+    step_func.reset()
+    adjoint_step_func.reset()
+
+    def loss_gradient(t, y):
+        if loss_grad_fn is not None:
+            return np.reshape(loss_grad_fn(t, y), model.dim)
+        return _loss_gradient(loss_fn, t, y, model.fd_step)
+
+    t_0, y_0 = state
+
+    # adjoint at the final state is set by its loss gradient in the first backward step
+    model.augment_state(state, adjoint=np.zeros(np.size(y_0)))
+    adjoint = np.zeros(model.dim)
+    param_adjoint = np.zeros(model.num_params)
+
+    loss = 0.0
+    forward_steps = 0
+    stored_states = 1
+
+    # pending reversals (stored state, number of steps, free checkpoints),
+    # the last one pushed holds the steps latest in time
+    stack = [(state, num_steps, num_checkpoints)] if num_steps > 0 else []
+
+    while stack:
+        stored_states = max(stored_states, len({id(entry[0]) for entry in stack}))
+
+        stored, n, free = stack.pop()
+
+        if n > 1:
+            # advance to the next checkpoint, and reverse the steps after it first
+            m = binomial_split(n, free)
+
+            checkpoint = stored
+            for _ in range(m):
+                checkpoint = _step(step_func, model.model, checkpoint, h)
+            forward_steps += m
+
+            stack.append((stored, m, free))
+
+            # without a free checkpoint, the last step is reversed from an unstored state
+            if free > 0:
+                stack.append((checkpoint, n - m, free - 1))
+                continue
+
+            stored = checkpoint
+
+        # reverse the single step from the stored state
+        t, y = _step(step_func, model.model, stored, h)
+        forward_steps += 1
+
+        loss += loss_fn(t, y)
+        adjoint = adjoint + loss_gradient(t, y)
+
+        augmented_state = model.augment_state((t, y), adjoint=adjoint,
+                                              param_adjoint=param_adjoint)
+        _, z = _step(adjoint_step_func, model, augmented_state, -h)
+
+        # the backward solution y is replaced by the recomputed forward state in the next step
+        _, adjoint, param_adjoint = model.split_state(z)
+        adjoint, param_adjoint = adjoint.copy(), param_adjoint.copy()
+
+    loss += loss_fn(t_0, y_0)
+    adjoint = adjoint + loss_gradient(t_0, y_0)
+
+    logger.info(f"Computed adjoint gradients over {num_steps} steps with "
+                f"{num_checkpoints} checkpoints and {forward_steps} forward steps.")
+
+    return {AdjointKeys.LOSS: loss,
+            AdjointKeys.INITIAL_STATE_GRADIENT: adjoint[0] if np.ndim(y_0) == 0 else adjoint,
+            AdjointKeys.PARAM_GRADIENTS: model.unflatten_params(param_adjoint),
+            AdjointKeys.NUM_STEPS: num_steps,
+            AdjointKeys.NUM_CHECKPOINTS: num_checkpoints,
+            AdjointKeys.STORED_STATES: stored_states,
+            AdjointKeys.FORWARD_STEPS: forward_steps}
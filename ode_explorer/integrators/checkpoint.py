@@ -0,0 +1,238 @@
+import logging
+import os
+import pickle
+import time
+from typing import Any, Dict, List, Text
+
+from ode_explorer import defaults
+from ode_explorer.callbacks import Callback
+from ode_explorer.constants import CheckpointKeys, RunKeys
+from ode_explorer.metrics import Metric
+from ode_explorer.stepfunctions import StepFunction
+from ode_explorer.stepsize_control import StepSizeController
+from ode_explorer.types import ModelState
+from ode_explorer.utils.profiling import PerformanceCounters
+from ode_explorer.utils.storage import MemmapStore
+
+__all__ = ["Checkpointer", "load_checkpoint"]
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpointer:
+    """
+    Periodically saves the full state of a running integration loop to disk, so that the run
+    can be resumed after a crash with ``Integrator.resume``. A checkpoint holds the run object,
+    the current state and step size, the performance counters, and the step function, step size controller, callbacks
+    and metrics including their internal state, e.g. the caches of multistep methods.
+
+    The states and metric values of the run are not rewritten in every checkpoint, since that
+    would make each checkpoint more expensive than the last. Instead, only the rows recorded
+    since the previous checkpoint are appended to a row log next to the checkpoint file, with
+    the suffix ".rows". States of memory-mapped result stores are already on disk and are not
+    logged at all.
+
+    The loop state is written atomically by writing to a temporary file first and replacing
+    the previous checkpoint afterwards. It records the length of the row log it belongs to,
+    so that rows appended by an interrupted checkpoint are ignored and overwritten, and a
+    crash during writing never corrupts the last checkpoint. The loops call the checkpointer
+    after every step, but a checkpoint is only written once the checkpoint interval has
+    passed since the last one, which amortizes the cost of writing over many steps.
+
+    The model is not part of the checkpoint, since models can hold unpicklable objects like
+    lambdas or modules, and needs to be passed again when resuming.
+    """
+
+    def __init__(self,
+                 path: Text,
+                 interval: float = defaults.CHECKPOINT_INTERVAL,
+                 loop_type: Text = None,
+                 output_dir: Text = None):
+        """
+        Checkpointer constructor.
+
+        Args:
+            path: File path to write checkpoints to.
+            interval: Minimum time in seconds between two checkpoints.
+            loop_type: Name of the integration loop in the loop factory.
+            output_dir: Output directory of the run, if any.
+        """
+        self.path = path
+
+        self.interval = interval
+
+        self.loop_type = loop_type
+
+        self.output_dir = output_dir
+
+        self.num_checkpoints = 0
+
+        # total time spent writing checkpoints
+        self.checkpoint_time = 0.0
+
+        self._last_checkpoint = time.monotonic()
+
+        # states and metric rows already in the row log, and the length of the log
+        self._num_states = 0
+        self._num_metric_rows = 0
+        self._rows_offset = 0
+
+    @property
+    def rows_path(self):
+        return self.path + ".rows"
+
+    def continue_from(self, checkpoint: Dict[Text, Any]):
+        """
+        Continue the row log of a loaded checkpoint instead of starting a new one, e.g. when
+        resuming a run.
+
+        Args:
+            checkpoint: Checkpoint loaded with ``load_checkpoint``.
+        """
+        self._num_states = checkpoint[CheckpointKeys.NUM_STATES]
+        self._num_metric_rows = checkpoint[CheckpointKeys.NUM_METRIC_ROWS]
+        self._rows_offset = checkpoint[CheckpointKeys.ROWS_OFFSET]
+
+    def _append_rows(self, run: Dict[Text, Any]) -> Dict[Text, Any]:
+        result_data = run[RunKeys.RESULT_DATA]
+        metric_data = run[RunKeys.METRICS]
+
+        # memory-mapped stores only pickle their file path and size
+        log_states = not isinstance(result_data, MemmapStore)
+
+        new_states = result_data[self._num_states:] if log_states else []
+        new_metric_rows = metric_data[self._num_metric_rows:]
+
+        # a new log is started from scratch, otherwise rows of an interrupted checkpoint
+        # after the recorded log length are overwritten
+        with open(self.rows_path, "r+b" if self._rows_offset > 0 else "wb") as f:
+            f.seek(self._rows_offset)
+            f.truncate()
+            pickle.dump((new_states, new_metric_rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+            self._rows_offset = f.tell()
+
+        self._num_states += len(new_states)
+        self._num_metric_rows += len(new_metric_rows)
+
+        excluded = [RunKeys.RESULT_DATA, RunKeys.METRICS] if log_states else [RunKeys.METRICS]
+
+        return {k: v for k, v in run.items() if k not in excluded}
+
+    def __call__(self,
+                 i: int,
+                 state: ModelState,
+                 h: float,
+                 run: Dict[Text, Any],
+                 step_func: StepFunction,
+                 sc: StepSizeController,
+                 callbacks: List[Callback],
+                 metrics: List[Metric],
+                 max_steps: int,
+                 force: bool = False,
+                 counters: PerformanceCounters = None):
+        """
+        Checkpointer call operator, called by the integration loops after each step. Writes
+        a checkpoint if the checkpoint interval has passed since the last checkpoint.
+
+        Args:
+            i: Number of the last completed iteration.
+            state: State to continue the integration from.
+            h: Step size to continue the integration with.
+            run: Run object of the integration.
+            step_func: Step function used in the integration.
+            sc: Step size controller used in the integration, if any.
+            callbacks: List of callbacks executed after each step.
+            metrics: List of metrics calculated after each step.
+            max_steps: Maximum number of steps of the integration.
+            force: If True, write a checkpoint regardless of the checkpoint interval.
+            counters: Performance counters of the run, continued when resuming.
+        """
+        if not force and time.monotonic() - self._last_checkpoint < self.interval:
+            return
+
+        start = time.monotonic()
+
+        run_state = self._append_rows(run)
+
+        checkpoint = {CheckpointKeys.LOOP_TYPE: self.loop_type,
+                      CheckpointKeys.ITERATION: i,
+                      CheckpointKeys.STATE: state,
+                      CheckpointKeys.STEP_SIZE: h,
+                      CheckpointKeys.MAX_STEPS: max_steps,
+                      CheckpointKeys.RUN: run_state,
+                      CheckpointKeys.STEP_FUNC: step_func,
+                      CheckpointKeys.STEP_SIZE_CONTROLLER: sc,
+                      CheckpointKeys.CALLBACKS: callbacks,
+                      CheckpointKeys.METRICS: metrics,
+                      CheckpointKeys.OUTPUT_DIR: self.output_dir,
+                      CheckpointKeys.INTERVAL: self.interval,
+                      CheckpointKeys.COUNTERS: counters,
+                      CheckpointKeys.NUM_STATES: self._num_states,
+                      CheckpointKeys.NUM_METRIC_ROWS: self._num_metric_rows,
+                      CheckpointKeys.ROWS_OFFSET: self._rows_offset}
+
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.path)
+
+        self._last_checkpoint = time.monotonic()
+
+        self.num_checkpoints += 1
+        self.checkpoint_time += self._last_checkpoint - start
+
+        logger.debug(f"Wrote checkpoint at iteration {i} to {self.path}.")
+
+    def remove(self):
+        """
+        Remove the checkpoint file and its row log, e.g. after the integration finished
+        successfully.
+        """
+        for path in [self.path, self.rows_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def load_checkpoint(path: Text) -> Dict[Text, Any]:
+    """
+    Load a checkpoint written by a Checkpointer, restoring the states and metric values of
+    the run from the row log.
+
+    Args:
+        path: Path to the checkpoint file.
+
+    Returns:
+        A dict holding the saved integration loop state.
+
+    Raises:
+        ValueError: If the checkpoint file does not exist.
+    """
+    if not os.path.exists(path):
+        raise ValueError(f"Checkpoint file {path} does not exist.")
+
+    with open(path, "rb") as f:
+        checkpoint = pickle.load(f)
+
+    run = checkpoint[CheckpointKeys.RUN]
+
+    states, metric_rows = [], []
+
+    # rows after the recorded log length belong to an interrupted checkpoint
+    with open(path + ".rows", "rb") as f:
+        while f.tell() < checkpoint[CheckpointKeys.ROWS_OFFSET]:
+            new_states, new_metric_rows = pickle.load(f)
+            states.extend(new_states)
+            metric_rows.extend(new_metric_rows)
+
+    if RunKeys.RESULT_DATA not in run:
+        run[RunKeys.RESULT_DATA] = states
+
+    run[RunKeys.METRICS] = metric_rows
+
+    return checkpoint
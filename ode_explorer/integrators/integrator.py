@@ -1,34 +1,71 @@
+import contextlib
 import copy
 import datetime
 import logging
+import logging.handlers
 import os
+import queue
 import uuid
-from typing import Dict, Callable, Text, List, Union, Any
+import weakref
+from typing import Dict, Callable, Text, List, Union, Any, Iterator, TYPE_CHECKING
 
-import absl.logging
-import pandas as pd
-from tabulate import tabulate
+import numpy as np
 
 from ode_explorer import constants
 from ode_explorer import defaults
 from ode_explorer.callbacks import Callback
-from ode_explorer.constants import RunKeys, RunConfigKeys, ModelMetadataKeys
+from ode_explorer.constants import RunKeys, RunConfigKeys, CatalogKeys, CheckpointKeys, \
+    PerformanceKeys
+from ode_explorer.integrators.adjoint import adjoint_loop
+from ode_explorer.integrators.checkpoint import Checkpointer, load_checkpoint
+from ode_explorer.integrators.integrator_loops import constant_h_steps, adaptive_h_steps, \
+    iter_chunks, validate_const_h_loop, validate_dynamic_loop
 from ode_explorer.integrators.loop_factory import loop_factory
 from ode_explorer.metrics import Metric
-from ode_explorer.models import BaseModel
-from ode_explorer.stepfunctions import StepFunction
+from ode_explorer.models import BaseModel, ODEModel, SensitivityModel, AdjointModel
+from ode_explorer.stepfunctions import StepFunction, SingleStepMethod
 from ode_explorer.stepsize_control import StepSizeController
 from ode_explorer.types import ModelState
-from ode_explorer.utils.data_utils import convert_to_dict, initialize_dim_names
-from ode_explorer.utils.run_utils import write_run_to_disk, get_run_metadata
+from ode_explorer.utils.background import BackgroundWriter
+from ode_explorer.utils.catalog import RunCatalog
+from ode_explorer.utils.data_utils import result_to_dataframe, stack_result_data
+from ode_explorer.utils.monitoring import MetricsExporter
+from ode_explorer.utils.profiling import PerformanceCounters, tracing_memory
+from ode_explorer.utils.run_utils import write_run_to_disk, load_run_from_disk
+from ode_explorer.utils.storage import result_writers, MemmapStore
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
-ch.setFormatter(absl.logging.PythonFormatter())
-logger.addHandler(ch)
+# handlers attached to the module logger, shared by all Integrator instances:
+# the console handler, and file handlers by absolute log file path
+_stream_handler = None
+_file_handlers = {}
+
+# performance counters shown in the run listing
+_LISTED_COUNTERS = [PerformanceKeys.RHS_CALLS,
+                    PerformanceKeys.REJECTED_STEPS,
+                    PerformanceKeys.NEWTON_ITERATIONS,
+                    PerformanceKeys.TOTAL_TIME,
+                    PerformanceKeys.PEAK_MEMORY]
+
+
+def _make_formatter() -> logging.Formatter:
+    # absl is only imported once the first handler is attached
+    import absl.logging
+    return absl.logging.PythonFormatter()
+
+
+def _attach_stream_handler():
+    global _stream_handler
+    if _stream_handler is None:
+        _stream_handler = logging.StreamHandler()
+        _stream_handler.setLevel(logging.INFO)
+        _stream_handler.setFormatter(_make_formatter())
+        logger.addHandler(_stream_handler)
 
 
 class Integrator:
@@ -36,6 +73,11 @@ class Integrator:
     Base class for all ODE integrators. An integrator keeps minimal state to facilitate IO and
     logging of model integration runs. It also serves as a registry for all model runs and can be
     queried for specific runs by different attributes.
+
+    Saved runs are recorded in a persistent run catalog, a SQLite database in the base output
+    directory, which indexes run IDs, timestamps, model metadata, run configs and summary metrics
+    along with the directory each run was saved to. Runs that are not saved to disk are only
+    recorded in an in-memory catalog of the integrator instance that created them.
     """
 
     def __init__(self,
@@ -43,7 +85,17 @@ class Integrator:
                  base_log_dir: Text = None,
                  logfile_name: Text = None,
                  base_output_dir: Text = None,
-                 csv_io_args: Dict[Text, Any] = None):
+                 csv_io_args: Dict[Text, Any] = None,
+                 catalog_file: Text = None,
+                 output_format: Text = None,
+                 io_args: Dict[Text, Any] = None,
+                 result_storage: Text = "memory",
+                 memmap_chunk_size: int = None,
+                 async_io: bool = False,
+                 max_pending_writes: int = None,
+                 exporter: MetricsExporter = None,
+                 trace_memory: bool = False,
+                 in_memory: bool = False):
         """
         Base Integrator constructor.
 
@@ -52,8 +104,38 @@ class Integrator:
             base_log_dir: Base directory for saving ODE integration logs.
             logfile_name: Base log file object to save all logs into.
             base_output_dir: Base output directory for saving run and model data.
-            csv_io_args: Additional keyword arguments passed to pandas.DataFrame.to_csv
-             when writing data to a CSV file.
+            csv_io_args: Deprecated alias for io_args, kept for backwards compatibility.
+            catalog_file: File name of the run catalog database in the base output directory.
+            output_format: File format for saving run result data, one of "csv", "npz",
+             "parquet", "hdf5" or "compressed". Parquet requires pyarrow or fastparquet, HDF5
+             requires h5py.
+            io_args: Additional keyword arguments passed to the result data writer, e.g. to
+             pandas.DataFrame.to_csv when writing data to a CSV file, or the compression mode,
+             codec and tolerance of the "compressed" format.
+            result_storage: Storage of the result data during integration, either "memory"
+             for a list of states or "memmap" for a memory-mapped file in the base output
+             directory, for runs too large to be held in memory.
+            memmap_chunk_size: Number of states a memory-mapped storage file grows by when
+             it is full.
+            async_io: Bool, whether to save runs and write log files on a background thread.
+             Saving then returns immediately, call ``flush`` or ``close`` to wait for pending
+             writes. Errors of a background write are raised on the next call to save_run,
+             the integration methods, ``flush`` or ``close``.
+            max_pending_writes: Maximum number of runs waiting to be saved in the background
+             before saving blocks.
+            exporter: Optional MetricsExporter publishing live metrics of the running
+             integrations, e.g. on a local HTTP endpoint. Can be shared by several integrators.
+            trace_memory: Bool, whether to measure the peak and retained memory of every run
+             with tracemalloc, saved in the run's performance counters. Tracing slows down
+             the integration, so this is best used for memory measurements only.
+            in_memory: Bool, whether to run without filesystem side effects, e.g. in
+             short-lived worker processes. No log and output directories are created, no log
+             file is written, and the run catalog is kept in memory. Runs are still saved to
+             disk if an output directory is given explicitly.
+
+        Raises:
+            ValueError: If the output format or the result storage is not supported, or if
+             memory-mapped result storage is requested in in-memory mode.
         """
 
         # pre-step function, will be called before each step if specified
@@ -62,6 +144,9 @@ class Integrator:
         # empty list holding the different executed ODE integration runs
         self.runs = []
 
+        # in-memory runs by ID, looked up after resolving IDs in the run catalog
+        self._runs_by_id = {}
+
         # step count, can be used to track integration runs
         self._step_count = 0
 
@@ -69,39 +154,152 @@ class Integrator:
 
         self.logfile_name = logfile_name or "logs.txt"
 
-        self._set_up_logger(log_dir=self.base_log_dir)
+        self.in_memory = in_memory
+
+        # log file of the last run integrated with its own log file
+        self._run_logfile = None
+
+        # background thread for saving runs, and listeners writing log files in the background
+        self._writer = None
+        self._log_listeners = []
+
+        if async_io:
+            self._writer = BackgroundWriter(
+                max_pending=max_pending_writes or defaults.IO_QUEUE_SIZE)
+            # flush pending writes when the integrator is collected or the interpreter exits
+            self._finalizer = weakref.finalize(self, Integrator._close_io,
+                                               self._writer, self._log_listeners)
+
+        self._set_up_logger()
 
         self.base_output_dir = base_output_dir or os.path.join(os.getcwd(), "results")
 
         self.datetime_format = "%c"
 
-        self.csv_io_args = csv_io_args or {}
+        self.output_format = output_format or defaults.OUTPUT_FORMAT
+
+        if self.output_format not in result_writers:
+            raise ValueError(f"Unsupported output format \"{self.output_format}\". Available "
+                             f"formats are: {', '.join(result_writers)}.")
+
+        self.io_args = io_args or csv_io_args or {}
 
-        if not os.path.exists(self.base_output_dir):
-            os.mkdir(self.base_output_dir)
+        if result_storage not in ["memory", "memmap"]:
+            raise ValueError(f"Unsupported result storage \"{result_storage}\". Available "
+                             f"storages are: memory, memmap.")
+
+        if in_memory and result_storage == "memmap":
+            raise ValueError("Memory-mapped result storage writes to the base output "
+                             "directory and cannot be used in in-memory mode.")
+
+        self.result_storage = result_storage
+
+        self.memmap_chunk_size = memmap_chunk_size or defaults.MEMMAP_CHUNK_SIZE
+
+        self.exporter = exporter
+
+        self.trace_memory = trace_memory
+
+        if in_memory:
+            self.catalog = RunCatalog(":memory:")
+        else:
+            if not os.path.exists(self.base_output_dir):
+                os.mkdir(self.base_output_dir)
+
+            self.catalog = RunCatalog(os.path.join(self.base_output_dir,
+                                                   catalog_file or defaults.CATALOG_FILE))
+
+        # unsaved runs have no data on disk, so other instances must not see them
+        self._session_catalog = self.catalog if in_memory else RunCatalog(":memory:")
 
         logger.info("Created an Integrator instance.")
 
     def _reset(self):
-        # Hard reset all data and step counts
+        # runs might still be saved in the background
+        self.flush()
+
+        # Hard reset all data and step counts, unsaved runs are
+        # dropped from the catalog since their data is gone
+        unsaved = [run_id for run_id in self._runs_by_id
+                   if self._session_catalog.query(run_id=run_id, output_dir=None)]
+        self._session_catalog.remove_runs(unsaved)
+
+        for run in self.runs:
+            if isinstance(run[RunKeys.RESULT_DATA], MemmapStore):
+                run[RunKeys.RESULT_DATA].delete()
+
+            sensitivities = run.get(RunKeys.SENSITIVITIES)
+            if isinstance(sensitivities, np.memmap) and os.path.exists(sensitivities.filename):
+                os.remove(sensitivities.filename)
+
         self._step_count = 0
         self.runs = []
+        self._runs_by_id = {}
 
-    def _set_up_logger(self, log_dir):
+    def _set_up_logger(self):
+        _attach_stream_handler()
+
+        if not self.in_memory:
+            self._attach_file_handler(os.path.join(self.base_log_dir, self.logfile_name))
+
+        logger.info('Creating an Integrator instance.')
+
+    def _attach_file_handler(self, log_file: Text) -> bool:
+        # one handler per log file, integrators logging to the same file share it
+        log_file = os.path.abspath(log_file)
+        if log_file in _file_handlers:
+            return False
+
+        log_dir = os.path.dirname(log_file)
         if not os.path.exists(log_dir):
-            os.mkdir(log_dir)
+            os.makedirs(log_dir)
 
-        fh = logging.FileHandler(os.path.join(self.base_log_dir, self.logfile_name))
+        fh = logging.FileHandler(log_file)
         fh.setLevel(logging.INFO)
-        fh.setFormatter(absl.logging.PythonFormatter())
-        logger.addHandler(fh)
-        logger.info('Creating an Integrator instance.')
+        fh.setFormatter(_make_formatter())
 
-    def _flush_stale_file_handlers(self):
-        for handler in logger.handlers:
-            if isinstance(handler, logging.FileHandler):
-                if handler.baseFilename != self.logfile_name:
-                    logger.handlers.remove(handler)
+        handler = self._wrap_file_handler(fh)
+        _file_handlers[log_file] = handler
+        logger.addHandler(handler)
+
+        return True
+
+    @staticmethod
+    def _detach_file_handler(log_file: Text):
+        handler = _file_handlers.pop(log_file, None)
+        if handler is not None:
+            logger.removeHandler(handler)
+            handler.close()
+
+    def _wrap_file_handler(self, fh: logging.FileHandler) -> logging.Handler:
+        if self._writer is None:
+            return fh
+
+        # records are passed through a queue and written to the file by a listener thread
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, fh)
+        listener.start()
+        self._log_listeners.append(listener)
+
+        return logging.handlers.QueueHandler(log_queue)
+
+    @staticmethod
+    def _close_io(writer: BackgroundWriter, log_listeners: List):
+        try:
+            writer.close()
+        finally:
+            for listener in log_listeners:
+                listener.stop()
+                # write log records directly to the file from now on
+                for handler in list(logger.handlers):
+                    if isinstance(handler, logging.handlers.QueueHandler) and \
+                            handler.queue is listener.queue:
+                        fh = listener.handlers[0]
+                        fh.setLevel(handler.level)
+                        logger.removeHandler(handler)
+                        logger.addHandler(fh)
+                        _file_handlers[fh.baseFilename] = fh
+            log_listeners.clear()
 
     def _make_run(self,
                   model: BaseModel,
@@ -112,7 +310,8 @@ class Integrator:
                   h: float,
                   max_steps: int,
                   callbacks: List[Callback],
-                  metrics: List[Metric]) -> Dict[Text, Any]:
+                  metrics: List[Metric],
+                  **kwargs) -> Dict[Text, Any]:
 
         # callbacks and metrics
         callbacks = callbacks or []
@@ -146,9 +345,20 @@ class Integrator:
                                     defaults.accepted: 1,
                                     defaults.rejected: 0})
 
+        if self.result_storage == "memmap":
+            memmap_dir = os.path.join(self.base_output_dir, defaults.MEMMAP_DIR)
+            if not os.path.exists(memmap_dir):
+                os.mkdir(memmap_dir)
+            memmap_file = os.path.join(memmap_dir, run[constants.RUN_ID] + ".dat")
+            result_data = MemmapStore(path=memmap_file, chunk_size=self.memmap_chunk_size)
+        else:
+            result_data = []
+
+        result_data.append(initial_state)
+
         run.update({RunKeys.MODEL_METADATA: model.get_metadata(),
                     RunKeys.RUN_CONFIG: run_config,
-                    RunKeys.RESULT_DATA: [initial_state],
+                    RunKeys.RESULT_DATA: result_data,
                     RunKeys.METRICS: [initial_metrics]})
 
         return run
@@ -164,19 +374,19 @@ class Integrator:
                    output_dir: Text = None,
                    logfile: Text = None,
                    progress_bar: bool = False,
+                   checkpoint_file: Text = None,
+                   checkpoint_interval: float = None,
+                   postprocess: Callable = None,
                    **loop_kwargs):
 
+        # surface errors of runs saved in the background
+        if self._writer is not None:
+            self._writer.raise_pending()
+
         if reset:
             self._reset()
 
-        # create file handler
-        if logfile:
-            self._flush_stale_file_handlers()
-            fh = logging.FileHandler(os.path.join(self.base_log_dir, logfile))
-            logger.addHandler(fh)
-
-        for handler in logger.handlers:
-            handler.setLevel(verbosity)
+        self._set_up_run_logging(verbosity=verbosity, logfile=logfile)
 
         # construct run object
         run = self._make_run(model=model,
@@ -188,24 +398,80 @@ class Integrator:
         # deepcopy here, otherwise the initial state gets overwritten
         state = copy.deepcopy(initial_state)
 
+        checkpointer = None
+        if checkpoint_file:
+            if checkpoint_interval is None:
+                checkpoint_interval = defaults.CHECKPOINT_INTERVAL
+            # in in-memory mode, the output directory is only created when needed
+            if not os.path.exists(self.base_output_dir):
+                os.makedirs(self.base_output_dir)
+            checkpointer = Checkpointer(path=os.path.join(self.base_output_dir, checkpoint_file),
+                                        interval=checkpoint_interval,
+                                        loop_type=loop_type,
+                                        output_dir=output_dir)
+            loop_kwargs["checkpointer"] = checkpointer
+
+        counters = PerformanceCounters()
+
         logger.info("Starting integration.")
 
-        loop_factory.get(loop_type)(run=run,
-                                    step_func=step_func,
-                                    model=model,
-                                    state=state,
-                                    progress_bar=progress_bar,
-                                    **loop_kwargs)
+        with self._instrument(run, counters):
+            loop_factory.get(loop_type)(run=run,
+                                        step_func=step_func,
+                                        model=model,
+                                        state=state,
+                                        progress_bar=progress_bar,
+                                        counters=counters,
+                                        **loop_kwargs)
+
+        # the memory is only known after leaving the tracing context
+        run[RunKeys.PERFORMANCE] = counters.to_dict()
 
         logger.info("Finished integration.")
 
-        if output_dir:
-            self.save_run(run=run, output_dir=output_dir)
+        if postprocess is not None:
+            postprocess(run)
+
+        return self._finalize_run(run=run, output_dir=output_dir, checkpointer=checkpointer)
 
-            logger.info("Run results saved to directory {}.".format(
-                os.path.join(self.base_output_dir, output_dir)))
+    def _instrument(self, run: Dict[Text, Any], counters: PerformanceCounters):
+        # export live metrics and trace the memory of the running integration, if requested
+        stack = contextlib.ExitStack()
+        if self.exporter is not None:
+            stack.enter_context(self.exporter.track(run, counters))
+        if self.trace_memory:
+            stack.enter_context(tracing_memory(counters))
+        return stack
+
+    def _set_up_run_logging(self, verbosity: int, logfile: Text = None):
+        # create file handler
+        if logfile:
+            # the log file of the previous run is closed, the base log file is kept
+            if self._run_logfile is not None:
+                self._detach_file_handler(self._run_logfile)
+                self._run_logfile = None
+
+            log_file = os.path.abspath(os.path.join(self.base_log_dir, logfile))
+            if self._attach_file_handler(log_file):
+                self._run_logfile = log_file
+
+        for handler in logger.handlers:
+            handler.setLevel(verbosity)
+
+    def _finalize_run(self, run: Dict[Text, Any], output_dir: Text = None,
+                      checkpointer: Checkpointer = None):
+        if isinstance(run[RunKeys.RESULT_DATA], MemmapStore):
+            run[RunKeys.RESULT_DATA].trim()
 
         self.runs.append(run)
+        self._runs_by_id[run[constants.RUN_ID]] = run
+        self._session_catalog.add_run(run)
+
+        # the run finished, there is nothing left to resume once it is saved
+        if output_dir:
+            self._save_run(run=run, output_dir=output_dir, checkpointer=checkpointer)
+        elif checkpointer is not None:
+            checkpointer.remove()
 
         return self
 
@@ -222,7 +488,9 @@ class Integrator:
                         logfile: Text = None,
                         progress_bar: bool = False,
                         callbacks: List[Callback] = None,
-                        metrics: List[Metric] = None):
+                        metrics: List[Metric] = None,
+                        checkpoint_file: Text = None,
+                        checkpoint_interval: float = None):
         """
         Integrate a model with a chosen step function and a constant step size.
 
@@ -240,6 +508,10 @@ class Integrator:
             progress_bar: Bool, whether to display a progress bar during the run.
             callbacks: List of callbacks to execute after each step.
             metrics: List of metrics to calculate after each step.
+            checkpoint_file: Checkpoint file in the base output directory. If specified,
+             periodically saves checkpoints of the run, which can be resumed with
+             ``Integrator.resume``. The file is removed once the run finishes.
+            checkpoint_interval: Minimum time in seconds between two checkpoints.
         """
 
         return self._integrate(loop_type="constant",
@@ -256,6 +528,8 @@ class Integrator:
                                progress_bar=progress_bar,
                                callbacks=callbacks,
                                metrics=metrics,
+                               checkpoint_file=checkpoint_file,
+                               checkpoint_interval=checkpoint_interval,
                                sc=None)
 
     def integrate_adaptively(self,
@@ -272,7 +546,9 @@ class Integrator:
                              logfile: Text = None,
                              progress_bar: bool = False,
                              callbacks: List[Callback] = None,
-                             metrics: List[Metric] = None):
+                             metrics: List[Metric] = None,
+                             checkpoint_file: Text = None,
+                             checkpoint_interval: float = None):
         """
         Integrate a model with a chosen step function adaptively with custom step size control.
 
@@ -291,6 +567,10 @@ class Integrator:
             progress_bar: Bool, whether to display a progress bar during the run.
             callbacks: List of callbacks to execute after each step.
             metrics: List of metrics to calculate after each step.
+            checkpoint_file: Checkpoint file in the base output directory. If specified,
+             periodically saves checkpoints of the run, which can be resumed with
+             ``Integrator.resume``. The file is removed once the run finishes.
+            checkpoint_interval: Minimum time in seconds between two checkpoints.
         """
 
         return self._integrate(loop_type="adaptive",
@@ -307,24 +587,503 @@ class Integrator:
                                progress_bar=progress_bar,
                                callbacks=callbacks,
                                metrics=metrics,
+                               checkpoint_file=checkpoint_file,
+                               checkpoint_interval=checkpoint_interval,
+                               sc=sc)
+
+    def integrate_sensitivity(self,
+                              model: ODEModel,
+                              step_func: StepFunction,
+                              initial_state: ModelState,
+                              params: List[Text] = None,
+                              end: float = None,
+                              h: float = None,
+                              max_steps: int = None,
+                              sc: Union[StepSizeController, Callable] = None,
+                              param_jac_fn: Callable = None,
+                              initial_sensitivities: np.ndarray = None,
+                              reset: bool = False,
+                              verbosity: int = logging.INFO,
+                              output_dir: Text = None,
+                              logfile: Text = None,
+                              progress_bar: bool = False):
+        """
+        Integrate a model together with the sensitivities dy/dp of its states with respect to
+        some of its function arguments, in a single run of the augmented forward sensitivity
+        system (see ``SensitivityModel``). This replaces one run per perturbed parameter.
+
+        The run holds the model states under the ``result_data`` key, and the sensitivities
+        as an array of shape (number of states, dim, number of parameters) under the
+        ``sensitivities`` key. The names of the parameters are saved in the run config.
+
+        Args:
+            model: ODEModel instance of your ODE problem. If it has an analytic Jacobian,
+             the Jacobian is evaluated once per right-hand side evaluation and shared by the
+             state and all sensitivities.
+            step_func: Step Function used to integrate the augmented system.
+            initial_state: State tuple containing the initial state variables.
+            params: Names of the model's fn_args to compute the sensitivities with respect to,
+             defaults to all numeric arguments.
+            end: Target end time for ODE solving. Equals the time value of the last step.
+            h: Constant step size for integration, or the initial step size if a step size
+             controller is given.
+            max_steps: Maximum allowed steps during the integration.
+            sc: Optional step size controller, integrates adaptively if given. The error
+             estimate includes the sensitivities.
+            param_jac_fn: Optional Jacobian of the right-hand side with respect to the
+             parameters, approximated by finite differences if not given.
+            initial_sensitivities: Derivatives of the initial state with respect to the
+             parameters, of shape (dim, number of parameters). Defaults to zeros.
+            reset: Bool, whether to reset the integrator (this deletes all previous runs).
+            verbosity: Logging verbosity, default logging.INFO.
+            output_dir: Output directory. If specified,saves run data and info into this directory.
+            logfile: Log file. If specified, writes all logs of the integration into this file.
+            progress_bar: Bool, whether to display a progress bar during the run.
+        """
+        sensitivity_model = SensitivityModel(model=model, params=params,
+                                             param_jac_fn=param_jac_fn)
+
+        augmented_state = sensitivity_model.augment_state(
+            initial_state, initial_sensitivities=initial_sensitivities)
+
+        def split_run(run: Dict[Text, Any]):
+            self._split_sensitivities(run=run, model=sensitivity_model)
+
+        return self._integrate(loop_type="adaptive" if sc else "constant",
+                               model=sensitivity_model,
+                               step_func=step_func,
+                               initial_state=augmented_state,
+                               end=end,
+                               h=h,
+                               max_steps=max_steps,
+                               reset=reset,
+                               verbosity=verbosity,
+                               output_dir=output_dir,
+                               logfile=logfile,
+                               progress_bar=progress_bar,
+                               callbacks=None,
+                               metrics=None,
+                               postprocess=split_run,
                                sc=sc)
 
-    def list_runs(self, tablefmt: Text = "github"):
+    def _split_sensitivities(self, run: Dict[Text, Any], model: SensitivityModel):
+        # replace the augmented states of a finished run by the model states and sensitivities
+        result_data = run[RunKeys.RESULT_DATA]
+        block = stack_result_data(result_data)
+
+        if isinstance(result_data, MemmapStore):
+            # split chunk by chunk, the augmented states are not read into memory at once
+            base_path = os.path.splitext(result_data.path)[0]
+            states = MemmapStore(path=base_path + "_states.dat",
+                                 chunk_size=result_data.chunk_size)
+            sensitivities = np.lib.format.open_memmap(
+                base_path + "_sensitivities.npy", mode="w+",
+                shape=(len(block), model.dim, model.num_params))
+
+            for i in range(0, len(block), result_data.chunk_size):
+                chunk_states, chunk_sensitivities = model.split_states(
+                    block[i:i + result_data.chunk_size])
+                states.extend(chunk_states)
+                sensitivities[i:i + len(chunk_states)] = chunk_sensitivities
+
+            states.trim()
+            sensitivities.flush()
+            result_data.delete()
+        else:
+            states, sensitivities = model.split_states(block)
+
+        run[RunKeys.RESULT_DATA] = states
+        run[RunKeys.SENSITIVITIES] = sensitivities
+        run[RunKeys.RUN_CONFIG][RunConfigKeys.SENSITIVITY_PARAMS] = model.param_names
+
+    def adjoint_gradient(self,
+                         model: ODEModel,
+                         step_func: StepFunction,
+                         initial_state: ModelState,
+                         loss_fn: Callable,
+                         loss_grad_fn: Callable = None,
+                         params: List[Text] = None,
+                         end: float = None,
+                         h: float = None,
+                         max_steps: int = None,
+                         num_checkpoints: int = None,
+                         param_jac_fn: Callable = None,
+                         adjoint_step_func: StepFunction = None,
+                         verbosity: int = logging.INFO) -> Dict[Text, Any]:
+        """
+        Compute the gradient of a scalar loss on the trajectory of a constant step size
+        integration with respect to the initial state and the model's function arguments,
+        by integrating the adjoint system backwards in time (see ``AdjointModel``). The cost
+        does not grow with the number of parameters like forward sensitivities or finite
+        differences do.
+
+        The trajectory is not recorded. The forward states needed by the backward
+        integration are recomputed from a few stored states, placed by binomial (revolve)
+        checkpointing, so that memory grows with the logarithm of the number of steps.
+
+        Args:
+            model: ODEModel instance of your ODE problem. Its Jacobian is used if available,
+             and approximated by finite differences otherwise.
+            step_func: Single-step method used to integrate the model.
+            initial_state: State tuple containing the initial state variables.
+            loss_fn: Loss loss_fn(t, y) evaluated at every state of the trajectory, including
+             the initial state, and summed. A loss on the final state only can return zero
+             for all other times.
+            loss_grad_fn: Optional gradient of loss_fn with respect to y, approximated by
+             central differences if not given.
+            params: Names of the model's fn_args to compute the gradients with respect to,
+             defaults to all numeric arguments.
+            end: Target end time for ODE solving. Equals the time value of the last step.
+            h: Constant step size for integration.
+            max_steps: Maximum allowed steps during the integration.
+            num_checkpoints: Number of forward states stored in addition to the initial
+             state, defaults to the binary logarithm of the number of steps. More
+             checkpoints recompute fewer forward steps.
+            param_jac_fn: Optional Jacobian of the right-hand side with respect to the
+             parameters, approximated by finite differences if not given.
+            adjoint_step_func: Single-step method used for the backward integration,
+             defaults to a copy of step_func.
+            verbosity: Logging verbosity, default logging.INFO.
+
+        Returns:
+            A dict holding the loss, the gradient with respect to the initial state, a dict
+            of the gradients with respect to each parameter in the shape of the argument,
+            and the checkpointing statistics: the number of checkpoints, the maximal number
+            of forward states stored at once and the number of forward steps taken.
+
+        Raises:
+            ValueError: If a step function is not a single-step method, whose steps can be
+             recomputed from a stored state alone.
+        """
+        adjoint_step_func = adjoint_step_func or copy.deepcopy(step_func)
+
+        for sf in [step_func, adjoint_step_func]:
+            if not isinstance(sf, SingleStepMethod):
+                raise ValueError(f"Adjoint gradients require single-step methods, whose "
+                                 f"steps can be recomputed from checkpoints, got "
+                                 f"{sf.__class__.__name__}.")
+
+        self._set_up_run_logging(verbosity=verbosity)
+
+        # fills in the missing one of end, step size and step count
+        run_config = {RunConfigKeys.START: initial_state[0],
+                      RunConfigKeys.END: end,
+                      RunConfigKeys.STEP_SIZE: h,
+                      RunConfigKeys.NUM_STEPS: max_steps}
+        validate_const_h_loop(run_config=run_config)
+
+        adjoint_model = AdjointModel(model=model, params=params, param_jac_fn=param_jac_fn)
+
+        return adjoint_loop(model=adjoint_model,
+                            step_func=step_func,
+                            adjoint_step_func=adjoint_step_func,
+                            state=initial_state,
+                            h=run_config[RunConfigKeys.STEP_SIZE],
+                            num_steps=run_config[RunConfigKeys.NUM_STEPS],
+                            loss_fn=loss_fn,
+                            loss_grad_fn=loss_grad_fn,
+                            num_checkpoints=num_checkpoints)
+
+    def iter_integrate(self,
+                       model: BaseModel,
+                       step_func: StepFunction,
+                       initial_state: ModelState,
+                       end: float = None,
+                       h: float = None,
+                       max_steps: int = None,
+                       sc: Union[StepSizeController, Callable] = None,
+                       chunk_size: int = None,
+                       include_initial: bool = True) -> Iterator:
+        """
+        Integrate a model lazily, yielding states or chunks of states as they are computed.
+        No run object is created and no states are kept, so that consumers like online filters
+        or live plots can process arbitrarily long integrations in constant memory, and stop
+        the integration early simply by not requesting further states.
+
+        Without a step size controller, the model is integrated with a constant step size and
+        exactly two of end, h and max_steps need to be given, as in integrate_const. With a
+        step size controller, the model is integrated adaptively up to the end time, as in
+        integrate_adaptively.
+
+        Args:
+            model: ODEModel instance of your ODE problem.
+            step_func: Step Function used to integrate the model.
+            initial_state: State tuple containing the initial state variables.
+            end: Target end time for ODE solving.
+            h: Constant step size, or initial step size for adaptive integration.
+            max_steps: Maximum allowed steps during the integration.
+            sc: Optional step size controller for adaptive integration.
+            chunk_size: If specified, yields lists of this many consecutive states instead of
+             single states.
+            include_initial: Bool, whether to yield the initial state first.
+
+        Returns:
+            A generator over the computed states, or over chunks of states.
+
+        Raises:
+            ValueError: If the integration is mis-configured.
+        """
+        run_config = {RunConfigKeys.START: initial_state[0],
+                      RunConfigKeys.END: end,
+                      RunConfigKeys.STEP_SIZE: h,
+                      RunConfigKeys.NUM_STEPS: max_steps}
+
+        # validate eagerly, so that configuration errors surface before the first state
+        if sc:
+            validate_dynamic_loop(run_config=run_config)
+        else:
+            validate_const_h_loop(run_config=run_config)
+
+        h = run_config[RunConfigKeys.STEP_SIZE]
+        max_steps = run_config[RunConfigKeys.NUM_STEPS]
+
+        # deepcopy here, otherwise the initial state gets overwritten
+        state = copy.deepcopy(initial_state)
+
+        def states():
+            if include_initial:
+                yield state
+
+            if sc:
+                yield from adaptive_h_steps(step_func=step_func, model=model, h=h,
+                                            end=run_config[RunConfigKeys.END],
+                                            max_steps=max_steps, state=state, sc=sc)
+            else:
+                yield from constant_h_steps(step_func=step_func, model=model, h=h,
+                                            max_steps=max_steps, state=state)
+
+        if chunk_size:
+            return iter_chunks(states(), chunk_size=chunk_size)
+
+        return states()
+
+    def integrate_parareal(self,
+                           model: BaseModel,
+                           coarse_step_func: StepFunction,
+                           fine_step_func: StepFunction,
+                           initial_state: ModelState,
+                           num_slices: int,
+                           end: float = None,
+                           h: float = None,
+                           max_steps: int = None,
+                           coarse_steps_per_slice: int = 1,
+                           max_iterations: int = None,
+                           tol: float = None,
+                           num_workers: int = None,
+                           reset: bool = False,
+                           verbosity: int = logging.INFO,
+                           output_dir: Text = None,
+                           logfile: Text = None,
+                           progress_bar: bool = False,
+                           metrics: List[Metric] = None):
         """
-        Lists all available previous runs.
+        Integrate a model in parallel in time with the Parareal algorithm. The integration
+        interval is split into time slices. A cheap coarse step function sweeps over all slices
+        serially, and an expensive fine step function with constant step size h refines each
+        slice in a separate worker process. The predictor-corrector iteration is repeated until
+        the maximal correction at the slice boundaries falls below the tolerance.
+
+        The iteration count, convergence history and the estimated speedup over a serial fine
+        integration are saved in the run under the ``parareal_info`` key. The speedup is the
+        ratio of the serial time, the CPU time of propagating every slice once with the fine
+        step function as in the first iteration, and the wall time of the whole Parareal
+        integration. The fine time is the CPU time of all fine propagations over all
+        iterations, i.e. the total work done by the workers, which is at least the serial time.
+
+        Args:
+            model: ODEModel instance of your ODE problem. Needs to be picklable, i.e. the
+             right-hand side should be defined at the top level of a module.
+            coarse_step_func: Step function used for the serial coarse propagation.
+            fine_step_func: Step function used for the parallel fine propagation.
+            initial_state: State tuple containing the initial state variables.
+            num_slices: Number of time slices to split the integration interval into.
+            end: Target end time for ODE solving. Equals the time value of the last step.
+            h: Constant step size of the fine step function.
+            max_steps: Total number of fine steps across all slices.
+            coarse_steps_per_slice: Number of coarse steps to take in each time slice.
+            max_iterations: Maximum number of Parareal iterations, defaults to num_slices.
+            tol: Convergence tolerance for the maximal correction at the slice boundaries.
+            num_workers: Number of worker processes, defaults to the number of CPUs.
+            reset: Bool, whether to reset the integrator (this deletes all previous runs).
+            verbosity: Logging verbosity, default logging.INFO.
+            output_dir: Output directory. If specified,saves run data and info into this directory.
+            logfile: Log file. If specified, writes all logs of the integration into this file.
+            progress_bar: Bool, whether to display a progress bar over the Parareal iterations.
+            metrics: List of metrics to calculate on each step of the final trajectory.
+        """
+
+        return self._integrate(loop_type="parareal",
+                               model=model,
+                               step_func=fine_step_func,
+                               initial_state=initial_state,
+                               end=end,
+                               h=h,
+                               max_steps=max_steps,
+                               reset=reset,
+                               verbosity=verbosity,
+                               output_dir=output_dir,
+                               logfile=logfile,
+                               progress_bar=progress_bar,
+                               callbacks=None,
+                               metrics=metrics,
+                               sc=None,
+                               coarse_step_func=coarse_step_func,
+                               num_slices=num_slices,
+                               coarse_steps_per_slice=coarse_steps_per_slice,
+                               max_iterations=max_iterations,
+                               tol=tol,
+                               num_workers=num_workers)
+
+    def resume(self,
+               checkpoint: Text,
+               model: BaseModel,
+               verbosity: int = logging.INFO,
+               output_dir: Text = None,
+               logfile: Text = None,
+               progress_bar: bool = False,
+               checkpoint_interval: float = None):
+        """
+        Resume an integration run from a checkpoint written during integrate_const or
+        integrate_adaptively. The run continues after the last checkpointed step with the
+        saved state, step size, step function, step size controller, callbacks and metrics,
+        so that the resumed run yields exactly the same result as an uninterrupted one.
+
+        Args:
+            checkpoint: Checkpoint file in the base output directory.
+            model: ODEModel instance of the checkpointed ODE problem. Models are not saved
+             in checkpoints.
+            verbosity: Logging verbosity, default logging.INFO.
+            output_dir: Output directory. Defaults to the output directory of the checkpointed
+             run, if any.
+            logfile: Log file. If specified, writes all logs of the integration into this file.
+            progress_bar: Bool, whether to display a progress bar during the run.
+            checkpoint_interval: Minimum time in seconds between two checkpoints of the resumed
+             run. Defaults to the interval of the checkpointed run.
+
+        Raises:
+            ValueError: If the checkpoint file does not exist.
+        """
+        if self._writer is not None:
+            self._writer.raise_pending()
+
+        path = os.path.join(self.base_output_dir, checkpoint)
+
+        ckpt = load_checkpoint(path)
+
+        self._set_up_run_logging(verbosity=verbosity, logfile=logfile)
+
+        loop_type = ckpt[CheckpointKeys.LOOP_TYPE]
+        output_dir = output_dir or ckpt[CheckpointKeys.OUTPUT_DIR]
+
+        if checkpoint_interval is None:
+            checkpoint_interval = ckpt[CheckpointKeys.INTERVAL]
+
+        # continue checkpointing into the same file and row log
+        checkpointer = Checkpointer(path=path,
+                                    interval=checkpoint_interval,
+                                    loop_type=loop_type,
+                                    output_dir=output_dir)
+        checkpointer.continue_from(ckpt)
+
+        run = ckpt[CheckpointKeys.RUN]
+
+        iteration = ckpt[CheckpointKeys.ITERATION]
+
+        logger.info(f"Resuming integration of run {run[constants.RUN_ID]} "
+                    f"after iteration {iteration}.")
+
+        counters = ckpt.get(CheckpointKeys.COUNTERS) or PerformanceCounters()
+
+        with self._instrument(run, counters):
+            loop_factory.get(loop_type)(run=run,
+                                        step_func=ckpt[CheckpointKeys.STEP_FUNC],
+                                        model=model,
+                                        h=ckpt[CheckpointKeys.STEP_SIZE],
+                                        max_steps=ckpt[CheckpointKeys.MAX_STEPS],
+                                        state=ckpt[CheckpointKeys.STATE],
+                                        callbacks=ckpt[CheckpointKeys.CALLBACKS],
+                                        metrics=ckpt[CheckpointKeys.METRICS],
+                                        sc=ckpt[CheckpointKeys.STEP_SIZE_CONTROLLER],
+                                        progress_bar=progress_bar,
+                                        checkpointer=checkpointer,
+                                        initial_step=iteration + 1,
+                                        counters=counters)
+
+        run[RunKeys.PERFORMANCE] = counters.to_dict()
+
+        logger.info("Finished integration.")
+
+        return self._finalize_run(run=run, output_dir=output_dir, checkpointer=checkpointer)
+
+    def list_runs(self, tablefmt: Text = "github", limit: int = None, **filters):
+        """
+        Lists all available previous runs recorded in the run catalog, most recent first,
+        along with the number of right-hand side evaluations, rejected steps and Newton
+        iterations, the total integration time and, if traced, the peak memory of each run.
 
         Args:
             tablefmt: Table format, passed to tabulate.
+            limit: Optional maximum number of runs to list.
+            **filters: Optional exact-match filters, see ``Integrator.query_runs``.
         """
 
-        if len(self.runs) == 0:
+        records = self.query_runs(limit=limit, **filters)
+
+        if len(records) == 0:
             print("No runs available!")
             return
 
-        metadata_list = [get_run_metadata(run) for run in self.runs]
+        metadata_list = []
+        for r in records:
+            summary = r[CatalogKeys.SUMMARY] or {}
+            metadata = {CatalogKeys.TIMESTAMP: r[CatalogKeys.TIMESTAMP],
+                        CatalogKeys.RUN_ID: r[CatalogKeys.RUN_ID],
+                        CatalogKeys.NUM_STATES: r[CatalogKeys.NUM_STATES]}
+            # performance counters, missing for runs not integrated by a loop
+            for key in _LISTED_COUNTERS:
+                metadata[key] = summary.get(key)
+            metadata[CatalogKeys.OUTPUT_DIR] = r[CatalogKeys.OUTPUT_DIR]
+            metadata_list.append(metadata)
+
+        from tabulate import tabulate
 
         print(tabulate(metadata_list, headers="keys", tablefmt=tablefmt))
 
+    def query_runs(self,
+                   since: float = None,
+                   until: float = None,
+                   limit: int = None,
+                   **filters) -> List[Dict[Text, Any]]:
+        """
+        Query the run catalog for previous runs, most recent first. This includes runs saved by
+        other integrator instances or processes sharing the same base output directory, and the
+        unsaved runs of this instance.
+
+        Args:
+            since: Optional UNIX timestamp, only return runs created at or after this time.
+            until: Optional UNIX timestamp, only return runs created before this time.
+            limit: Optional maximum number of runs to return.
+            **filters: Exact-match filters, e.g. h=0.01 or output_dir="my_run". Keys other than
+             the catalog columns are looked up in the run config.
+
+        Returns:
+            A list of catalog records, as dicts.
+        """
+        records = self.catalog.query(since=since, until=until, limit=limit, **filters)
+
+        if self._session_catalog is self.catalog:
+            return records
+
+        # a run saved in the background can briefly be in both catalogs
+        saved = {r[CatalogKeys.RUN_ID] for r in records}
+        records += [r for r in self._session_catalog.query(since=since, until=until,
+                                                           limit=limit, **filters)
+                    if r[CatalogKeys.RUN_ID] not in saved]
+
+        records.sort(key=lambda r: r[CatalogKeys.CREATED], reverse=True)
+
+        return records[:limit]
+
     def get_run_by_id(self, run_id: Text):
         """
         Returns a previous ODE integration run by (partial) ID.
@@ -332,22 +1091,39 @@ class Integrator:
         Args:
             run_id: ID of the chosen integration run object.
 
+        Runs that are not held in memory, e.g. runs of other processes sharing the same
+        output directory, are loaded lazily from the directory they were saved to.
+
         Raises:
             ValueError: If no run matches the given run ID.
 
         """
-        if len(self.runs) == 0:
+        if run_id == "latest" and len(self.runs) > 0:
+            return self.runs[-1]
+
+        if len(self.catalog) == 0 and len(self._session_catalog) == 0:
             raise ValueError("No runs available. Please integrate a model first!")
+
         if run_id == "latest":
-            return self.runs[-1]
-        try:
-            run = next(r for r in self.runs if run_id in str(r[constants.RUN_ID]))
-        except StopIteration:
-            raise ValueError(f"Run with ID {run_id} not found.")
+            record = self.catalog.latest()
+        else:
+            try:
+                record = self._session_catalog.get(run_id)
+            except ValueError:
+                record = self.catalog.get(run_id)
 
-        return run
+        full_id = record[CatalogKeys.RUN_ID]
+
+        if full_id in self._runs_by_id:
+            return self._runs_by_id[full_id]
+
+        if record[CatalogKeys.OUTPUT_DIR] is None:
+            raise ValueError(f"Run with ID {full_id} is not loaded in this Integrator instance "
+                             f"and was not saved to disk.")
+
+        return self.load_run(path=record[CatalogKeys.OUTPUT_DIR])
 
-    def return_result_data(self, run_id: Text) -> pd.DataFrame:
+    def return_result_data(self, run_id: Text) -> "pd.DataFrame":
         """
         Construct a pd.DataFrame out of the result data of a previous integration run.
 
@@ -360,24 +1136,10 @@ class Integrator:
 
         run = self.get_run_by_id(run_id=run_id)
 
-        model_metadata = run[RunKeys.MODEL_METADATA]
-
-        dim_names = model_metadata[ModelMetadataKeys.DIM_NAMES]
-
-        variable_names = model_metadata[ModelMetadataKeys.VARIABLE_NAMES]
-
-        run_result = copy.deepcopy(run[RunKeys.RESULT_DATA])
-
-        if not dim_names:
-            dim_names = initialize_dim_names(variable_names, run_result[0])
+        return result_to_dataframe(run[RunKeys.RESULT_DATA],
+                                   model_metadata=run[RunKeys.MODEL_METADATA])
 
-        for i, res in enumerate(run_result):
-            run_result[i] = convert_to_dict(res, model_metadata=model_metadata,
-                                            dim_names=dim_names)
-
-        return pd.DataFrame(run_result)
-
-    def return_metrics(self, run_id: Text) -> pd.DataFrame:
+    def return_metrics(self, run_id: Text) -> "pd.DataFrame":
         """
         Construct a pd.DataFrame out of the result data of a previous integration run.
 
@@ -387,6 +1149,7 @@ class Integrator:
         Returns:
             A pd.DataFrame containing the metric data of the run with ID run_id as rows.
         """
+        import pandas as pd
 
         run = self.get_run_by_id(run_id=run_id)
 
@@ -400,9 +1163,97 @@ class Integrator:
             run: Run object obtained as output from ODE integration.
             output_dir: Target directory to save the run to.
 
+        If the Integrator was created with ``async_io=True``, the run is saved on a background
+        thread and this method returns immediately. The run must not be modified afterwards.
+
+        Raises:
+            BackgroundWriteError: If a previous background write failed.
         """
+        self._save_run(run=run, output_dir=output_dir)
+
+    def _save_run(self, run: Dict, output_dir: Text, checkpointer: Checkpointer = None):
         out_dir = os.path.join(self.base_output_dir, output_dir)
-        write_run_to_disk(run=run, out_dir=out_dir, **self.csv_io_args)
+
+        if self._writer is not None:
+            self._writer.submit(self._write_run, run=run, out_dir=out_dir,
+                                checkpointer=checkpointer,
+                                task_name=f"saving run {run[constants.RUN_ID]} to {out_dir}")
+        else:
+            self._write_run(run=run, out_dir=out_dir, checkpointer=checkpointer)
+
+    def _write_run(self, run: Dict, out_dir: Text, checkpointer: Checkpointer = None):
+        write_run_to_disk(run=run, out_dir=out_dir, output_format=self.output_format,
+                          **self.io_args)
+
+        # the checkpoint is kept until the results are on disk
+        if checkpointer is not None:
+            checkpointer.remove()
+
+        self.catalog.add_run(run=run, output_dir=out_dir)
+
+        if self._session_catalog is not self.catalog:
+            self._session_catalog.remove_runs([run[constants.RUN_ID]])
+
+        logger.info("Run results saved to directory {}.".format(out_dir))
+
+    def flush(self):
+        """
+        Wait until all runs saved in the background are written to disk.
+
+        Raises:
+            BackgroundWriteError: If any background write failed since the last call.
+        """
+        if self._writer is not None:
+            self._writer.flush()
+
+        for listener in self._log_listeners:
+            # restart the listener to drain the log queue
+            listener.stop()
+            listener.start()
+
+    def close(self):
+        """
+        Wait until all runs saved in the background are written to disk, and stop the
+        background threads. Runs saved afterwards are written synchronously.
+
+        Raises:
+            BackgroundWriteError: If any background write failed since the last call.
+        """
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            self._finalizer.detach()
+            self._close_io(writer, self._log_listeners)
+
+    def load_run(self, path: Text) -> Dict[Text, Any]:
+        """
+        Loads a run saved to disk and registers it in this Integrator instance. The result
+        data is not parsed upfront, but loaded lazily on first access. Result data saved in
+        the uncompressed NPZ format is memory-mapped, so that loading even very large runs
+        takes constant time.
+
+        Args:
+            path: Directory the run was saved to. Relative paths are interpreted relative to
+             the base output directory.
+
+        Returns:
+            The loaded run object.
+
+        Raises:
+            ValueError: If the directory does not contain a saved run.
+        """
+        out_dir = os.path.join(self.base_output_dir, path)
+
+        run = load_run_from_disk(out_dir)
+
+        run_id = run[constants.RUN_ID]
+
+        if run_id not in self._runs_by_id:
+            self.runs.append(run)
+            self._runs_by_id[run_id] = run
+
+        self.catalog.add_run(run=run, output_dir=out_dir)
+
+        return run
 
     def visualize(self, run_id: Text, ax=None):
         """
@@ -1,18 +1,20 @@
 import logging
-from typing import Any, List, Dict, Text
-
-from tqdm import trange
+import time
+from typing import Any, List, Dict, Text, Iterator
 
 from ode_explorer import defaults
 from ode_explorer.callbacks import Callback
 from ode_explorer.constants import RunKeys, RunConfigKeys
+from ode_explorer.integrators.checkpoint import Checkpointer
 from ode_explorer.metrics import Metric
 from ode_explorer.models import BaseModel
 from ode_explorer.stepfunctions import StepFunction
 from ode_explorer.stepsize_control import StepSizeController
 from ode_explorer.types import ModelState
+from ode_explorer.utils.profiling import PerformanceCounters, CountingModel, counting
 
-__all__ = ["constant_h_loop", "adaptive_h_loop"]
+__all__ = ["constant_h_loop", "adaptive_h_loop", "constant_h_steps", "adaptive_h_steps",
+           "iter_chunks"]
 
 logger = logging.getLogger(__name__)
 
@@ -26,46 +28,78 @@ def constant_h_loop(run: Dict[Text, Any],
                     callbacks: List[Callback],
                     metrics: List[Metric],
                     progress_bar: bool = False,
-                    sc: StepSizeController = None):
+                    sc: StepSizeController = None,
+                    checkpointer: Checkpointer = None,
+                    initial_step: int = 1,
+                    counters: PerformanceCounters = None):
     # callbacks and metrics
     callbacks = callbacks or []
     metrics = metrics or []
 
+    counters = counters or PerformanceCounters()
+
+    # only the step function sees the counting model, so that right-hand side
+    # evaluations in callbacks and metrics are not attributed to the step function
+    counting_model = CountingModel(model, counters)
+
     run_config = run[RunKeys.RUN_CONFIG]
 
-    validate_const_h_loop(run_config=run_config)
+    # resumed runs have been validated before
+    if initial_step == 1:
+        validate_const_h_loop(run_config=run_config)
+
+    # validation fills in the missing one of step size and step count
+    h = run_config[RunConfigKeys.STEP_SIZE]
+    max_steps = run_config[RunConfigKeys.NUM_STEPS]
 
     # treat initial state as state 0
     if progress_bar:
+        from tqdm import trange
         # register to tqdm
-        iterator = trange(1, max_steps + 1)
+        iterator = trange(initial_step, max_steps + 1)
     else:
-        iterator = range(1, max_steps + 1)
+        iterator = range(initial_step, max_steps + 1)
 
-    for i in iterator:
-        # if self._pre_step_hook:
-        #     self._pre_step_hook()
+    with counting(counters):
+        for i in iterator:
+            # if self._pre_step_hook:
+            #     self._pre_step_hook()
 
-        updated_state = step_func.forward(model, state, h)
+            step_start = time.perf_counter()
+
+            updated_state = step_func.forward(counting_model, state, h)
+
+            step_end = time.perf_counter()
+            counters.step_time += step_end - step_start
+            counters.accepted_steps += 1
+
+            # adding the current iteration number and time stamp
+            metric_dict = {}
+
+            for metric in metrics:
+                val = metric(i, state, updated_state, model, locals())
+                metric_dict[metric.__name__] = val
+
+            run[RunKeys.METRICS].append(metric_dict)
 
-        # adding the current iteration number and time stamp
-        metric_dict = {}
+            # execute the registered callbacks after the step
+            for callback in callbacks:
+                callback(i, state, updated_state, model, locals())
 
-        for metric in metrics:
-            val = metric(i, state, updated_state, model, locals())
-            metric_dict[metric.__name__] = val
+            counters.callback_time += time.perf_counter() - step_end
 
-        run[RunKeys.METRICS].append(metric_dict)
+            run[RunKeys.RESULT_DATA].append(updated_state)
+            counters.current_time = updated_state[0]
 
-        # execute the registered callbacks after the step
-        for callback in callbacks:
-            callback(i, state, updated_state, model, locals())
+            # update delayed after callback execution so that callbacks have
+            # access to both the previous and the current state
+            state = updated_state
 
-        run[RunKeys.RESULT_DATA].append(updated_state)
+            if checkpointer is not None:
+                checkpointer(i, state, h, run, step_func, sc, callbacks, metrics, max_steps,
+                             counters=counters)
 
-        # update delayed after callback execution so that callbacks have
-        # access to both the previous and the current state
-        state = updated_state
+    run[RunKeys.PERFORMANCE] = counters.to_dict()
 
 
 def adaptive_h_loop(run: Dict[Text, Any],
@@ -77,14 +111,24 @@ def adaptive_h_loop(run: Dict[Text, Any],
                     callbacks: List[Callback],
                     metrics: List[Metric],
                     sc: StepSizeController = None,
-                    progress_bar: bool = False):
+                    progress_bar: bool = False,
+                    checkpointer: Checkpointer = None,
+                    initial_step: int = 1,
+                    counters: PerformanceCounters = None):
     # callbacks and metrics
     callbacks = callbacks or []
     metrics = metrics or []
 
+    counters = counters or PerformanceCounters()
+
+    counting_model = CountingModel(model, counters)
+
     run_config = run[RunKeys.RUN_CONFIG]
 
-    validate_dynamic_loop(run_config=run_config)
+    # resumed runs have been validated before, and continue with their current step size
+    if initial_step == 1:
+        validate_dynamic_loop(run_config=run_config)
+        h = run_config[RunConfigKeys.STEP_SIZE]
 
     max_steps = run_config[RunConfigKeys.NUM_STEPS]
 
@@ -92,59 +136,181 @@ def adaptive_h_loop(run: Dict[Text, Any],
 
     # treat initial state as state 0
     if progress_bar:
+        from tqdm import trange
         # register to tqdm
-        iterator = trange(1, max_steps + 1)
+        iterator = trange(initial_step, max_steps + 1)
     else:
-        iterator = range(1, max_steps + 1)
+        iterator = range(initial_step, max_steps + 1)
 
-    for i in iterator:
-        # if self._pre_step_hook:
-        #     self._pre_step_hook()
+    with counting(counters):
+        for i in iterator:
+            # if self._pre_step_hook:
+            #     self._pre_step_hook()
 
+            step_start = time.perf_counter()
+
+            updated_state = step_func.forward(counting_model, state, h)
+
+            counters.step_time += time.perf_counter() - step_start
+
+            accepted, h = sc(i, h, state, updated_state, model, locals())
+
+            if accepted:
+                counters.accepted_steps += 1
+            else:
+                counters.rejected_steps += 1
+
+            # e.g. DOPRI45 returns a tuple of estimates, as do embedded RKs
+            if isinstance(updated_state, (tuple, list)):
+                # TODO: This needs work, maybe infer which one is the higher order
+                lower_order_sol, higher_order_sol = updated_state
+                current = higher_order_sol[0]
+            else:
+                higher_order_sol = updated_state
+                current = higher_order_sol[0]
+
+            # the next step starts from the new state if accepted, else from the old one
+            next_start = current if accepted else state[0]
+
+            if next_start + h > end:
+                h = end - next_start
+
+            callback_start = time.perf_counter()
+
+            # initialize with the current iteration number and time stamp
+            new_metrics = {defaults.iteration: i,
+                           defaults.step_size: h,
+                           defaults.accepted: int(accepted),
+                           defaults.rejected: int(not accepted)}
+
+            for metric in metrics:
+                new_metrics[metric.__name__] = metric(i, state, higher_order_sol, model,
+                                                      locals())
+
+            run[RunKeys.METRICS].append(new_metrics)
+
+            # execute the registered callbacks after the step
+            for callback in callbacks:
+                callback(i, state, higher_order_sol, model, locals())
+
+            counters.callback_time += time.perf_counter() - callback_start
+
+            if accepted:
+                run[RunKeys.RESULT_DATA].append(higher_order_sol)
+                counters.current_time = current
+
+                if current >= end:
+                    break
+
+                # update delayed after callback execution so that callbacks have
+                # access to both the previous and the current state
+                state = higher_order_sol
+
+            if checkpointer is not None:
+                checkpointer(i, state, h, run, step_func, sc, callbacks, metrics, max_steps,
+                             counters=counters)
+
+    run[RunKeys.PERFORMANCE] = counters.to_dict()
+
+
+def constant_h_steps(step_func: StepFunction,
+                     model: BaseModel,
+                     h: float,
+                     max_steps: int,
+                     state: ModelState) -> Iterator[ModelState]:
+    """
+    Generator version of the constant step size loop. Yields each new state as soon as it
+    is computed, without recording the states or calculating metrics.
+
+    Args:
+        step_func: Step function used to integrate the model.
+        model: ODE model to integrate.
+        h: Constant step size.
+        max_steps: Number of steps to take.
+        state: Initial state.
+
+    Yields:
+        The state after each step.
+    """
+    for _ in range(max_steps):
+        state = step_func.forward(model, state, h)
+        yield state
+
+
+def adaptive_h_steps(step_func: StepFunction,
+                     model: BaseModel,
+                     h: float,
+                     end: float,
+                     max_steps: int,
+                     state: ModelState,
+                     sc: StepSizeController) -> Iterator[ModelState]:
+    """
+    Generator version of the adaptive step size loop. Yields each accepted state as soon as
+    it is computed, without recording the states or calculating metrics.
+
+    Args:
+        step_func: Step function used to integrate the model.
+        model: ODE model to integrate.
+        h: Initial step size.
+        end: End time of the integration.
+        max_steps: Maximum number of steps, including rejected ones.
+        state: Initial state.
+        sc: Step size controller, adjusting the step size after each step.
+
+    Yields:
+        Each accepted state.
+    """
+    for i in range(1, max_steps + 1):
         updated_state = step_func.forward(model, state, h)
 
         accepted, h = sc(i, h, state, updated_state, model, locals())
 
         # e.g. DOPRI45 returns a tuple of estimates, as do embedded RKs
         if isinstance(updated_state, (tuple, list)):
-            # TODO: This needs work, maybe infer which one is the higher order
             lower_order_sol, higher_order_sol = updated_state
-            current = higher_order_sol[0]
         else:
             higher_order_sol = updated_state
-            current = higher_order_sol[0]
-
-        if current + h > end:
-            h = end - current
 
-        # initialize with the current iteration number and time stamp
-        new_metrics = {defaults.iteration: i,
-                       defaults.step_size: h,
-                       defaults.accepted: int(accepted),
-                       defaults.rejected: int(not accepted)}
+        current = higher_order_sol[0]
 
-        for metric in metrics:
-            new_metrics[metric.__name__] = metric(i, state, higher_order_sol, model, locals())
+        next_start = current if accepted else state[0]
 
-        run[RunKeys.METRICS].append(new_metrics)
-
-        # execute the registered callbacks after the step
-        for callback in callbacks:
-            callback(i, state, higher_order_sol, model, locals())
+        if next_start + h > end:
+            h = end - next_start
 
         if not accepted:
             continue
 
-        run[RunKeys.RESULT_DATA].append(higher_order_sol)
+        yield higher_order_sol
 
         if current >= end:
-            break
+            return
 
-        # update delayed after callback execution so that callbacks have
-        # access to both the previous and the current state
         state = higher_order_sol
 
 
+def iter_chunks(states: Iterator[ModelState], chunk_size: int) -> Iterator[List[ModelState]]:
+    """
+    Group a stream of states into lists of consecutive states.
+
+    Args:
+        states: Iterator over states.
+        chunk_size: Number of states per chunk. The last chunk may hold fewer states.
+
+    Yields:
+        Lists of at most chunk_size consecutive states.
+    """
+    chunk = []
+    for state in states:
+        chunk.append(state)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
 def validate_const_h_loop(run_config: Dict[Text, Any]):
     start = run_config[RunConfigKeys.START]
     end = run_config[RunConfigKeys.END]
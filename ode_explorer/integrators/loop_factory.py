@@ -1,4 +1,6 @@
 from ode_explorer.integrators import integrator_loops as loops
+from ode_explorer.integrators import parareal
 
 loop_factory = {"constant": loops.constant_h_loop,
-                "adaptive": loops.adaptive_h_loop}
+                "adaptive": loops.adaptive_h_loop,
+                "parareal": parareal.parareal_loop}
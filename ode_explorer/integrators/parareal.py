@@ -0,0 +1,260 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Dict, Text, Tuple
+
+import numpy as np
+
+from ode_explorer import defaults
+from ode_explorer.callbacks import Callback
+from ode_explorer.constants import RunKeys, RunConfigKeys, PararealKeys
+from ode_explorer.integrators.integrator_loops import validate_const_h_loop
+from ode_explorer.metrics import Metric
+from ode_explorer.models import BaseModel
+from ode_explorer.stepfunctions import StepFunction
+from ode_explorer.stepsize_control import StepSizeController
+from ode_explorer.types import ModelState
+from ode_explorer.utils.profiling import PerformanceCounters, CountingModel, counting
+
+__all__ = ["parareal_loop", "propagate"]
+
+logger = logging.getLogger(__name__)
+
+
+def propagate(model: BaseModel,
+              step_func: StepFunction,
+              state: ModelState,
+              h: float,
+              num_steps: int,
+              return_trajectory: bool = False) -> Tuple[ModelState, List[ModelState], float]:
+    """
+    Propagate a state over a time slice with a fixed number of constant-size steps. This is
+    used both for the serial coarse sweeps and, inside the worker processes, for the fine
+    propagation of each time slice in the Parareal algorithm.
+
+    Args:
+        model: ODE model to integrate.
+        step_func: Step function used for propagation. It is reset before the first step,
+         since every time slice is an independent initial value problem.
+        state: Initial state of the time slice.
+        h: Constant step size.
+        num_steps: Number of steps to take.
+        return_trajectory: Whether to return all intermediate states as well.
+
+    Returns:
+        A tuple (state, trajectory, elapsed) containing the final state, the list of computed
+        states (empty if return_trajectory is False) and the CPU time of the propagation in
+        seconds. Unlike the wall time, the CPU time does not grow when worker processes share
+        fewer cores than there are workers.
+    """
+    step_func.reset()
+
+    trajectory = []
+
+    start = time.process_time()
+
+    for _ in range(num_steps):
+        updated_state = step_func.forward(model, state, h)
+
+        # e.g. DOPRI45 returns a tuple of estimates, use the higher order one
+        if isinstance(updated_state[0], (tuple, list)):
+            updated_state = updated_state[-1]
+
+        if return_trajectory:
+            trajectory.append(updated_state)
+
+        state = updated_state
+
+    return state, trajectory, time.process_time() - start
+
+
+def parareal_loop(run: Dict[Text, Any],
+                  step_func: StepFunction,
+                  model: BaseModel,
+                  h: float,
+                  max_steps: int,
+                  state: ModelState,
+                  callbacks: List[Callback],
+                  metrics: List[Metric],
+                  coarse_step_func: StepFunction,
+                  num_slices: int,
+                  coarse_steps_per_slice: int = 1,
+                  max_iterations: int = None,
+                  tol: float = None,
+                  num_workers: int = None,
+                  progress_bar: bool = False,
+                  sc: StepSizeController = None,
+                  counters: PerformanceCounters = None):
+    """
+    Parareal predictor-corrector loop. The interval is split into time slices; a cheap
+    coarse propagator sweeps all slices serially, while the expensive fine propagator
+    refines every unconverged slice in parallel worker processes. The iteration
+
+        U_{n+1}^{k+1} = G(U_n^{k+1}) + F(U_n^k) - G(U_n^k)
+
+    is repeated until the largest correction falls below the tolerance.
+
+    Only the work done in this process is counted in the performance counters, i.e. the
+    coarse sweeps and, without worker processes, the fine propagation.
+    """
+    metrics = metrics or []
+
+    counters = counters or PerformanceCounters()
+
+    counting_model = CountingModel(model, counters)
+
+    if callbacks:
+        raise ValueError("Callbacks are not supported in Parareal mode, since the fine "
+                         "propagation happens out of order in separate worker processes.")
+
+    run_config = run[RunKeys.RUN_CONFIG]
+
+    validate_const_h_loop(run_config=run_config)
+
+    h = run_config[RunConfigKeys.STEP_SIZE]
+    num_steps = run_config[RunConfigKeys.NUM_STEPS]
+
+    if not 0 < num_slices <= num_steps:
+        raise ValueError("The number of time slices has to be positive and must not exceed "
+                         f"the number of fine steps, got {num_slices} slices for "
+                         f"{num_steps} steps.")
+
+    max_iterations = max_iterations or num_slices
+    tol = tol or defaults.PARAREAL_TOL
+    num_workers = min(num_workers or os.cpu_count() or 1, num_slices)
+
+    # distribute the fine steps as evenly as possible among the slices
+    fine_steps = [num_steps // num_slices + int(n < num_steps % num_slices)
+                  for n in range(num_slices)]
+    coarse_h = [n_f * h / coarse_steps_per_slice for n_f in fine_steps]
+
+    def coarse(n: int, s: ModelState) -> ModelState:
+        return propagate(counting_model, coarse_step_func, s, coarse_h[n],
+                         coarse_steps_per_slice)[0]
+
+    start_time = time.perf_counter()
+
+    # the right-hand side calls of the serial sweeps are counted
+    with counting(counters):
+        # initial serial coarse sweep, U^0
+        boundaries = [state]
+        coarse_values = []
+        for n in range(num_slices):
+            coarse_values.append(coarse(n, boundaries[n]))
+            boundaries.append(coarse_values[n])
+
+        trajectories = [None] * num_slices
+        # the first iteration propagates every slice once, like a serial fine integration
+        serial_times = [0.0] * num_slices
+        fine_time = 0.0
+        corrections = []
+        converged = False
+
+        if progress_bar:
+            from tqdm import trange
+            # register to tqdm
+            iterator = trange(max_iterations)
+        else:
+            iterator = range(max_iterations)
+
+        executor = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else None
+
+        try:
+            for k in iterator:
+                # slices before k start from an exact value and are already final
+                pending = range(k, num_slices)
+
+                if executor is not None:
+                    futures = [executor.submit(propagate, model, step_func, boundaries[n],
+                                               h, fine_steps[n], True) for n in pending]
+                    results = [f.result() for f in futures]
+                else:
+                    results = [propagate(counting_model, step_func, boundaries[n], h,
+                                         fine_steps[n], True) for n in pending]
+
+                fine_values = {}
+                for n, (fine_state, trajectory, elapsed) in zip(pending, results):
+                    fine_values[n] = fine_state
+                    trajectories[n] = trajectory
+                    fine_time += elapsed
+                    if k == 0:
+                        serial_times[n] = elapsed
+
+                # serial correction sweep, slice k is exact after this iteration
+                correction = 0.0
+                new_boundaries = boundaries[:k + 1]
+                for n in pending:
+                    if n == k:
+                        coarse_new = coarse_values[n]
+                    else:
+                        coarse_new = coarse(n, new_boundaries[n])
+
+                    corrected = _combine(coarse_new, fine_values[n], coarse_values[n])
+                    correction = max(correction, _max_distance(corrected, boundaries[n + 1]))
+
+                    coarse_values[n] = coarse_new
+                    new_boundaries.append(corrected)
+
+                boundaries = new_boundaries
+                corrections.append(correction)
+
+                logger.info(f"Parareal iteration {k + 1}: maximal correction {correction:.3e}.")
+
+                # after num_slices iterations, Parareal reproduces the fine solution exactly
+                if correction < tol or k + 1 == num_slices:
+                    converged = True
+                    break
+
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    wall_time = time.perf_counter() - start_time
+    serial_time = sum(serial_times)
+    num_iterations = len(corrections)
+
+    result_data = run[RunKeys.RESULT_DATA]
+    for trajectory in trajectories:
+        result_data.extend(trajectory)
+
+    # metrics are evaluated on the final trajectory, after the fact
+    for i in range(1, len(result_data)):
+        metric_dict = {}
+        for metric in metrics:
+            metric_dict[metric.__name__] = metric(i, result_data[i - 1], result_data[i],
+                                                  model, locals())
+        run[RunKeys.METRICS].append(metric_dict)
+
+    counters.accepted_steps = len(result_data) - 1
+    counters.current_time = result_data[-1][0]
+
+    run[RunKeys.PARAREAL_INFO] = {
+        PararealKeys.NUM_SLICES: num_slices,
+        PararealKeys.NUM_WORKERS: num_workers,
+        PararealKeys.ITERATIONS: num_iterations,
+        PararealKeys.CONVERGED: converged,
+        PararealKeys.CORRECTIONS: [float(c) for c in corrections],
+        PararealKeys.WALL_TIME: wall_time,
+        PararealKeys.SERIAL_TIME: serial_time,
+        PararealKeys.FINE_TIME: fine_time,
+        PararealKeys.SPEEDUP: serial_time / wall_time if wall_time > 0 else 0.0}
+
+    if not converged:
+        logger.warning(f"Parareal did not converge to tolerance {tol} within "
+                       f"{max_iterations} iterations.")
+
+    logger.info(f"Parareal finished after {num_iterations} iteration(s) on {num_workers} "
+                f"worker(s), estimated speedup over serial fine integration: "
+                f"{run[RunKeys.PARAREAL_INFO][PararealKeys.SPEEDUP]:.2f}x.")
+
+
+def _combine(coarse_new: ModelState, fine_old: ModelState, coarse_old: ModelState) -> ModelState:
+    # Parareal update G(U^{k+1}) + F(U^k) - G(U^k), applied to all state vectors
+    t = fine_old[0]
+    return (t, *[g_new + f - g_old for g_new, f, g_old
+                 in zip(coarse_new[1:], fine_old[1:], coarse_old[1:])])
+
+
+def _max_distance(state: ModelState, other: ModelState) -> float:
+    return max(float(np.max(np.abs(np.subtract(a, b)))) for a, b in zip(state[1:], other[1:]))
@@ -1,3 +1,6 @@
 from ode_explorer.models.base_model import BaseModel
 from ode_explorer.models.model import ODEModel
 from ode_explorer.models.hamiltonian_system import HamiltonianSystem
+from ode_explorer.models.multirate_model import MultirateModel
+from ode_explorer.models.split_model import SplitModel
+from ode_explorer.models.sensitivity_model import ParameterizedModel, SensitivityModel, AdjointModel
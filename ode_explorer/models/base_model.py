@@ -2,7 +2,17 @@
 class BaseModel:
     """
     Base model class. Override this to define your own ODE model classes.
+
+    Attributes:
+        jac: Optional Jacobian jac(t, y) of the right-hand side with respect to y, used by
+         implicit step functions instead of a finite-difference approximation.
+        rhs_into: Optional in-place right-hand side rhs_into(t, y, out), writing the
+         derivative into the preallocated array out. Used by step functions keeping a
+         workspace between steps instead of allocating new arrays.
     """
+    jac = None
+    rhs_into = None
+
     def make_state(self, *args, **kwargs):
         """
         Constructs a state object from raw input floats and numpy arrays.
@@ -25,3 +35,14 @@ class BaseModel:
 
         """
         raise NotImplementedError
+
+    def rhs(self, *args):
+        """
+        Right-hand side of the model, called by the builtin step functions. Defaults to the
+        call operator. Models with additional function arguments replace this by a callable
+        with the arguments bound, to save the argument handling on every evaluation.
+
+        Returns:
+            A state vector corresponding to the right hand side of y' = f(t,y).
+        """
+        return self(*args)
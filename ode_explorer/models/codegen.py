@@ -0,0 +1,232 @@
+"""
+Code generation of right-hand sides and Jacobians of ODE models defined by SymPy expressions.
+
+The expressions are reduced by common subexpression elimination and printed as NumPy code
+into a Python module, which is cached on disk under a hash of the expressions. Later
+processes building a model from the same expressions import the cached module directly and
+skip the symbolic differentiation, simplification and printing.
+"""
+import hashlib
+import os
+from typing import Any, List, Sequence, Text, Tuple
+
+from ode_explorer import defaults
+from ode_explorer.utils.import_utils import import_module_from_source
+
+__all__ = ["GeneratedFunctions", "generate_functions"]
+
+# bump this when the generated code changes, to invalidate cached modules
+CODEGEN_VERSION = 1
+
+_HEADER = '''"""
+Generated by ode_explorer.models.codegen from SymPy expressions, do not edit.
+"""
+import numpy
+'''
+
+
+class GeneratedFunctions:
+    """
+    Functions generated from the SymPy expressions of an ODE model.
+
+    Attributes:
+        rhs: Right-hand side rhs(t, y[, p]). The state y has the shape (dim,) or, for a
+         vectorized evaluation, (dim, ...), in which case the result has the same shape.
+        jac: Jacobian jac(t, y[, p]) of the right-hand side with respect to y, a dense
+         (dim, dim) array or a scipy.sparse CSR matrix. For scalar models, the derivative.
+        rhs_batch: Right-hand side rhs_batch(t, Y[, P]) of an ensemble, with one state per
+         row of Y of shape (N, dim) and one parameter vector per row of P of shape
+         (N, num_params), or a single shared parameter vector.
+        path: Path of the generated module.
+    """
+
+    def __init__(self, rhs, jac, rhs_batch, path: Text):
+        self.rhs = rhs
+        self.jac = jac
+        self.rhs_batch = rhs_batch
+        self.path = path
+
+
+def _import_sympy():
+    try:
+        import sympy
+    except ImportError:
+        raise ImportError("Defining models by SymPy expressions requires sympy. You can "
+                          "install it by running \"pip install ode-explorer[sympy]\".")
+    return sympy
+
+
+def _printer():
+    from sympy.printing.numpy import NumPyPrinter
+    return NumPyPrinter({"fully_qualified_modules": True})
+
+
+def _unpack_lines(dim: int, num_params: int, state: Text, params: Text,
+                  batch: bool) -> List[Text]:
+    index = "[..., {}]" if batch else "[{}]"
+
+    if dim == 1:
+        lines = [f"_y0 = {state}"]
+    else:
+        lines = [f"_y{i} = {state}{index.format(i)}" for i in range(dim)]
+
+    lines += [f"_p{i} = {params}{index.format(i)}" for i in range(num_params)]
+
+    return lines
+
+
+def _reduce(sympy, exprs: List[Any]) -> Tuple[List[Text], List[Text]]:
+    # common subexpression elimination, returns the assignments and the reduced expressions
+    printer = _printer()
+    replacements, reduced = sympy.cse(exprs, symbols=sympy.numbered_symbols("_c"))
+
+    assignments = [f"{sym} = {printer.doprint(expr)}" for sym, expr in replacements]
+
+    return assignments, [printer.doprint(expr) for expr in reduced]
+
+
+def _function(name: Text, args: Sequence[Text], lines: List[Text]) -> Text:
+    body = "\n".join("    " + line for line in lines)
+    return f"\n\ndef {name}({', '.join(args)}):\n{body}\n"
+
+
+def _rhs_source(sympy, exprs: List[Any], dim: int, num_params: int, batch: bool) -> Text:
+    state, params = ("Y", "P") if batch else ("y", "p")
+    args = ["t", state] + ([params] if num_params else [])
+
+    lines = _unpack_lines(dim, num_params, state, params, batch)
+
+    assignments, reduced = _reduce(sympy, exprs)
+    lines += assignments
+
+    if dim == 1:
+        # constant right-hand sides are broadcast to the shape of the state
+        lines.append(f"return {reduced[0]} + 0.0 * {state}")
+    else:
+        index = "[..., {}]" if batch else "[{}]"
+        lines.append(f"out = numpy.empty(numpy.shape({state}))")
+        lines += [f"out{index.format(i)} = {expr}" for i, expr in enumerate(reduced)]
+        lines.append("return out")
+
+    return _function("rhs_batch" if batch else "rhs", args, lines)
+
+
+def _jac_source(sympy, jacobian, dim: int, num_params: int, sparse: bool) -> Text:
+    args = ["t", "y"] + (["p"] if num_params else [])
+
+    lines = _unpack_lines(dim, num_params, "y", "p", batch=False)
+
+    if dim == 1:
+        assignments, reduced = _reduce(sympy, [jacobian[0, 0]])
+        lines += assignments
+        lines.append(f"return {reduced[0]} + 0.0 * y")
+        return _function("jac", args, lines)
+
+    entries = [(i, j) for i in range(dim) for j in range(dim) if jacobian[i, j] != 0]
+
+    assignments, reduced = _reduce(sympy, [jacobian[i, j] for i, j in entries])
+    lines += assignments
+
+    if sparse:
+        lines.append(f"data = numpy.empty({len(entries)})")
+        lines += [f"data[{k}] = {expr}" for k, expr in enumerate(reduced)]
+        lines.append("import scipy.sparse")
+        lines.append(f"return scipy.sparse.csr_matrix((data, (_JAC_ROWS, _JAC_COLS)), "
+                     f"shape=({dim}, {dim}))")
+
+        rows, cols = [i for i, _ in entries], [j for _, j in entries]
+        header = f"\n\n_JAC_ROWS = numpy.array({rows}, dtype=int)\n" \
+                 f"_JAC_COLS = numpy.array({cols}, dtype=int)\n"
+
+        return header + _function("jac", args, lines)
+
+    lines.append(f"out = numpy.zeros(({dim}, {dim}) + numpy.shape(y)[1:])")
+    lines += [f"out[{i}, {j}] = {expr}" for (i, j), expr in zip(entries, reduced)]
+    lines.append("return out")
+
+    return _function("jac", args, lines)
+
+
+def _canonicalize(sympy, exprs: Sequence[Any], state_syms: Sequence[Any],
+                  param_syms: Sequence[Any], time_sym: Any) -> List[Any]:
+    # rename all symbols to the names used in the generated code, so that the
+    # cache key does not depend on the symbol names chosen by the user
+    mapping = {sym: sympy.Symbol(f"_y{i}") for i, sym in enumerate(state_syms)}
+    mapping.update({sym: sympy.Symbol(f"_p{i}") for i, sym in enumerate(param_syms)})
+    if time_sym is not None:
+        mapping[time_sym] = sympy.Symbol("t")
+
+    canonical = [sympy.sympify(expr).xreplace(mapping) for expr in exprs]
+
+    unknown = set().union(*(expr.free_symbols for expr in canonical)) - set(mapping.values())
+    if unknown:
+        raise ValueError(f"The expressions contain symbols which are neither state variables, "
+                         f"parameters nor the time: {', '.join(sorted(map(str, unknown)))}.")
+
+    return canonical
+
+
+def generate_functions(exprs: Sequence[Any],
+                       state_syms: Sequence[Any],
+                       param_syms: Sequence[Any] = None,
+                       time_sym: Any = None,
+                       sparse_jacobian: bool = False,
+                       cache_dir: Text = None) -> GeneratedFunctions:
+    """
+    Generate the right-hand side, its Jacobian and an ensemble variant of the right-hand side
+    of an ODE model y' = f(t, y, p) given by SymPy expressions.
+
+    Args:
+        exprs: SymPy expressions of the derivatives of the state variables, in the order of
+         the state variables.
+        state_syms: SymPy symbols of the state variables.
+        param_syms: SymPy symbols of the parameters, passed as a parameter vector p.
+        time_sym: SymPy symbol of the time, if the model is non-autonomous.
+        sparse_jacobian: Bool, whether to return the Jacobian as a scipy.sparse CSR matrix.
+        cache_dir: Directory for generated modules, defaults to ~/.cache/ode_explorer/codegen.
+
+    Returns:
+        A GeneratedFunctions instance.
+
+    Raises:
+        ImportError: If sympy is not installed.
+        ValueError: If the number of expressions and state variables differ, or if the
+         expressions contain unknown symbols.
+    """
+    sympy = _import_sympy()
+
+    param_syms = list(param_syms or [])
+    dim, num_params = len(state_syms), len(param_syms)
+
+    if len(exprs) != dim:
+        raise ValueError(f"Got {len(exprs)} expressions for {dim} state variables.")
+
+    canonical = _canonicalize(sympy, exprs, state_syms, param_syms, time_sym)
+
+    key = hashlib.sha256(repr((CODEGEN_VERSION, [sympy.srepr(e) for e in canonical], dim,
+                               num_params, sparse_jacobian)).encode()).hexdigest()
+
+    cache_dir = os.path.expanduser(cache_dir or defaults.CODEGEN_CACHE_DIR)
+    path = os.path.join(cache_dir, f"model_{key[:32]}.py")
+
+    if not os.path.exists(path):
+        state_vars = [sympy.Symbol(f"_y{i}") for i in range(dim)]
+        jacobian = sympy.Matrix(canonical).jacobian(state_vars)
+
+        source = _HEADER + \
+            _rhs_source(sympy, canonical, dim, num_params, batch=False) + \
+            _rhs_source(sympy, canonical, dim, num_params, batch=True) + \
+            _jac_source(sympy, jacobian, dim, num_params, sparse=sparse_jacobian)
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # write atomically, concurrent processes may generate the same module
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(source)
+        os.replace(tmp_path, path)
+
+    module = import_module_from_source(path, module_name=f"ode_explorer_codegen_{key[:32]}")
+
+    return GeneratedFunctions(rhs=module.rhs, jac=module.jac, rhs_batch=module.rhs_batch,
+                              path=path)
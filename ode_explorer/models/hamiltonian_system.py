@@ -4,7 +4,7 @@ from ode_explorer.constants import ModelMetadataKeys
 from ode_explorer.models import BaseModel
 from ode_explorer.models import messages
 from ode_explorer.types import StateVariable
-from ode_explorer.utils.helpers import infer_variable_names, infer_separability
+from ode_explorer.utils.helpers import infer_variable_names, infer_separability, bind_args
 from ode_explorer.utils.import_utils import import_func_from_module
 
 Hamiltonian = Callable[[StateVariable, StateVariable, StateVariable, Any], float]
@@ -32,6 +32,10 @@ class HamiltonianSystem(BaseModel):
     of the Hamiltonian; a separable Hamiltonian needs a q-derivative independent of p, and a p-derivative
     independent of q. To specify a separable Hamiltonian correctly, supply a q-derivative with signature
     (t, q, **h_args) and a p-derivative of signature (t, p, **h_args).
+
+    The additional arguments are bound to the Hamiltonian and its derivatives on construction
+    and on every call to ``update_args``. Step functions call the bound derivatives
+    ``bound_q_derivative`` and ``bound_p_derivative``, which take only the state arguments.
     """
 
     def __init__(self,
@@ -92,6 +96,27 @@ class HamiltonianSystem(BaseModel):
         else:
             self.is_separable = infer_separability(self.q_derivative, self.p_derivative)
 
+        self._bind()
+
+    def _bind(self):
+        # separable derivatives take (t, q) and (t, p), non-separable ones (t, q, p)
+        num_state_args = 2 if self.is_separable else 3
+
+        self.bound_hamiltonian = bind_args(self.hamiltonian, self.h_args, num_state_args=3)
+        self.bound_q_derivative = bind_args(self.q_derivative, self.h_args, num_state_args)
+        self.bound_p_derivative = bind_args(self.p_derivative, self.h_args, num_state_args)
+
+    def __getstate__(self):
+        # bound callables are closures, which cannot be pickled
+        state = self.__dict__.copy()
+        for name in ["bound_hamiltonian", "bound_q_derivative", "bound_p_derivative"]:
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind()
+
     def make_state(self, t: StateVariable, q: StateVariable, p: StateVariable):
         """
         Constructs a state object from raw input floats and numpy arrays.
@@ -114,6 +139,7 @@ class HamiltonianSystem(BaseModel):
             **kwargs: Updated keyword arguments to replace the old ones.
         """
         self.h_args.update(kwargs)
+        self._bind()
 
     def get_metadata(self):
         """
@@ -138,4 +164,4 @@ class HamiltonianSystem(BaseModel):
         Returns:
             A scalar, the value of the Hamiltonian at the current state.
         """
-        return self.hamiltonian(t, q, p, **self.h_args)
+        return self.bound_hamiltonian(t, q, p)
@@ -7,3 +7,14 @@ BAD_MODEL_DEF = "Defining a model function by a source path and by a callable fu
 DIMENSION_MISMATCH = "Error: Dimension mismatch. List of dimension names " \
                      "suggests a system of size {0}, but inferred a system size of {1} " \
                      "from initial state."
+
+INCOMPLETE_SPLIT = "Error: Incomplete split model definition. A split right hand side " \
+                   "f(t,y) = f_explicit(t,y) + f_implicit(t,y) requires both the " \
+                   "explicit_fn and the implicit_fn arguments."
+
+BAD_SPLIT_DEF = "Defining a model function by a single right hand side and by a split " \
+                "right hand side are mutually exclusive options. Please choose only one of " \
+                "these options."
+
+INPLACE_SPLIT = "Error: In-place right hand sides f(t,y,out) are not supported for split " \
+                "models. Please supply a single right hand side in in-place form."
@@ -1,15 +1,30 @@
-from typing import Dict, Any, Text, List, Callable
+from typing import Dict, Any, Text, List, Callable, Sequence
+
+import numpy as np
 
 from ode_explorer.constants import ModelMetadataKeys
 from ode_explorer.models import BaseModel
 from ode_explorer.models import messages
 from ode_explorer.types import StateVariable
-from ode_explorer.utils.helpers import infer_variable_names
+from ode_explorer.utils.helpers import infer_variable_names, bind_args
 from ode_explorer.utils.import_utils import import_func_from_module
 
 ODEFunction = Callable[[StateVariable, StateVariable, Any], StateVariable]
 
 
+class SplitFunction:
+    """
+    Right-hand side given as the sum of an explicit (non-stiff) and an implicit (stiff) part.
+    """
+
+    def __init__(self, explicit_fn: ODEFunction, implicit_fn: ODEFunction):
+        self.explicit_fn = explicit_fn
+        self.implicit_fn = implicit_fn
+
+    def __call__(self, t: StateVariable, y: StateVariable, **kwargs) -> StateVariable:
+        return self.explicit_fn(t, y, **kwargs) + self.implicit_fn(t, y, **kwargs)
+
+
 class ODEModel(BaseModel):
     """
     Base class for all ODE models.
@@ -21,9 +36,40 @@ class ODEModel(BaseModel):
     In addition to the actual right-hand side, the ODEModel class keeps a minimal amount of state around,
     mainly for bookkeeping and easier visualization using pandas.
 
+    Optionally, the right-hand side can be given in split form ::
+
+        f(t, y) = f_explicit(t, y) + f_implicit(t, y),
+
+    where f_implicit holds the stiff terms of the model. Split models can be integrated with
+    implicit-explicit (IMEX) step functions, which treat only the stiff part implicitly.
+
+    The additional function arguments are bound to the right-hand side on construction and
+    on every call to ``update_args``, which is the only supported way of changing them.
+
+    An analytic Jacobian of the right-hand side with respect to y can be supplied as jac_fn,
+    taking the same arguments as the ode_fn. Implicit step functions use it for their Newton
+    iterations instead of approximating the Jacobian by finite differences. Models defined by
+    SymPy expressions, which get a generated right-hand side and Jacobian, can be built with
+    ``ODEModel.from_sympy``.
+
+    For large states, the right-hand side can be given in in-place form ``ode_fn(t, y, out)``
+    by setting inplace=True, writing the derivative into the preallocated array out instead
+    of returning a new array. Step functions with an in-place kernel then evaluate it into
+    their workspace, while all other step functions call it with a fresh output array.
+
     Attributes:
         ode_fn: Right-hand side of the ODE.
+        explicit_fn: Non-stiff part of the right-hand side, if given in split form.
+        implicit_fn: Stiff part of the right-hand side, if given in split form.
+        jac_fn: Optional Jacobian of the right-hand side with respect to y.
+        inplace: Whether the ode_fn writes the right-hand side into an output array argument.
         fn_args: Dict with additional keyword arguments for the ode_fn.
+        rhs: Right-hand side with the additional arguments bound, taking only t and y.
+        explicit_rhs: Non-stiff part of the right-hand side with the arguments bound.
+        implicit_rhs: Stiff part of the right-hand side with the arguments bound.
+        jac: Jacobian with the additional arguments bound, taking only t and y, or None.
+        rhs_into: In-place right-hand side with the additional arguments bound, taking t, y
+         and out, for models with an in-place ode_fn, or None.
         variable_names: List of ODE variable names, taken from the signature of the ode_fn.
         dim_names: Optional list of dimension names for result data saving. These will become column
          headers in result pandas.DataFrame objects.
@@ -34,7 +80,11 @@ class ODEModel(BaseModel):
                  module_path: Text = None,
                  ode_fn_name: Text = None,
                  fn_args: Dict[Text, Any] = None,
-                 dim_names: List[Text] = None) -> None:
+                 dim_names: List[Text] = None,
+                 explicit_fn: ODEFunction = None,
+                 implicit_fn: ODEFunction = None,
+                 jac_fn: Callable = None,
+                 inplace: bool = False) -> None:
         """
         ODEModel constructor.
 
@@ -47,24 +97,158 @@ class ODEModel(BaseModel):
             fn_args: Additional keyword arguments for ode_fn.
             dim_names: Optional list of dimension names for result data saving. These will become column
              headers in result pandas.DataFrame objects.
+            explicit_fn: Optional callable implementing the non-stiff part of a split right-hand side.
+            implicit_fn: Optional callable implementing the stiff part of a split right-hand side.
+            jac_fn: Optional callable implementing the Jacobian of the right-hand side with
+             respect to y, taking the same arguments as the ode_fn. Returns a (dim, dim) array
+             or scipy.sparse matrix, or the derivative for scalar models.
+            inplace: Bool, whether the ode_fn has the in-place signature ode_fn(t, y, out),
+             writing the right-hand side into the array out. Requires array-valued states.
         """
-        if not any([bool(module_path), bool(ode_fn_name), bool(ode_fn)]):
+        is_split = any([bool(explicit_fn), bool(implicit_fn)])
+
+        if not any([bool(module_path), bool(ode_fn_name), bool(ode_fn), is_split]):
             raise ValueError(messages.MISSING_INFO)
 
         if any([bool(module_path), bool(ode_fn_name)]) and bool(ode_fn):
             raise ValueError(messages.BAD_MODEL_DEF)
 
+        if is_split and not all([bool(explicit_fn), bool(implicit_fn)]):
+            raise ValueError(messages.INCOMPLETE_SPLIT)
+
+        if is_split and any([bool(module_path), bool(ode_fn_name), bool(ode_fn)]):
+            raise ValueError(messages.BAD_SPLIT_DEF)
+
+        if is_split and inplace:
+            raise ValueError(messages.INPLACE_SPLIT)
+
+        self.explicit_fn = explicit_fn
+        self.implicit_fn = implicit_fn
+        self.jac_fn = jac_fn
+        self.inplace = inplace
+
         if bool(ode_fn):
             self.ode_fn = ode_fn
+        elif is_split:
+            self.ode_fn = SplitFunction(explicit_fn=explicit_fn, implicit_fn=implicit_fn)
         else:
             self.ode_fn = import_func_from_module(module_path, ode_fn_name)
 
         # additional arguments for the function
         self.fn_args = fn_args or {}
 
-        self.variable_names = infer_variable_names(rhs=ode_fn)
+        self.variable_names = infer_variable_names(rhs=explicit_fn if is_split else self.ode_fn)
         self.dim_names = dim_names or []
 
+        self._bind()
+
+    def _bind(self):
+        rhs_into = None
+
+        if self.is_split:
+            explicit_rhs = bind_args(self.explicit_fn, self.fn_args)
+            implicit_rhs = bind_args(self.implicit_fn, self.fn_args)
+
+            self.explicit_rhs, self.implicit_rhs = explicit_rhs, implicit_rhs
+            self._rhs = lambda t, y: explicit_rhs(t, y) + implicit_rhs(t, y)
+        elif self.inplace:
+            self.explicit_rhs = self.implicit_rhs = None
+            rhs_into = bind_args(self.ode_fn, self.fn_args, num_state_args=3)
+
+            # step functions without an in-place kernel get a fresh output array
+            def _rhs(t, y):
+                out = np.empty(np.shape(y))
+                rhs_into(t, y, out)
+                return out
+
+            self._rhs = _rhs
+        else:
+            self.explicit_rhs = self.implicit_rhs = None
+            self._rhs = bind_args(self.ode_fn, self.fn_args)
+
+        self.jac = bind_args(self.jac_fn, self.fn_args)
+
+        # subclasses overriding the call operator are evaluated through it
+        if type(self).__call__ is ODEModel.__call__:
+            self.rhs, self.rhs_into = self._rhs, rhs_into
+        else:
+            self.rhs_into = None
+
+    def __getstate__(self):
+        # bound callables are closures, which cannot be pickled
+        state = self.__dict__.copy()
+        for name in ["rhs", "_rhs", "explicit_rhs", "implicit_rhs", "jac", "rhs_into"]:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind()
+
+    @classmethod
+    def from_sympy(cls,
+                   exprs: Sequence[Any],
+                   state_syms: Sequence[Any],
+                   params: Dict[Any, Any] = None,
+                   time_sym: Any = None,
+                   sparse_jacobian: bool = False,
+                   cache_dir: Text = None,
+                   dim_names: List[Text] = None) -> "ODEModel":
+        """
+        Construct an ODE model from SymPy expressions of its right-hand side.
+
+        The right-hand side, its analytic Jacobian and an ensemble variant are generated as
+        NumPy code after common subexpression elimination, and cached on disk under a hash
+        of the expressions, so that later constructions skip the symbolic processing. The
+        parameter values are passed as a parameter vector p, which can be changed later by
+        ``update_args(p=...)``.
+
+        Since the generated functions live in a module loaded from the cache directory, the
+        model cannot be sent to worker processes.
+
+        Args:
+            exprs: SymPy expressions of the derivatives of the state variables.
+            state_syms: SymPy symbols of the state variables.
+            params: Optional dict mapping SymPy parameter symbols to their values.
+            time_sym: SymPy symbol of the time, if the model is non-autonomous.
+            sparse_jacobian: Bool, whether to generate the Jacobian as a scipy.sparse matrix.
+            cache_dir: Directory for generated code, defaults to ~/.cache/ode_explorer/codegen.
+            dim_names: Optional list of dimension names for result data saving. Defaults to
+             the time and the names of the state symbols.
+
+        Returns:
+            An ODEModel with the generated right-hand side and Jacobian. The ensemble
+            variant rhs_batch(t, Y[, P]) is available as the batch_fn attribute.
+        """
+        from ode_explorer.models.codegen import generate_functions
+
+        params = params or {}
+
+        generated = generate_functions(exprs=exprs,
+                                       state_syms=state_syms,
+                                       param_syms=list(params),
+                                       time_sym=time_sym,
+                                       sparse_jacobian=sparse_jacobian,
+                                       cache_dir=cache_dir)
+
+        fn_args = {"p": np.array([float(v) for v in params.values()])} if params else None
+
+        model = cls(ode_fn=generated.rhs,
+                    fn_args=fn_args,
+                    dim_names=dim_names or ["t"] + [str(sym) for sym in state_syms],
+                    jac_fn=generated.jac)
+
+        model.batch_fn = generated.rhs_batch
+
+        return model
+
+    @property
+    def is_split(self) -> bool:
+        """
+        Whether the model right-hand side is given in split (explicit + implicit) form.
+        """
+        return self.implicit_fn is not None
+
     def update_args(self, **kwargs):
         """
         Update the model's keyword arguments.
@@ -73,6 +257,7 @@ class ODEModel(BaseModel):
             **kwargs: Updated keyword arguments to replace the old ones.
         """
         self.fn_args.update(kwargs)
+        self._bind()
 
     def make_state(self, t: StateVariable, y: StateVariable):
         """
@@ -111,4 +296,30 @@ class ODEModel(BaseModel):
              at the input state.
 
         """
-        return self.ode_fn(t, y, **self.fn_args)
+        return self._rhs(t, y)
+
+    def explicit(self, t: StateVariable, y: StateVariable) -> StateVariable:
+        """
+        Evaluate the explicit (non-stiff) part of a split right-hand side.
+
+        Args:
+            t: Time variable at the current state.
+            y: Spatial variable at the current state.
+
+        Returns:
+            A spatial variable representing the explicit part of the right-hand side.
+        """
+        return self.explicit_rhs(t, y)
+
+    def implicit(self, t: StateVariable, y: StateVariable) -> StateVariable:
+        """
+        Evaluate the implicit (stiff) part of a split right-hand side.
+
+        Args:
+            t: Time variable at the current state.
+            y: Spatial variable at the current state.
+
+        Returns:
+            A spatial variable representing the implicit part of the right-hand side.
+        """
+        return self.implicit_rhs(t, y)
@@ -0,0 +1,247 @@
+from typing import Dict, Any, Text, List, Sequence
+
+import numpy as np
+
+from ode_explorer.constants import ModelMetadataKeys
+from ode_explorer.models import BaseModel
+from ode_explorer.models.model import ODEFunction
+from ode_explorer.types import StateVariable
+from ode_explorer.utils.helpers import infer_variable_names, bind_args
+
+__all__ = ["MultirateModel", "SlowSubsystem", "FastSubsystem"]
+
+
+class MultirateModel(BaseModel):
+    """
+    Model class for ODE systems that couple a set of slowly varying components with a set of
+    fast components. The right-hand side is given as two separate functions, so that the slow
+    part can be evaluated on a much coarser time scale than the fast part, e.g. with the
+    ``MultirateMethod`` step function.
+
+    Both functions are called with the full state vector y and return the derivatives of their
+    respective components only, in the order given by the slow and fast index sets.
+
+    Attributes:
+        slow_fn: Right-hand side of the slow components.
+        fast_fn: Right-hand side of the fast components.
+        slow_idx: Indices of the slow components in the state vector.
+        fast_idx: Indices of the fast components in the state vector.
+        fn_args: Dict with additional keyword arguments for both slow_fn and fast_fn.
+        num_slow_evals: Number of slow right-hand side evaluations since the last counter reset.
+        num_fast_evals: Number of fast right-hand side evaluations since the last counter reset.
+    """
+
+    def __init__(self,
+                 slow_fn: ODEFunction,
+                 fast_fn: ODEFunction,
+                 slow_idx: Sequence[int],
+                 fast_idx: Sequence[int],
+                 fn_args: Dict[Text, Any] = None,
+                 dim_names: List[Text] = None):
+        """
+        MultirateModel constructor.
+
+        Args:
+            slow_fn: Callable returning the derivatives of the slow components.
+            fast_fn: Callable returning the derivatives of the fast components.
+            slow_idx: Indices of the slow components in the state vector.
+            fast_idx: Indices of the fast components in the state vector.
+            fn_args: Additional keyword arguments for slow_fn and fast_fn.
+            dim_names: Optional list of dimension names for result data saving. These will become
+             column headers in result pandas.DataFrame objects.
+        """
+        self.slow_idx = np.asarray(slow_idx, dtype=int)
+        self.fast_idx = np.asarray(fast_idx, dtype=int)
+
+        if np.intersect1d(self.slow_idx, self.fast_idx).size > 0:
+            raise ValueError("The slow and fast component index sets must be disjoint.")
+
+        self.slow_fn = slow_fn
+        self.fast_fn = fast_fn
+
+        # additional arguments for the functions
+        self.fn_args = fn_args or {}
+
+        self.variable_names = infer_variable_names(rhs=slow_fn)
+        self.dim_names = dim_names or []
+
+        self.num_slow_evals = 0
+        self.num_fast_evals = 0
+
+        self._bind()
+
+    def _bind(self):
+        self._slow_rhs = bind_args(self.slow_fn, self.fn_args)
+        self._fast_rhs = bind_args(self.fast_fn, self.fn_args)
+
+    def __getstate__(self):
+        # bound callables are closures, which cannot be pickled
+        state = self.__dict__.copy()
+        del state["_slow_rhs"], state["_fast_rhs"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind()
+
+    def reset_counters(self):
+        """
+        Reset the slow and fast right-hand side evaluation counters.
+        """
+        self.num_slow_evals = 0
+        self.num_fast_evals = 0
+
+    def update_args(self, **kwargs):
+        """
+        Update the model's keyword arguments.
+
+        Args:
+            **kwargs: Updated keyword arguments to replace the old ones.
+        """
+        self.fn_args.update(kwargs)
+        self._bind()
+
+    def make_state(self, t: StateVariable, y: StateVariable):
+        """
+        Constructs a state object from raw input floats and numpy arrays.
+
+        Args:
+            t: Time variable at the current state.
+            y: Spatial variable at the current state.
+
+        Returns:
+            A state object representing the current model state.
+        """
+        return t, y
+
+    def get_metadata(self):
+        """
+        Return model metadata information. Used for constructing result pandas DataFrame objects.
+
+        Returns:
+            A dict with model metadata information.
+        """
+
+        return {ModelMetadataKeys.VARIABLE_NAMES: self.variable_names,
+                ModelMetadataKeys.DIM_NAMES: self.dim_names}
+
+    def slow(self, t: StateVariable, y: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the right-hand side of the slow components.
+
+        Args:
+            t: Time variable at the current state.
+            y: Full state vector at the current state.
+
+        Returns:
+            The derivatives of the slow components.
+        """
+        self.num_slow_evals += 1
+        return self._slow_rhs(t, y)
+
+    def fast(self, t: StateVariable, y: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the right-hand side of the fast components.
+
+        Args:
+            t: Time variable at the current state.
+            y: Full state vector at the current state.
+
+        Returns:
+            The derivatives of the fast components.
+        """
+        self.num_fast_evals += 1
+        return self._fast_rhs(t, y)
+
+    def __call__(self, t: StateVariable, y: np.ndarray) -> np.ndarray:
+        """
+        Multirate model call operator. Assembles the full right-hand side, so that the model
+        can also be integrated with all single-rate step functions.
+
+        Args:
+            t: Time variable at the current state.
+            y: Full state vector at the current state.
+
+        Returns:
+            The derivatives of all components.
+        """
+        out = np.empty(len(y))
+        out[self.slow_idx] = self.slow(t, y)
+        out[self.fast_idx] = self.fast(t, y)
+        return out
+
+
+def _interpolate(times: np.ndarray, values: np.ndarray, t: StateVariable) -> np.ndarray:
+    # Lagrange form of the polynomial through the points (times[i], values[i])
+    result = np.zeros(values.shape[1:])
+    for i, t_i in enumerate(times):
+        others = np.delete(times, i)
+        result += np.prod((t - others) / (t_i - others)) * values[i]
+    return result
+
+
+class SlowSubsystem(BaseModel):
+    """
+    Slow subsystem of a multirate model, advancing only the slow components. The fast
+    components are extrapolated by the polynomial through their values at the last macro-step
+    points, or frozen at their values at the beginning of the macro-step if only that one
+    is given.
+    """
+
+    def __init__(self, model: MultirateModel):
+        self.model = model
+        self._y = None
+        self._times = None
+        self._fast_values = None
+
+    def bind(self, times: Sequence[float], states: Sequence[np.ndarray]):
+        """
+        Bind the subsystem to the full states at the last macro-step points.
+
+        Args:
+            times: Times of the last macro-step points, ending with the beginning of the
+             current macro-step.
+            states: Full state vectors at these times.
+        """
+        self._y = np.array(states[-1], dtype=float)
+        self._times = np.asarray(times, dtype=float)
+        self._fast_values = np.array([y[self.model.fast_idx] for y in states], dtype=float)
+
+    def __call__(self, t: StateVariable, y_slow: np.ndarray) -> np.ndarray:
+        self._y[self.model.slow_idx] = y_slow
+        self._y[self.model.fast_idx] = _interpolate(self._times, self._fast_values, t)
+        return self.model.slow(t, self._y)
+
+
+class FastSubsystem(BaseModel):
+    """
+    Fast subsystem of a multirate model, advancing only the fast components. The slow components
+    are interpolated by the polynomial through their values at the last macro-step points and
+    at the end of the current macro-step, i.e. linearly if only the beginning and the end of
+    the current macro-step are given.
+    """
+
+    def __init__(self, model: MultirateModel):
+        self.model = model
+        self._y = None
+        self._times = None
+        self._slow_values = None
+
+    def bind(self, times: Sequence[float], slow_values: Sequence[np.ndarray], y: np.ndarray):
+        """
+        Bind the subsystem to the slow solution of the current macro-step.
+
+        Args:
+            times: Times of the last macro-step points, ending with the end of the current
+             macro-step.
+            slow_values: Slow components at these times.
+            y: Full state vector at the beginning of the macro-step.
+        """
+        self._y = np.array(y, dtype=float)
+        self._times = np.asarray(times, dtype=float)
+        self._slow_values = np.array(slow_values, dtype=float)
+
+    def __call__(self, t: StateVariable, y_fast: np.ndarray) -> np.ndarray:
+        self._y[self.model.slow_idx] = _interpolate(self._times, self._slow_values, t)
+        self._y[self.model.fast_idx] = y_fast
+        return self.model.fast(t, self._y)
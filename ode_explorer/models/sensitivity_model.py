@@ -0,0 +1,482 @@
+from typing import Any, Callable, Dict, List, Text, Tuple
+
+import numpy as np
+
+from ode_explorer.models import BaseModel, ODEModel
+from ode_explorer.types import ModelState, StateVariable
+from ode_explorer.utils.helpers import is_scalar, bind_args
+
+__all__ = ["ParameterizedModel", "SensitivityModel", "AdjointModel"]
+
+
+def _is_numeric(value: Any) -> bool:
+    return np.issubdtype(np.asarray(value).dtype, np.number)
+
+
+class ParameterizedModel(BaseModel):
+    """
+    Base class of models augmenting the state of an ODE model y' = f(t, y, p) with the
+    derivatives of the solution with respect to some of its function arguments p. The numeric
+    arguments are flattened into a parameter vector, and the Jacobians of the right-hand side
+    with respect to the state and the parameters are taken from the model or approximated by
+    forward differences.
+
+    Attributes:
+        model: Wrapped ODE model.
+        params: Names of the function arguments the derivatives are taken with respect to.
+        param_names: Names of the scalar parameters, with array-valued arguments expanded as
+         name_1, name_2, ..., in the order of the parameter vector.
+        num_params: Number of scalar parameters.
+    """
+
+    def __init__(self,
+                 model: ODEModel,
+                 params: List[Text] = None,
+                 param_jac_fn: Callable = None,
+                 fd_step: float = None):
+        """
+        Constructor of models differentiating an ODE model with respect to its arguments.
+
+        Args:
+            model: ODE model to differentiate.
+            params: Names of numeric entries of the model's fn_args to differentiate with
+             respect to. Array-valued entries contribute one parameter per component. Defaults
+             to all numeric entries.
+            param_jac_fn: Optional callable implementing the Jacobian J_p of the right-hand
+             side with respect to the parameters, taking the same arguments as the ode_fn and
+             returning an array of shape (dim, num_params). Approximated by forward
+             differences if not given.
+            fd_step: Relative step of finite difference approximations, defaults to the square
+             root of the machine precision.
+
+        Raises:
+            ValueError: If the model is not an ODEModel, or if a parameter is not a numeric
+             entry of the model's fn_args.
+        """
+        if not isinstance(model, ODEModel):
+            raise ValueError("Only ODEModel instances can be differentiated with respect to "
+                             "their arguments.")
+
+        fn_args = model.fn_args
+
+        if params is None:
+            params = [name for name, value in fn_args.items() if _is_numeric(value)]
+
+        unknown = [name for name in params if name not in fn_args]
+        if unknown:
+            raise ValueError(f"Unknown model arguments: {', '.join(unknown)}.")
+
+        non_numeric = [name for name in params if not _is_numeric(fn_args[name])]
+        if non_numeric:
+            raise ValueError(f"Models can only be differentiated with respect to numeric "
+                             f"arguments, got: {', '.join(non_numeric)}.")
+
+        if not params:
+            raise ValueError("The model has no numeric arguments to differentiate with "
+                             "respect to.")
+
+        self.model = model
+        self.params = list(params)
+
+        # flat parameter vector, and the slice and shape of every argument in it
+        self._slices = []
+        self.param_names = []
+        values = []
+
+        start = 0
+        for name in self.params:
+            value = np.asarray(fn_args[name], dtype=float)
+            self._slices.append((name, slice(start, start + value.size), value.shape))
+
+            if value.ndim == 0:
+                self.param_names.append(name)
+            else:
+                self.param_names += [f"{name}_{i}" for i in range(1, value.size + 1)]
+
+            values.append(value.ravel())
+            start += value.size
+
+        self._p = np.concatenate(values)
+        self.num_params = len(self._p)
+
+        self.fd_step = fd_step or np.sqrt(np.finfo(float).eps)
+
+        self.param_jac = bind_args(param_jac_fn, model.fn_args)
+
+        # set by augment_state from the state of the model
+        self.dim = None
+        self._scalar = False
+
+    def unflatten_params(self, values: np.ndarray) -> Dict[Text, Any]:
+        """
+        Map a vector over the scalar parameters, e.g. a gradient, to the function arguments.
+
+        Args:
+            values: Array of shape (num_params,).
+
+        Returns:
+            A dict holding the values of each argument in params, in the shape of the argument.
+        """
+        return {name: values[idx].reshape(shape) if shape else values[idx][0]
+                for name, idx, shape in self._slices}
+
+    def _args(self, p: np.ndarray) -> Dict[Text, Any]:
+        # model arguments with the parameters taken from the vector p
+        args = dict(self.model.fn_args)
+        args.update(self.unflatten_params(p))
+        return args
+
+    def _eval(self, t: StateVariable, y: StateVariable, p: np.ndarray) -> StateVariable:
+        args = self._args(p)
+
+        if self.model.inplace:
+            out = np.empty(np.shape(y))
+            self.model.ode_fn(t, y, out, **args)
+            return out
+
+        return self.model.ode_fn(t, y, **args)
+
+    def _state(self, values: np.ndarray) -> StateVariable:
+        return values[0] if self._scalar else values
+
+    def _delta(self, j: int, direction: np.ndarray) -> float:
+        # relative to the parameter, and small enough for the state perturbation
+        scale = max(1.0, abs(self._p[j])) / max(1.0, np.max(np.abs(direction)))
+        return self.fd_step * scale
+
+    def _state_jacobian(self, t: StateVariable, y: StateVariable,
+                        f: StateVariable = None) -> np.ndarray:
+        if self.model.jac is not None:
+            jac = self.model.jac(t, y)
+            if hasattr(jac, "toarray"):
+                jac = jac.toarray()
+            return np.atleast_2d(jac)
+
+        # forward differences, one evaluation per state dimension
+        n = self.dim
+        y_vec = np.reshape(y, n).astype(float)
+        if f is None:
+            f = self.model.rhs(t, y)
+
+        jac = np.empty((n, n))
+        for i in range(n):
+            delta = self.fd_step * max(1.0, abs(y_vec[i]))
+            perturbed = y_vec.copy()
+            perturbed[i] += delta
+            jac[:, i] = np.reshape((self.model.rhs(t, self._state(perturbed)) - f) / delta, n)
+
+        return jac
+
+    def _param_jacobian(self, t: StateVariable, y: StateVariable,
+                        f: StateVariable) -> np.ndarray:
+        n = self.dim
+
+        if self.param_jac is not None:
+            return np.reshape(self.param_jac(t, y), (n, self.num_params))
+
+        jac = np.empty((n, self.num_params))
+        for j in range(self.num_params):
+            delta = self._delta(j, np.zeros(1))
+            p = self._p.copy()
+            p[j] += delta
+            jac[:, j] = np.reshape((self._eval(t, y, p) - f) / delta, n)
+
+        return jac
+
+    def make_state(self, t: StateVariable, y: StateVariable):
+        """
+        Constructs a state object from raw input floats and numpy arrays.
+
+        Args:
+            t: Time variable at the current state.
+            y: Augmented spatial variable at the current state.
+
+        Returns:
+            A state object representing the current model state.
+        """
+        return t, y
+
+    def get_metadata(self):
+        """
+        Return the metadata of the wrapped model, which describes the model states the
+        augmented states are split into.
+
+        Returns:
+            A dict with model metadata information.
+        """
+        return self.model.get_metadata()
+
+    def __call__(self, t: StateVariable, z: np.ndarray) -> np.ndarray:
+        """
+        Model call operator, evaluating the right-hand side of the augmented system.
+
+        Args:
+            t: Time variable at the current state.
+            z: Augmented spatial variable at the current state.
+
+        Returns:
+            The derivative of the augmented spatial variable.
+        """
+        return self.rhs(t, z)
+
+
+class SensitivityModel(ParameterizedModel):
+    """
+    Forward sensitivity system of an ODE model y' = f(t, y, p) with respect to some of its
+    function arguments p. The state is augmented by the sensitivities S = dy/dp, which obey ::
+
+        S'(t) = J_y(t, y) S + J_p(t, y),    S(t_0) = S_0,
+
+    where J_y and J_p are the Jacobians of the right-hand side with respect to the state and
+    the parameters. Integrating the augmented system once replaces integrating the model once
+    per perturbed parameter.
+
+    The augmented state holds y followed by the columns of S, one per parameter. If the model
+    has an analytic Jacobian, it is evaluated once per right-hand side evaluation and shared
+    by the state and all sensitivities, and implicit step functions get the block diagonal
+    Jacobian of the augmented system, whose Newton iterations then only need J_y. Otherwise,
+    each column J_y s_j + J_p e_j is approximated by a single forward difference of the
+    right-hand side in the direction (s_j, e_j), sharing the unperturbed evaluation.
+    """
+
+    def __init__(self,
+                 model: ODEModel,
+                 params: List[Text] = None,
+                 param_jac_fn: Callable = None,
+                 fd_step: float = None):
+        """
+        SensitivityModel constructor.
+
+        Args:
+            model: ODE model to compute sensitivities of.
+            params: Names of numeric entries of the model's fn_args to compute the
+             sensitivities with respect to. Defaults to all numeric entries.
+            param_jac_fn: Optional Jacobian of the right-hand side with respect to the
+             parameters, see ``ParameterizedModel``.
+            fd_step: Relative step of finite difference approximations.
+        """
+        super(SensitivityModel, self).__init__(model=model, params=params,
+                                               param_jac_fn=param_jac_fn, fd_step=fd_step)
+
+        # implicit step functions get the block diagonal Jacobian of the augmented system
+        self.jac = self._augmented_jac if model.jac is not None else None
+
+    def augment_state(self, state: ModelState, initial_sensitivities: np.ndarray = None) -> ModelState:
+        """
+        Construct the augmented state from a model state and the initial sensitivities.
+
+        Args:
+            state: Initial state (t, y) of the model.
+            initial_sensitivities: Optional array of shape (dim, num_params) holding the
+             derivatives of the initial state with respect to the parameters. Defaults to
+             zeros, i.e. an initial state independent of the parameters.
+
+        Returns:
+            The augmented state (t, z), with z holding y followed by the sensitivity columns.
+        """
+        t, y = state
+
+        self._scalar = is_scalar(y)
+        self.dim = 1 if self._scalar else len(y)
+
+        z = np.zeros(self.dim * (1 + self.num_params))
+        z[:self.dim] = y
+
+        if initial_sensitivities is not None:
+            s_0 = np.reshape(initial_sensitivities, (self.dim, self.num_params))
+            z[self.dim:] = s_0.T.ravel()
+
+        return t, z
+
+    def split_states(self, block: np.ndarray) -> Tuple[List[ModelState], np.ndarray]:
+        """
+        Split a block of augmented states into model states and sensitivities.
+
+        Args:
+            block: Array of augmented states, with one row (t, z) per state.
+
+        Returns:
+            A list of model states (t, y), and an array of shape (number of states, dim,
+            num_params) holding the sensitivity matrix dy/dp of every state.
+        """
+        n = self.dim
+
+        states = [(t, self._state(y.copy())) for t, y in zip(block[:, 0], block[:, 1:1 + n])]
+
+        sensitivities = block[:, 1 + n:].reshape(len(block), self.num_params, n)
+
+        return states, np.ascontiguousarray(sensitivities.transpose(0, 2, 1))
+
+    def rhs(self, t: StateVariable, z: np.ndarray) -> np.ndarray:
+        """
+        Right-hand side of the augmented system.
+
+        Args:
+            t: Time variable at the current state.
+            z: Augmented spatial variable, holding y followed by the sensitivity columns.
+
+        Returns:
+            The derivative of the augmented spatial variable.
+        """
+        n, num_params = self.dim, self.num_params
+
+        y = self._state(z[:n])
+        s = z[n:].reshape(num_params, n)
+
+        f = self.model.rhs(t, y)
+
+        dz = np.empty(len(z))
+        dz[:n] = f
+        ds = dz[n:].reshape(num_params, n)
+
+        if self.model.jac is not None:
+            # the Jacobian is shared by all sensitivities
+            np.dot(s, self._state_jacobian(t, y).T, out=ds)
+            ds += self._param_jacobian(t, y, f).T
+
+            return dz
+
+        # directional differences J_y s_j + J_p e_j, one evaluation per parameter
+        for j in range(num_params):
+            delta = self._delta(j, s[j])
+
+            p = self._p.copy()
+            p[j] += delta
+
+            perturbed = self._eval(t, self._state(z[:n] + delta * s[j]), p)
+            ds[j] = np.reshape((perturbed - f) / delta, n)
+
+        return dz
+
+    def _augmented_jac(self, t: StateVariable, z: np.ndarray) -> np.ndarray:
+        # block diagonal, neglecting the second derivatives of the right-hand side
+        j_y = self._state_jacobian(t, self._state(z[:self.dim]))
+        return np.kron(np.eye(1 + self.num_params), j_y)
+
+
+class AdjointModel(ParameterizedModel):
+    """
+    Adjoint system of an ODE model y' = f(t, y, p), integrated backwards in time to compute
+    the gradient of a scalar loss L on the trajectory with respect to the initial state and
+    some of the function arguments p. Between the states entering the loss, the adjoint
+    lambda = dL/dy and the parameter gradient mu obey ::
+
+        lambda'(t) = - J_y(t, y)^T lambda,    mu'(t) = - J_p(t, y)^T lambda,
+
+    and lambda jumps by the loss gradient at each of those states. Integrated from the final
+    time with mu = 0, lambda(t_0) and mu(t_0) are the gradients of L with respect to the
+    initial state and the parameters. The cost is independent of the number of parameters,
+    apart from the products with J_p.
+
+    The augmented state holds y, lambda and mu. The state y is integrated backwards along,
+    so that the step functions see it at their stages, and is reset to the forward solution
+    after every step. The Jacobians are taken from the model if available and approximated by
+    forward differences otherwise, which costs one model evaluation per state dimension and
+    per parameter.
+    """
+
+    def __init__(self,
+                 model: ODEModel,
+                 params: List[Text] = None,
+                 param_jac_fn: Callable = None,
+                 fd_step: float = None):
+        """
+        AdjointModel constructor.
+
+        Args:
+            model: ODE model to compute gradients of.
+            params: Names of numeric entries of the model's fn_args to compute the
+             gradients with respect to. Defaults to all numeric entries.
+            param_jac_fn: Optional Jacobian of the right-hand side with respect to the
+             parameters, see ``ParameterizedModel``.
+            fd_step: Relative step of finite difference approximations.
+        """
+        super(AdjointModel, self).__init__(model=model, params=params,
+                                           param_jac_fn=param_jac_fn, fd_step=fd_step)
+
+        # implicit step functions get the Jacobian of the augmented system
+        self.jac = self._augmented_jac if model.jac is not None else None
+
+    def augment_state(self, state: ModelState, adjoint: np.ndarray,
+                      param_adjoint: np.ndarray = None) -> ModelState:
+        """
+        Construct the augmented state from a model state and the adjoint variables.
+
+        Args:
+            state: State (t, y) of the model.
+            adjoint: Adjoint lambda = dL/dy at the state, of shape (dim,).
+            param_adjoint: Accumulated parameter gradient mu, of shape (num_params,).
+             Defaults to zeros.
+
+        Returns:
+            The augmented state (t, z), with z holding y, lambda and mu.
+        """
+        t, y = state
+
+        self._scalar = is_scalar(y)
+        self.dim = 1 if self._scalar else len(y)
+
+        n = self.dim
+
+        z = np.zeros(2 * n + self.num_params)
+        z[:n] = y
+        z[n:2 * n] = np.reshape(adjoint, n)
+
+        if param_adjoint is not None:
+            z[2 * n:] = param_adjoint
+
+        return t, z
+
+    def split_state(self, z: np.ndarray) -> Tuple[StateVariable, np.ndarray, np.ndarray]:
+        """
+        Split an augmented state variable into the model state and the adjoint variables.
+
+        Args:
+            z: Augmented spatial variable.
+
+        Returns:
+            A tuple (y, lambda, mu) of the spatial variable, the adjoint and the accumulated
+            parameter gradient.
+        """
+        n = self.dim
+        return self._state(z[:n]), z[n:2 * n], z[2 * n:]
+
+    def rhs(self, t: StateVariable, z: np.ndarray) -> np.ndarray:
+        """
+        Right-hand side of the adjoint system.
+
+        Args:
+            t: Time variable at the current state.
+            z: Augmented spatial variable, holding y, lambda and mu.
+
+        Returns:
+            The derivative of the augmented spatial variable.
+        """
+        n = self.dim
+
+        y, adjoint, _ = self.split_state(z)
+
+        f = self.model.rhs(t, y)
+
+        dz = np.empty(len(z))
+        dz[:n] = f
+        dz[n:2 * n] = - self._state_jacobian(t, y, f).T @ adjoint
+        dz[2 * n:] = - self._param_jacobian(t, y, f).T @ adjoint
+
+        return dz
+
+    def _augmented_jac(self, t: StateVariable, z: np.ndarray) -> np.ndarray:
+        # neglecting the second derivatives of the right-hand side, the adjoint equations
+        # are linear in lambda
+        n = self.dim
+
+        y = self._state(z[:n])
+        j_y = self._state_jacobian(t, y)
+        j_p = self._param_jacobian(t, y, self.model.rhs(t, y))
+
+        jac = np.zeros((len(z), len(z)))
+        jac[:n, :n] = j_y
+        jac[n:2 * n, n:2 * n] = - j_y.T
+        jac[2 * n:, n:2 * n] = - j_p.T
+
+        return jac
@@ -0,0 +1,86 @@
+from typing import Text, List
+
+import numpy as np
+
+from ode_explorer.constants import ModelMetadataKeys
+from ode_explorer.models import BaseModel, ODEModel
+from ode_explorer.types import StateVariable
+
+__all__ = ["SplitModel"]
+
+
+class SplitModel(BaseModel):
+    """
+    Model class composing several ODE models into a single one by summing their right-hand
+    sides, i.e. ::
+
+        y'(t) = f_1(t, y) + f_2(t, y) + ... + f_n(t, y).
+
+    A SplitModel is meant to be integrated with an operator splitting step function like
+    ``LieSplitting`` or ``StrangSplitting``, which advances each sub-model with its own
+    step function. Sub-models with a known flow can be advanced exactly by using the
+    ``ExactFlow`` or ``LinearFlow`` step functions.
+
+    Attributes:
+        models: List of sub-models.
+        variable_names: List of ODE variable names, taken from the first sub-model.
+        dim_names: Optional list of dimension names for result data saving.
+    """
+
+    def __init__(self, models: List[ODEModel], dim_names: List[Text] = None):
+        """
+        SplitModel constructor.
+
+        Args:
+            models: List of sub-models, all operating on the same state.
+            dim_names: Optional list of dimension names for result data saving. These will become
+             column headers in result pandas.DataFrame objects.
+        """
+        if len(models) < 2:
+            raise ValueError("A split model needs to be composed of at least two sub-models.")
+
+        self.models = list(models)
+
+        self.variable_names = self.models[0].variable_names
+        self.dim_names = dim_names or self.models[0].dim_names
+
+    def __len__(self):
+        return len(self.models)
+
+    def make_state(self, t: StateVariable, y: StateVariable):
+        """
+        Constructs a state object from raw input floats and numpy arrays.
+
+        Args:
+            t: Time variable at the current state.
+            y: Spatial variable at the current state.
+
+        Returns:
+            A state object representing the current model state.
+        """
+        return t, y
+
+    def get_metadata(self):
+        """
+        Return model metadata information. Used for constructing result pandas DataFrame objects.
+
+        Returns:
+            A dict with model metadata information.
+        """
+
+        return {ModelMetadataKeys.VARIABLE_NAMES: self.variable_names,
+                ModelMetadataKeys.DIM_NAMES: self.dim_names}
+
+    def __call__(self, t: StateVariable, y: StateVariable) -> StateVariable:
+        """
+        Split model call operator. Evaluates the full right-hand side as the sum of all
+        sub-model right-hand sides, so that the model can also be integrated without splitting.
+
+        Args:
+            t: Time variable at the current state.
+            y: Spatial variable at the current state.
+
+        Returns:
+            A spatial variable representing the full right-hand side at the input state.
+        """
+        return np.sum([model(t, y) for model in self.models], axis=0)
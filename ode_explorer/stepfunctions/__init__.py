@@ -7,7 +7,18 @@ from ode_explorer.stepfunctions.stepfunctions import (
     AdamsBashforth2,
     BDF2,
     EulerA,
-    EulerB
+    EulerB,
+    MultirateMethod,
+    IMEXEuler,
+    ARS222,
+    ARS343,
+    ARK3,
+    ARK4,
+    ARK5,
+    ExactFlow,
+    LinearFlow,
+    LieSplitting,
+    StrangSplitting
 )
 
 from ode_explorer.stepfunctions.templates import (
@@ -15,6 +26,8 @@ from ode_explorer.stepfunctions.templates import (
     MultiStepMethod,
     ExplicitRungeKuttaMethod,
     ImplicitRungeKuttaMethod,
+    IMEXRungeKuttaMethod,
+    SplittingMethod,
     ExplicitMultiStepMethod,
     ImplicitMultiStepMethod
 )
@@ -1,8 +1,9 @@
-from typing import Tuple
+from typing import Tuple, List, Callable
 
 import numpy as np
 
-from ode_explorer.models import ODEModel, HamiltonianSystem
+from ode_explorer.models import BaseModel, ODEModel, HamiltonianSystem, MultirateModel
+from ode_explorer.models.multirate_model import SlowSubsystem, FastSubsystem
 from ode_explorer.stepfunctions.stepfunctions_impl import *
 from ode_explorer.stepfunctions.templates import *
 from ode_explorer.types import ModelState, StateVariable
@@ -16,7 +17,18 @@ __all__ = ["ForwardEulerMethod",
            "AdamsBashforth2",
            "BDF2",
            "EulerA",
-           "EulerB"]
+           "EulerB",
+           "MultirateMethod",
+           "IMEXEuler",
+           "ARS222",
+           "ARS343",
+           "ARK3",
+           "ARK4",
+           "ARK5",
+           "ExactFlow",
+           "LinearFlow",
+           "LieSplitting",
+           "StrangSplitting"]
 
 
 class ForwardEulerMethod(SingleStepMethod):
@@ -27,6 +39,10 @@ class ForwardEulerMethod(SingleStepMethod):
     def __init__(self):
         super(ForwardEulerMethod, self).__init__(order=1)
 
+    def _advance(self, model: ODEModel, t: StateVariable, y: StateVariable, h: float,
+                 f: StateVariable = None) -> StateVariable:
+        return forward_euler_impl(model=model, t=t, y=y, h=h, f=f)
+
     def forward(self,
                 model: ODEModel,
                 state: ModelState,
@@ -34,7 +50,7 @@ class ForwardEulerMethod(SingleStepMethod):
                 **kwargs) -> ModelState:
         t, y = self.get_data_from_state(state=state)
 
-        y_new = forward_euler_impl(model=model, t=t, y=y, h=h)
+        y_new = self._advance(model=model, t=t, y=y, h=h)
 
         return self.make_new_state(t=t + h, y=y_new)
 
@@ -50,6 +66,13 @@ class HeunMethod(SingleStepMethod):
         self.model_dim = 1
         self.k = np.zeros(self.num_stages)
 
+    def _advance(self, model: ODEModel, t: StateVariable, y: StateVariable, h: float,
+                 f: StateVariable = None) -> StateVariable:
+        if self._get_shape(y) != self.k.shape:
+            self._adjust_dims(y)
+
+        return heun_impl(model=model, t=t, y=y, h=h, k=self.k, f=f)
+
     def forward(self,
                 model: ODEModel,
                 state: ModelState,
@@ -57,10 +80,7 @@ class HeunMethod(SingleStepMethod):
                 **kwargs) -> ModelState:
         t, y = self.get_data_from_state(state=state)
 
-        if self._get_shape(y) != self.k.shape:
-            self._adjust_dims(y)
-
-        y_new = heun_impl(model=model, t=t, y=y, h=h, k=self.k)
+        y_new = self._advance(model=model, t=t, y=y, h=h)
 
         return self.make_new_state(t=t + h, y=y_new)
 
@@ -77,6 +97,17 @@ class RungeKutta4(SingleStepMethod):
         self.k = np.zeros(self.num_stages)
         self.model_dim = 1
 
+    def _advance(self, model: ODEModel, t: StateVariable, y: StateVariable, h: float,
+                 f: StateVariable = None) -> StateVariable:
+        if self._get_shape(y) != self.k.shape:
+            self._adjust_dims(y)
+
+        if self._use_inplace(model, y):
+            return rk4_inplace_impl(rhs_into=model.rhs_into, t=t, y=y, h=h, k=self.k,
+                                    y_stage=self.y_stage, f=f)
+
+        return rk4_impl(model=model, t=t, y=y, h=h, k=self.k, f=f)
+
     def forward(self,
                 model: ODEModel,
                 state: ModelState,
@@ -84,10 +115,7 @@ class RungeKutta4(SingleStepMethod):
                 **kwargs) -> ModelState:
         t, y = self.get_data_from_state(state=state)
 
-        if self._get_shape(y) != self.k.shape:
-            self._adjust_dims(y)
-
-        y_new = rk4_impl(model=model, t=t, y=y, h=h, k=self.k)
+        y_new = self._advance(model=model, t=t, y=y, h=h)
 
         return self.make_new_state(t=t + h, y=y_new)
 
@@ -117,6 +145,36 @@ class DOPRI45(SingleStepMethod):
         # First same as last (FSAL) rule
         self.gammas = np.array([5179 / 57600, 0.0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40])
 
+    def _estimates(self, model: ODEModel, t: StateVariable, y: StateVariable, h: float,
+                   f: StateVariable = None) -> Tuple[StateVariable, StateVariable]:
+        if self._get_shape(y) != self.k.shape:
+            self._adjust_dims(y)
+
+        if self._use_inplace(model, y):
+            return dopri45_inplace_impl(rhs_into=model.rhs_into, t=t, y=y, h=h,
+                                        alphas=self.alphas, betas=self.betas,
+                                        gammas=self.gammas, k=self.k,
+                                        y_stage=self.y_stage, f=f)
+
+        return dopri45_impl(model=model, t=t, y=y, h=h, alphas=self.alphas,
+                            betas=self.betas, gammas=self.gammas, k=self.k, f=f)
+
+    def startup_step(self,
+                     model: ODEModel,
+                     state: ModelState,
+                     h: float,
+                     f: StateVariable = None) -> Tuple[ModelState, StateVariable]:
+        """
+        Startup step for multi-step methods, advancing by the 5th order solution. The last
+        stage is evaluated at the 5th order solution (first same as last), so the right-hand
+        side at the new state is returned without an additional evaluation.
+        """
+        t, y = self.get_data_from_state(state=state)
+
+        _, y_new5 = self._estimates(model=model, t=t, y=y, h=h, f=f)
+
+        return self.make_new_state(t=t + h, y=y_new5), np.copy(self.k[6])
+
     def forward(self,
                 model: ODEModel,
                 state: ModelState,
@@ -124,11 +182,7 @@ class DOPRI45(SingleStepMethod):
                 **kwargs) -> Tuple[ModelState, ...]:
         t, y = self.get_data_from_state(state=state)
 
-        if self._get_shape(y) != self.k.shape:
-            self._adjust_dims(y)
-
-        y_new4, y_new5 = dopri45_impl(model=model, t=t, y=y, h=h, alphas=self.alphas,
-                                      betas=self.betas, gammas=self.gammas, k=self.k)
+        y_new4, y_new5 = self._estimates(model=model, t=t, y=y, h=h)
 
         # 4th and 5th order solution
         new_state4 = self.make_new_state(t=t + h, y=y_new4)
@@ -170,7 +224,7 @@ class AdamsBashforth2(ExplicitMultiStepMethod):
     Adams-Bashforth Method of order 2 for ODE solving.
     """
 
-    def __init__(self, startup: SingleStepMethod):
+    def __init__(self, startup: SingleStepMethod = None):
         a_coeffs = np.ones(1)
         b_coeffs = np.array([1.5, -0.5])
         super(AdamsBashforth2, self).__init__(order=2,
@@ -242,10 +296,472 @@ class BDF2(ImplicitMultiStepMethod):
     Adams-Bashforth Method of order 2 for ODE solving.
     """
 
-    def __init__(self, startup: SingleStepMethod):
+    def __init__(self, startup: SingleStepMethod = None):
         a_coeffs = np.array([-4 / 3, 1 / 3])
         b_coeffs = np.array([2 / 3])
         super(BDF2, self).__init__(order=2,
                                    startup=startup,
                                    a_coeffs=a_coeffs,
                                    b_coeffs=b_coeffs)
+
+
+class MultirateMethod(SingleStepMethod):
+    """
+    Multirate method for models with fast and slow components. In each macro-step of size h,
+    the slow components are advanced with a single step of the slow step function. Afterwards,
+    the fast components are sub-cycled with num_substeps steps of the fast step function
+    ("slowest first" strategy).
+
+    Both parts are coupled through polynomials through the states at the last macro-step
+    points: the slow step extrapolates the fast components, and the fast sub-steps interpolate
+    the slow components, including their new values at the end of the macro-step. Using the
+    last p points, where p is the smaller one of the orders of the slow and fast step functions,
+    the method keeps order p (see Gear and Wells (1984), "Multirate linear multistep methods").
+    Until p points are available, i.e. in the first p - 1 macro-steps, the full model is
+    advanced with num_substeps steps of the fast step function instead.
+
+    The slow right-hand side is thus evaluated only as often as the slow step function requires
+    per macro-step, independent of the fast time scale. Points later than the beginning of a
+    macro-step are discarded, e.g. after a rejected step, and a macro-step starting from any
+    other state than the last point starts up again.
+    """
+
+    def __init__(self,
+                 slow_step: SingleStepMethod,
+                 fast_step: SingleStepMethod,
+                 num_substeps: int):
+        """
+        Multirate method constructor.
+
+        Args:
+            slow_step: Step function used for the macro-steps of the slow components.
+            fast_step: Step function used for the sub-steps of the fast components.
+            num_substeps: Number of fast sub-steps per macro-step.
+        """
+        super(MultirateMethod, self).__init__(order=max(min(slow_step.order,
+                                                            fast_step.order), 1))
+
+        if num_substeps < 1:
+            raise ValueError("The number of fast sub-steps has to be a positive integer.")
+
+        self.slow_step = slow_step
+        self.fast_step = fast_step
+        self.num_substeps = num_substeps
+
+        self._model = None
+        self._slow_system = None
+        self._fast_system = None
+
+        # times and full states of the last macro-step points
+        self._times = []
+        self._states = []
+
+    def reset(self):
+        """
+        Resets the slow and fast step functions and the stored macro-step points.
+        """
+        self.slow_step.reset()
+        self.fast_step.reset()
+        self._times, self._states = [], []
+
+    def _bind_model(self, model: MultirateModel):
+        self._model = model
+        self._slow_system = SlowSubsystem(model)
+        self._fast_system = FastSubsystem(model)
+        self._times, self._states = [], []
+
+    def _update_points(self, t: float, y: np.ndarray):
+        while self._times and self._times[-1] > t:
+            self._times.pop()
+            self._states.pop()
+
+        if not self._times or self._times[-1] != t or not np.array_equal(self._states[-1], y):
+            self._times, self._states = [t], [np.array(y, dtype=float)]
+
+    @staticmethod
+    def _unpack(state: ModelState) -> ModelState:
+        # embedded methods return a tuple of estimates, use the higher order one
+        if isinstance(state[0], (tuple, list)):
+            return state[-1]
+        return state
+
+    def _substeps(self, model: BaseModel, t: float, y: np.ndarray, h: float) -> np.ndarray:
+        state = (t, y)
+        h_fast = h / self.num_substeps
+
+        for _ in range(self.num_substeps):
+            state = self._unpack(self.fast_step.forward(model, state, h_fast))
+
+        return state[-1]
+
+    def forward(self,
+                model: MultirateModel,
+                state: ModelState,
+                h: float,
+                **kwargs) -> ModelState:
+        t, y = self.get_data_from_state(state=state)
+
+        if model is not self._model:
+            self._bind_model(model)
+
+        self._update_points(t, y)
+
+        if len(self._times) < self.order:
+            # startup, not enough points for the coupling polynomials yet
+            y_new = self._substeps(model, t, y, h)
+        else:
+            slow_idx, fast_idx = model.slow_idx, model.fast_idx
+
+            # macro-step for the slow components, fast components extrapolated
+            self._slow_system.bind(self._times, self._states)
+            slow_state = self.slow_step.forward(self._slow_system, (t, y[slow_idx]), h)
+            y_slow = self._unpack(slow_state)[-1]
+
+            # sub-cycling of the fast components, slow components interpolated
+            self._fast_system.bind(self._times + [t + h],
+                                   [s[slow_idx] for s in self._states] + [y_slow], y)
+
+            y_new = np.empty(len(y))
+            y_new[slow_idx] = y_slow
+            y_new[fast_idx] = self._substeps(self._fast_system, t, y[fast_idx], h)
+
+        self._times.append(t + h)
+        self._states.append(y_new)
+
+        # keep the points needed for the next macro-step
+        del self._times[:-self.order], self._states[:-self.order]
+
+        return self.make_new_state(t=t + h, y=y_new)
+
+
+class IMEXEuler(IMEXRungeKuttaMethod):
+    """
+    Implicit-explicit Euler method, also known as ARS(1,1,1). Treats the non-stiff part of a
+    split model with the forward and the stiff part with the backward Euler method.
+    """
+
+    def __init__(self, **kwargs):
+        alphas = np.array([0.0, 1.0])
+        explicit_betas = np.array([[0.0, 0.0],
+                                   [1.0, 0.0]])
+        explicit_gammas = np.array([1.0, 0.0])
+        implicit_betas = np.array([[0.0, 0.0],
+                                   [0.0, 1.0]])
+        implicit_gammas = np.array([0.0, 1.0])
+        super(IMEXEuler, self).__init__(explicit_alphas=alphas,
+                                        explicit_betas=explicit_betas,
+                                        explicit_gammas=explicit_gammas,
+                                        implicit_alphas=alphas,
+                                        implicit_betas=implicit_betas,
+                                        implicit_gammas=implicit_gammas,
+                                        order=1,
+                                        **kwargs)
+
+
+class ARS222(IMEXRungeKuttaMethod):
+    """
+    Second order, L-stable IMEX Runge-Kutta method ARS(2,2,2) by Ascher, Ruuth and Spiteri,
+    with two implicit stages.
+    """
+
+    def __init__(self, **kwargs):
+        gamma = 1 - 1 / np.sqrt(2)
+        delta = 1 - 1 / (2 * gamma)
+
+        alphas = np.array([0.0, gamma, 1.0])
+        explicit_betas = np.array([[0.0, 0.0, 0.0],
+                                   [gamma, 0.0, 0.0],
+                                   [delta, 1 - delta, 0.0]])
+        explicit_gammas = np.array([delta, 1 - delta, 0.0])
+        implicit_betas = np.array([[0.0, 0.0, 0.0],
+                                   [0.0, gamma, 0.0],
+                                   [0.0, 1 - gamma, gamma]])
+        implicit_gammas = np.array([0.0, 1 - gamma, gamma])
+        super(ARS222, self).__init__(explicit_alphas=alphas,
+                                     explicit_betas=explicit_betas,
+                                     explicit_gammas=explicit_gammas,
+                                     implicit_alphas=alphas,
+                                     implicit_betas=implicit_betas,
+                                     implicit_gammas=implicit_gammas,
+                                     order=2,
+                                     **kwargs)
+
+
+class ARS343(IMEXRungeKuttaMethod):
+    """
+    Third order, L-stable IMEX Runge-Kutta method ARS(3,4,3) by Ascher, Ruuth and Spiteri,
+    with three implicit stages.
+    """
+
+    def __init__(self, **kwargs):
+        gamma = 0.4358665215
+        b1 = -1.5 * gamma ** 2 + 4 * gamma - 0.25
+        b2 = 1.5 * gamma ** 2 - 5 * gamma + 1.25
+
+        explicit_betas = np.array([[0.0, 0.0, 0.0, 0.0],
+                                   [gamma, 0.0, 0.0, 0.0],
+                                   [0.3212788860, 0.3966543747, 0.0, 0.0],
+                                   [-0.105858296, 0.5529291479, 0.5529291479, 0.0]])
+        explicit_gammas = np.array([0.0, b1, b2, gamma])
+        implicit_betas = np.array([[0.0, 0.0, 0.0, 0.0],
+                                   [0.0, gamma, 0.0, 0.0],
+                                   [0.0, (1 - gamma) / 2, gamma, 0.0],
+                                   [0.0, b1, b2, gamma]])
+        implicit_gammas = np.array([0.0, b1, b2, gamma])
+        super(ARS343, self).__init__(explicit_alphas=explicit_betas.sum(axis=1),
+                                     explicit_betas=explicit_betas,
+                                     explicit_gammas=explicit_gammas,
+                                     implicit_alphas=implicit_betas.sum(axis=1),
+                                     implicit_betas=implicit_betas,
+                                     implicit_gammas=implicit_gammas,
+                                     order=3,
+                                     **kwargs)
+
+
+class ARK3(IMEXRungeKuttaMethod):
+    """
+    Third order additive Runge-Kutta method ARK3(2)4L[2]SA by Kennedy and Carpenter, with an
+    L-stable, stiffly accurate ESDIRK for the implicit part.
+    """
+
+    def __init__(self, **kwargs):
+        gamma = 1767732205903 / 4055673282236
+
+        alphas = np.array([0.0, 1767732205903 / 2027836641118, 3 / 5, 1.0])
+        explicit_betas = np.array([
+            [0.0, 0.0, 0.0, 0.0],
+            [1767732205903 / 2027836641118, 0.0, 0.0, 0.0],
+            [5535828885825 / 10492691773637, 788022342437 / 10882634858940, 0.0, 0.0],
+            [6485989280629 / 16251701735622, -4246266847089 / 9704473918619,
+             10755448449292 / 10357097424841, 0.0]])
+        implicit_betas = np.array([
+            [0.0, 0.0, 0.0, 0.0],
+            [gamma, gamma, 0.0, 0.0],
+            [2746238789719 / 10658868560708, -640167445237 / 6845629431997, gamma, 0.0],
+            [1471266399579 / 7840856788654, -4482444167858 / 7529755066697,
+             11266239266428 / 11593286722821, gamma]])
+        gammas = implicit_betas[-1].copy()
+        super(ARK3, self).__init__(explicit_alphas=alphas,
+                                   explicit_betas=explicit_betas,
+                                   explicit_gammas=gammas,
+                                   implicit_alphas=alphas,
+                                   implicit_betas=implicit_betas,
+                                   implicit_gammas=gammas,
+                                   order=3,
+                                   **kwargs)
+
+
+class ARK4(IMEXRungeKuttaMethod):
+    """
+    Fourth order additive Runge-Kutta method ARK4(3)6L[2]SA by Kennedy and Carpenter, with an
+    L-stable, stiffly accurate ESDIRK for the implicit part.
+    """
+
+    def __init__(self, **kwargs):
+        gamma = 1 / 4
+
+        alphas = np.array([0.0, 1 / 2, 83 / 250, 31 / 50, 17 / 20, 1.0])
+        explicit_betas = np.array([
+            [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+            [1 / 2, 0.0, 0.0, 0.0, 0.0, 0.0],
+            [13861 / 62500, 6889 / 62500, 0.0, 0.0, 0.0, 0.0],
+            [-116923316275 / 2393684061468, -2731218467317 / 15368042101831,
+             9408046702089 / 11113171139209, 0.0, 0.0, 0.0],
+            [-451086348788 / 2902428689909, -2682348792572 / 7519795681897,
+             12662868775082 / 11960479115383, 3355817975965 / 11060851509271, 0.0, 0.0],
+            [647845179188 / 3216320057751, 73281519250 / 8382639484533,
+             552539513391 / 3454668386233, 3354512671639 / 8306763924573, 4040 / 17871, 0.0]])
+        implicit_betas = np.array([
+            [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+            [gamma, gamma, 0.0, 0.0, 0.0, 0.0],
+            [8611 / 62500, -1743 / 31250, gamma, 0.0, 0.0, 0.0],
+            [5012029 / 34652500, -654441 / 2922500, 174375 / 388108, gamma, 0.0, 0.0],
+            [15267082809 / 155376265600, -71443401 / 120774400, 730878875 / 902184768,
+             2285395 / 8070912, gamma, 0.0],
+            [82889 / 524892, 0.0, 15625 / 83664, 69875 / 102672, -2260 / 8211, gamma]])
+        gammas = implicit_betas[-1].copy()
+        super(ARK4, self).__init__(explicit_alphas=alphas,
+                                   explicit_betas=explicit_betas,
+                                   explicit_gammas=gammas,
+                                   implicit_alphas=alphas,
+                                   implicit_betas=implicit_betas,
+                                   implicit_gammas=gammas,
+                                   order=4,
+                                   **kwargs)
+
+
+class ARK5(IMEXRungeKuttaMethod):
+    """
+    Fifth order additive Runge-Kutta method ARK5(4)8L[2]SA by Kennedy and Carpenter, with an
+    L-stable, stiffly accurate ESDIRK for the implicit part.
+    """
+
+    def __init__(self, **kwargs):
+        gamma = 41 / 200
+
+        alphas = np.array([0.0, 41 / 100, 2935347310677 / 11292855782101,
+                           1426016391358 / 7196633302097, 92 / 100, 24 / 100, 3 / 5, 1.0])
+        explicit_betas = np.zeros((8, 8))
+        explicit_betas[1, :1] = [41 / 100]
+        explicit_betas[2, :2] = [367902744464 / 2072280473677, 677623207551 / 8224143866563]
+        explicit_betas[3, :3] = [1268023523408 / 10340822734521, 0.0,
+                                 1029933939417 / 13636558850479]
+        explicit_betas[4, :4] = [14463281900351 / 6315353703477, 0.0,
+                                 66114435211212 / 5879490589093,
+                                 -54053170152839 / 4284798021562]
+        explicit_betas[5, :5] = [14090043504691 / 34967701212078, 0.0,
+                                 15191511035443 / 11219624916014,
+                                 -18461159152457 / 12425892160975,
+                                 -281667163811 / 9011619295870]
+        explicit_betas[6, :6] = [19230459214898 / 13134317526959, 0.0,
+                                 21275331358303 / 2942455364971,
+                                 -38145345988419 / 4862620318723, -1 / 8, -1 / 8]
+        explicit_betas[7, :7] = [-19977161125411 / 11928030595625, 0.0,
+                                 -40795976796054 / 6384907823539,
+                                 177454434618887 / 12078138498510,
+                                 782672205425 / 8267701900261,
+                                 -69563011059811 / 9646580694205,
+                                 7356628210526 / 4942186776405]
+
+        implicit_betas = np.zeros((8, 8))
+        implicit_betas[1, :2] = [gamma, gamma]
+        implicit_betas[2, :3] = [41 / 400, -567603406766 / 11931857230679, gamma]
+        implicit_betas[3, :4] = [683785636431 / 9252920307686, 0.0,
+                                 -110385047103 / 1367015193373, gamma]
+        implicit_betas[4, :5] = [3016520224154 / 10081342136671, 0.0,
+                                 30586259806659 / 12414158314087,
+                                 -22760509404356 / 11113319521817, gamma]
+        implicit_betas[5, :6] = [218866479029 / 1489978393911, 0.0,
+                                 638256894668 / 5436446318841,
+                                 -1179710474555 / 5321154724896,
+                                 -60928119172 / 8023461067671, gamma]
+        implicit_betas[6, :7] = [1020004230633 / 5715676835656, 0.0,
+                                 25762820946817 / 25263940353407,
+                                 -2161375909145 / 9755907335909,
+                                 -211217309593 / 5846859502534,
+                                 -4269925059573 / 7827059040749, gamma]
+        implicit_betas[7, :8] = [-872700587467 / 9133579230613, 0.0, 0.0,
+                                 22348218063261 / 9555858737531,
+                                 -1143369518992 / 8141816002931,
+                                 -39379526789629 / 19018526304540,
+                                 32727382324388 / 42900044865799, gamma]
+        gammas = implicit_betas[-1].copy()
+        super(ARK5, self).__init__(explicit_alphas=alphas,
+                                   explicit_betas=explicit_betas,
+                                   explicit_gammas=gammas,
+                                   implicit_alphas=alphas,
+                                   implicit_betas=implicit_betas,
+                                   implicit_gammas=gammas,
+                                   order=5,
+                                   **kwargs)
+
+
+class ExactFlow(SingleStepMethod):
+    """
+    Exact propagator for models with a known closed-form flow. Use this in splitting methods to
+    advance a sub-model exactly.
+    """
+
+    def __init__(self, flow: Callable):
+        """
+        Exact flow constructor.
+
+        Args:
+            flow: Callable with signature flow(t, y, h, **fn_args), returning the exact solution
+             at time t + h of the model started at time t in y. The model's keyword arguments
+             are passed to the flow.
+        """
+        super(ExactFlow, self).__init__(order=np.inf)
+
+        self.flow = flow
+
+    def forward(self,
+                model: ODEModel,
+                state: ModelState,
+                h: float,
+                **kwargs) -> ModelState:
+        t, y = self.get_data_from_state(state=state)
+
+        y_new = self.flow(t, y, h, **model.fn_args)
+
+        return self.make_new_state(t=t + h, y=y_new)
+
+
+class LinearFlow(SingleStepMethod):
+    """
+    Exact propagator for linear autonomous models y' = Ay, computed with the matrix exponential.
+    The propagators exp(hA) are cached per step size, so that a constant step size integration
+    needs only a single (or, in Strang splitting, two) matrix exponentials.
+    """
+
+    def __init__(self, matrix: np.ndarray):
+        """
+        Linear flow constructor.
+
+        Args:
+            matrix: The system matrix A, or a scalar for a scalar linear model.
+        """
+        super(LinearFlow, self).__init__(order=np.inf)
+
+        self.matrix = matrix
+        self._propagators = {}
+
+    def reset(self):
+        """
+        Clears the cached propagators.
+        """
+        self._propagators = {}
+
+    def _get_propagator(self, h: float):
+        if h not in self._propagators:
+            if is_scalar(self.matrix):
+                self._propagators[h] = np.exp(h * self.matrix)
+            else:
+                from scipy.linalg import expm
+                self._propagators[h] = expm(h * np.asarray(self.matrix))
+
+        return self._propagators[h]
+
+    def forward(self,
+                model: ODEModel,
+                state: ModelState,
+                h: float,
+                **kwargs) -> ModelState:
+        t, y = self.get_data_from_state(state=state)
+
+        propagator = self._get_propagator(h)
+
+        if is_scalar(propagator):
+            y_new = propagator * y
+        else:
+            y_new = np.dot(propagator, y)
+
+        return self.make_new_state(t=t + h, y=y_new)
+
+
+class LieSplitting(SplittingMethod):
+    """
+    First order Lie-Trotter splitting. Advances the sub-models of a split model one after the
+    other, each by a full step.
+    """
+
+    def __init__(self, step_funcs: List[SingleStepMethod]):
+        sequence = [(i, 0.0, 1.0) for i in range(len(step_funcs))]
+        super(LieSplitting, self).__init__(step_funcs=step_funcs,
+                                           sequence=sequence,
+                                           order=1)
+
+
+class StrangSplitting(SplittingMethod):
+    """
+    Second order Strang splitting. Advances all but the last sub-model by a half step, the last
+    one by a full step, and then all but the last one by another half step in reverse order.
+    """
+
+    def __init__(self, step_funcs: List[SingleStepMethod]):
+        n = len(step_funcs)
+        sequence = [(i, 0.0, 0.5) for i in range(n - 1)] + [(n - 1, 0.0, 1.0)] + \
+                   [(i, 0.5, 0.5) for i in reversed(range(n - 1))]
+        super(StrangSplitting, self).__init__(step_funcs=step_funcs,
+                                              sequence=sequence,
+                                              order=2)
@@ -1,60 +1,144 @@
-from typing import List
+from typing import List, Callable
 
 import numpy as np
-from scipy.optimize import root, root_scalar
 
 from ode_explorer.models import ODEModel, HamiltonianSystem
 from ode_explorer.types import ModelState, StateVariable
+from ode_explorer.utils.profiling import record_solver_result
 
 __all__ = ["forward_euler_impl",
            "heun_impl",
            "rk4_impl",
+           "rk4_inplace_impl",
            "dopri45_impl",
+           "dopri45_inplace_impl",
+           "explicit_rk_inplace_impl",
            "backward_euler_scalar_impl",
            "backward_euler_ndim_impl",
            "euler_a_separable_impl",
-           "euler_b_separable_impl"]
+           "euler_b_separable_impl",
+           "implicit_stage_scalar_impl",
+           "implicit_stage_ndim_impl",
+           "dense_jacobian"]
 
 
-def forward_euler_impl(model: ODEModel, t: StateVariable, y: StateVariable, h: float) -> StateVariable:
-    return y + h * model(t, y)
+def dense_jacobian(jac) -> np.ndarray:
+    """
+    Convert a Jacobian returned by a model, which may be a scipy.sparse matrix, to a dense
+    2D array, as required by scipy.optimize.root.
+    """
+    if hasattr(jac, "toarray"):
+        jac = jac.toarray()
+    return np.atleast_2d(jac)
 
 
-def heun_impl(model: ODEModel, t: StateVariable, y: StateVariable, h: float, k: np.ndarray) -> StateVariable:
+def forward_euler_impl(model: ODEModel, t: StateVariable, y: StateVariable, h: float,
+                       f: StateVariable = None) -> StateVariable:
+    if f is None:
+        f = model.rhs(t, y)
+    return y + h * f
+
+
+def heun_impl(model: ODEModel, t: StateVariable, y: StateVariable, h: float, k: np.ndarray,
+              f: StateVariable = None) -> StateVariable:
     hs = np.ones(2) * 0.5 * h
+    rhs = model.rhs
 
-    k[0] = model(t, y)
-    k[1] = model(t + h, y + h * k[0])
+    k[0] = rhs(t, y) if f is None else f
+    k[1] = rhs(t + h, y + h * k[0])
     return y + np.dot(hs, k)
 
 
-def rk4_impl(model: ODEModel, t: StateVariable, y: StateVariable, h: float, k: np.ndarray) -> StateVariable:
+def rk4_impl(model: ODEModel, t: StateVariable, y: StateVariable, h: float, k: np.ndarray,
+             f: StateVariable = None) -> StateVariable:
     # notation follows that in
     # https://en.wikipedia.org/wiki/Runge%E2%80%93Kutta_methods
     hs = 0.5 * h
     gammas = np.array([1.0, 2.0, 2.0, 1.0]) / 6
+    rhs = model.rhs
 
-    k[0] = model(t, y)
-    k[1] = model(t + hs, y + hs * k[0])
-    k[2] = model(t + hs, y + hs * k[1])
-    k[3] = model(t + h, y + h * k[2])
+    k[0] = rhs(t, y) if f is None else f
+    k[1] = rhs(t + hs, y + hs * k[0])
+    k[2] = rhs(t + hs, y + hs * k[1])
+    k[3] = rhs(t + h, y + h * k[2])
 
     return y + h * np.dot(gammas, k)
 
 
+def _first_stage_into(rhs_into: Callable, t: StateVariable, y: np.ndarray, k: np.ndarray,
+                      f: np.ndarray = None):
+    # a right-hand side value known at the input state is copied instead of evaluated
+    if f is None:
+        rhs_into(t, y, k[0])
+    else:
+        k[0] = f
+
+
+def rk4_inplace_impl(rhs_into: Callable, t: StateVariable, y: np.ndarray, h: float, k: np.ndarray,
+                     y_stage: np.ndarray, f: np.ndarray = None) -> np.ndarray:
+    # the stages are evaluated into the rows of k and their arguments are formed in
+    # y_stage, so that only the new state is allocated
+    hs = 0.5 * h
+    gammas = np.array([1.0, 2.0, 2.0, 1.0]) / 6
+
+    _first_stage_into(rhs_into, t, y, k, f)
+    np.multiply(k[0], hs, out=y_stage)
+    np.add(y_stage, y, out=y_stage)
+
+    rhs_into(t + hs, y_stage, k[1])
+    np.multiply(k[1], hs, out=y_stage)
+    np.add(y_stage, y, out=y_stage)
+
+    rhs_into(t + hs, y_stage, k[2])
+    np.multiply(k[2], h, out=y_stage)
+    np.add(y_stage, y, out=y_stage)
+
+    rhs_into(t + h, y_stage, k[3])
+
+    y_new = np.dot(gammas, k)
+    np.multiply(y_new, h, out=y_new)
+    np.add(y_new, y, out=y_new)
+
+    return y_new
+
+
+def explicit_rk_inplace_impl(rhs_into: Callable, t: StateVariable, y: np.ndarray, h: float,
+                             alphas: np.ndarray, betas: np.ndarray, gammas: np.ndarray,
+                             k: np.ndarray, y_stage: np.ndarray, f: np.ndarray = None) -> np.ndarray:
+    _first_stage_into(rhs_into, t, y, k, f)
+
+    for i in range(1, len(alphas)):
+        # first row of betas is a zero row because it is an explicit RK
+        np.dot(betas[i, :i], k[:i], out=y_stage)
+        np.multiply(y_stage, h, out=y_stage)
+        np.add(y_stage, y, out=y_stage)
+
+        rhs_into(t + h * alphas[i], y_stage, k[i])
+
+    y_new = np.dot(gammas, k)
+    np.multiply(y_new, h, out=y_new)
+    np.add(y_new, y, out=y_new)
+
+    return y_new
+
+
 def dopri45_impl(model: ODEModel, t: StateVariable, y: StateVariable, h: float, alphas: np.ndarray,
-                 betas: List[np.ndarray], gammas: np.ndarray, k: np.ndarray) -> ModelState:
-    k[0] = model(t, y)
-    k[1] = model(t + h * alphas[0], y + h * np.dot(betas[0], k[:1]))
-    k[2] = model(t + h * alphas[1], y + h * np.dot(betas[1], k[:2]))
-    k[3] = model(t + h * alphas[2], y + h * np.dot(betas[2], k[:3]))
-    k[4] = model(t + h * alphas[3], y + h * np.dot(betas[3], k[:4]))
-    k[5] = model(t + h * alphas[4], y + h * np.dot(betas[4], k[:5]))
+                 betas: List[np.ndarray], gammas: np.ndarray, k: np.ndarray,
+                 f: StateVariable = None) -> ModelState:
+    rhs = model.rhs
+
+    k[0] = rhs(t, y) if f is None else f
+    k[1] = rhs(t + h * alphas[0], y + h * np.dot(betas[0], k[:1]))
+    k[2] = rhs(t + h * alphas[1], y + h * np.dot(betas[1], k[:2]))
+    k[3] = rhs(t + h * alphas[2], y + h * np.dot(betas[2], k[:3]))
+    k[4] = rhs(t + h * alphas[3], y + h * np.dot(betas[3], k[:4]))
+    k[5] = rhs(t + h * alphas[4], y + h * np.dot(betas[4], k[:5]))
 
     # 5th order solution, computed in 6 evaluations
     y_new5 = y + h * np.dot(betas[5], k[:6])
 
-    k[6] = y_new5
+    # last stage, evaluated at the 5th order solution
+    k[6] = rhs(t + h, y_new5)
 
     # 4th order solution, to be used in error estimation
     y_new4 = y + h * np.dot(gammas, k)
@@ -62,10 +146,42 @@ def dopri45_impl(model: ODEModel, t: StateVariable, y: StateVariable, h: float,
     return y_new4, y_new5
 
 
+def dopri45_inplace_impl(rhs_into: Callable, t: StateVariable, y: np.ndarray, h: float,
+                         alphas: np.ndarray, betas: List[np.ndarray], gammas: np.ndarray,
+                         k: np.ndarray, y_stage: np.ndarray, f: np.ndarray = None) -> ModelState:
+    _first_stage_into(rhs_into, t, y, k, f)
+
+    for i in range(5):
+        np.dot(betas[i], k[:i + 1], out=y_stage)
+        np.multiply(y_stage, h, out=y_stage)
+        np.add(y_stage, y, out=y_stage)
+
+        rhs_into(t + h * alphas[i], y_stage, k[i + 1])
+
+    # 5th order solution, computed in 6 evaluations
+    y_new5 = np.dot(betas[5], k[:6])
+    np.multiply(y_new5, h, out=y_new5)
+    np.add(y_new5, y, out=y_new5)
+
+    # last stage, evaluated at the 5th order solution
+    rhs_into(t + h, y_new5, k[6])
+
+    # 4th order solution, to be used in error estimation
+    y_new4 = np.dot(gammas, k)
+    np.multiply(y_new4, h, out=y_new4)
+    np.add(y_new4, y, out=y_new4)
+
+    return y_new4, y_new5
+
+
 def backward_euler_scalar_impl(model: ODEModel, t: StateVariable, y: float, h: float,
                                **solver_kwargs) -> float:
+    from scipy.optimize import root_scalar
+
+    rhs = model.rhs
+
     def F(x: float) -> float:
-        return y + h * model(t + h, x) - x
+        return y + h * rhs(t + h, x) - x
 
     # sort the kwargs before putting them into the tuple passed to root
     # if kwargs:
@@ -74,8 +190,14 @@ def backward_euler_scalar_impl(model: ODEModel, t: StateVariable, y: float, h: f
     #     args = ()
     args = ()
 
+    # with an analytic Jacobian, root_scalar switches from the secant to Newton's method
+    jac = model.jac
+    if jac is not None and "fprime" not in solver_kwargs:
+        solver_kwargs["fprime"] = lambda x, *_: h * jac(t + h, x) - 1.0
+
     # TODO: Retry here in case of convergence failure?
     root_res = root_scalar(F, args=args, x0=y, x1=y + h, **solver_kwargs)
+    record_solver_result(root_res)
     y_new = root_res.root
 
     return y_new
@@ -83,8 +205,12 @@ def backward_euler_scalar_impl(model: ODEModel, t: StateVariable, y: float, h: f
 
 def backward_euler_ndim_impl(model: ODEModel, t: StateVariable, y: StateVariable, h: float,
                              **solver_kwargs) -> StateVariable:
+    from scipy.optimize import root
+
+    rhs = model.rhs
+
     def F(x: StateVariable) -> StateVariable:
-        return y + h * model(t + h, x) - x
+        return y + h * rhs(t + h, x) - x
 
     # sort the kwargs before putting them into the tuple passed to root
     # if kwargs:
@@ -93,24 +219,60 @@ def backward_euler_ndim_impl(model: ODEModel, t: StateVariable, y: StateVariable
     #     args = ()
     args = ()
 
+    jac = model.jac
+    if jac is not None and "jac" not in solver_kwargs:
+        identity = np.eye(len(y))
+        solver_kwargs["jac"] = lambda x, *_: h * dense_jacobian(jac(t + h, x)) - identity
+
     # TODO: Retry here in case of convergence failure?
     root_res = root(F, x0=y, args=args, **solver_kwargs)
+    record_solver_result(root_res)
     y_new = root_res.x
 
     return y_new
 
 
+def implicit_stage_scalar_impl(fn: Callable, t: StateVariable, rhs: float, ha: float,
+                               **solver_kwargs) -> float:
+    from scipy.optimize import root_scalar
+
+    # solves the diagonally implicit stage equation x = rhs + ha * fn(t, x)
+    def F(x: float) -> float:
+        return rhs + ha * fn(t, x) - x
+
+    # TODO: Retry here in case of convergence failure?
+    root_res = root_scalar(F, x0=rhs, x1=rhs + ha, **solver_kwargs)
+    record_solver_result(root_res)
+
+    return root_res.root
+
+
+def implicit_stage_ndim_impl(fn: Callable, t: StateVariable, rhs: StateVariable, ha: float,
+                             **solver_kwargs) -> StateVariable:
+    from scipy.optimize import root
+
+    # solves the diagonally implicit stage equation x = rhs + ha * fn(t, x)
+    def F(x: StateVariable) -> StateVariable:
+        return rhs + ha * fn(t, x) - x
+
+    # TODO: Retry here in case of convergence failure?
+    root_res = root(F, x0=rhs, **solver_kwargs)
+    record_solver_result(root_res)
+
+    return root_res.x
+
+
 def euler_a_separable_impl(hamiltonian: HamiltonianSystem, t: StateVariable, q: StateVariable,
                            p: StateVariable, h: float) -> ModelState:
-    q_new = q + h * hamiltonian.p_derivative(t, p)
-    p_new = p - h * hamiltonian.q_derivative(t, q_new)
+    q_new = q + h * hamiltonian.bound_p_derivative(t, p)
+    p_new = p - h * hamiltonian.bound_q_derivative(t, q_new)
 
     return q_new, p_new
 
 
 def euler_b_separable_impl(hamiltonian: HamiltonianSystem, t: StateVariable, q: StateVariable,
                            p: StateVariable, h: float) -> ModelState:
-    p_new = p - h * hamiltonian.q_derivative(t, q)
-    q_new = q + h * hamiltonian.p_derivative(t, p_new)
+    p_new = p - h * hamiltonian.bound_q_derivative(t, q)
+    q_new = q + h * hamiltonian.bound_p_derivative(t, p_new)
 
     return q_new, p_new
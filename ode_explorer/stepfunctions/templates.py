@@ -1,11 +1,18 @@
 import logging
+from typing import List, Tuple
 
 import numpy as np
-from scipy.optimize import root
 
 from ode_explorer.models import BaseModel, ODEModel
+from ode_explorer.stepfunctions.stepfunctions_impl import (
+    implicit_stage_scalar_impl,
+    implicit_stage_ndim_impl,
+    explicit_rk_inplace_impl,
+    dense_jacobian
+)
 from ode_explorer.types import StateVariable, ModelState
 from ode_explorer.utils.helpers import is_scalar
+from ode_explorer.utils.profiling import record_solver_result
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +20,8 @@ __all__ = ["SingleStepMethod",
            "MultiStepMethod",
            "ExplicitRungeKuttaMethod",
            "ImplicitRungeKuttaMethod",
+           "IMEXRungeKuttaMethod",
+           "SplittingMethod",
            "ExplicitMultiStepMethod",
            "ImplicitMultiStepMethod"]
 
@@ -34,6 +43,9 @@ class SingleStepMethod:
         self.model_dim = 0
         self.num_stages = 0
 
+        # workspace for the stage arguments of in-place kernels
+        self.y_stage = None
+
     def _adjust_dims(self, y: StateVariable):
         scalar_ode = is_scalar(y)
 
@@ -46,6 +58,11 @@ class SingleStepMethod:
 
         self.model_dim = model_dim
         self.k = np.zeros(shape=shape)
+        self.y_stage = np.zeros(shape=shape[1:])
+
+    def _use_inplace(self, model: BaseModel, y: StateVariable) -> bool:
+        # in-place kernels need an in-place right-hand side and an array-valued state
+        return getattr(model, "rhs_into", None) is not None and not is_scalar(y)
 
     def _get_shape(self, y: StateVariable):
         return (self.num_stages,) if is_scalar(y) else (self.num_stages, len(y))
@@ -85,6 +102,46 @@ class SingleStepMethod:
         """
         pass
 
+    def _advance(self,
+                 model: BaseModel,
+                 t: StateVariable,
+                 y: StateVariable,
+                 h: float,
+                 f: StateVariable = None) -> StateVariable:
+        """
+        Compute the spatial variable at time t+h. Implemented by step functions whose first
+        stage is the right-hand side at the input state, which is taken from f if given.
+        """
+        raise NotImplementedError
+
+    def startup_step(self,
+                     model: BaseModel,
+                     state: ModelState,
+                     h: float,
+                     f: StateVariable = None) -> Tuple[ModelState, StateVariable]:
+        """
+        Advance an ODE in time as part of the startup calculation of a multi-step method, which
+        knows the right-hand side at the input state and needs it at the new state.
+
+        Args:
+            model: ODEModel object implementing the ODE model.
+            state: Input state.
+            h: Step size to use in the step function.
+            f: Optional right-hand side at the input state, used instead of evaluating it.
+
+        Returns:
+            A new state containing the ODE model data at time t+h, and the right-hand side at
+            the new state if the step function evaluated it, or None.
+        """
+        if type(self)._advance is SingleStepMethod._advance:
+            return self.forward(model=model, state=state, h=h), None
+
+        t, y = self.get_data_from_state(state=state)
+
+        y_new = self._advance(model=model, t=t, y=y, h=h, f=f)
+
+        return self.make_new_state(t=t + h, y=y_new), None
+
     def forward(self,
                 model: BaseModel,
                 state: ModelState,
@@ -114,6 +171,16 @@ class MultiStepMethod:
     Multi-step methods are defined by two sets of coefficients, commonly denoted a and b in numerical
     literature. For more information and sample methods, see
     https://en.wikipedia.org/wiki/Linear_multistep_method.
+
+    The first num_previous - 1 states are computed by a single-step startup method. By default,
+    this is an explicit Runge-Kutta method of the same order as the multi-step method, up to
+    order 5. The right-hand side values known from the startup steps are reused, so that the
+    startup does not evaluate the right-hand side at a state twice.
+
+    The past states and right-hand side values are kept in ring buffers of num_previous rows.
+    A step overwrites the oldest row with the newest values and advances the head index, which
+    points to the oldest row, instead of shifting the whole history. The coefficient vectors
+    are rotated along with the head, with all rotations precomputed on construction.
     """
 
     def __init__(self,
@@ -126,7 +193,8 @@ class MultiStepMethod:
         Base MultiStepMethod constructor.
 
         Args:
-            startup: SingleStepMethod used to compute the startup data.
+            startup: SingleStepMethod used to compute the startup data. If None, an explicit
+             Runge-Kutta method matched to the order of the method is used.
             a_coeffs: Array of a-coefficients of the method.
             b_coeffs: Array of b-coefficients of the method.
             order: Order of the method.
@@ -138,7 +206,10 @@ class MultiStepMethod:
         # startup calculation variables, only for multi-step methods
         self.ready = False
         self._cache_idx = 1
-        self.startup = startup
+        self.startup = startup if startup is not None else _matched_startup(order)
+
+        # implicit methods only keep the past states, not the right-hand side values
+        self._uses_f_cache = True
 
         if reverse:
             self.a_coeffs = np.flip(a_coeffs)
@@ -150,11 +221,20 @@ class MultiStepMethod:
         # TODO: This is not good
         self.num_previous = max(len(b_coeffs), len(a_coeffs))
 
-        # side cache for additional steps
+        # ring buffer histories, the f- and y-caches get one row per past state
+        # of the model dimension on startup, while the times are always scalar
         self.f_cache = np.zeros(self.num_previous)
         self.t_cache = np.zeros(self.num_previous)
         self.y_cache = np.zeros(self.num_previous)
 
+        # index of the oldest entry in the ring buffers
+        self._head = 0
+
+        # coefficients for every head position, row i is rotated by i, so that the
+        # coefficient of the j-th oldest entry is at index (i + j) % num_previous
+        self._a_rings = self._make_rings(self.a_coeffs)
+        self._b_rings = self._make_rings(self.b_coeffs)
+
     @staticmethod
     def get_data_from_state(state: ModelState):
         """
@@ -184,6 +264,16 @@ class MultiStepMethod:
         """
         return t, y
 
+    def _make_rings(self, coeffs: np.ndarray) -> np.ndarray:
+        # shorter coefficient arrays are padded with zeros for the oldest entries
+        padded = np.zeros(self.num_previous)
+        padded[self.num_previous - len(coeffs):] = coeffs
+
+        return np.stack([np.roll(padded, shift) for shift in range(self.num_previous)])
+
+    def _advance_head(self):
+        self._head = (self._head + 1) % self.num_previous
+
     def _adjust_dims(self, y: StateVariable):
         if is_scalar(y):
             model_dim = 1
@@ -212,6 +302,7 @@ class MultiStepMethod:
         """
         self.ready = False
         self._cache_idx = 1
+        self._head = 0
 
     def _perform_startup_calculation(self,
                                      model: ODEModel,
@@ -236,17 +327,28 @@ class MultiStepMethod:
         if self._get_shape(y) != self.y_cache.shape:
             self._adjust_dims(y)
 
+        rhs = model.rhs
+
+        # the startup values are stored oldest first
+        self._head = 0
+
         # fill function evaluation cache
-        self.t_cache[0], self.y_cache[0], self.f_cache[0] = t, y, model(t, y)
+        self.t_cache[0], self.y_cache[0], self.f_cache[0] = t, y, rhs(t, y)
 
         for i in range(1, self.num_previous):
-            startup_state = self.startup.forward(model=model,
-                                                 state=state,
-                                                 h=h,
-                                                 **kwargs)
+            # the right-hand side at the previous state is the first stage of the startup step
+            startup_state, f = self.startup.startup_step(model=model,
+                                                         state=state,
+                                                         h=h,
+                                                         f=self.f_cache[i - 1])
 
             self.t_cache[i], self.y_cache[i] = startup_state
-            self.f_cache[i] = model(self.t_cache[i], self.y_cache[i])
+
+            if f is not None:
+                self.f_cache[i] = f
+            elif self._uses_f_cache or i < self.num_previous - 1:
+                self.f_cache[i] = rhs(self.t_cache[i], self.y_cache[i])
+
             state = startup_state
 
         self.ready = True
@@ -362,18 +464,71 @@ class ExplicitRungeKuttaMethod(SingleStepMethod):
 
         t, y = self.get_data_from_state(state=state)
 
+        y_new = self._advance(model=model, t=t, y=y, h=h)
+
+        return self.make_new_state(t=t + h, y=y_new)
+
+    def _advance(self,
+                 model: ODEModel,
+                 t: StateVariable,
+                 y: StateVariable,
+                 h: float,
+                 f: StateVariable = None) -> StateVariable:
         if self._get_shape(y) != self.k.shape:
             self._adjust_dims(y)
 
-        self.k[0] = model(t, y)
+        if self._use_inplace(model, y):
+            return explicit_rk_inplace_impl(rhs_into=model.rhs_into, t=t, y=y, h=h,
+                                            alphas=self.alphas, betas=self.betas,
+                                            gammas=self.gammas, k=self.k, y_stage=self.y_stage,
+                                            f=f)
 
-        for i in range(1, self.num_stages):
-            # first row of betas is a zero row because it is an explicit RK
-            self.k[i] = model(t + h * self.alphas[i], y + h * np.dot(self.betas[i], self.k))
+        rhs = model.rhs
 
-        y_new = y + h * np.dot(self.gammas, self.k)
+        self.k[0] = rhs(t, y) if f is None else f
 
-        return self.make_new_state(t=t + h, y=y_new)
+        for i in range(1, self.num_stages):
+            # first row of betas is a zero row because it is an explicit RK
+            self.k[i] = rhs(t + h * self.alphas[i], y + h * np.dot(self.betas[i], self.k))
+
+        return y + h * np.dot(self.gammas, self.k)
+
+
+def _matched_startup(order: int) -> ExplicitRungeKuttaMethod:
+    # explicit Runge-Kutta method of the given order, at least 1 and at most 5
+    r = max(min(order, 5), 1)
+
+    if r == 1:
+        # forward Euler
+        alphas, betas, gammas = np.zeros(1), np.zeros((1, 1)), np.ones(1)
+    elif r == 2:
+        # Heun
+        alphas = np.array([0.0, 1.0])
+        betas = np.array([[0.0, 0.0], [1.0, 0.0]])
+        gammas = np.array([0.5, 0.5])
+    elif r == 3:
+        # Kutta's third order method
+        alphas = np.array([0.0, 0.5, 1.0])
+        betas = np.array([[0.0, 0.0, 0.0], [0.5, 0.0, 0.0], [-1.0, 2.0, 0.0]])
+        gammas = np.array([1.0, 4.0, 1.0]) / 6
+    elif r == 4:
+        # classic Runge-Kutta
+        alphas = np.array([0.0, 0.5, 0.5, 1.0])
+        betas = np.array([[0.0, 0.0, 0.0, 0.0], [0.5, 0.0, 0.0, 0.0], [0.0, 0.5, 0.0, 0.0],
+                          [0.0, 0.0, 1.0, 0.0]])
+        gammas = np.array([1.0, 2.0, 2.0, 1.0]) / 6
+    else:
+        # 5th order solution of the Dormand-Prince pair
+        alphas = np.array([0.0, 0.2, 0.3, 0.8, 8 / 9, 1.0])
+        betas = np.zeros((6, 6))
+        betas[1, :1] = [0.2]
+        betas[2, :2] = [3 / 40, 9 / 40]
+        betas[3, :3] = [44 / 45, -56 / 15, 32 / 9]
+        betas[4, :4] = [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729]
+        betas[5, :5] = [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]
+        gammas = np.array([35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+
+    return ExplicitRungeKuttaMethod(alphas=alphas, betas=betas, gammas=gammas, order=r)
 
 
 class ImplicitRungeKuttaMethod(SingleStepMethod):
@@ -479,10 +634,12 @@ class ImplicitRungeKuttaMethod(SingleStepMethod):
 
         op_type = "scalar" if is_scalar(y) else "ndim"
 
+        rhs = model.rhs
+
         def F(x: np.ndarray) -> np.ndarray:
             # kwargs are not allowed in scipy.optimize, so pass tuple instead
             model_stack = self._array_ops.get(op_type)(
-                [model(t + h * self.alphas[i], y + h * np.dot(self.betas[i], x.reshape(initial_shape)))
+                [rhs(t + h * self.alphas[i], y + h * np.dot(self.betas[i], x.reshape(initial_shape)))
                  for i in range(self.num_stages)])
 
             return model_stack - x
@@ -493,14 +650,292 @@ class ImplicitRungeKuttaMethod(SingleStepMethod):
         else:
             args = ()
 
+        solver_kwargs = self.solver_kwargs
+
+        jac = model.jac
+        if jac is not None and "jac" not in solver_kwargs:
+            identity = np.eye(shape_prod)
+
+            def J(x: np.ndarray, *_) -> np.ndarray:
+                # block row i of the Jacobian of F holds h * beta_ij * f_y(t_i, Y_i)
+                stages = x.reshape(initial_shape)
+                blocks = [h * np.kron(self.betas[i:i + 1],
+                                      dense_jacobian(jac(t + h * self.alphas[i],
+                                                         y + h * np.dot(self.betas[i], stages))))
+                          for i in range(self.num_stages)]
+
+                return np.concatenate(blocks, axis=0) - identity
+
+            solver_kwargs = dict(solver_kwargs, jac=J)
+
+        from scipy.optimize import root
+
         # TODO: Retry here in case of convergence failure?
-        root_res = root(F, x0=self.k.reshape((shape_prod,)), args=args, **self.solver_kwargs)
+        root_res = root(F, x0=self.k.reshape((shape_prod,)), args=args, **solver_kwargs)
+        record_solver_result(root_res)
 
         y_new = y + h * np.dot(self.gammas, root_res.x.reshape(initial_shape))
 
         return self.make_new_state(t=t + h, y=y_new)
 
 
+class IMEXRungeKuttaMethod(SingleStepMethod):
+    """
+    Base class template for additive implicit-explicit (IMEX) Runge-Kutta methods.
+
+    An IMEX Runge-Kutta method integrates models with a split right-hand side
+    f(t, y) = f_explicit(t, y) + f_implicit(t, y). It is defined by two Butcher tableaux,
+    an explicit one applied to the non-stiff part and a diagonally implicit one applied to the
+    stiff part. Only the stiff part enters the non-linear stage equations, so every stage
+    requires at most one solve of the size of the state vector, and the non-stiff part never
+    needs to be differentiated.
+
+    For more information on IMEX Runge-Kutta methods, see Ascher, Ruuth and Spiteri (1997),
+    "Implicit-explicit Runge-Kutta methods for time-dependent partial differential equations",
+    and Kennedy and Carpenter (2003), "Additive Runge-Kutta schemes for
+    convection-diffusion-reaction equations".
+    """
+    def __init__(self,
+                 explicit_alphas: np.ndarray,
+                 explicit_betas: np.ndarray,
+                 explicit_gammas: np.ndarray,
+                 implicit_alphas: np.ndarray,
+                 implicit_betas: np.ndarray,
+                 implicit_gammas: np.ndarray,
+                 order: int = 0,
+                 **kwargs):
+        """
+        IMEX Runge-Kutta method constructor.
+
+        Args:
+            explicit_alphas: Alpha- or a-array of the explicit Butcher tableau.
+            explicit_betas: Beta- or b-matrix of the explicit Butcher tableau.
+            explicit_gammas: Gamma- or c-array of the explicit Butcher tableau.
+            implicit_alphas: Alpha- or a-array of the diagonally implicit Butcher tableau.
+            implicit_betas: Beta- or b-matrix of the diagonally implicit Butcher tableau.
+            implicit_gammas: Gamma- or c-array of the diagonally implicit Butcher tableau.
+            order: Order of the resulting IMEX RK method.
+            **kwargs: Additional keyword arguments used in the call to scipy.optimize.root.
+        """
+
+        super(IMEXRungeKuttaMethod, self).__init__(order=order)
+
+        self._validate_butcher_tableaux(explicit_alphas=explicit_alphas,
+                                        explicit_betas=explicit_betas,
+                                        explicit_gammas=explicit_gammas,
+                                        implicit_alphas=implicit_alphas,
+                                        implicit_betas=implicit_betas,
+                                        implicit_gammas=implicit_gammas)
+
+        self.explicit_alphas = explicit_alphas
+        self.explicit_betas = explicit_betas
+        self.explicit_gammas = explicit_gammas
+        self.implicit_alphas = implicit_alphas
+        self.implicit_betas = implicit_betas
+        self.implicit_gammas = implicit_gammas
+        self.num_stages = len(explicit_alphas)
+        self.k = np.zeros(self.num_stages)
+        self.k_implicit = np.zeros(self.num_stages)
+
+        # stage derivatives that never enter a later stage or the final
+        # update do not need to be evaluated
+        self._needs_explicit = np.any(explicit_betas != 0, axis=0) | (explicit_gammas != 0)
+        self._needs_implicit = np.any(np.tril(implicit_betas, k=-1) != 0, axis=0) | \
+            (implicit_gammas != 0)
+
+        # scipy.optimize.root options
+        self.solver_kwargs = kwargs
+
+    @staticmethod
+    def _validate_butcher_tableaux(explicit_alphas: np.ndarray,
+                                   explicit_betas: np.ndarray,
+                                   explicit_gammas: np.ndarray,
+                                   implicit_alphas: np.ndarray,
+                                   implicit_betas: np.ndarray,
+                                   implicit_gammas: np.ndarray) -> None:
+        _error_msg = []
+        num_stages = len(explicit_alphas)
+
+        if any(len(v) != num_stages for v in [explicit_gammas, implicit_alphas, implicit_gammas]):
+            _error_msg.append("All alpha and gamma vectors need to have the same length")
+
+        if any(b.shape != (num_stages, num_stages) for b in [explicit_betas, implicit_betas]):
+            _error_msg.append("Both beta matrices must be quadratic matrices with the same "
+                              "dimension as the alphas/gammas arrays")
+
+        elif not np.allclose(explicit_betas, np.tril(explicit_betas, k=-1)):
+            _error_msg.append("The explicit beta matrix has to be strictly lower triangular, "
+                              "i.e. b_ij = 0 for i <= j")
+
+        elif not np.allclose(implicit_betas, np.tril(implicit_betas)):
+            _error_msg.append("The implicit beta matrix has to be lower triangular for "
+                              "a diagonally implicit method, i.e. b_ij = 0 for i < j")
+
+        if _error_msg:
+            raise ValueError("An error occurred while validating the input "
+                             "Butcher tableaux. More information: "
+                             "{}.".format(",".join(_error_msg)))
+
+    def _adjust_dims(self, y: StateVariable):
+        super(IMEXRungeKuttaMethod, self)._adjust_dims(y)
+        self.k_implicit = np.zeros_like(self.k)
+
+    def forward(self,
+                model: ODEModel,
+                state: ModelState,
+                h: float,
+                **kwargs) -> ModelState:
+        """
+        Main method to advance an ODE in time by computing a new state with an additive
+        implicit-explicit Runge-Kutta method.
+
+        This function is templated and not meant to be directly overridden. If you want more
+        control over your step function, consider implementing an IMEX RK method by subclassing the
+        ``SingleStepMethod`` class instead.
+
+        Args:
+            model: ODEModel object with a split right-hand side.
+            state: Input state.
+            h: Step size to use in the step function.
+            **kwargs: Additional keyword arguments, unused for now.
+
+        Returns:
+            A new state containing the ODE model data at time t+h.
+        """
+
+        if not getattr(model, "is_split", False):
+            raise ValueError("IMEX Runge-Kutta methods require a model with a split right-hand "
+                             "side. Please supply explicit_fn and implicit_fn when constructing "
+                             "the model.")
+
+        t, y = self.get_data_from_state(state=state)
+
+        if self._get_shape(y) != self.k.shape:
+            self._adjust_dims(y)
+
+        if is_scalar(y):
+            solve = implicit_stage_scalar_impl
+        else:
+            solve = implicit_stage_ndim_impl
+
+        explicit_rhs, implicit_rhs = model.explicit_rhs, model.implicit_rhs
+
+        for i in range(self.num_stages):
+            stage_rhs = y + h * (np.dot(self.explicit_betas[i, :i], self.k[:i]) +
+                                 np.dot(self.implicit_betas[i, :i], self.k_implicit[:i]))
+
+            t_implicit = t + h * self.implicit_alphas[i]
+            diag = self.implicit_betas[i, i]
+
+            if diag != 0.0:
+                stage_value = solve(implicit_rhs, t_implicit, stage_rhs, h * diag,
+                                    **self.solver_kwargs)
+            else:
+                stage_value = stage_rhs
+
+            if self._needs_explicit[i]:
+                self.k[i] = explicit_rhs(t + h * self.explicit_alphas[i], stage_value)
+
+            if self._needs_implicit[i]:
+                self.k_implicit[i] = implicit_rhs(t_implicit, stage_value)
+
+        y_new = y + h * (np.dot(self.explicit_gammas, self.k) +
+                         np.dot(self.implicit_gammas, self.k_implicit))
+
+        return self.make_new_state(t=t + h, y=y_new)
+
+
+class SplittingMethod(SingleStepMethod):
+    """
+    Base class template for operator splitting methods.
+
+    An operator splitting method advances a model whose right-hand side is a sum of sub-models
+    by composing the flows of the individual sub-models. Each sub-model is advanced by its own
+    step function, which makes it possible to use e.g. an implicit method for a stiff sub-model,
+    a cheap explicit method for a non-stiff one and an exact propagator for a sub-model with a
+    closed-form solution.
+
+    A splitting method is defined by a sequence of sub-steps. Each sub-step is a tuple
+    (i, offset, fraction), meaning that the i-th sub-model is advanced from time t + offset * h
+    by a step of size fraction * h.
+
+    For more information on splitting methods, see
+    https://en.wikipedia.org/wiki/Strang_splitting.
+    """
+    def __init__(self,
+                 step_funcs: List[SingleStepMethod],
+                 sequence: List[Tuple[int, float, float]],
+                 order: int = 0):
+        """
+        Splitting method constructor.
+
+        Args:
+            step_funcs: List of step functions, one for each sub-model of the split model.
+            sequence: List of sub-steps (i, offset, fraction) making up a single step.
+            order: Order of the resulting splitting method.
+        """
+
+        super(SplittingMethod, self).__init__(order=order)
+
+        if any(isinstance(step_func, MultiStepMethod) for step_func in step_funcs):
+            raise ValueError("Multi-step methods cannot be used in a splitting method, since "
+                             "their history is invalidated by the other sub-steps.")
+
+        self.step_funcs = list(step_funcs)
+        self.sequence = list(sequence)
+        self.num_stages = len(self.sequence)
+
+    def reset(self):
+        """
+        Resets all sub-model step functions.
+        """
+        for step_func in self.step_funcs:
+            step_func.reset()
+
+    def forward(self,
+                model: BaseModel,
+                state: ModelState,
+                h: float,
+                **kwargs) -> ModelState:
+        """
+        Main method to advance an ODE in time by computing a new state with an
+        operator splitting method.
+
+        This function is templated and not meant to be directly overridden. If you want more
+        control over your step function, consider implementing a splitting method by subclassing
+        the ``SingleStepMethod`` class instead.
+
+        Args:
+            model: SplitModel object holding the sub-models.
+            state: Input state.
+            h: Step size to use in the step function.
+            **kwargs: Additional keyword arguments, unused for now.
+
+        Returns:
+            A new state containing the ODE model data at time t+h.
+        """
+
+        if len(model.models) != len(self.step_funcs):
+            raise ValueError(f"Got {len(self.step_funcs)} step functions for a split model "
+                             f"with {len(model.models)} sub-models.")
+
+        t, y = self.get_data_from_state(state=state)
+
+        for i, offset, fraction in self.sequence:
+            sub_state = self.step_funcs[i].forward(model.models[i],
+                                                   (t + offset * h, y),
+                                                   fraction * h,
+                                                   **kwargs)
+
+            # embedded methods return a tuple of estimates, use the higher order one
+            if isinstance(sub_state[0], (tuple, list)):
+                sub_state = sub_state[-1]
+
+            y = sub_state[-1]
+
+        return self.make_new_state(t=t + h, y=y)
+
+
 class ExplicitMultiStepMethod(MultiStepMethod):
     """
     Base class for explicit multi-step methods for ODE solving.
@@ -525,7 +960,8 @@ class ExplicitMultiStepMethod(MultiStepMethod):
         Base ExplicitMultiStepMethod constructor.
 
         Args:
-            startup: Single-step method used to compute the startup values.
+            startup: Single-step method used to compute the startup values. If None, an
+             explicit Runge-Kutta method matched to the order of the method is used.
             a_coeffs: Array of a-coefficients. Unused for explicit multi-step methods.
             b_coeffs: Array of b-coefficients.
             order: Order of the resulting explicit multi-step method.
@@ -577,10 +1013,11 @@ class ExplicitMultiStepMethod(MultiStepMethod):
         if self._cache_idx < self.num_previous:
             return self._get_cached_state()
 
-        y_new = y + h * np.dot(self.b_coeffs, self.f_cache)
+        y_new = y + h * np.dot(self._b_rings[self._head], self.f_cache)
 
-        self.f_cache = np.roll(self.f_cache, shift=-1, axis=0)
-        self.f_cache[-1] = model(t + h, y_new)
+        # the newest value replaces the oldest one
+        self.f_cache[self._head] = model.rhs(t + h, y_new)
+        self._advance_head()
 
         return self.make_new_state(t=t + h, y=y_new)
 
@@ -611,7 +1048,8 @@ class ImplicitMultiStepMethod(MultiStepMethod):
         ImplicitMultiStepMethod constructor.
 
         Args:
-            startup: Single-step method used to compute the startup values.
+            startup: Single-step method used to compute the startup values. If None, an
+             explicit Runge-Kutta method matched to the order of the method is used.
             a_coeffs: Array of a-coefficients. Unused for explicit multi-step methods.
             b_coeffs: Array of b-coefficients.
             order: Order of the resulting explicit multi-step method.
@@ -629,6 +1067,8 @@ class ImplicitMultiStepMethod(MultiStepMethod):
         # scipy.optimize.root options
         self.solver_kwargs = kwargs
 
+        self._uses_f_cache = False
+
     def forward(self,
                 model: ODEModel,
                 state: ModelState,
@@ -670,20 +1110,40 @@ class ImplicitMultiStepMethod(MultiStepMethod):
         if self._cache_idx < self.num_previous:
             return self._get_cached_state()
 
+        rhs = model.rhs
+
+        history = np.dot(self._a_rings[self._head], self.y_cache)
+
         def F(x: StateVariable) -> StateVariable:
-            return x + np.dot(self.a_coeffs, self.y_cache) - h * b * model(t + h, x)
+            return x + history - h * b * rhs(t + h, x)
 
         if kwargs:
             args = tuple(kwargs[arg] for arg in model.fn_args.keys())
         else:
             args = ()
 
+        solver_kwargs = self.solver_kwargs
+
+        jac = model.jac
+        if jac is not None and "jac" not in solver_kwargs:
+            identity = np.eye(np.size(y))
+
+            def J(x: StateVariable, *_) -> np.ndarray:
+                return identity - h * b * dense_jacobian(jac(t + h, x))
+
+            solver_kwargs = dict(solver_kwargs, jac=J)
+
+        from scipy.optimize import root
+
         # TODO: Retry here in case of convergence failure?
-        root_res = root(F, x0=y, args=args, **self.solver_kwargs)
+        root_res = root(F, x0=y, args=args, **solver_kwargs)
+        record_solver_result(root_res)
 
-        y_new = root_res.x
+        # scipy.optimize.root returns an array of shape (1,) for scalar states
+        y_new = root_res.x.item() if is_scalar(y) else root_res.x
 
-        self.y_cache = np.roll(self.y_cache, shift=-1, axis=0)
-        self.y_cache[-1] = y_new
+        # the newest state replaces the oldest one
+        self.y_cache[self._head] = y_new
+        self._advance_head()
 
         return self.make_new_state(t=t + h, y=y_new)
@@ -88,7 +88,8 @@ class DOPRI45Controller(StepSizeController):
 
         accept = err_ratio < 1.
 
-        error_est = (1 / err_ratio) ** (1 / self.order)
+        # an exact step, e.g. of a tiny first step, allows the maximal increase
+        error_est = (1 / err_ratio) ** (1 / self.order) if err_ratio > 0 else np.inf
 
         h_new = h * min(self.fac_max, max(self.fac_min, self.safety_factor * error_est))
 
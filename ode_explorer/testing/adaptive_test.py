@@ -0,0 +1,106 @@
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import DOPRI45
+from ode_explorer.stepsize_control import StepSizeController, DOPRI45Controller
+
+
+def decay(t: float, y: float, lamb: float = 1.0):
+    return -lamb * y
+
+
+class RejectAtEnd(StepSizeController):
+    """Rejects the first step reaching the end time and halves the step size."""
+
+    def __init__(self, end: float):
+        self.end = end
+        self.rejected = False
+
+    def __call__(self, i, h, state, updated_state, model, local_vars):
+        # DOPRI45 returns the embedded and the 5th order solution
+        if not self.rejected and updated_state[-1][0] >= self.end - 1e-12:
+            self.rejected = True
+            return False, h / 2
+        return True, h
+
+
+def dopri45_order_test(model: ODEModel):
+    global_errors, local_errors = [], []
+    for h in [0.1, 0.05]:
+        step_func = DOPRI45()
+        state = (0.0, 1.0)
+        for _ in range(int(round(1.0 / h))):
+            _, state = step_func.forward(model, state, h)
+
+        global_errors.append(float(abs(state[1] - np.exp(-1.0))))
+
+        # the embedded solution drives the error estimate, its local error is O(h^5)
+        embedded_state, _ = DOPRI45().forward(model, (0.0, 1.0), h)
+        local_errors.append(float(abs(embedded_state[1] - np.exp(-h))))
+
+    global_order = np.log2(global_errors[0] / global_errors[1])
+    local_order = np.log2(local_errors[0] / local_errors[1])
+
+    print(f"DOPRI45: global errors {global_errors}, observed order {global_order:.2f}")
+    print(f"DOPRI45 embedded: local errors {local_errors}, observed order {local_order:.2f}")
+
+    assert abs(global_order - 5) < 0.3
+    assert abs(local_order - 5) < 0.3
+
+
+def exact_step_test():
+    # a constant solution is integrated exactly, the error estimate vanishes
+    model = ODEModel(ode_fn=lambda t, y: 0.0 * y)
+    state = (0.0, 1.0)
+    h = 0.1
+
+    controller = DOPRI45Controller()
+    updated_state = DOPRI45().forward(model, state, h)
+
+    with np.errstate(divide="raise"):
+        accept, h_new = controller(0, h, state, updated_state, model, {})
+
+    assert accept
+    assert h_new == h * controller.fac_max
+
+
+def rejected_last_step_test(model: ODEModel):
+    # steps of 0.3 reach 0.9, the clamped step to 1.0 is rejected and halved from 0.9
+    integrator = Integrator()
+    integrator.integrate_adaptively(model=model,
+                                    step_func=DOPRI45(),
+                                    initial_state=(0.0, 1.0),
+                                    sc=RejectAtEnd(end=1.0),
+                                    initial_h=0.3,
+                                    end=1.0,
+                                    max_steps=100,
+                                    verbosity=1)
+
+    times = integrator.return_result_data(run_id="latest")["t"].values
+    assert len(times) == 6 and np.allclose(times, [0.0, 0.3, 0.6, 0.9, 0.95, 1.0])
+
+    states = integrator.iter_integrate(model=model,
+                                       step_func=DOPRI45(),
+                                       initial_state=(0.0, 1.0),
+                                       sc=RejectAtEnd(end=1.0),
+                                       h=0.3,
+                                       end=1.0,
+                                       max_steps=100)
+
+    times = [state[0] for state in states]
+    assert len(times) == 6 and np.allclose(times, [0.0, 0.3, 0.6, 0.9, 0.95, 1.0])
+
+
+def main():
+    model = ODEModel(ode_fn=decay, fn_args={"lamb": 1.0})
+
+    dopri45_order_test(model)
+
+    exact_step_test()
+
+    rejected_last_step_test(model)
+
+
+if __name__ == "__main__":
+    main()
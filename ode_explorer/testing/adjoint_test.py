@@ -0,0 +1,207 @@
+import numpy as np
+
+from ode_explorer.constants import AdjointKeys, RunKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.integrators.adjoint import binomial_split
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import RungeKutta4, BackwardEulerMethod, BDF2
+
+H = 0.01
+NUM_STEPS = 200
+
+
+def decay(t: float, y: float, lamb: float = 0.5):
+    return - lamb * y
+
+
+def lotka_volterra(t: float, y: np.ndarray, a: float = 1.0, b: np.ndarray = None,
+                   c: float = 0.8):
+    x, z = y
+    return np.array([a * x - b[0] * x * z, -c * z + b[1] * x * z])
+
+
+def lotka_volterra_jac(t: float, y: np.ndarray, a: float = 1.0, b: np.ndarray = None,
+                       c: float = 0.8):
+    x, z = y
+    return np.array([[a - b[0] * z, -b[0] * x],
+                     [b[1] * z, -c + b[1] * x]])
+
+
+def lotka_volterra_param_jac(t: float, y: np.ndarray, a: float = 1.0, b: np.ndarray = None,
+                             c: float = 0.8):
+    # columns a, b_1, b_2, c
+    x, z = y
+    return np.array([[x, -x * z, 0.0, 0.0],
+                     [0.0, 0.0, x * z, -z]])
+
+
+def lotka_volterra_model(jac: bool = False, **fn_args):
+    args = {"a": 1.0, "b": np.array([0.5, 0.4]), "c": 0.8}
+    args.update(fn_args)
+    return ODEModel(ode_fn=lotka_volterra, fn_args=args,
+                    jac_fn=lotka_volterra_jac if jac else None)
+
+
+def tracking_loss(t: float, y: np.ndarray):
+    # squared distance to a reference trajectory, integrated over time
+    return H * np.sum((y - np.array([1.0 + 0.1 * t, 0.5])) ** 2)
+
+
+def tracking_loss_grad(t: float, y: np.ndarray):
+    return 2 * H * (y - np.array([1.0 + 0.1 * t, 0.5]))
+
+
+def trajectory_loss(integrator, model, step_func, initial_state, loss_fn):
+    integrator.integrate_const(model=model, step_func=step_func, initial_state=initial_state,
+                               h=H, max_steps=NUM_STEPS, verbosity=40)
+    return sum(loss_fn(t, y) for t, y in integrator.runs[-1][RunKeys.RESULT_DATA])
+
+
+def finite_difference_gradients(integrator, make_step_func, initial_state, eps=1e-6):
+    # central differences of separate runs, with respect to a, b_1, b_2, c and y_0
+    def loss(args, y_0):
+        return trajectory_loss(integrator, lotka_volterra_model(**args), make_step_func(),
+                               (0.0, y_0), tracking_loss)
+
+    base = {"a": 1.0, "b": np.array([0.5, 0.4]), "c": 0.8}
+    t_0, y_0 = initial_state
+
+    param_gradient = []
+    for name, idx in [("a", None), ("b", 0), ("b", 1), ("c", None)]:
+        values = []
+        for sign in [1, -1]:
+            args = {k: np.copy(v) for k, v in base.items()}
+            if idx is None:
+                args[name] = args[name] + sign * eps
+            else:
+                args[name][idx] += sign * eps
+            values.append(loss(args, y_0))
+        param_gradient.append((values[0] - values[1]) / (2 * eps))
+
+    state_gradient = []
+    for i in range(len(y_0)):
+        e = np.zeros(len(y_0))
+        e[i] = eps
+        state_gradient.append((loss(base, y_0 + e) - loss(base, y_0 - e)) / (2 * eps))
+
+    return np.array(param_gradient), np.array(state_gradient)
+
+
+def flat_param_gradient(gradients):
+    return np.concatenate([np.ravel(gradients[name]) for name in ["a", "b", "c"]])
+
+
+def main():
+    integrator = Integrator(in_memory=True)
+
+    # the checkpoint schedule splits into two non-empty parts
+    for num_steps in [2, 10, 100, 1000]:
+        for num_checkpoints in [0, 1, 3, 10]:
+            assert 1 <= binomial_split(num_steps, num_checkpoints) < num_steps
+
+    # L = sum_k h * y_k^2 for the scalar decay y' = -lamb * y, checked against
+    # finite differences of separate runs
+    y_0, lamb, eps = 2.0, 0.5, 1e-6
+
+    def decay_loss(t, y):
+        return H * y ** 2
+
+    def decay_trajectory_loss(lamb_, y_0_):
+        return trajectory_loss(integrator, ODEModel(ode_fn=decay, fn_args={"lamb": lamb_}),
+                               RungeKutta4(), (0.0, y_0_), decay_loss)
+
+    result = integrator.adjoint_gradient(model=ODEModel(ode_fn=decay, fn_args={"lamb": lamb}),
+                                         step_func=RungeKutta4(), initial_state=(0.0, y_0),
+                                         loss_fn=decay_loss, h=H, max_steps=NUM_STEPS,
+                                         verbosity=40)
+
+    expected_lamb = (decay_trajectory_loss(lamb + eps, y_0) -
+                     decay_trajectory_loss(lamb - eps, y_0)) / (2 * eps)
+    expected_y_0 = (decay_trajectory_loss(lamb, y_0 + eps) -
+                    decay_trajectory_loss(lamb, y_0 - eps)) / (2 * eps)
+
+    assert np.isclose(result[AdjointKeys.LOSS], decay_trajectory_loss(lamb, y_0), rtol=1e-12)
+    assert np.isclose(result[AdjointKeys.PARAM_GRADIENTS]["lamb"], expected_lamb, rtol=1e-5)
+    assert np.ndim(result[AdjointKeys.INITIAL_STATE_GRADIENT]) == 0
+    assert np.isclose(result[AdjointKeys.INITIAL_STATE_GRADIENT], expected_y_0, rtol=1e-5)
+
+    # gradients of a vector model with array-valued parameters, with and without Jacobians,
+    # and for an implicit method. The adjoint ODE approximates the gradient of the exact
+    # solution, which the gradient of a first order method only agrees with up to O(h).
+    initial_state = (0.0, np.array([1.0, 0.5]))
+
+    for make_step_func, rtol in [(RungeKutta4, 1e-5), (BackwardEulerMethod, 5e-2)]:
+        expected_params, expected_state = finite_difference_gradients(
+            integrator, make_step_func, initial_state)
+
+        cases = [(lotka_volterra_model(), None, None),
+                 (lotka_volterra_model(jac=True), None, tracking_loss_grad),
+                 (lotka_volterra_model(jac=True), lotka_volterra_param_jac, None)]
+
+        for model, param_jac_fn, loss_grad_fn in cases:
+            result = integrator.adjoint_gradient(model=model, step_func=make_step_func(),
+                                                 initial_state=initial_state,
+                                                 loss_fn=tracking_loss,
+                                                 loss_grad_fn=loss_grad_fn, h=H,
+                                                 max_steps=NUM_STEPS,
+                                                 param_jac_fn=param_jac_fn, verbosity=40)
+
+            gradients = result[AdjointKeys.PARAM_GRADIENTS]
+            assert np.shape(gradients["b"]) == (2,)
+            assert np.allclose(flat_param_gradient(gradients), expected_params, rtol=rtol), \
+                (make_step_func, flat_param_gradient(gradients), expected_params)
+            assert np.allclose(result[AdjointKeys.INITIAL_STATE_GRADIENT], expected_state,
+                               rtol=rtol), make_step_func
+
+    # the number of stored forward states grows logarithmically with the number of steps,
+    # and the gradients do not depend on the checkpoints the states are recomputed from
+    model = lotka_volterra_model(jac=True)
+
+    def checkpointed_gradient(num_steps, num_checkpoints):
+        return integrator.adjoint_gradient(model=model, step_func=RungeKutta4(),
+                                           initial_state=initial_state, loss_fn=tracking_loss,
+                                           loss_grad_fn=tracking_loss_grad, h=H,
+                                           max_steps=num_steps, num_checkpoints=num_checkpoints,
+                                           param_jac_fn=lotka_volterra_param_jac, verbosity=40)
+
+    for num_steps in [50, 1000]:
+        results = {num_checkpoints: checkpointed_gradient(num_steps, num_checkpoints)
+                   for num_checkpoints in [None, 2, num_steps]}
+
+        default = results[None]
+        assert default[AdjointKeys.NUM_CHECKPOINTS] == int(np.ceil(np.log2(num_steps)))
+        assert default[AdjointKeys.STORED_STATES] <= default[AdjointKeys.NUM_CHECKPOINTS] + 1
+
+        # with a checkpoint per step, nothing is recomputed
+        assert results[num_steps][AdjointKeys.FORWARD_STEPS] == 2 * num_steps - 1
+
+        for result in results.values():
+            assert np.allclose(flat_param_gradient(result[AdjointKeys.PARAM_GRADIENTS]),
+                               flat_param_gradient(default[AdjointKeys.PARAM_GRADIENTS]),
+                               rtol=1e-12)
+            assert np.allclose(result[AdjointKeys.INITIAL_STATE_GRADIENT],
+                               default[AdjointKeys.INITIAL_STATE_GRADIENT], rtol=1e-12)
+
+    # with 10 checkpoints for 1000 steps, binomial(10 + 4, 10) >= 1000 bounds the number of
+    # recomputations of each step by 4, in addition to the step before reversing it
+    assert default[AdjointKeys.FORWARD_STEPS] <= (4 + 1) * 1000
+
+    # without checkpoints, the steps are recomputed from the initial state
+    result = checkpointed_gradient(50, 0)
+    assert result[AdjointKeys.STORED_STATES] == 1
+    assert result[AdjointKeys.FORWARD_STEPS] == 50 * 51 // 2
+
+    # multi-step methods cannot restart from a checkpoint
+    try:
+        integrator.adjoint_gradient(model=model, step_func=BDF2(), initial_state=initial_state,
+                                    loss_fn=tracking_loss, h=H, max_steps=10, verbosity=40)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected a ValueError for a multi-step method.")
+
+    integrator.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import time
+from typing import Union
+
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import RungeKutta4
+from ode_explorer.utils.background import BackgroundWriteError
+
+y_0 = np.ones(50)
+
+
+def ode_func(t: float, y: Union[float, np.ndarray], lamb: float = 0.5):
+    return - lamb * y
+
+
+def sweep(integrator: Integrator, prefix: str, lambdas):
+    start = time.perf_counter()
+
+    for lamb in lambdas:
+        model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+        integrator.integrate_const(model=model,
+                                   step_func=RungeKutta4(),
+                                   initial_state=(0.0, y_0),
+                                   h=0.001,
+                                   max_steps=5000,
+                                   verbosity=40,
+                                   output_dir=f"{prefix}_{lamb}")
+
+    submitted = time.perf_counter() - start
+
+    integrator.flush()
+
+    return submitted, time.perf_counter() - start
+
+
+def main():
+    lambdas = [0.1 * i for i in range(1, 9)]
+
+    sync_time, _ = sweep(Integrator(), "sync", lambdas)
+
+    integrator = Integrator(async_io=True, max_pending_writes=4)
+    async_time, total_time = sweep(integrator, "async", lambdas)
+
+    print(f"Sweep of {len(lambdas)} runs: synchronous saving {sync_time:.2f}s, "
+          f"background saving {async_time:.2f}s ({total_time:.2f}s until flushed).")
+
+    for lamb in lambdas:
+        out_dir = os.path.join(integrator.base_output_dir, f"async_{lamb}")
+        assert os.path.exists(os.path.join(out_dir, "run_info.json"))
+        assert integrator.catalog.query(output_dir=out_dir)
+
+    # errors of all failed background writes surface on the next call, and writes queued
+    # after a failure are still executed
+    integrator.io_args = {"bad_argument": True}
+    integrator.save_run(run=integrator.runs[-2], output_dir="async_error_1")
+    integrator.save_run(run=integrator.runs[-1], output_dir="async_error_2")
+
+    try:
+        integrator.flush()
+    except BackgroundWriteError as e:
+        print(f"Background writes failed as expected: {e}")
+        assert len(e.failures) == 2
+        assert all(isinstance(error, TypeError) for error in e.errors)
+        assert integrator.runs[-2]["run_id"] in str(e) and integrator.runs[-1]["run_id"] in str(e)
+    else:
+        raise AssertionError("The background write errors were not raised.")
+
+    # the checkpoint of a finished run is kept until its results are written
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": 0.5})
+    checkpoint = os.path.join(integrator.base_output_dir, "async.ckpt")
+
+    integrator.integrate_const(model=model,
+                               step_func=RungeKutta4(),
+                               initial_state=(0.0, y_0),
+                               h=0.001,
+                               max_steps=100,
+                               verbosity=40,
+                               output_dir="async_checkpointed",
+                               checkpoint_file="async.ckpt",
+                               checkpoint_interval=0.0)
+
+    try:
+        integrator.flush()
+    except BackgroundWriteError:
+        pass
+    else:
+        raise AssertionError("The background write error was not raised.")
+
+    assert os.path.exists(checkpoint)
+
+    integrator.io_args = {}
+    integrator.save_run(run=integrator.runs[-1], output_dir="async_checkpointed")
+    integrator.flush()
+
+    os.remove(checkpoint)
+    os.remove(checkpoint + ".rows")
+
+    integrator.integrate_const(model=model,
+                               step_func=RungeKutta4(),
+                               initial_state=(0.0, y_0),
+                               h=0.001,
+                               max_steps=100,
+                               verbosity=40,
+                               output_dir="async_checkpointed",
+                               checkpoint_file="async.ckpt",
+                               checkpoint_interval=0.0)
+    integrator.flush()
+
+    assert not os.path.exists(checkpoint)
+    integrator.save_run(run=integrator.runs[-1], output_dir="async_after_error")
+    integrator.close()
+
+    assert os.path.exists(os.path.join(integrator.base_output_dir, "async_after_error"))
+
+
+if __name__ == "__main__":
+    main()
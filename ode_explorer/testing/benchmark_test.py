@@ -0,0 +1,53 @@
+import os
+
+from ode_explorer.benchmarks import save_results, load_results, compare_results
+from ode_explorer.benchmarks.step_functions import run_suite
+
+
+def main():
+    results = run_suite(dims=[1, 10],
+                        rhs_costs=["cheap"],
+                        step_funcs=["RungeKutta4", "DOPRI45", "MultirateMethod"],
+                        repeat=1,
+                        steps_scale=0.1)
+
+    by_name = {r["name"]: r for r in results}
+
+    rk4 = by_name["RungeKutta4/constant/dim=10/cheap"]
+    assert rk4["rhs_calls"] == 4 * rk4["steps"]
+    assert rk4["steps_per_second"] > 0 and rk4["peak_memory"] > 0
+
+    assert "DOPRI45/adaptive/dim=1/cheap" in by_name
+    assert "skipped" in by_name["MultirateMethod/constant/dim=1/cheap"]
+
+    path = os.path.join(os.getcwd(), "benchmark.json")
+    save_results(results, path, suite="step_functions")
+    baseline = load_results(path)
+
+    # a 50% throughput drop is flagged, a 5% drop is not
+    current = load_results(path)
+    for result in current["results"]:
+        if result["name"] == rk4["name"]:
+            result["steps_per_second"] *= 0.5
+            result["rhs_calls_per_second"] *= 0.95
+
+    comparisons = compare_results(baseline, current, threshold=0.1)
+    regressions = {(c["name"], c["field"]) for c in comparisons if c["regression"]}
+
+    assert regressions == {(rk4["name"], "steps_per_second")}
+
+    # a benchmark failing or dropped in the current results is a regression
+    dopri = by_name["DOPRI45/adaptive/dim=1/cheap"]
+    current = load_results(path)
+    current["results"] = [{"name": r["name"], "skipped": "RuntimeError"}
+                          if r["name"] == rk4["name"] else r
+                          for r in current["results"] if r["name"] != dopri["name"]]
+
+    comparisons = compare_results(baseline, current, threshold=0.1)
+    regressed = {c["name"] for c in comparisons if c["regression"]}
+
+    assert regressed == {rk4["name"], dopri["name"]}
+
+
+if __name__ == "__main__":
+    main()
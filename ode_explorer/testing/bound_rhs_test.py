@@ -0,0 +1,76 @@
+import pickle
+
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel, HamiltonianSystem
+from ode_explorer.stepfunctions import RungeKutta4, EulerA
+from ode_explorer.utils.helpers import bind_args
+
+
+def decay(t: float, y, lamb: float = 0.5, offset: float = 0.0):
+    return - lamb * (y - offset)
+
+
+def decay_kwonly(t: float, y, *, lamb: float = 0.5):
+    return - lamb * y
+
+
+def hamiltonian(t: float, q, p, k: float = 1.0):
+    return 0.5 * (p ** 2 + k * q ** 2)
+
+
+def q_derivative(t: float, q, k: float = 1.0):
+    return k * q
+
+
+def p_derivative(t: float, p, k: float = 1.0):
+    return p
+
+
+class ShiftedModel(ODEModel):
+    def __call__(self, t, y):
+        return super(ShiftedModel, self).__call__(t, y) + 1.0
+
+
+def main():
+    # positional binding fills in the defaults of skipped arguments
+    assert bind_args(decay, {"offset": 1.0})(0.0, 3.0) == -1.0
+    assert bind_args(decay_kwonly, {"lamb": 2.0})(0.0, 3.0) == -6.0
+    assert bind_args(decay, {}) is decay
+
+    model = ODEModel(ode_fn=decay, fn_args={"lamb": 0.5})
+    assert model.rhs(0.0, 2.0) == model(0.0, 2.0) == -1.0
+
+    # the bound right-hand side is rebuilt on argument updates
+    model.update_args(lamb=2.0)
+    assert model.rhs(0.0, 2.0) == -4.0
+
+    # bound callables are rebuilt after unpickling, e.g. in worker processes
+    restored = pickle.loads(pickle.dumps(model))
+    assert restored.rhs(0.0, 2.0) == -4.0
+
+    # subclasses overriding the call operator are integrated through it
+    shifted = ShiftedModel(ode_fn=decay, fn_args={"lamb": 0.5})
+    assert shifted.rhs(0.0, 2.0) == 0.0
+
+    integrator = Integrator()
+    integrator.integrate_const(model=shifted, step_func=RungeKutta4(),
+                               initial_state=(0.0, 2.0), h=0.1, max_steps=10, verbosity=40)
+
+    # y = 2 is the fixed point of the shifted right-hand side
+    assert np.isclose(integrator.runs[-1]["result_data"][-1][1], 2.0)
+
+    # the Hamiltonian arguments are passed to its derivatives
+    system = HamiltonianSystem(hamiltonian=hamiltonian, q_derivative=q_derivative,
+                               p_derivative=p_derivative, h_args={"k": 4.0})
+
+    assert system(0.0, 1.0, 0.0) == 2.0
+    assert system.bound_q_derivative(0.0, 1.0) == 4.0
+
+    q_new, p_new = EulerA().forward(system, (0.0, 1.0, 0.0), h=0.1)[1:]
+    assert np.isclose(p_new, -0.4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import os
+from multiprocessing import Pool
+from typing import Union
+
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import RungeKutta4
+
+y_0 = 1.0
+lamb = 0.5
+num_runs = 20
+
+
+def ode_func(t: float, y: Union[float, np.ndarray], lamb: float = 0.5):
+    return - lamb * y
+
+
+def sweep(h: float):
+    # every worker writes its runs to the same output directory and catalog
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+
+    integrator = Integrator(base_output_dir=os.path.join(os.getcwd(), "catalog_results"))
+
+    for i in range(num_runs):
+        integrator.integrate_const(model=model,
+                                   step_func=RungeKutta4(),
+                                   initial_state=(0.0, y_0),
+                                   h=h,
+                                   max_steps=10,
+                                   verbosity=40,
+                                   output_dir=f"sweep_{h}_{i}")
+
+
+def main():
+    step_sizes = [0.1, 0.01, 0.001, 0.0001]
+
+    with Pool(len(step_sizes)) as pool:
+        pool.map(sweep, step_sizes)
+
+    integrator = Integrator(base_output_dir=os.path.join(os.getcwd(), "catalog_results"))
+
+    for h in step_sizes:
+        records = integrator.query_runs(h=h)
+        assert len(records) >= num_runs
+        assert all(r["output_dir"] for r in records)
+
+    latest = integrator.query_runs(limit=1)[0]
+    assert integrator.catalog.resolve(latest["run_id"][:8]) == latest["run_id"]
+
+    integrator.list_runs(limit=5)
+
+    # unsaved runs are only visible to the integrator that created them
+    num_saved = len(integrator.query_runs())
+    saved_id = integrator.query_runs(limit=1)[0]["run_id"]
+
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+    integrator.integrate_const(model=model,
+                               step_func=RungeKutta4(),
+                               initial_state=(0.0, y_0),
+                               h=0.1,
+                               max_steps=10,
+                               verbosity=40)
+
+    unsaved_id = integrator.runs[-1]["run_id"]
+    assert integrator.query_runs(limit=1)[0]["run_id"] == unsaved_id
+    assert integrator.get_run_by_id(unsaved_id[:8]) is integrator.runs[-1]
+
+    fresh = Integrator(base_output_dir=os.path.join(os.getcwd(), "catalog_results"))
+    assert len(fresh.query_runs()) == num_saved
+    assert fresh.get_run_by_id("latest")["run_id"] == saved_id
+
+
+if __name__ == "__main__":
+    main()
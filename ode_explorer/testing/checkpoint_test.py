@@ -0,0 +1,143 @@
+import os
+import tempfile
+from typing import Union
+
+import numpy as np
+
+from ode_explorer.callbacks import Callback
+from ode_explorer.constants import CheckpointKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.integrators.checkpoint import Checkpointer, load_checkpoint
+from ode_explorer.metrics import DistanceToSolution
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import AdamsBashforth2, DOPRI45, ForwardEulerMethod
+from ode_explorer.stepsize_control import DOPRI45Controller
+
+y_0 = np.ones(10)
+lamb = 0.5
+
+# toggled off to let the resumed run pass the crash point
+crash_enabled = True
+
+
+class Crash(Callback):
+    def __init__(self, at_step: int):
+        super(Crash, self).__init__()
+        self.at_step = at_step
+
+    def __call__(self, i, state, updated_state, model, local_vars):
+        if crash_enabled and i == self.at_step:
+            raise RuntimeError(f"Simulated crash at step {i}.")
+
+
+def ode_func(t: float, y: Union[float, np.ndarray], lamb: float = 0.5):
+    return - lamb * y
+
+
+def sol(t):
+    return np.exp(-lamb * t) * y_0
+
+
+def integrate(integrator, model, adaptive: bool, callbacks=None, checkpoint_file=None):
+    kwargs = dict(model=model,
+                  initial_state=(0.0, y_0),
+                  verbosity=40,
+                  callbacks=callbacks,
+                  metrics=[DistanceToSolution(solution=sol, name="l2_distance")],
+                  checkpoint_file=checkpoint_file,
+                  checkpoint_interval=0.0)
+
+    if adaptive:
+        integrator.integrate_adaptively(step_func=DOPRI45(),
+                                        sc=DOPRI45Controller(atol=1e-12, rtol=1e-12),
+                                        initial_h=0.001,
+                                        end=10.0,
+                                        **kwargs)
+    else:
+        integrator.integrate_const(step_func=AdamsBashforth2(startup=ForwardEulerMethod()),
+                                   h=0.001,
+                                   max_steps=2000,
+                                   **kwargs)
+
+
+def incremental_test():
+    # checkpoints only append the rows recorded since the previous checkpoint
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpointer = Checkpointer(path=os.path.join(tmp_dir, "run.ckpt"), interval=0.0)
+
+        run = {"result_data": [], "metrics": []}
+
+        sizes = []
+        for i in range(1, 5):
+            run["result_data"].extend((float(t), y_0) for t in range(1000))
+            run["metrics"].extend({"step": t} for t in range(1000))
+            checkpointer(i, run["result_data"][-1], 0.001, run, None, None, [], [], 10000)
+            sizes.append(os.path.getsize(checkpointer.rows_path))
+
+        assert np.allclose(np.diff(sizes), sizes[0], rtol=0.01)
+
+        # rows of an interrupted checkpoint are ignored
+        with open(checkpointer.rows_path, "ab") as f:
+            f.write(b"partial")
+
+        ckpt = load_checkpoint(checkpointer.path)
+        assert len(ckpt[CheckpointKeys.RUN]["result_data"]) == 4000
+        assert len(ckpt[CheckpointKeys.RUN]["metrics"]) == 4000
+
+        # a resumed run continues the row log, overwriting the interrupted rows
+        resumed = Checkpointer(path=checkpointer.path, interval=0.0)
+        resumed.continue_from(ckpt)
+
+        run = ckpt[CheckpointKeys.RUN]
+        run["result_data"].extend((float(t), y_0) for t in range(1000))
+        run["metrics"].extend({"step": t} for t in range(1000))
+        resumed(5, run["result_data"][-1], 0.001, run, None, None, [], [], 10000)
+
+        assert os.path.getsize(resumed.rows_path) - sizes[-1] < 1.01 * sizes[0]
+
+        ckpt = load_checkpoint(checkpointer.path)
+        assert len(ckpt[CheckpointKeys.RUN]["result_data"]) == 5000
+        assert ckpt[CheckpointKeys.RUN]["metrics"][-1] == {"step": 999}
+
+
+def main():
+    global crash_enabled
+
+    incremental_test()
+
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+
+    for result_storage in ["memory", "memmap"]:
+        for adaptive in [False, True]:
+            crash_enabled = True
+
+            integrator = Integrator(result_storage=result_storage)
+
+            integrate(integrator, model, adaptive)
+            expected = integrator.return_result_data(run_id="latest")
+            expected_metrics = integrator.return_metrics(run_id="latest")
+
+            try:
+                integrate(integrator, model, adaptive, callbacks=[Crash(at_step=100)],
+                          checkpoint_file="run.ckpt")
+            except RuntimeError as e:
+                print(e)
+
+            assert os.path.exists(os.path.join(integrator.base_output_dir, "run.ckpt"))
+
+            crash_enabled = False
+
+            # resume in a fresh integrator, as after a restart
+            resumed = Integrator(result_storage=result_storage)
+            resumed.resume(checkpoint="run.ckpt", model=model, verbosity=40)
+
+            result = resumed.return_result_data(run_id="latest")
+            metrics = resumed.return_metrics(run_id="latest")
+
+            assert np.array_equal(result.values, expected.values)
+            assert np.array_equal(metrics.values, expected_metrics.values)
+            assert not os.path.exists(os.path.join(resumed.base_output_dir, "run.ckpt"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import json
+import os
+
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import RungeKutta4
+
+# damped oscillators with different frequencies
+frequencies = np.arange(1, 6, dtype=float)
+y_0 = np.concatenate([np.ones(5), np.zeros(5)])
+
+
+def ode_func(t: float, y: np.ndarray, damping: float = 0.1):
+    x, v = y[:5], y[5:]
+    return np.concatenate([v, - frequencies ** 2 * x - damping * v])
+
+
+def file_size(integrator: Integrator, output_dir: str):
+    with open(os.path.join(integrator.base_output_dir, output_dir, "run_info.json")) as f:
+        result_file = json.load(f)["storage"]["file"]
+    return os.path.getsize(os.path.join(integrator.base_output_dir, output_dir, result_file))
+
+
+def main():
+    model = ODEModel(ode_fn=ode_func, fn_args={"damping": 0.1})
+
+    integrator = Integrator()
+
+    integrator.integrate_const(model=model,
+                               step_func=RungeKutta4(),
+                               initial_state=(0.0, y_0),
+                               h=0.001,
+                               max_steps=50000,
+                               verbosity=40,
+                               output_dir="compression_csv")
+
+    expected = integrator.return_result_data(run_id="latest").values
+    run = integrator.runs[-1]
+
+    csv_size = file_size(integrator, "compression_csv")
+
+    for io_args, max_error in [({"mode": "lossless", "codec": "zlib"}, 0.0),
+                               ({"mode": "lossless", "codec": "lzma"}, 0.0),
+                               ({"mode": "float32"}, 1e-6),
+                               ({"mode": "drop", "tol": 1e-6}, 1e-6),
+                               ({"mode": "drop", "tol": 1e-4, "codec": "lzma"}, 1e-4)]:
+        compressor = Integrator(output_format="compressed", io_args=io_args)
+
+        output_dir = "compression_" + "_".join(str(v) for v in io_args.values())
+        compressor.save_run(run=run, output_dir=output_dir)
+
+        loaded = Integrator().load_run(path=output_dir)
+        result = Integrator().return_result_data(run_id=loaded["run_id"]).values
+
+        error = np.max(np.abs(result - expected))
+        ratio = csv_size / file_size(compressor, output_dir)
+
+        print(f"{io_args}: {ratio:.1f}x smaller than CSV, max error {error:.2e}")
+
+        assert loaded["storage"]["options"]["mode"] == io_args["mode"]
+        assert error <= max_error
+        # the time column is always stored losslessly
+        assert np.array_equal(result[:, 0], expected[:, 0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import copy
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from ode_explorer.utils.data_utils import convert_to_dict, initialize_dim_names, \
+    result_to_dataframe
+
+variable_names = ["t", "y"]
+
+
+def make_result(num_states: int, dim: int):
+    y = np.random.randn(num_states, dim)
+    return [(0.001 * i, y[i]) for i in range(num_states)]
+
+
+def export_rowwise(result_data, model_metadata):
+    # export as done before, one dict per state
+    run_result = copy.deepcopy(result_data)
+
+    dim_names = initialize_dim_names(variable_names, run_result[0])
+
+    for i, res in enumerate(run_result):
+        run_result[i] = convert_to_dict(res, model_metadata=model_metadata,
+                                        dim_names=dim_names)
+
+    return pd.DataFrame(run_result)
+
+
+def main():
+    model_metadata = {"variable_names": variable_names, "dim_names": None}
+
+    for num_states, dim in [(100000, 1), (100000, 10), (1000000, 10)]:
+        result_data = make_result(num_states, dim)
+
+        number = 1 if num_states > 100000 else 3
+
+        rowwise = timeit.timeit(lambda: export_rowwise(result_data, model_metadata),
+                                number=number) / number
+        columnar = timeit.timeit(lambda: result_to_dataframe(result_data, model_metadata),
+                                 number=number) / number
+
+        df_old = export_rowwise(result_data, model_metadata)
+        df_new = result_to_dataframe(result_data, model_metadata)
+
+        assert list(df_old.columns) == list(df_new.columns)
+        assert np.array_equal(df_old.values, df_new.values)
+
+        print(f"{num_states} states, {dim} dims: row-wise {rowwise:.3f}s, "
+              f"columnar {columnar:.3f}s, speedup {rowwise / columnar:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.metrics import DistanceToSolution
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import IMEXEuler, ARS222, ARS343, ARK3, ARK4, ARK5
+
+y_0_scalar = 1.0
+y_0_vec = np.ones(10)
+
+
+def explicit_func(t: float, y, stiffness: float = 1000.0):
+    return - np.sin(t) * np.ones_like(y)
+
+
+def implicit_func(t: float, y, stiffness: float = 1000.0):
+    # stiff relaxation towards the slow manifold y = cos(t)
+    return - stiffness * (y - np.cos(t))
+
+
+def sol_scalar(t):
+    return np.cos(t)
+
+
+def sol_vec(t):
+    return np.cos(t) * y_0_vec
+
+
+def order_test():
+    # mildly stiff, so that the order is not reduced, with a transient off the slow manifold
+    stiffness = 1.0
+
+    model = ODEModel(explicit_fn=explicit_func, implicit_fn=implicit_func,
+                     fn_args={"stiffness": stiffness})
+
+    integrator = Integrator()
+
+    exact = np.cos(1.0) + np.exp(-stiffness)
+
+    for step_func in [IMEXEuler(), ARS222(), ARS343(), ARK3(), ARK4(), ARK5()]:
+        errors = []
+        for h in [0.05, 0.025]:
+            integrator.integrate_const(model=model,
+                                       step_func=step_func,
+                                       initial_state=(0.0, 2.0),
+                                       h=h,
+                                       max_steps=int(round(1.0 / h)),
+                                       verbosity=1)
+
+            result = integrator.return_result_data(run_id="latest").values[-1]
+            errors.append(abs(result[1] - exact))
+
+        observed_order = np.log2(errors[0] / errors[1])
+
+        print(f"{step_func.__class__.__name__}: errors {errors}, "
+              f"observed order {observed_order:.2f}")
+
+        assert abs(observed_order - step_func.order) < 0.3
+
+
+def main():
+    t_0 = 0.0
+
+    model = ODEModel(explicit_fn=explicit_func, implicit_fn=implicit_func,
+                     fn_args={"stiffness": 1000.0})
+
+    integrator = Integrator()
+
+    step_funcs = [IMEXEuler(), ARS222(), ARS343(), ARK3(), ARK4(), ARK5()]
+
+    for initial in [(y_0_scalar, sol_scalar), (y_0_vec, sol_vec)]:
+        initial_y, sol = initial
+        initial_state = (t_0, initial_y)
+
+        for step_func in step_funcs:
+            # a step size far beyond the explicit stability limit of 2 / stiffness
+            integrator.integrate_const(model=model,
+                                       step_func=step_func,
+                                       initial_state=initial_state,
+                                       h=0.05,
+                                       max_steps=100,
+                                       verbosity=1,
+                                       metrics=[DistanceToSolution(solution=sol, name="l2_distance")])
+
+            metrics = integrator.return_metrics(run_id="latest")
+
+            print(step_func.__class__.__name__, metrics["l2_distance"].max())
+
+            assert metrics["l2_distance"].max() < 1e-2
+
+    order_test()
+
+
+if __name__ == "__main__":
+    main()
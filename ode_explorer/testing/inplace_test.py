@@ -0,0 +1,88 @@
+import tracemalloc
+
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import RungeKutta4, DOPRI45, ExplicitRungeKuttaMethod
+from ode_explorer.stepsize_control import DOPRI45Controller
+from ode_explorer.utils.profiling import CountingModel, PerformanceCounters
+
+
+def oscillator(t: float, y: np.ndarray, omega: float = 2.0):
+    return np.concatenate([y[len(y) // 2:], -omega ** 2 * y[:len(y) // 2]])
+
+
+def oscillator_inplace(t: float, y: np.ndarray, out: np.ndarray, omega: float = 2.0):
+    half = len(y) // 2
+    out[:half] = y[half:]
+    np.multiply(y[:half], -omega ** 2, out=out[half:])
+
+
+def kutta3():
+    return ExplicitRungeKuttaMethod(alphas=np.array([0.0, 0.5, 1.0]),
+                                    betas=np.array([[0.0, 0.0, 0.0],
+                                                    [0.5, 0.0, 0.0],
+                                                    [-1.0, 2.0, 0.0]]),
+                                    gammas=np.array([1.0, 4.0, 1.0]) / 6,
+                                    order=3)
+
+
+def main():
+    y_0 = np.concatenate([np.ones(50), np.zeros(50)])
+
+    model = ODEModel(ode_fn=oscillator, fn_args={"omega": 2.0})
+    inplace = ODEModel(ode_fn=oscillator_inplace, fn_args={"omega": 2.0}, inplace=True)
+
+    assert model.rhs_into is None
+    assert np.array_equal(inplace.rhs(0.0, y_0), model.rhs(0.0, y_0))
+
+    # in-place kernels give the same states as the allocating ones
+    for step_func in [RungeKutta4(), kutta3(), DOPRI45()]:
+        expected = step_func.forward(model, (0.0, y_0), 0.01)
+        actual = step_func.forward(inplace, (0.0, y_0), 0.01)
+
+        if isinstance(step_func, DOPRI45):
+            expected, actual = expected[1], actual[1]
+
+        assert np.allclose(expected[1], actual[1], rtol=1e-14), step_func
+
+    integrator = Integrator(in_memory=True)
+
+    final_states = []
+    for m in [model, inplace]:
+        integrator.integrate_adaptively(model=m, step_func=DOPRI45(), initial_state=(0.0, y_0),
+                                        sc=DOPRI45Controller(atol=1e-8), initial_h=0.01,
+                                        end=1.0, max_steps=1000, verbosity=40)
+        final_states.append(integrator.runs[-1]["result_data"][-1])
+
+    # the step size control sees the same error estimates, x(t) = cos(omega * t)
+    (t, y), (t_inplace, y_inplace) = final_states
+    assert t == t_inplace and np.allclose(y, y_inplace, rtol=1e-14)
+    assert np.allclose(y_inplace[:50], np.cos(2.0 * t_inplace), atol=1e-4)
+
+    integrator.close()
+
+    # at steady state, an in-place step only allocates the new state
+    dim = 10 ** 6
+    y = np.ones(dim)
+    state_bytes = y.nbytes
+
+    for m in [model, inplace]:
+        counting_model = CountingModel(m, PerformanceCounters())
+        step_func = RungeKutta4()
+        state = step_func.forward(counting_model, (0.0, y), 1e-3)
+
+        tracemalloc.start()
+        state = step_func.forward(counting_model, state, 1e-3)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if m is inplace:
+            assert peak < 1.5 * state_bytes, peak / state_bytes
+        else:
+            assert peak > 2.0 * state_bytes, peak / state_bytes
+
+
+if __name__ == "__main__":
+    main()
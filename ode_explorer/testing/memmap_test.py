@@ -0,0 +1,90 @@
+import os
+import tracemalloc
+from typing import Union, Text
+
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel, HamiltonianSystem
+from ode_explorer.stepfunctions import RungeKutta4, EulerA
+
+y_0 = np.ones(100)
+lamb = 0.5
+
+
+def ode_func(t: float, y: Union[float, np.ndarray], lamb: float = 0.5):
+    return - lamb * y
+
+
+def hamiltonian(t: float, q: np.ndarray, p: np.ndarray, m: float = 1.0) -> float:
+    return np.dot(p, p) / (2 * m)
+
+
+def q_derivative(t: float, q: np.ndarray, m: float = 1.0):
+    return np.zeros_like(q)
+
+
+def p_derivative(t: float, p: np.ndarray, m: float = 1.0):
+    return p / m
+
+
+def integrate(result_storage: Text, model, step_func, initial_state, max_steps: int):
+    integrator = Integrator(result_storage=result_storage, memmap_chunk_size=1000)
+
+    tracemalloc.start()
+    integrator.integrate_const(model=model,
+                               step_func=step_func,
+                               initial_state=initial_state,
+                               h=0.001,
+                               max_steps=max_steps,
+                               verbosity=40)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return integrator, peak
+
+
+def main():
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+
+    initial_state = (0.0, y_0)
+
+    in_memory, memory_peak = integrate("memory", model, RungeKutta4(), initial_state, 20000)
+    memmapped, memmap_peak = integrate("memmap", model, RungeKutta4(), initial_state, 20000)
+
+    expected = in_memory.return_result_data(run_id="latest")
+    result = memmapped.return_result_data(run_id="latest")
+
+    assert np.array_equal(result.values, expected.values)
+    assert list(result.columns) == list(expected.columns)
+
+    run = memmapped.runs[-1]
+    assert os.path.exists(run["result_data"].path)
+    assert os.path.getsize(run["result_data"].path) == expected.values.nbytes
+
+    print(f"Peak traced memory: in memory {memory_peak / 1e6:.1f} MB, "
+          f"memory-mapped {memmap_peak / 1e6:.1f} MB.")
+
+    # saving a memory-mapped run with several vector variables
+    hamiltonian_system = HamiltonianSystem(hamiltonian=hamiltonian,
+                                           q_derivative=q_derivative,
+                                           p_derivative=p_derivative)
+
+    memmapped.integrate_const(model=hamiltonian_system,
+                              step_func=EulerA(),
+                              initial_state=(0.0, np.zeros(2), np.ones(2)),
+                              h=0.01,
+                              max_steps=2500,
+                              verbosity=40,
+                              output_dir="memmap_hamiltonian")
+
+    t, q, p = memmapped.runs[-1]["result_data"][-1]
+    assert isinstance(t, float) and q.shape == p.shape == (2,)
+
+    path = memmapped.runs[-1]["result_data"].path
+    memmapped._reset()
+    assert not os.path.exists(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import logging
+import tracemalloc
+
+import numpy as np
+
+from ode_explorer.benchmarks.memory import run_memory_benchmark
+from ode_explorer.constants import PerformanceKeys, RunKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import ForwardEulerMethod
+from ode_explorer.utils.profiling import PerformanceCounters, tracing_memory
+
+
+def ode_func(t: float, y: np.ndarray, lamb: float = 0.5):
+    return - lamb * y
+
+
+def main():
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": 0.5})
+
+    # memory is only traced on request
+    for trace_memory in [False, True]:
+        integrator = Integrator(trace_memory=trace_memory)
+
+        integrator.integrate_const(model=model,
+                                   step_func=ForwardEulerMethod(),
+                                   initial_state=(0.0, np.ones(100)),
+                                   h=0.001,
+                                   max_steps=1000,
+                                   verbosity=logging.ERROR)
+
+        performance = integrator.runs[-1][RunKeys.PERFORMANCE]
+
+        for key in [PerformanceKeys.PEAK_MEMORY, PerformanceKeys.RETAINED_MEMORY]:
+            assert (key in performance) == trace_memory
+
+        integrator.close()
+
+    # the run retains at least its trajectory, and never more than its peak
+    assert performance[PerformanceKeys.RETAINED_MEMORY] >= 1000 * 101 * 8
+    assert performance[PerformanceKeys.PEAK_MEMORY] >= \
+        performance[PerformanceKeys.RETAINED_MEMORY]
+
+    # tracing started by the caller, also without tracemalloc.reset_peak before Python 3.9
+    reset_peak = getattr(tracemalloc, "reset_peak", None)
+    tracemalloc.start()
+    try:
+        for has_reset_peak in [True, False]:
+            if not has_reset_peak and reset_peak is not None:
+                del tracemalloc.reset_peak
+
+            # an earlier, larger peak must not be attributed to the traced block
+            np.ones(10 ** 6).sum()
+
+            counters = PerformanceCounters()
+            with tracing_memory(counters):
+                block = np.ones(1000)
+
+            assert tracemalloc.is_tracing()
+            assert block.nbytes <= counters.retained_memory <= counters.peak_memory < 10 ** 6
+
+            del block
+    finally:
+        if reset_peak is not None:
+            tracemalloc.reset_peak = reset_peak
+        tracemalloc.stop()
+
+    results = run_memory_benchmark(steps=[1000], dims=[100])
+    retained = {r["storage"]: r["retained_memory"] for r in results}
+
+    # memory-mapped result data is not held in memory
+    assert retained["memmap"] < retained["memory"]
+    assert all(r["bytes_per_state"] > 0 for r in results)
+
+
+if __name__ == "__main__":
+    main()
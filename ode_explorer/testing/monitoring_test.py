@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+import urllib.request
+from typing import Union
+
+import numpy as np
+
+from ode_explorer.callbacks import Callback
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import RungeKutta4
+from ode_explorer.utils.monitoring import MetricsExporter
+
+y_0 = np.ones(10)
+lamb = 0.5
+
+# released by the main thread after scraping the running integration
+release = threading.Event()
+
+
+class Pause(Callback):
+    def __init__(self, at_step: int):
+        super(Pause, self).__init__()
+        self.at_step = at_step
+
+    def __call__(self, i, state, updated_state, model, local_vars):
+        if i == self.at_step:
+            release.wait(timeout=30)
+
+
+def ode_func(t: float, y: Union[float, np.ndarray], lamb: float = 0.5):
+    return - lamb * y
+
+
+def parse(text: str):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def scrape(port: int):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        return parse(response.read().decode("utf-8"))
+
+
+def main():
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+
+    snapshot_file = os.path.join(os.getcwd(), "metrics.prom")
+
+    exporter = MetricsExporter(port=0, snapshot_file=snapshot_file, snapshot_interval=0.1)
+
+    integrator = Integrator(exporter=exporter)
+
+    thread = threading.Thread(target=integrator.integrate_const,
+                              kwargs=dict(model=model,
+                                          step_func=RungeKutta4(),
+                                          initial_state=(0.0, y_0),
+                                          h=0.001,
+                                          max_steps=1000,
+                                          verbosity=40,
+                                          callbacks=[Pause(at_step=500)]))
+    thread.start()
+
+    # wait for the integration to reach the pause
+    for _ in range(100):
+        samples = scrape(exporter.port)
+        if samples.get("ode_explorer_rhs_calls_total", 0) >= 2000:
+            break
+        time.sleep(0.05)
+
+    print({k: v for k, v in samples.items() if "run_" in k})
+
+    assert samples["ode_explorer_runs_active"] == 1
+    assert samples["ode_explorer_rhs_calls_total"] == 2000
+    assert np.isclose([v for k, v in samples.items()
+                       if k.startswith("ode_explorer_run_progress_ratio")][0], 0.5, atol=1e-2)
+    assert [v for k, v in samples.items()
+            if k.startswith("ode_explorer_run_steps_per_second")][0] > 0
+    assert samples["ode_explorer_process_resident_memory_bytes"] > 0
+
+    release.set()
+    thread.join()
+
+    samples = scrape(exporter.port)
+
+    assert samples["ode_explorer_runs_active"] == 0
+    assert samples["ode_explorer_runs_completed_total"] == 1
+    assert samples["ode_explorer_rhs_calls_total"] == 4000
+    assert samples['ode_explorer_steps_total{result="accepted"}'] == 1000
+
+    exporter.close()
+
+    with open(snapshot_file) as f:
+        assert parse(f.read())["ode_explorer_runs_completed_total"] == 1
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import MultirateModel
+from ode_explorer.stepfunctions import RungeKutta4, MultirateMethod
+
+y_0 = np.array([1.0, 0.0, 0.5])
+
+
+def slow_func(t: float, y: np.ndarray, k: float = 0.1):
+    # two slowly decaying components, weakly driven by the fast one
+    return np.array([-k * y[0] + 0.01 * y[2], -k * y[1] + 0.05 * y[0]])
+
+
+def fast_func(t: float, y: np.ndarray, k: float = 0.1):
+    # fast relaxation towards the first slow component
+    return np.array([-50.0 * (y[2] - y[0])])
+
+
+def oscillator_slow(t: float, y: np.ndarray):
+    # harmonic oscillator, position as slow and velocity as fast component
+    return np.array([y[1]])
+
+
+def oscillator_fast(t: float, y: np.ndarray):
+    return np.array([-y[0]])
+
+
+def order_test():
+    model = MultirateModel(slow_fn=oscillator_slow, fast_fn=oscillator_fast,
+                           slow_idx=[0], fast_idx=[1])
+
+    integrator = Integrator()
+
+    step_func = MultirateMethod(slow_step=RungeKutta4(), fast_step=RungeKutta4(),
+                                num_substeps=10)
+
+    # the coupling keeps the order of the slow and fast step functions
+    assert step_func.order == 4
+
+    errors = []
+    for h in [0.05, 0.025]:
+        integrator.integrate_const(model=model,
+                                   step_func=step_func,
+                                   initial_state=(0.0, np.array([1.0, 0.0])),
+                                   h=h,
+                                   max_steps=int(round(1.0 / h)),
+                                   verbosity=1)
+
+        result = integrator.return_result_data(run_id="latest").values[-1]
+        errors.append(np.max(np.abs(result[1:] - np.array([np.cos(1.0), -np.sin(1.0)]))))
+
+    observed_order = np.log2(errors[0] / errors[1])
+
+    print(f"MultirateMethod: errors {errors}, observed order {observed_order:.2f}")
+
+    assert abs(observed_order - step_func.order) < 0.3
+
+
+def main():
+    t_0 = 0.0
+
+    model = MultirateModel(slow_fn=slow_func, fast_fn=fast_func,
+                           slow_idx=[0, 1], fast_idx=[2])
+
+    initial_state = (t_0, y_0)
+
+    integrator = Integrator()
+
+    integrator.integrate_const(model=model,
+                               step_func=RungeKutta4(),
+                               initial_state=initial_state,
+                               h=0.001,
+                               max_steps=5000,
+                               verbosity=1)
+
+    single_rate = integrator.return_result_data(run_id="latest")
+    single_rate_slow_evals = model.num_slow_evals
+
+    model.reset_counters()
+
+    integrator.integrate_const(model=model,
+                               step_func=MultirateMethod(slow_step=RungeKutta4(),
+                                                         fast_step=RungeKutta4(),
+                                                         num_substeps=20),
+                               initial_state=initial_state,
+                               h=0.02,
+                               max_steps=250,
+                               verbosity=1)
+
+    multirate = integrator.return_result_data(run_id="latest")
+
+    print(f"Slow RHS evaluations: single rate {single_rate_slow_evals}, "
+          f"multirate {model.num_slow_evals}")
+
+    error = np.max(np.abs(multirate.values[-1] - single_rate.values[-1]))
+    print(f"Maximal deviation at the end point: {error:.3e}")
+
+    assert model.num_slow_evals * 10 <= single_rate_slow_evals
+    assert error < 1e-3
+
+    order_test()
+
+
+if __name__ == "__main__":
+    main()
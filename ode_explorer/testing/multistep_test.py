@@ -0,0 +1,114 @@
+import numpy as np
+from scipy.optimize import root
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import AdamsBashforth2, BDF2, RungeKutta4, DOPRI45, \
+    ExplicitMultiStepMethod
+from ode_explorer.utils.profiling import CountingModel, PerformanceCounters
+
+NUM_STEPS = 50
+H = 0.01
+
+
+def oscillator(t: float, y, omega: float = 2.0):
+    # scalar states decay instead
+    if np.ndim(y) == 0:
+        return - omega * y
+    return np.concatenate([y[len(y) // 2:], -omega ** 2 * y[:len(y) // 2]])
+
+
+def adams_bashforth4():
+    return ExplicitMultiStepMethod(startup=None,
+                                   a_coeffs=np.ones(1),
+                                   b_coeffs=np.array([55, -59, 37, -9]) / 24,
+                                   order=4)
+
+
+def startup_values(model, y_0, depth):
+    states = [(0.0, y_0)]
+    for _ in range(depth - 1):
+        states.append(RungeKutta4().forward(model, states[-1], H))
+    return states
+
+
+def reference_explicit(model, y_0, b_coeffs):
+    # history shifted as a list, b_coeffs are ordered newest first
+    states = startup_values(model, y_0, len(b_coeffs))
+    fs = [model.rhs(t, y) for t, y in states]
+
+    while len(states) <= NUM_STEPS:
+        t, y = states[-1]
+        y_new = y + H * sum(c * f for c, f in zip(b_coeffs, reversed(fs[-len(b_coeffs):])))
+        states.append((t + H, y_new))
+        fs.append(model.rhs(t + H, y_new))
+
+    return states[-1][1]
+
+
+def reference_bdf2(model, y_0):
+    states = startup_values(model, y_0, 2)
+
+    while len(states) <= NUM_STEPS:
+        (_, y_old), (t, y) = states[-2:]
+
+        def F(x):
+            return x - 4 / 3 * y + 1 / 3 * y_old - 2 / 3 * H * model.rhs(t + H, x)
+
+        y_new = root(F, x0=y).x
+        states.append((t + H, y_new.item() if np.ndim(y) == 0 else y_new))
+
+    return states[-1][1]
+
+
+def main():
+    model = ODEModel(ode_fn=oscillator, fn_args={"omega": 2.0})
+    integrator = Integrator(in_memory=True)
+
+    cases = [(lambda: AdamsBashforth2(startup=RungeKutta4()),
+              lambda y_0: reference_explicit(model, y_0, [1.5, -0.5])),
+             (adams_bashforth4,
+              lambda y_0: reference_explicit(model, y_0, [55 / 24, -59 / 24, 37 / 24, -9 / 24])),
+             (lambda: BDF2(startup=RungeKutta4()),
+              lambda y_0: reference_bdf2(model, y_0))]
+
+    # the ring buffer histories give the same states as a shifted history,
+    # for scalar and vector states and histories deeper than two steps
+    for y_0 in [1.0, np.concatenate([np.ones(3), np.zeros(3)])]:
+        for make_step_func, reference in cases:
+            step_func = make_step_func()
+
+            integrator.integrate_const(model=model, step_func=step_func,
+                                       initial_state=(0.0, y_0), h=H, max_steps=NUM_STEPS,
+                                       verbosity=40)
+
+            y_final = integrator.runs[-1]["result_data"][-1][1]
+
+            assert np.shape(y_final) == np.shape(y_0)
+            assert np.allclose(y_final, reference(y_0), rtol=1e-10), step_func
+
+            # the history is restarted for the next run
+            step_func.reset()
+
+    integrator.close()
+
+    # the startup reuses the right-hand side at the previous state as its first stage, and
+    # the last stage of first same as last methods as the right-hand side at the new state
+    startup_calls = [(AdamsBashforth2(startup=RungeKutta4()), 1 + 3 + 1),
+                     (AdamsBashforth2(startup=DOPRI45()), 1 + 6),
+                     (adams_bashforth4(), 1 + 3 * (3 + 1)),
+                     (BDF2(startup=RungeKutta4()), 1 + 3)]
+
+    for step_func, expected_calls in startup_calls:
+        counters = PerformanceCounters()
+        step_func.forward(CountingModel(model, counters), (0.0, np.ones(4)), H)
+
+        assert counters.rhs_calls == expected_calls, (step_func, counters.rhs_calls)
+
+    # without a startup method, a Runge-Kutta method of the same order is used
+    for step_func in [AdamsBashforth2(), BDF2(), adams_bashforth4()]:
+        assert step_func.startup.order == step_func.order
+
+
+if __name__ == "__main__":
+    main()
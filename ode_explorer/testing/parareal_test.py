@@ -0,0 +1,71 @@
+import os
+from typing import Union
+
+import numpy as np
+
+from ode_explorer.constants import RunKeys, PararealKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import ForwardEulerMethod, RungeKutta4
+
+y_0 = np.ones(10)
+lamb = 0.5
+
+
+def ode_func(t: float, y: Union[float, np.ndarray], lamb: float = 0.5):
+    return - lamb * y
+
+
+def main():
+    t_0 = 0.0
+
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+
+    initial_state = (t_0, y_0)
+
+    integrator = Integrator()
+
+    integrator.integrate_const(model=model,
+                               step_func=RungeKutta4(),
+                               initial_state=initial_state,
+                               h=0.001,
+                               max_steps=8000,
+                               verbosity=1)
+
+    serial = integrator.return_result_data(run_id="latest")
+
+    integrator.integrate_parareal(model=model,
+                                  coarse_step_func=ForwardEulerMethod(),
+                                  fine_step_func=RungeKutta4(),
+                                  initial_state=initial_state,
+                                  num_slices=8,
+                                  h=0.001,
+                                  max_steps=8000,
+                                  coarse_steps_per_slice=10,
+                                  tol=1e-10,
+                                  num_workers=4,
+                                  verbosity=1)
+
+    parallel = integrator.return_result_data(run_id="latest")
+
+    info = integrator.get_run_by_id(run_id="latest")[RunKeys.PARAREAL_INFO]
+
+    print(info)
+
+    assert info[PararealKeys.CONVERGED]
+    assert info[PararealKeys.ITERATIONS] < 8
+    assert len(parallel) == len(serial)
+    assert np.allclose(parallel.values, serial.values, atol=1e-9)
+
+    # the fine work of all iterations includes the first, serial-equivalent sweep, and the
+    # workers cannot do more work than the available cores in the wall time
+    num_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    wall_time = info[PararealKeys.WALL_TIME]
+
+    assert 0 < info[PararealKeys.SERIAL_TIME] <= info[PararealKeys.FINE_TIME]
+    assert info[PararealKeys.FINE_TIME] <= 1.1 * min(4, num_cpus) * wall_time
+    assert np.isclose(info[PararealKeys.SPEEDUP], info[PararealKeys.SERIAL_TIME] / wall_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from typing import Union
+
+import numpy as np
+
+from ode_explorer.constants import PerformanceKeys, RunKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.metrics import DistanceToSolution
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import ForwardEulerMethod, RungeKutta4, BackwardEulerMethod, \
+    DOPRI45
+from ode_explorer.stepsize_control import DOPRI45Controller
+
+y_0 = np.ones(10)
+lamb = 0.5
+
+num_steps = 1000
+
+
+def ode_func(t: float, y: Union[float, np.ndarray], lamb: float = 0.5):
+    return - lamb * y
+
+
+def sol(t):
+    return np.exp(-lamb * t) * y_0
+
+
+def main():
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+
+    integrator = Integrator()
+
+    # right-hand side evaluations per step of explicit methods
+    for step_func, evals_per_step in [(ForwardEulerMethod(), 1), (RungeKutta4(), 4)]:
+        integrator.integrate_const(model=model,
+                                   step_func=step_func,
+                                   initial_state=(0.0, y_0),
+                                   h=0.001,
+                                   max_steps=num_steps,
+                                   verbosity=40,
+                                   metrics=[DistanceToSolution(solution=sol, name="l2")])
+
+        performance = integrator.runs[-1][RunKeys.PERFORMANCE]
+
+        assert performance[PerformanceKeys.RHS_CALLS] == evals_per_step * num_steps
+        assert performance[PerformanceKeys.ACCEPTED_STEPS] == num_steps
+        assert performance[PerformanceKeys.REJECTED_STEPS] == 0
+        assert performance[PerformanceKeys.NONLINEAR_SOLVES] == 0
+
+    # implicit methods solve one non-linear system per step
+    integrator.integrate_const(model=model,
+                               step_func=BackwardEulerMethod(),
+                               initial_state=(0.0, y_0),
+                               h=0.001,
+                               max_steps=num_steps,
+                               verbosity=40)
+
+    performance = integrator.runs[-1][RunKeys.PERFORMANCE]
+
+    assert performance[PerformanceKeys.NONLINEAR_SOLVES] == num_steps
+    assert performance[PerformanceKeys.RHS_CALLS] > num_steps
+
+    # adaptive runs count rejected steps
+    integrator.integrate_adaptively(model=model,
+                                    step_func=DOPRI45(),
+                                    sc=DOPRI45Controller(atol=1e-9),
+                                    initial_state=(0.0, y_0),
+                                    initial_h=5.0,
+                                    end=10.0,
+                                    verbosity=40)
+
+    run = integrator.runs[-1]
+    performance = run[RunKeys.PERFORMANCE]
+
+    rejected = sum(m["rejected"] for m in run[RunKeys.METRICS])
+
+    assert performance[PerformanceKeys.REJECTED_STEPS] == rejected > 0
+    assert performance[PerformanceKeys.ACCEPTED_STEPS] == len(run[RunKeys.RESULT_DATA]) - 1
+
+    # the time breakdown adds up to the total time
+    total = sum(performance[k] for k in [PerformanceKeys.RHS_TIME,
+                                         PerformanceKeys.STEP_FUNC_TIME,
+                                         PerformanceKeys.CALLBACK_TIME,
+                                         PerformanceKeys.BOOKKEEPING_TIME])
+
+    assert np.isclose(total, performance[PerformanceKeys.TOTAL_TIME])
+
+    integrator.list_runs()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import os
+import tempfile
+
+import numpy as np
+
+from ode_explorer.constants import RunKeys, RunConfigKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel, SensitivityModel
+from ode_explorer.stepfunctions import RungeKutta4, DOPRI45, BackwardEulerMethod
+from ode_explorer.stepsize_control import DOPRI45Controller
+
+H = 0.01
+NUM_STEPS = 100
+
+
+def decay(t: float, y: float, lamb: float = 0.5):
+    return - lamb * y
+
+
+def decay_jac(t: float, y: float, lamb: float = 0.5):
+    return np.array([[-lamb]])
+
+
+def lotka_volterra(t: float, y: np.ndarray, a: float = 1.0, b: np.ndarray = None,
+                   c: float = 0.8):
+    x, z = y
+    return np.array([a * x - b[0] * x * z, -c * z + b[1] * x * z])
+
+
+def lotka_volterra_jac(t: float, y: np.ndarray, a: float = 1.0, b: np.ndarray = None,
+                       c: float = 0.8):
+    x, z = y
+    return np.array([[a - b[0] * z, -b[0] * x],
+                     [b[1] * z, -c + b[1] * x]])
+
+
+def lotka_volterra_param_jac(t: float, y: np.ndarray, a: float = 1.0, b: np.ndarray = None,
+                             c: float = 0.8):
+    # columns a, b_1, b_2, c
+    x, z = y
+    return np.array([[x, -x * z, 0.0, 0.0],
+                     [0.0, 0.0, x * z, -z]])
+
+
+def lotka_volterra_model(jac: bool = False, **fn_args):
+    args = {"a": 1.0, "b": np.array([0.5, 0.4]), "c": 0.8}
+    args.update(fn_args)
+    return ODEModel(ode_fn=lotka_volterra, fn_args=args,
+                    jac_fn=lotka_volterra_jac if jac else None)
+
+
+def final_state(integrator, model, step_func, initial_state):
+    integrator.integrate_const(model=model, step_func=step_func, initial_state=initial_state,
+                               h=H, max_steps=NUM_STEPS, verbosity=40)
+    return integrator.runs[-1][RunKeys.RESULT_DATA][-1][1]
+
+
+def finite_difference_sensitivities(integrator, make_step_func, initial_state, eps=1e-6):
+    # central differences of separate runs with perturbed parameters
+    base = {"a": 1.0, "b": np.array([0.5, 0.4]), "c": 0.8}
+    perturbations = [("a", None), ("b", 0), ("b", 1), ("c", None)]
+
+    columns = []
+    for name, idx in perturbations:
+        results = []
+        for sign in [1, -1]:
+            args = {k: np.copy(v) if k == "b" else v for k, v in base.items()}
+            if idx is None:
+                args[name] += sign * eps
+            else:
+                args[name][idx] += sign * eps
+            results.append(final_state(integrator, lotka_volterra_model(**args),
+                                       make_step_func(), initial_state))
+        columns.append((results[0] - results[1]) / (2 * eps))
+
+    return np.stack(columns, axis=1)
+
+
+def main():
+    integrator = Integrator(in_memory=True)
+
+    # dy/dlamb = -t * y_0 * exp(-lamb * t) for the scalar decay y' = -lamb * y
+    y_0, lamb = 2.0, 0.5
+    models = [ODEModel(ode_fn=decay, fn_args={"lamb": lamb}),
+              ODEModel(ode_fn=decay, fn_args={"lamb": lamb}, jac_fn=decay_jac)]
+
+    for model in models:
+        integrator.integrate_sensitivity(model=model, step_func=RungeKutta4(),
+                                         initial_state=(0.0, y_0), h=H, max_steps=NUM_STEPS,
+                                         verbosity=40)
+        run = integrator.runs[-1]
+
+        t, y = run[RunKeys.RESULT_DATA][-1]
+        sensitivities = run[RunKeys.SENSITIVITIES]
+
+        assert np.ndim(y) == 0 and np.isclose(y, y_0 * np.exp(-lamb * t))
+        assert sensitivities.shape == (NUM_STEPS + 1, 1, 1)
+        assert np.isclose(sensitivities[-1, 0, 0], -t * y_0 * np.exp(-lamb * t), rtol=1e-6)
+        assert run[RunKeys.RUN_CONFIG][RunConfigKeys.SENSITIVITY_PARAMS] == ["lamb"]
+
+    # the step size controller sees the error estimates of the sensitivities as well
+    integrator.integrate_sensitivity(model=models[0], step_func=DOPRI45(),
+                                     initial_state=(0.0, y_0), end=2.0, h=0.1,
+                                     max_steps=1000, sc=DOPRI45Controller(atol=1e-9),
+                                     verbosity=40)
+    t, _ = integrator.runs[-1][RunKeys.RESULT_DATA][-1]
+    assert np.isclose(t, 2.0)
+    assert np.isclose(integrator.runs[-1][RunKeys.SENSITIVITIES][-1, 0, 0],
+                      -t * y_0 * np.exp(-lamb * t), rtol=1e-4)
+
+    # the sensitivities of a vector model with array-valued parameters agree with finite
+    # differences of separate runs, with and without Jacobians, and for an implicit method
+    initial_state = (0.0, np.array([1.0, 0.5]))
+
+    for make_step_func in [RungeKutta4, BackwardEulerMethod]:
+        expected = finite_difference_sensitivities(integrator, make_step_func, initial_state)
+
+        cases = [(lotka_volterra_model(), None),
+                 (lotka_volterra_model(jac=True), None),
+                 (lotka_volterra_model(jac=True), lotka_volterra_param_jac)]
+
+        for model, param_jac_fn in cases:
+            integrator.integrate_sensitivity(model=model, step_func=make_step_func(),
+                                             initial_state=initial_state, h=H,
+                                             max_steps=NUM_STEPS, param_jac_fn=param_jac_fn,
+                                             verbosity=40)
+            run = integrator.runs[-1]
+
+            assert run[RunKeys.RUN_CONFIG][RunConfigKeys.SENSITIVITY_PARAMS] == \
+                ["a", "b_1", "b_2", "c"]
+            assert np.allclose(run[RunKeys.SENSITIVITIES][-1], expected, atol=1e-5), \
+                (make_step_func, model.jac, param_jac_fn)
+
+    # a subset of the parameters, and initial sensitivities
+    initial_sensitivities = np.array([[1.0], [0.0]])
+    integrator.integrate_sensitivity(model=lotka_volterra_model(), step_func=RungeKutta4(),
+                                     initial_state=initial_state, params=["c"], h=H,
+                                     max_steps=NUM_STEPS,
+                                     initial_sensitivities=initial_sensitivities,
+                                     verbosity=40)
+    assert integrator.runs[-1][RunKeys.SENSITIVITIES].shape == (NUM_STEPS + 1, 2, 1)
+    assert np.array_equal(integrator.runs[-1][RunKeys.SENSITIVITIES][0], initial_sensitivities)
+
+    for bad_params in [["d"], ["a", "e"]]:
+        try:
+            SensitivityModel(lotka_volterra_model(), params=bad_params)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"Expected a ValueError for parameters {bad_params}.")
+
+    integrator.close()
+
+    # memory-mapped runs are split into memory-mapped states and sensitivities,
+    # which are saved with the run and memory-mapped when loaded again
+    with tempfile.TemporaryDirectory() as output_dir:
+        memmapped = Integrator(base_output_dir=output_dir, result_storage="memmap",
+                               memmap_chunk_size=16)
+
+        memmapped.integrate_sensitivity(model=lotka_volterra_model(jac=True),
+                                        step_func=RungeKutta4(), initial_state=initial_state,
+                                        h=H, max_steps=NUM_STEPS, output_dir="sensitivity_run",
+                                        verbosity=40)
+        run = memmapped.runs[-1]
+
+        integrator = Integrator(in_memory=True)
+        integrator.integrate_sensitivity(model=lotka_volterra_model(jac=True),
+                                         step_func=RungeKutta4(), initial_state=initial_state,
+                                         h=H, max_steps=NUM_STEPS, verbosity=40)
+        expected = integrator.runs[-1]
+        integrator.close()
+
+        assert isinstance(run[RunKeys.SENSITIVITIES], np.memmap)
+        assert np.array_equal(run[RunKeys.SENSITIVITIES], expected[RunKeys.SENSITIVITIES])
+        assert np.array_equal(memmapped.return_result_data(run_id="latest").values,
+                              integrator.return_result_data(run_id="latest").values)
+
+        loaded = memmapped.load_run("sensitivity_run")
+        assert isinstance(loaded[RunKeys.SENSITIVITIES], np.memmap)
+        assert np.array_equal(loaded[RunKeys.SENSITIVITIES], expected[RunKeys.SENSITIVITIES])
+        assert loaded[RunKeys.RUN_CONFIG][RunConfigKeys.SENSITIVITY_PARAMS] == \
+            ["a", "b_1", "b_2", "c"]
+
+        # the memory-mapped files are removed together with the runs
+        sensitivity_file = run[RunKeys.SENSITIVITIES].filename
+        del run, loaded
+        memmapped._reset()
+        assert not os.path.exists(sensitivity_file)
+
+        memmapped.close()
+
+
+if __name__ == "__main__":
+    main()
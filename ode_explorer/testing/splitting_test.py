@@ -0,0 +1,78 @@
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel, SplitModel
+from ode_explorer.stepfunctions import RungeKutta4, ExactFlow, LinearFlow, LieSplitting, \
+    StrangSplitting
+
+n = 20
+
+# periodic 1D diffusion matrix on a uniform grid
+dx = 1.0 / n
+laplacian = (np.diag(-2.0 * np.ones(n)) + np.diag(np.ones(n - 1), 1) +
+             np.diag(np.ones(n - 1), -1))
+laplacian[0, -1] = laplacian[-1, 0] = 1.0
+diffusion_matrix = 0.01 * laplacian / dx ** 2
+
+y_0 = 0.5 + 0.4 * np.sin(2 * np.pi * np.linspace(0.0, 1.0, n, endpoint=False))
+
+
+def transport(t: float, y: np.ndarray, d: np.ndarray = diffusion_matrix):
+    return np.dot(d, y)
+
+
+def reaction(t: float, y: np.ndarray, r: float = 1.0):
+    return r * y * (1 - y)
+
+
+def reaction_flow(t: float, y: np.ndarray, h: float, r: float = 1.0):
+    # closed-form solution of the logistic equation
+    return y / (y + (1 - y) * np.exp(-r * h))
+
+
+def main():
+    t_0 = 0.0
+
+    transport_model = ODEModel(ode_fn=transport)
+    reaction_model = ODEModel(ode_fn=reaction, fn_args={"r": 1.0})
+
+    model = SplitModel(models=[transport_model, reaction_model])
+
+    initial_state = (t_0, y_0)
+
+    integrator = Integrator()
+
+    integrator.integrate_const(model=model,
+                               step_func=RungeKutta4(),
+                               initial_state=initial_state,
+                               h=0.0005,
+                               max_steps=2000,
+                               verbosity=1)
+
+    reference = integrator.return_result_data(run_id="latest").values[-1]
+
+    for splitting in [LieSplitting, StrangSplitting]:
+        errors = []
+        for h in [0.1, 0.05]:
+            step_func = splitting(step_funcs=[LinearFlow(matrix=diffusion_matrix),
+                                              ExactFlow(flow=reaction_flow)])
+
+            integrator.integrate_const(model=model,
+                                       step_func=step_func,
+                                       initial_state=initial_state,
+                                       h=h,
+                                       max_steps=int(round(1.0 / h)),
+                                       verbosity=1)
+
+            result = integrator.return_result_data(run_id="latest").values[-1]
+            errors.append(np.max(np.abs(result - reference)))
+
+        observed_order = np.log2(errors[0] / errors[1])
+
+        print(f"{splitting.__name__}: errors {errors}, observed order {observed_order:.2f}")
+
+        assert abs(observed_order - step_func.order) < 0.3
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+
+from ode_explorer.benchmarks.import_time import HEAVY_MODULES
+from ode_explorer.integrators import Integrator
+from ode_explorer.integrators.integrator import logger
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import ForwardEulerMethod
+
+
+def ode_func(t: float, y: float, lamb: float = 0.5):
+    return - lamb * y
+
+
+def main():
+    # importing the integrators does not pull in heavy optional dependencies
+    code = "import sys, ode_explorer.integrators; " \
+           f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         check=True).stdout
+    assert out.strip() == "[]", out
+
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": 0.5})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+
+        # in-memory integrators do not touch the filesystem
+        integrator = Integrator(in_memory=True)
+
+        integrator.integrate_const(model=model,
+                                   step_func=ForwardEulerMethod(),
+                                   initial_state=(0.0, 1.0),
+                                   h=0.01,
+                                   max_steps=100,
+                                   verbosity=logging.ERROR)
+
+        assert os.listdir(tmp_dir) == []
+        assert len(integrator.query_runs()) == 1
+
+        # explicitly saved runs are still written to disk
+        integrator.save_run(integrator.runs[-1], output_dir="my_run")
+        assert os.path.exists(os.path.join(integrator.base_output_dir, "my_run"))
+
+        try:
+            Integrator(in_memory=True, result_storage="memmap")
+            raise AssertionError("Memory-mapped storage in in-memory mode should fail.")
+        except ValueError:
+            pass
+
+        # integrators logging to the same file share one file handler
+        num_handlers = len(logger.handlers)
+        for _ in range(5):
+            Integrator(base_log_dir=tmp_dir, base_output_dir=tmp_dir)
+
+        assert len(logger.handlers) == num_handlers + 1
+
+        for handler in logger.handlers:
+            handler.flush()
+
+        with open(os.path.join(tmp_dir, "logs.txt")) as f:
+            lines = [line for line in f if "Created an Integrator instance." in line]
+
+        assert len(lines) == 5
+
+        # the log file of a previous run is closed when the next run gets its own
+        for logfile in ["run_1.txt", "run_2.txt"]:
+            integrator.integrate_const(model=model,
+                                       step_func=ForwardEulerMethod(),
+                                       initial_state=(0.0, 1.0),
+                                       h=0.01,
+                                       max_steps=10,
+                                       logfile=logfile,
+                                       verbosity=logging.INFO)
+
+        log_files = [os.path.basename(h.baseFilename) for h in logger.handlers
+                     if isinstance(h, logging.FileHandler)]
+        assert "run_2.txt" in log_files and "run_1.txt" not in log_files
+
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import time
+from typing import Union
+
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import ForwardEulerMethod
+
+y_0 = np.ones(10)
+lamb = 0.5
+
+
+def ode_func(t: float, y: Union[float, np.ndarray], lamb: float = 0.5):
+    return - lamb * y
+
+
+def main():
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+
+    initial_state = (0.0, y_0)
+
+    for output_format, io_args in [("csv", {}), ("csv", {"sep": ";", "index": False}),
+                                   ("npz", {}), ("npz", {"compressed": True}),
+                                   ("parquet", {}), ("hdf5", {})]:
+        integrator = Integrator(output_format=output_format, io_args=io_args)
+
+        try:
+            integrator.integrate_const(model=model,
+                                       step_func=ForwardEulerMethod(),
+                                       initial_state=initial_state,
+                                       h=0.001,
+                                       max_steps=1000,
+                                       verbosity=40,
+                                       output_dir=f"storage_{output_format}")
+        except ImportError as e:
+            print(f"Skipping {output_format}: {e}")
+            continue
+
+        expected = integrator.return_result_data(run_id="latest")
+
+        # load through a fresh integrator, resolving the run in the catalog
+        run_id = integrator.runs[-1]["run_id"]
+        result = Integrator().return_result_data(run_id=run_id[:8])
+
+        assert list(result.columns) == list(expected.columns)
+        assert np.allclose(result.values, expected.values)
+
+        loader = Integrator()
+        run = loader.load_run(path=f"storage_{output_format}")
+
+        # the catalog summary comes from run_info.json, the result data stays unread
+        assert not run["result_data"].loaded
+        record = loader.catalog.get(run_id=run["run_id"])
+        assert record["num_states"] == len(expected)
+        assert np.isclose(record["summary"]["final_time"], expected["t"].values[-1])
+
+        t, y = run["result_data"][-1]
+        assert isinstance(t, float) and y.shape == y_0.shape
+
+        # metrics are written and read with the same CSV options as the result data
+        assert len(run["metrics"]) == len(integrator.runs[-1]["metrics"])
+
+    # one large run, loaded without reading its result data
+    num_states, dim = 2000000, 20
+    block = np.random.randn(num_states, dim - 1)
+
+    integrator = Integrator(output_format="npz")
+    integrator.integrate_const(model=model,
+                               step_func=ForwardEulerMethod(),
+                               initial_state=(0.0, np.ones(dim - 1)),
+                               h=0.001,
+                               max_steps=1,
+                               verbosity=40)
+
+    run = integrator.runs[-1]
+    run["result_data"] = [(0.001 * i, block[i]) for i in range(num_states)]
+    integrator.save_run(run=run, output_dir="storage_large")
+
+    size = os.path.getsize(os.path.join(integrator.base_output_dir, "storage_large",
+                                        "result_data.npz"))
+
+    start = time.perf_counter()
+    loaded = Integrator().load_run(path="storage_large")
+    df = Integrator().return_result_data(run_id=loaded["run_id"])
+    elapsed = time.perf_counter() - start
+
+    assert df.shape == (num_states, dim)
+
+    print(f"Loaded a {size / 1e6:.0f} MB run in {1000 * elapsed:.1f} ms.")
+
+
+if __name__ == "__main__":
+    main()
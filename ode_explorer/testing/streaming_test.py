@@ -0,0 +1,100 @@
+import itertools
+import tracemalloc
+from typing import Union
+
+import numpy as np
+
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import RungeKutta4, DOPRI45
+from ode_explorer.stepsize_control import DOPRI45Controller
+
+y_0 = np.ones(10)
+lamb = 0.5
+
+
+def ode_func(t: float, y: Union[float, np.ndarray], lamb: float = 0.5):
+    return - lamb * y
+
+
+def main():
+    model = ODEModel(ode_fn=ode_func, fn_args={"lamb": lamb})
+
+    initial_state = (0.0, y_0)
+
+    integrator = Integrator()
+
+    # streamed states match the recorded ones
+    integrator.integrate_const(model=model,
+                               step_func=RungeKutta4(),
+                               initial_state=initial_state,
+                               h=0.001,
+                               max_steps=1000,
+                               verbosity=40)
+
+    expected = integrator.return_result_data(run_id="latest").values
+
+    states = integrator.iter_integrate(model=model,
+                                       step_func=RungeKutta4(),
+                                       initial_state=initial_state,
+                                       h=0.001,
+                                       max_steps=1000)
+
+    streamed = np.array([np.concatenate([[t], y]) for t, y in states])
+    assert np.array_equal(streamed, expected)
+
+    chunks = list(integrator.iter_integrate(model=model,
+                                            step_func=RungeKutta4(),
+                                            initial_state=initial_state,
+                                            h=0.001,
+                                            max_steps=1000,
+                                            chunk_size=300))
+
+    assert [len(c) for c in chunks] == [300, 300, 300, 101]
+
+    # adaptive streaming yields the accepted states of integrate_adaptively
+    integrator.integrate_adaptively(model=model,
+                                    step_func=DOPRI45(),
+                                    sc=DOPRI45Controller(atol=1e-9),
+                                    initial_state=initial_state,
+                                    initial_h=0.001,
+                                    end=10.0,
+                                    verbosity=40)
+
+    expected = integrator.return_result_data(run_id="latest").values
+
+    states = integrator.iter_integrate(model=model,
+                                       step_func=DOPRI45(),
+                                       sc=DOPRI45Controller(atol=1e-9),
+                                       initial_state=initial_state,
+                                       h=0.001,
+                                       end=10.0,
+                                       max_steps=10000)
+
+    streamed = np.array([np.concatenate([[t], y]) for t, y in states])
+    assert np.array_equal(streamed, expected)
+
+    # stopping early, and constant memory for long integrations
+    states = integrator.iter_integrate(model=model,
+                                       step_func=RungeKutta4(),
+                                       initial_state=initial_state,
+                                       h=0.001,
+                                       max_steps=10 ** 9)
+
+    first = list(itertools.islice(states, 10))
+    assert len(first) == 10
+
+    tracemalloc.start()
+    running_mean = np.zeros_like(y_0)
+    for i, (t, y) in enumerate(itertools.islice(states, 100000)):
+        running_mean += (y - running_mean) / (i + 1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Peak traced memory over 100000 streamed steps: {peak / 1e3:.1f} kB.")
+
+    assert peak < 1e6
+
+
+if __name__ == "__main__":
+    main()
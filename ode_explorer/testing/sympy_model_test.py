@@ -0,0 +1,114 @@
+import os
+import tempfile
+
+import numpy as np
+
+from ode_explorer.constants import RunKeys, PerformanceKeys
+from ode_explorer.integrators import Integrator
+from ode_explorer.models import ODEModel
+from ode_explorer.stepfunctions import BackwardEulerMethod, BDF2, ImplicitRungeKuttaMethod, \
+    RungeKutta4
+
+
+def van_der_pol(t: float, y: np.ndarray, mu: float = 5.0):
+    return np.array([y[1], mu * (1.0 - y[0] ** 2) * y[1] - y[0]])
+
+
+def van_der_pol_jac(t: float, y: np.ndarray, mu: float = 5.0):
+    return np.array([[0.0, 1.0],
+                     [-2.0 * mu * y[0] * y[1] - 1.0, mu * (1.0 - y[0] ** 2)]])
+
+
+def gauss_legendre():
+    r = np.sqrt(3.0) / 6
+    return ImplicitRungeKuttaMethod(alphas=np.array([0.5 - r, 0.5 + r]),
+                                    betas=np.array([[0.25, 0.25 - r], [0.25 + r, 0.25]]),
+                                    gammas=np.array([0.5, 0.5]))
+
+
+def integrate(integrator, model, step_func):
+    integrator.integrate_const(model=model, step_func=step_func,
+                               initial_state=(0.0, np.array([2.0, 0.0])),
+                               h=0.01, max_steps=200, verbosity=40)
+
+    run = integrator.runs[-1]
+
+    return run[RunKeys.RESULT_DATA][-1][1], run[RunKeys.PERFORMANCE][PerformanceKeys.RHS_CALLS]
+
+
+def main():
+    integrator = Integrator(in_memory=True)
+
+    finite_differences = ODEModel(ode_fn=van_der_pol, fn_args={"mu": 5.0})
+    analytic = ODEModel(ode_fn=van_der_pol, fn_args={"mu": 5.0}, jac_fn=van_der_pol_jac)
+
+    # the analytic Jacobian replaces the finite-difference approximation
+    # in the Newton iterations, saving the right-hand side evaluations spent on it
+    step_funcs = [BackwardEulerMethod, lambda: BDF2(startup=RungeKutta4()), gauss_legendre]
+
+    for make_step_func in step_funcs:
+        y_fd, calls_fd = integrate(integrator, finite_differences, make_step_func())
+        y_jac, calls_jac = integrate(integrator, analytic, make_step_func())
+
+        assert np.allclose(y_fd, y_jac, atol=1e-6), make_step_func
+        assert calls_jac < calls_fd, make_step_func
+
+    # the Jacobian arguments are updated together with the right-hand side
+    analytic.update_args(mu=1.0)
+    assert analytic.jac(0.0, np.array([2.0, 0.0]))[1, 1] == -3.0
+
+    try:
+        import sympy
+    except ImportError:
+        # sympy is a test requirement, skipping has to be asked for explicitly
+        if not os.environ.get("ODE_EXPLORER_SKIP_SYMPY"):
+            raise ImportError("The tests of models defined by SymPy expressions require sympy. "
+                              "Install the test requirements by running \"pip install -r "
+                              "requirements-test.txt\", or set ODE_EXPLORER_SKIP_SYMPY=1 to "
+                              "skip these tests.")
+        print("sympy is not installed, skipping the tests of models defined by SymPy expressions.")
+        integrator.close()
+        return
+
+    x, v, mu = sympy.symbols("x v mu")
+    exprs = [v, mu * (1 - x ** 2) * v - x]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model = ODEModel.from_sympy(exprs, state_syms=[x, v], params={mu: 5.0},
+                                    cache_dir=cache_dir)
+
+        y = np.array([2.0, 0.5])
+        assert np.allclose(model.rhs(0.0, y), van_der_pol(0.0, y))
+        assert np.allclose(model.jac(0.0, y), van_der_pol_jac(0.0, y))
+
+        # vectorized evaluation over a trailing axis, and ensembles with one state per row
+        ys = np.random.randn(2, 8)
+        assert np.allclose(model.rhs(0.0, ys), van_der_pol(0.0, ys))
+
+        params = np.linspace(1.0, 5.0, 8)[:, None]
+        batch = model.batch_fn(0.0, ys.T, params)
+        expected = [van_der_pol(0.0, ys[:, i], mu=params[i, 0]) for i in range(8)]
+        assert np.allclose(batch, expected)
+
+        # a second model from the same expressions is loaded from the code cache,
+        # regardless of the symbol names
+        a, b, c = sympy.symbols("a b c")
+        cached = ODEModel.from_sympy([b, c * (1 - a ** 2) * b - a], state_syms=[a, b],
+                                     params={c: 1.0}, sparse_jacobian=False,
+                                     cache_dir=cache_dir)
+        assert cached.ode_fn.__module__ == model.ode_fn.__module__
+        assert np.allclose(cached.rhs(0.0, y), van_der_pol(0.0, y, mu=1.0))
+
+        sparse = ODEModel.from_sympy(exprs, state_syms=[x, v], params={mu: 5.0},
+                                     sparse_jacobian=True, cache_dir=cache_dir)
+        assert np.allclose(sparse.jac(0.0, y).toarray(), van_der_pol_jac(0.0, y))
+
+        y_gen, _ = integrate(integrator, sparse, BackwardEulerMethod())
+        y_fd, _ = integrate(integrator, finite_differences, BackwardEulerMethod())
+        assert np.allclose(y_gen, y_fd, atol=1e-6)
+
+    integrator.close()
+
+
+if __name__ == "__main__":
+    main()
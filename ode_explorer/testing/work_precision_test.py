@@ -0,0 +1,53 @@
+import numpy as np
+
+from ode_explorer.benchmarks.problems import problems
+from ode_explorer.benchmarks.work_precision import run_work_precision, cheapest
+
+
+def main():
+    # the reference of problems without closed-form solution agrees with the exact one
+    assert np.allclose(problems["decay"].reference(), np.exp(-5.0) * np.ones(10))
+
+    results = run_work_precision(problem_names=["decay", "kepler"],
+                                 step_funcs=["ForwardEulerMethod", "RungeKutta4", "DOPRI45"],
+                                 num_refinements=3,
+                                 tolerances=[1e-4, 1e-6, 1e-8])
+
+    for problem, step_func, order in [("kepler", "RungeKutta4", 4),
+                                      ("decay", "ForwardEulerMethod", 1)]:
+        errors = [r["error"] for r in results
+                  if r["problem"] == problem and r["step_func"] == step_func]
+
+        # halving the step size reduces the error by 2^order
+        observed = np.log2(errors[-2] / errors[-1])
+        print(f"{problem} {step_func}: observed order {observed:.2f}")
+
+        assert abs(observed - order) < 0.3
+
+    # the adaptive method reaches the end of the interval at every tolerance
+    dopri = [r for r in results if r["step_func"] == "DOPRI45"]
+    assert all("error" in r for r in dopri)
+    assert dopri[-1]["error"] < dopri[0]["error"]
+
+    picks = cheapest(results, target_errors=[1e-6])
+    assert all(p["step_func"] in ["RungeKutta4", "DOPRI45"] for p in picks)
+
+    # special step functions only run on the problems available in their model form
+    results = run_work_precision(problem_names=["decay", "kepler", "robertson"],
+                                 step_funcs=["EulerA", "ARS222"],
+                                 num_refinements=3)
+
+    assert {(r["problem"], r["step_func"]) for r in results} == {("kepler", "EulerA"),
+                                                                  ("robertson", "ARS222")}
+
+    # the Hamiltonian form shares the reference solution of the plain right-hand side
+    euler_a = [r["error"] for r in results if r["step_func"] == "EulerA"]
+    assert euler_a[-1] < euler_a[0]
+
+    ars222 = [r for r in results if r["step_func"] == "ARS222"]
+    assert all("error" in r for r in ars222)
+    assert ars222[-1]["error"] < 1e-4
+
+
+if __name__ == "__main__":
+    main()
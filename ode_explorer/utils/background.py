@@ -0,0 +1,138 @@
+import queue
+import threading
+from typing import Callable, List, Text, Tuple
+
+from ode_explorer import defaults
+
+__all__ = ["BackgroundWriter", "BackgroundWriteError"]
+
+# sentinel telling the writer thread to exit
+_STOP = object()
+
+
+class BackgroundWriteError(RuntimeError):
+    """
+    Raised when one or more tasks of a BackgroundWriter failed. Holds the names of all failed
+    tasks and their exceptions, in the order they were submitted.
+    """
+
+    def __init__(self, failures: List[Tuple[Text, BaseException]]):
+        self.failures = failures
+
+        details = "; ".join(f"{name}: {type(e).__name__}: {e}" for name, e in failures)
+
+        super(BackgroundWriteError, self).__init__(
+            f"{len(failures)} background task(s) failed: {details}")
+
+    @property
+    def errors(self) -> List[BaseException]:
+        return [e for _, e in self.failures]
+
+
+class BackgroundWriter:
+    """
+    Executes I/O tasks like saving runs to disk on a background thread, so that the caller
+    can continue with the next integration while the previous run is written.
+
+    Tasks are passed through a bounded queue. When the queue is full, submitting blocks
+    until the writer caught up, which bounds the memory held by pending runs. A failing task
+    does not stop the tasks submitted after it. The exceptions of all failed tasks are
+    collected and raised together as a BackgroundWriteError in the caller on the next call
+    to ``submit``, ``flush`` or ``close``.
+    """
+
+    def __init__(self, max_pending: int = defaults.IO_QUEUE_SIZE, name: str = None):
+        """
+        BackgroundWriter constructor.
+
+        Args:
+            max_pending: Maximum number of pending tasks before submitting blocks.
+            name: Optional name of the writer thread.
+        """
+        self._queue = queue.Queue(maxsize=max_pending)
+
+        # names and exceptions of failed tasks not yet raised in the caller
+        self._failures = []
+        self._lock = threading.Lock()
+
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._work,
+                                        name=name or "BackgroundWriter",
+                                        daemon=True)
+        self._thread.start()
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    return
+                name, fn, args, kwargs = task
+                fn(*args, **kwargs)
+            except BaseException as e:
+                with self._lock:
+                    self._failures.append((name, e))
+            finally:
+                self._queue.task_done()
+
+    def raise_pending(self):
+        """
+        Raise the exceptions of previously submitted tasks that failed, if any.
+
+        Raises:
+            BackgroundWriteError: If any task failed since the last call.
+        """
+        with self._lock:
+            failures, self._failures = self._failures, []
+
+        if failures:
+            raise BackgroundWriteError(failures) from failures[0][1]
+
+    def submit(self, fn: Callable, *args, task_name: Text = None, **kwargs):
+        """
+        Submit a task to the writer thread.
+
+        Args:
+            fn: Function to execute on the writer thread.
+            *args: Positional arguments passed to the function.
+            task_name: Optional name identifying the task in error messages.
+            **kwargs: Keyword arguments passed to the function.
+
+        Raises:
+            ValueError: If the writer was closed.
+            BackgroundWriteError: If any previously submitted task failed.
+        """
+        self.raise_pending()
+
+        if self._closed:
+            raise ValueError("Cannot submit tasks to a closed BackgroundWriter.")
+
+        self._queue.put((task_name or getattr(fn, "__name__", repr(fn)), fn, args, kwargs))
+
+    @property
+    def num_pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def flush(self):
+        """
+        Wait until all submitted tasks are done.
+
+        Raises:
+            BackgroundWriteError: If any submitted task failed.
+        """
+        self._queue.join()
+        self.raise_pending()
+
+    def close(self):
+        """
+        Wait until all submitted tasks are done and stop the writer thread.
+
+        Raises:
+            BackgroundWriteError: If any submitted task failed.
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join()
+        self.raise_pending()
@@ -0,0 +1,283 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Text, Any, List, Iterable
+
+from ode_explorer import constants
+from ode_explorer.constants import RunKeys, RunConfigKeys, CatalogKeys, StorageKeys
+from ode_explorer.utils.storage import ArrayStore
+
+__all__ = ["RunCatalog"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    timestamp TEXT,
+    created REAL,
+    output_dir TEXT,
+    start_time REAL,
+    end_time REAL,
+    step_size REAL,
+    num_steps INTEGER,
+    num_states INTEGER,
+    model_metadata TEXT,
+    run_config TEXT,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created_idx ON runs (created);
+CREATE INDEX IF NOT EXISTS runs_output_dir_idx ON runs (output_dir);
+CREATE INDEX IF NOT EXISTS runs_step_size_idx ON runs (step_size);
+"""
+
+# columns that can be filtered on directly, everything else is looked up in the run config
+_COLUMNS = {CatalogKeys.RUN_ID: "run_id",
+            CatalogKeys.OUTPUT_DIR: "output_dir",
+            RunConfigKeys.START: "start_time",
+            RunConfigKeys.END: "end_time",
+            RunConfigKeys.STEP_SIZE: "step_size",
+            RunConfigKeys.NUM_STEPS: "num_steps",
+            CatalogKeys.NUM_STATES: "num_states"}
+
+_JSON_COLUMNS = ["model_metadata", "run_config", "summary"]
+
+
+class RunCatalog:
+    """
+    Persistent catalog of ODE integration runs, backed by a local SQLite database. The catalog
+    indexes run ID, creation time, model metadata, run configuration and summary metrics of
+    each run, together with the directory the run data was saved to.
+
+    The database is opened in write-ahead logging (WAL) mode, so that multiple processes can
+    read and write the same catalog concurrently, e.g. in parameter sweeps sharing one output
+    directory.
+    """
+
+    def __init__(self, path: Text, timeout: float = 30.0):
+        """
+        Run catalog constructor.
+
+        Args:
+            path: Path to the SQLite database file. Use ":memory:" for a non-persistent catalog.
+            timeout: Time in seconds to wait for a lock held by a concurrent writer.
+        """
+        self.path = path
+
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def _write(self, statement: Text, parameters: Iterable = ()):
+        # BEGIN IMMEDIATE acquires the write lock up front, concurrent
+        # writers wait for up to the connection timeout
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(statement, parameters)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _read(self, statement: Text, parameters: Iterable = ()) -> List[Dict[Text, Any]]:
+        with self._lock:
+            rows = self._conn.execute(statement, parameters).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> Dict[Text, Any]:
+        record = dict(row)
+        for column in _JSON_COLUMNS:
+            if record.get(column) is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    @staticmethod
+    def _summarize(run: Dict[Text, Any]) -> Dict[Text, Any]:
+        result_data = run[RunKeys.RESULT_DATA]
+        metrics = run[RunKeys.METRICS]
+
+        storage = run.get(RunKeys.STORAGE) or {}
+
+        # runs loaded from disk record their size, so that their result data is not read
+        if isinstance(result_data, ArrayStore) and not result_data.loaded and \
+                StorageKeys.NUM_STATES in storage:
+            summary = {CatalogKeys.NUM_STATES: storage[StorageKeys.NUM_STATES]}
+            final_time = storage.get(StorageKeys.FINAL_TIME)
+        else:
+            summary = {CatalogKeys.NUM_STATES: len(result_data)}
+            final_time = float(result_data[-1][0]) if len(result_data) > 0 else None
+
+        if final_time is not None:
+            summary[CatalogKeys.FINAL_TIME] = final_time
+
+        # last recorded value of every scalar metric
+        if metrics:
+            for k, v in metrics[-1].items():
+                if isinstance(v, (int, float)):
+                    summary[k] = v
+
+        # performance counters recorded by the integration loops
+        summary.update(run.get(RunKeys.PERFORMANCE, {}))
+
+        return summary
+
+    def add_run(self, run: Dict[Text, Any], output_dir: Text = None):
+        """
+        Add a run to the catalog. If a run with the same ID is already present, its entry is
+        updated, keeping the original creation time and output directory if none is given.
+
+        Args:
+            run: Run object obtained as output from ODE integration.
+            output_dir: Directory the run data was saved to, if any.
+        """
+        run_config = run[RunKeys.RUN_CONFIG]
+        summary = self._summarize(run)
+
+        self._write("INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (run_id) DO UPDATE SET "
+                    "output_dir = coalesce(excluded.output_dir, output_dir), "
+                    "num_states = excluded.num_states, "
+                    "run_config = excluded.run_config, "
+                    "summary = excluded.summary",
+                    (run[constants.RUN_ID],
+                     run[constants.TIMESTAMP],
+                     time.time(),
+                     output_dir,
+                     run_config.get(RunConfigKeys.START),
+                     run_config.get(RunConfigKeys.END),
+                     run_config.get(RunConfigKeys.STEP_SIZE),
+                     run_config.get(RunConfigKeys.NUM_STEPS),
+                     summary[CatalogKeys.NUM_STATES],
+                     json.dumps(run[RunKeys.MODEL_METADATA], default=str),
+                     json.dumps(run_config, default=str),
+                     json.dumps(summary, default=str)))
+
+    def remove_runs(self, run_ids: List[Text]):
+        """
+        Remove runs from the catalog. This does not delete any saved run data.
+
+        Args:
+            run_ids: Full IDs of the runs to remove.
+        """
+        for run_id in run_ids:
+            self._write("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    def resolve(self, run_id: Text) -> Text:
+        """
+        Resolve a (partial) run ID to the full ID of a run in the catalog. Exact and prefix
+        matches are looked up in the primary key index, other partial IDs are matched as
+        substrings.
+
+        Args:
+            run_id: (Partial) ID of a run.
+
+        Returns:
+            The full ID of the most recent run matching the given ID.
+
+        Raises:
+            ValueError: If no run matches the given run ID.
+        """
+        records = self._read("SELECT run_id FROM runs WHERE run_id >= ? AND run_id < ? "
+                             "ORDER BY created DESC LIMIT 1", (run_id, run_id + "\uffff"))
+
+        if not records:
+            records = self._read("SELECT run_id FROM runs WHERE instr(run_id, ?) > 0 "
+                                 "ORDER BY created DESC LIMIT 1", (run_id,))
+
+        if not records:
+            raise ValueError(f"Run with ID {run_id} not found.")
+
+        return records[0][CatalogKeys.RUN_ID]
+
+    def get(self, run_id: Text) -> Dict[Text, Any]:
+        """
+        Get the catalog record of a run by (partial) ID.
+
+        Args:
+            run_id: (Partial) ID of a run.
+
+        Returns:
+            A dict holding the catalog record of the run.
+
+        Raises:
+            ValueError: If no run matches the given run ID.
+        """
+        full_id = self.resolve(run_id)
+        return self._read("SELECT * FROM runs WHERE run_id = ?", (full_id,))[0]
+
+    def latest(self) -> Dict[Text, Any]:
+        """
+        Get the catalog record of the most recently added run.
+
+        Returns:
+            A dict holding the catalog record of the run, or None if the catalog is empty.
+        """
+        records = self._read("SELECT * FROM runs ORDER BY created DESC LIMIT 1")
+        return records[0] if records else None
+
+    def query(self,
+              since: float = None,
+              until: float = None,
+              limit: int = None,
+              **filters) -> List[Dict[Text, Any]]:
+        """
+        Query the catalog for runs, most recent first.
+
+        Args:
+            since: Optional UNIX timestamp, only return runs created at or after this time.
+            until: Optional UNIX timestamp, only return runs created before this time.
+            limit: Optional maximum number of runs to return.
+            **filters: Exact-match filters. Indexed columns (run_id, output_dir, start, end, h,
+             num_steps, num_states) are filtered directly, all other keys are looked up in the
+             run config.
+
+        Returns:
+            A list of catalog records matching the filters.
+        """
+        clauses, parameters = [], []
+
+        if since is not None:
+            clauses.append("created >= ?")
+            parameters.append(since)
+
+        if until is not None:
+            clauses.append("created < ?")
+            parameters.append(until)
+
+        for k, v in filters.items():
+            if k in _COLUMNS:
+                clauses.append(f"{_COLUMNS[k]} IS ?")
+            else:
+                clauses.append("json_extract(run_config, ?) IS ?")
+                parameters.append(f"$.{k}")
+            parameters.append(v)
+
+        statement = "SELECT * FROM runs"
+        if clauses:
+            statement += " WHERE " + " AND ".join(clauses)
+        statement += " ORDER BY created DESC"
+        if limit is not None:
+            statement += " LIMIT ?"
+            parameters.append(limit)
+
+        return self._read(statement, parameters)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
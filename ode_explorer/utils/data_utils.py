@@ -1,13 +1,18 @@
 import os
-from typing import List, Dict, Text, Any
+from typing import List, Dict, Text, Any, Union, TYPE_CHECKING
 
-import pandas as pd
+import numpy as np
 
 from ode_explorer.constants import ModelMetadataKeys
 from ode_explorer.types import ModelState
 from ode_explorer.utils.helpers import is_scalar
+from ode_explorer.utils.storage import ArrayStore
 
-__all__ = ["initialize_dim_names", "convert_to_dict", "write_result_to_csv"]
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = ["initialize_dim_names", "convert_to_dict", "stack_result_data", "result_to_dataframe",
+           "write_result_to_csv"]
 
 
 def initialize_dim_names(variable_names: List[Text], state: ModelState):
@@ -74,7 +79,73 @@ def convert_to_dict(state: ModelState, model_metadata: Dict[Text, Any], dim_name
     return output_dict
 
 
-def write_result_to_csv(result: List[Any],
+def stack_result_data(result_data: Union[List[ModelState], ArrayStore]) -> np.ndarray:
+    """
+    Stack the states of a run result into a single two-dimensional array, with one row
+    per state and one column per scalar dimension. Each state variable is copied into its
+    columns in one vectorized operation, instead of converting the states one by one.
+
+    Args:
+        result_data: List of ODE states obtained in the numerical integration run.
+
+    Returns:
+        A numpy array of shape (number of states, number of dimensions).
+    """
+
+    # runs loaded from disk are already stacked
+    if isinstance(result_data, ArrayStore):
+        return np.asarray(result_data.data)
+
+    sample = result_data[0]
+
+    dims = [1 if is_scalar(v) else len(v) for v in sample]
+
+    dtype = np.result_type(float, *[np.asarray(v).dtype for v in sample])
+
+    block = np.empty((len(result_data), sum(dims)), dtype=dtype)
+
+    idx = 0
+    for i, dim in enumerate(dims):
+        if dim == 1 and is_scalar(sample[i]):
+            block[:, idx] = [state[i] for state in result_data]
+        else:
+            np.stack([state[i] for state in result_data], out=block[:, idx:idx + dim])
+        idx += dim
+
+    return block
+
+
+def result_to_dataframe(result_data: Union[List[ModelState], ArrayStore],
+                        model_metadata: Dict[Text, Any]) -> "pd.DataFrame":
+    """
+    Construct a pd.DataFrame out of the result data of an integration run. The states are
+    stacked into a single array block, which backs the DataFrame without a further copy,
+    so that the DataFrame columns are views into the stacked array.
+
+    Args:
+        result_data: List of ODE states obtained in the numerical integration run.
+        model_metadata: Model metadata saved in the run.
+
+    Returns:
+        A pd.DataFrame containing the integration data as rows.
+    """
+    import pandas as pd
+
+    if len(result_data) == 0:
+        return pd.DataFrame()
+
+    dim_names = model_metadata[ModelMetadataKeys.DIM_NAMES]
+
+    if not dim_names:
+        variable_names = model_metadata[ModelMetadataKeys.VARIABLE_NAMES]
+        dim_names = initialize_dim_names(variable_names, result_data[0])
+
+    block = stack_result_data(result_data)
+
+    return pd.DataFrame(block, columns=dim_names, copy=False)
+
+
+def write_result_to_csv(result: Union[List[Any], "pd.DataFrame"],
                         out_dir: Text,
                         outfile_name: Text,
                         **kwargs) -> None:
@@ -82,19 +153,23 @@ def write_result_to_csv(result: List[Any],
     Write a run result to disk as a csv file.
 
     Args:
-        result: List of ODE states in the run result, in Dict format.
+        result: List of ODE states in the run result in Dict format, or a pd.DataFrame.
         out_dir: Designated output directory.
         outfile_name: Designated output file name.
         **kwargs: Additional keyword arguments passed to pandas.DataFrame.to_csv.
     """
+    import pandas as pd
 
     if not os.path.exists(out_dir):
         os.mkdir(out_dir)
 
     file_ext = ".csv"
 
-    # convert result_list to data frame, fast construction from list
-    result_df = pd.DataFrame(data=result)
+    if isinstance(result, pd.DataFrame):
+        result_df = result
+    else:
+        # convert result_list to data frame, fast construction from list
+        result_df = pd.DataFrame(data=result)
 
     out_file = os.path.join(out_dir, outfile_name)
 
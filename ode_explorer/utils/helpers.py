@@ -1,9 +1,9 @@
 import inspect
-from typing import Callable, List, Text
+from typing import Any, Callable, Dict, List, Text, Tuple
 
 from ode_explorer.defaults import standard_rhs, hamiltonian_rhs
 
-__all__ = ["is_scalar", "infer_variable_names", "infer_separability"]
+__all__ = ["is_scalar", "infer_variable_names", "infer_separability", "bind_args"]
 
 
 def is_scalar(y):
@@ -73,3 +73,70 @@ def infer_separability(q_derivative: Callable, p_derivative: Callable) -> bool:
         is_separable = True
 
     return is_separable
+
+
+def _positional_args(fn: Callable, fn_args: Dict[Text, Any],
+                     num_state_args: int) -> Tuple[Any, ...]:
+    # values of fn_args in the order of the parameters after the state arguments, with
+    # defaults filled in for skipped parameters, or None if they cannot be passed positionally
+    try:
+        params = list(inspect.signature(fn).parameters.values())[num_state_args:]
+    except (TypeError, ValueError):
+        return None
+
+    positional = [inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD]
+
+    values = []
+    remaining = set(fn_args)
+
+    for param in params:
+        if not remaining:
+            break
+        if param.kind not in positional:
+            return None
+        if param.name in remaining:
+            values.append(fn_args[param.name])
+            remaining.remove(param.name)
+        elif param.default is not inspect.Parameter.empty:
+            values.append(param.default)
+        else:
+            return None
+
+    return None if remaining else tuple(values)
+
+
+def bind_args(fn: Callable, fn_args: Dict[Text, Any], num_state_args: int = 2) -> Callable:
+    """
+    Bind additional arguments to a model function, so that the returned callable only takes
+    the state arguments. Arguments which can be passed positionally are bound as a tuple,
+    which avoids unpacking a dict into keyword arguments on every call, e.g. for a
+    parameter vector ``fn(t, y, params)``.
+
+    The arguments are bound by value, the callable needs to be rebuilt if they change.
+
+    Args:
+        fn: Model function, taking the state arguments followed by the additional arguments.
+        fn_args: Additional keyword arguments of the function.
+        num_state_args: Number of leading state arguments, e.g. 2 for a right-hand side
+         f(t, y) and 3 for a Hamiltonian H(t, q, p).
+
+    Returns:
+        A callable taking only the state arguments.
+    """
+    if fn is None or not fn_args:
+        return fn
+
+    values = _positional_args(fn, fn_args, num_state_args)
+
+    if values is None:
+        kwargs = dict(fn_args)
+        return lambda *state: fn(*state, **kwargs)
+
+    # the common cases avoid packing the state arguments into a tuple
+    if num_state_args == 2:
+        if len(values) == 1:
+            value, = values
+            return lambda t, y: fn(t, y, value)
+        return lambda t, y: fn(t, y, *values)
+
+    return lambda *state: fn(*state, *values)
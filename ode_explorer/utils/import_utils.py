@@ -3,22 +3,31 @@ from __future__ import division
 from __future__ import print_function
 
 import importlib
+import importlib.machinery
 import types
 from typing import Text, Callable
 
-__all__ = ["import_func_from_source", "import_func_from_module"]
+__all__ = ["import_module_from_source", "import_func_from_source", "import_func_from_module"]
+
+
+def import_module_from_source(source_path: Text,
+                              module_name: Text = "user_module") -> types.ModuleType:
+    """Imports a module provided as source file."""
+    loader = importlib.machinery.SourceFileLoader(
+        fullname=module_name,
+        path=source_path,
+    )
+    user_module = types.ModuleType(loader.name)
+    user_module.__file__ = source_path
+    loader.exec_module(user_module)
+    return user_module
 
 
 def import_func_from_source(source_path: Text, fn_name: Text) -> Callable:
     """Imports a function from a module provided as source file."""
 
     try:
-        loader = importlib.machinery.SourceFileLoader(
-            fullname='user_module',
-            path=source_path,
-        )
-        user_module = types.ModuleType(loader.name)
-        loader.exec_module(user_module)
+        user_module = import_module_from_source(source_path)
         return getattr(user_module, fn_name)
 
     except IOError:
@@ -0,0 +1,284 @@
+import contextlib
+import os
+import sys
+import threading
+from typing import Dict, Text, Any, List
+
+from ode_explorer import constants
+from ode_explorer import defaults
+from ode_explorer.constants import RunKeys, RunConfigKeys
+from ode_explorer.utils.profiling import PerformanceCounters
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+__all__ = ["MetricsExporter"]
+
+_PREFIX = "ode_explorer"
+
+
+def _memory_usage() -> Dict[Text, float]:
+    # current and peak resident set size of the process in bytes
+    memory = {}
+
+    try:
+        with open("/proc/self/statm") as f:
+            memory["resident"] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        memory["max_resident"] = max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    return memory
+
+
+class MetricsExporter:
+    """
+    Exports live metrics of running integrations in the Prometheus text format, to monitor
+    long parameter sweeps without attaching a debugger. The exported metrics include the
+    integration progress, throughput in steps and right-hand side calls per second and the
+    step rejection rate of every running integration, totals over all finished runs, and the
+    memory use of the process.
+
+    The metrics are read from the performance counters the integration loops fill in, so
+    exporting adds no work to the loops themselves. They can be served by a local HTTP
+    endpoint running on a background thread, written periodically to a snapshot file, or
+    both. An exporter can be shared by several integrators, e.g. all integrators of a sweep.
+    """
+
+    def __init__(self,
+                 port: int = None,
+                 host: Text = defaults.EXPORTER_HOST,
+                 snapshot_file: Text = None,
+                 snapshot_interval: float = defaults.SNAPSHOT_INTERVAL):
+        """
+        MetricsExporter constructor. Starts the HTTP server and snapshot threads right away.
+
+        Args:
+            port: Port of the HTTP endpoint serving the metrics under /metrics. Use 0 to pick
+             a free port, see ``MetricsExporter.port``. If None, no endpoint is started.
+            host: Host address the HTTP endpoint binds to, by default only local connections
+             are accepted.
+            snapshot_file: Optional file to periodically write the metrics to, e.g. for the
+             textfile collector of the Prometheus node exporter.
+            snapshot_interval: Time in seconds between two snapshots.
+        """
+        self._lock = threading.Lock()
+
+        # running integrations by run ID
+        self._live = {}
+
+        # totals over all finished runs
+        self._completed_runs = 0
+        self._totals = PerformanceCounters()
+
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+
+        self._stop = threading.Event()
+
+        self._server = None
+        self._threads = []
+
+        if port is not None:
+            import http.server
+            self._server = http.server.ThreadingHTTPServer((host, port),
+                                                           self._make_handler())
+            self._server.daemon_threads = True
+            self._start_thread(self._server.serve_forever, name="MetricsExporterHTTP")
+
+        if snapshot_file is not None:
+            self._start_thread(self._write_snapshots, name="MetricsExporterSnapshot")
+
+    def _start_thread(self, target, name: Text):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _make_handler(self):
+        import http.server
+
+        exporter = self
+
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ["/", "/metrics"]:
+                    self.send_error(404)
+                    return
+
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # scrapes are not logged
+                pass
+
+        return MetricsHandler
+
+    @property
+    def port(self) -> int:
+        """
+        Port of the HTTP endpoint, or None if no endpoint is running.
+        """
+        return self._server.server_address[1] if self._server is not None else None
+
+    @contextlib.contextmanager
+    def track(self, run: Dict[Text, Any], counters: PerformanceCounters):
+        """
+        Context manager exporting the metrics of a running integration. Used by the
+        integrator around the integration loop.
+
+        Args:
+            run: Run object of the integration.
+            counters: Performance counters filled in by the integration loop.
+        """
+        run_id = run[constants.RUN_ID]
+
+        with self._lock:
+            self._live[run_id] = (run[RunKeys.RUN_CONFIG], counters)
+
+        # counters of resumed runs include the steps before the checkpoint
+        offset = (counters.rhs_calls, counters.accepted_steps, counters.rejected_steps)
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._live[run_id]
+                self._completed_runs += 1
+                self._totals.rhs_calls += counters.rhs_calls - offset[0]
+                self._totals.accepted_steps += counters.accepted_steps - offset[1]
+                self._totals.rejected_steps += counters.rejected_steps - offset[2]
+
+    def render(self) -> Text:
+        """
+        Render the current metrics in the Prometheus text exposition format.
+
+        Returns:
+            The metrics as a string.
+        """
+        with self._lock:
+            live = list(self._live.items())
+            completed_runs = self._completed_runs
+            rhs_calls = self._totals.rhs_calls
+            accepted = self._totals.accepted_steps
+            rejected = self._totals.rejected_steps
+
+        lines = []
+
+        def metric(name: Text, metric_type: Text, help_text: Text, samples: List):
+            lines.append(f"# HELP {_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {_PREFIX}_{name} {metric_type}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                label_str = "{" + label_str + "}" if label_str else ""
+                lines.append(f"{_PREFIX}_{name}{label_str} {float(value)!r}")
+
+        progress, step_rates, rhs_rates, rejection_rates, times = [], [], [], [], []
+
+        for run_id, (run_config, counters) in live:
+            # totals include the running integrations
+            rhs_calls += counters.rhs_calls
+            accepted += counters.accepted_steps
+            rejected += counters.rejected_steps
+
+            labels = {"run_id": run_id}
+
+            start = run_config[RunConfigKeys.START]
+            end = run_config[RunConfigKeys.END]
+            current = counters.current_time if counters.current_time is not None else start
+
+            times.append((dict(labels, bound="current"), current))
+            times.append((dict(labels, bound="end"), end))
+
+            if end is not None and end > start:
+                progress.append((labels, (current - start) / (end - start)))
+
+            elapsed = counters.elapsed()
+            steps = counters.accepted_steps + counters.rejected_steps
+
+            if elapsed > 0:
+                step_rates.append((labels, steps / elapsed))
+                rhs_rates.append((labels, counters.rhs_calls / elapsed))
+
+            if steps > 0:
+                rejection_rates.append((labels, counters.rejected_steps / steps))
+
+        metric("runs_active", "gauge", "Number of running integrations.", [({}, len(live))])
+        metric("runs_completed_total", "counter", "Number of finished integrations.",
+               [({}, completed_runs)])
+        metric("steps_total", "counter", "Number of integration steps.",
+               [({"result": "accepted"}, accepted), ({"result": "rejected"}, rejected)])
+        metric("rhs_calls_total", "counter", "Number of right-hand side evaluations.",
+               [({}, rhs_calls)])
+        metric("run_time", "gauge", "Current and end time of running integrations.", times)
+        metric("run_progress_ratio", "gauge",
+               "Fraction of the integration interval covered by running integrations.",
+               progress)
+        metric("run_steps_per_second", "gauge",
+               "Average steps per second of running integrations.", step_rates)
+        metric("run_rhs_calls_per_second", "gauge",
+               "Average right-hand side evaluations per second of running integrations.",
+               rhs_rates)
+        metric("run_rejection_ratio", "gauge",
+               "Fraction of rejected steps of running integrations.", rejection_rates)
+
+        memory = _memory_usage()
+
+        if "resident" in memory:
+            metric("process_resident_memory_bytes", "gauge",
+                   "Resident memory size of the process in bytes.",
+                   [({}, memory["resident"])])
+
+        if "max_resident" in memory:
+            metric("process_max_resident_memory_bytes", "gauge",
+                   "Peak resident memory size of the process in bytes.",
+                   [({}, memory["max_resident"])])
+
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self):
+        """
+        Write the current metrics to the snapshot file. The file is replaced atomically, so
+        that readers never see a partially written snapshot.
+        """
+        tmp_file = self.snapshot_file + ".tmp"
+
+        with open(tmp_file, "w") as f:
+            f.write(self.render())
+
+        os.replace(tmp_file, self.snapshot_file)
+
+    def _write_snapshots(self):
+        while not self._stop.wait(self.snapshot_interval):
+            self.write_snapshot()
+
+    def close(self):
+        """
+        Stop the HTTP endpoint and snapshot threads. A final snapshot is written, so that the
+        snapshot file reflects all finished runs.
+        """
+        if self._stop.is_set():
+            return
+
+        self._stop.set()
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+        for thread in self._threads:
+            thread.join()
+
+        if self.snapshot_file is not None:
+            self.write_snapshot()
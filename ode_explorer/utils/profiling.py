@@ -0,0 +1,242 @@
+import contextlib
+import threading
+import time
+import tracemalloc
+from typing import Dict, Text, Any, Callable
+
+from ode_explorer.constants import PerformanceKeys
+from ode_explorer.models import BaseModel
+
+__all__ = ["PerformanceCounters", "CountingModel", "active_counters", "counting",
+           "tracing_memory", "record_solver_result"]
+
+# right-hand side parts evaluated by step functions in addition to the model call operator
+_RHS_METHODS = ("rhs", "rhs_into", "explicit", "implicit", "explicit_rhs", "implicit_rhs", "slow", "fast",
+                "q_derivative", "p_derivative", "bound_q_derivative", "bound_p_derivative")
+
+# counters of the running integration loops, per thread
+_local = threading.local()
+
+
+def _active_stack() -> list:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+class PerformanceCounters:
+    """
+    Performance counters of an integration run. The counters are filled in by the integration
+    loops, a CountingModel wrapped around the integrated model, and the non-linear solvers
+    of implicit step functions.
+
+    Times are wall-clock seconds. The step function time excludes the time spent in the
+    right-hand side, and the bookkeeping time is everything in the loop apart from right-hand
+    side, step function, callbacks and metrics, e.g. step size control and recording states.
+    """
+
+    def __init__(self):
+        self.rhs_calls = 0
+        self.jacobian_evals = 0
+        self.nonlinear_solves = 0
+        self.newton_iterations = 0
+        self.accepted_steps = 0
+        self.rejected_steps = 0
+
+        self.rhs_time = 0.0
+        self.step_time = 0.0
+        self.callback_time = 0.0
+        self.total_time = 0.0
+
+        # time of the last accepted state, read by live metrics exporters
+        self.current_time = None
+
+        # memory allocated during the integration in bytes, if traced
+        self.peak_memory = None
+        self.retained_memory = None
+
+        # start of the currently running integration loop, if any
+        self._start = None
+
+    def elapsed(self) -> float:
+        """
+        Return the total time including the currently running integration loop, if any.
+
+        Returns:
+            The total wall-clock time in seconds.
+        """
+        if self._start is None:
+            return self.total_time
+        return self.total_time + time.perf_counter() - self._start
+
+    def __getstate__(self):
+        # fold in the running loop time, e.g. when checkpointing mid-run
+        state = self.__dict__.copy()
+        state["total_time"] = self.elapsed()
+        state["_start"] = None
+        return state
+
+    def to_dict(self) -> Dict[Text, Any]:
+        """
+        Return the counters as a dict, to be saved in a run object.
+
+        Returns:
+            A dict holding the counter values.
+        """
+        step_func_time = max(self.step_time - self.rhs_time, 0.0)
+        total_time = self.elapsed()
+        bookkeeping_time = max(total_time - self.step_time - self.callback_time, 0.0)
+
+        counters = {PerformanceKeys.RHS_CALLS: self.rhs_calls,
+                    PerformanceKeys.JACOBIAN_EVALS: self.jacobian_evals,
+                    PerformanceKeys.NONLINEAR_SOLVES: self.nonlinear_solves,
+                    PerformanceKeys.NEWTON_ITERATIONS: self.newton_iterations,
+                    PerformanceKeys.ACCEPTED_STEPS: self.accepted_steps,
+                    PerformanceKeys.REJECTED_STEPS: self.rejected_steps,
+                    PerformanceKeys.RHS_TIME: self.rhs_time,
+                    PerformanceKeys.STEP_FUNC_TIME: step_func_time,
+                    PerformanceKeys.CALLBACK_TIME: self.callback_time,
+                    PerformanceKeys.BOOKKEEPING_TIME: bookkeeping_time,
+                    PerformanceKeys.TOTAL_TIME: total_time}
+
+        if self.peak_memory is not None:
+            counters.update({PerformanceKeys.PEAK_MEMORY: self.peak_memory,
+                             PerformanceKeys.RETAINED_MEMORY: self.retained_memory})
+
+        return counters
+
+
+class CountingModel:
+    """
+    Transparent proxy around an ODE model, which counts and times all evaluations of the
+    right-hand side, including those of the sub-models of a split model. All other attribute
+    accesses are forwarded to the wrapped model.
+    """
+
+    def __init__(self, model: BaseModel, counters: PerformanceCounters):
+        """
+        CountingModel constructor.
+
+        Args:
+            model: ODE model to wrap.
+            counters: Performance counters to record right-hand side evaluations in.
+        """
+        self.model = model
+        self.counters = counters
+
+        # sub-models of split models, advanced separately by splitting methods
+        if hasattr(model, "models"):
+            self.models = [CountingModel(m, counters) for m in model.models]
+
+    def _count(self, fn: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.counters.rhs_time += time.perf_counter() - start
+            self.counters.rhs_calls += 1
+
+    def __call__(self, *args, **kwargs):
+        return self._count(self.model, *args, **kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self.model, name)
+
+        if name in _RHS_METHODS and callable(attr):
+            return lambda *args, **kwargs: self._count(attr, *args, **kwargs)
+
+        return attr
+
+
+def active_counters() -> PerformanceCounters:
+    """
+    Return the performance counters of the integration running in the current thread, if any.
+
+    Returns:
+        The active PerformanceCounters instance, or None.
+    """
+    stack = _active_stack()
+    return stack[-1] if stack else None
+
+
+@contextlib.contextmanager
+def counting(counters: PerformanceCounters):
+    """
+    Context manager activating performance counters for the duration of an integration loop,
+    and timing the loop.
+
+    Args:
+        counters: Performance counters to activate.
+    """
+    stack = _active_stack()
+    stack.append(counters)
+    counters._start = time.perf_counter()
+    try:
+        yield counters
+    finally:
+        counters.total_time += time.perf_counter() - counters._start
+        counters._start = None
+        stack.pop()
+
+
+@contextlib.contextmanager
+def tracing_memory(counters: PerformanceCounters):
+    """
+    Context manager measuring the memory allocated by Python during an integration with
+    tracemalloc. Records the peak memory, and the memory retained afterwards, e.g. by the
+    recorded states and metrics, relative to the memory in use when entering.
+
+    Tracing slows down all allocations, so this is meant for memory measurements, not for
+    timing. If tracemalloc is already tracing, its peak is reset, and it keeps tracing on exit.
+    Before Python 3.9, the peak cannot be reset. A peak that was not exceeded during the
+    integration is then unknown, and the retained memory is recorded as a lower bound.
+
+    Args:
+        counters: Performance counters to record the memory in.
+    """
+    started = not tracemalloc.is_tracing()
+
+    if started:
+        tracemalloc.start()
+    elif hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+    baseline, initial_peak = tracemalloc.get_traced_memory()
+
+    try:
+        yield counters
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+
+        if started:
+            tracemalloc.stop()
+
+        # without a peak reset, an earlier peak says nothing about the integration
+        if peak <= initial_peak and initial_peak > baseline:
+            peak = current
+
+        counters.peak_memory = peak - baseline
+        counters.retained_memory = current - baseline
+
+
+def record_solver_result(result: Any):
+    """
+    Record the statistics of a non-linear solve in the active performance counters. Reads the
+    iteration and Jacobian evaluation counts reported by scipy.optimize.root and root_scalar.
+    Right-hand side evaluations of the solver are counted by the CountingModel instead.
+
+    Args:
+        result: Result object returned by the solver.
+    """
+    counters = active_counters()
+
+    if counters is None:
+        return
+
+    counters.nonlinear_solves += 1
+
+    # OptimizeResult is a dict, RootResults has attributes
+    get = result.get if isinstance(result, dict) else lambda k, d=0: getattr(result, k, d)
+
+    counters.newton_iterations += get("nit", 0) or get("iterations", 0)
+    counters.jacobian_evals += get("njev", 0)
@@ -1,11 +1,15 @@
 import json
 import os
-import copy
-from typing import Dict, Text
+from typing import Dict, Text, Any
+
+import numpy as np
 
 from ode_explorer import constants
-from ode_explorer.constants import RunKeys, ModelMetadataKeys
-from ode_explorer.utils.data_utils import write_result_to_csv, convert_to_dict, initialize_dim_names
+from ode_explorer import defaults
+from ode_explorer.constants import RunKeys, ModelMetadataKeys, StorageKeys
+from ode_explorer.utils.data_utils import write_result_to_csv, stack_result_data, \
+    initialize_dim_names
+from ode_explorer.utils.storage import write_result, read_result, csv_read_args
 
 
 def get_run_metadata(run):
@@ -25,49 +29,142 @@ def get_run_metadata(run):
     return metadata
 
 
-def write_run_to_disk(run: Dict, out_dir: Text, **kwargs):
+def write_run_to_disk(run: Dict, out_dir: Text, output_format: Text = defaults.OUTPUT_FORMAT,
+                      **kwargs):
     """
     Save a run to disk, including result data, metrics and additional info.
 
     Args:
         run: Run object saved in an Integrator instance.
         out_dir: Designated output directory.
-        **kwargs: Additional keyword arguments passed to pandas.DataFrame.to_csv.
+        output_format: File format of the result data, one of "csv", "npz", "parquet",
+         "hdf5" or "compressed". Metrics are always written as CSV. The options needed to
+         read the result data back, e.g. the compression mode, are saved in run_info.json.
+        **kwargs: Additional keyword arguments passed to the result data writer, e.g. to
+         pandas.DataFrame.to_csv for CSV files.
     """
 
-    run_copy = copy.deepcopy(run)
+    # shallow copy, the result data, metrics and sensitivities are not serialized as json
+    run_copy = {k: v for k, v in run.items() if k not in [RunKeys.RESULT_DATA, RunKeys.METRICS,
+                                                          RunKeys.SENSITIVITIES]}
 
-    result_data = run_copy.pop(RunKeys.RESULT_DATA)
+    result_data = run[RunKeys.RESULT_DATA]
 
-    metric_data = run_copy.pop(RunKeys.METRICS)
+    metric_data = run[RunKeys.METRICS]
 
     run_filename = "run_info.json"
 
-    model_metadata = run_copy[RunKeys.MODEL_METADATA]
-
-    variable_names = model_metadata[ModelMetadataKeys.VARIABLE_NAMES]
+    model_metadata = run[RunKeys.MODEL_METADATA]
 
     dim_names = model_metadata[ModelMetadataKeys.DIM_NAMES]
 
     if not dim_names:
+        variable_names = model_metadata[ModelMetadataKeys.VARIABLE_NAMES]
         dim_names = initialize_dim_names(variable_names, result_data[0])
 
-    for i, res in enumerate(result_data):
-        result_data[i] = convert_to_dict(res, model_metadata=model_metadata,
-                                         dim_names=dim_names)
-
-    # write result vectors to csv file
-    write_result_to_csv(result=result_data,
-                        out_dir=out_dir,
-                        outfile_name=RunKeys.RESULT_DATA,
-                        **kwargs)
+    # write result vectors in the chosen format
+    result_file, options = write_result(block=stack_result_data(result_data),
+                                        columns=dim_names,
+                                        out_dir=out_dir,
+                                        outfile_name=RunKeys.RESULT_DATA,
+                                        output_format=output_format,
+                                        **kwargs)
+
+    # write metrics to csv file with the CSV options of the result data, always keeping
+    # the index, which is the only column of metrics without any values
+    if output_format == "csv":
+        metric_args = {k: v for k, v in kwargs.items() if k != "index"}
+    else:
+        metric_args = {}
 
-    # write metrics to csv file
     write_result_to_csv(result=metric_data,
                         out_dir=out_dir,
                         outfile_name=RunKeys.METRICS,
-                        **kwargs)
+                        **metric_args)
+
+    run_copy[RunKeys.STORAGE] = {
+        StorageKeys.FORMAT: output_format,
+        StorageKeys.FILE: result_file,
+        StorageKeys.OPTIONS: options,
+        StorageKeys.COLUMNS: dim_names,
+        StorageKeys.VARIABLE_SHAPES: [list(np.shape(v)) for v in result_data[0]],
+        StorageKeys.NUM_STATES: len(result_data),
+        StorageKeys.FINAL_TIME: float(result_data[-1][0])}
+
+    # sensitivities of forward sensitivity runs, one matrix dy/dp per state
+    if run.get(RunKeys.SENSITIVITIES) is not None:
+        np.save(os.path.join(out_dir, RunKeys.SENSITIVITIES + ".npy"),
+                run[RunKeys.SENSITIVITIES])
 
     outfile = os.path.join(out_dir, run_filename)
     with open(outfile, "w") as f:
         json.dump(run_copy, f)
+
+
+def load_run_from_disk(path: Text) -> Dict[Text, Any]:
+    """
+    Load a run saved with ``write_run_to_disk``. The result data is not read into memory,
+    but loaded lazily on first access; uncompressed NPZ result files and the sensitivities
+    of forward sensitivity runs are memory-mapped.
+
+    Args:
+        path: Directory the run was saved to.
+
+    Returns:
+        A run object, holding the result data as an ArrayStore.
+
+    Raises:
+        ValueError: If the directory does not contain a saved run.
+    """
+    import pandas as pd
+
+    info_file = os.path.join(path, "run_info.json")
+
+    if not os.path.exists(info_file):
+        raise ValueError(f"Directory {path} does not contain a saved run.")
+
+    with open(info_file, "r") as f:
+        run = json.load(f)
+
+    # runs saved before result formats were recorded are plain CSV
+    storage = run.get(RunKeys.STORAGE) or {
+        StorageKeys.FORMAT: "csv",
+        StorageKeys.FILE: RunKeys.RESULT_DATA + ".csv",
+        StorageKeys.COLUMNS: None,
+        StorageKeys.VARIABLE_SHAPES: None}
+
+    result_file = os.path.join(path, storage[StorageKeys.FILE])
+
+    columns = storage[StorageKeys.COLUMNS]
+    variable_shapes = storage[StorageKeys.VARIABLE_SHAPES]
+
+    if columns is None:
+        columns = list(pd.read_csv(result_file, nrows=0).columns[1:])
+        variable_shapes = [[] for _ in columns]
+
+    run[RunKeys.RESULT_DATA] = read_result(in_file=result_file,
+                                           columns=columns,
+                                           variable_shapes=variable_shapes,
+                                           output_format=storage[StorageKeys.FORMAT],
+                                           options=storage.get(StorageKeys.OPTIONS))
+
+    if storage[StorageKeys.FORMAT] == "csv":
+        metric_options = {k: v for k, v in (storage.get(StorageKeys.OPTIONS) or {}).items()
+                          if k != "index"}
+    else:
+        metric_options = {}
+
+    metrics = pd.read_csv(os.path.join(path, RunKeys.METRICS + ".csv"),
+                          **csv_read_args(metric_options))
+
+    # rows without any metric values are dropped by to_dict
+    if len(metrics.columns) > 0:
+        run[RunKeys.METRICS] = metrics.to_dict("records")
+    else:
+        run[RunKeys.METRICS] = [{} for _ in range(len(metrics))]
+
+    sensitivity_file = os.path.join(path, RunKeys.SENSITIVITIES + ".npy")
+    if os.path.exists(sensitivity_file):
+        run[RunKeys.SENSITIVITIES] = np.load(sensitivity_file, mmap_mode="r")
+
+    return run
@@ -0,0 +1,561 @@
+import lzma
+import os
+import zipfile
+import zlib
+from typing import List, Text, Any, Callable, Union, Dict, Tuple
+
+import numpy as np
+
+from ode_explorer import defaults
+from ode_explorer.types import ModelState
+
+__all__ = ["ArrayStore", "MemmapStore", "result_writers", "result_readers", "write_result",
+           "read_result", "csv_read_args"]
+
+# name of the result array inside npz and hdf5 files
+_ARRAY_NAME = "result_data"
+
+
+class ArrayStore:
+    """
+    Sequence of ODE states backed by a single two-dimensional array with one row per state,
+    as obtained when loading saved run data from disk. Indexing an ArrayStore returns state
+    tuples like the ones recorded during integration, whose vector variables are views into
+    the underlying array.
+
+    The array is loaded lazily on first access, and can be a numpy.memmap or any other
+    array-like supporting numpy-style slicing, e.g. an HDF5 dataset, so that even large
+    runs only read the states that are actually accessed.
+    """
+
+    def __init__(self, data: Union[Any, Callable[[], Any]], variable_shapes: List[List[int]]):
+        """
+        ArrayStore constructor.
+
+        Args:
+            data: Two-dimensional array of states, or a callable returning it on first access.
+            variable_shapes: Shapes of the state variables, [] for scalar and [n] for vector
+             variables, in the order of the state tuple.
+        """
+        self._data = data
+
+        self._set_shapes(variable_shapes)
+
+    def _set_shapes(self, variable_shapes: List[List[int]]):
+        self.variable_shapes = [list(s) for s in variable_shapes]
+
+        self._slices = []
+        idx = 0
+        for shape in self.variable_shapes:
+            dim = shape[0] if shape else 1
+            self._slices.append((idx, dim, not shape))
+            idx += dim
+
+        self.num_dims = idx
+
+    @property
+    def data(self):
+        if callable(self._data):
+            self._data = self._data()
+        return self._data
+
+    @property
+    def loaded(self) -> bool:
+        return not callable(self._data)
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def _to_state(self, row) -> ModelState:
+        return tuple(row[idx].item() if scalar else row[idx:idx + dim]
+                     for idx, dim, scalar in self._slices)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return ArrayStore(self.data[item], self.variable_shapes)
+
+        return self._to_state(self.data[item])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class MemmapStore(ArrayStore):
+    """
+    Growable ArrayStore backed by a numpy.memmap file, used to record the states of runs
+    too large to be held in memory. States are written into the mapped file as they are
+    appended, and write-back to disk is left to the OS page cache. When the file is full,
+    it is extended by a fixed number of states and mapped again, which does not copy any
+    previously recorded states.
+
+    A MemmapStore supports the ``append`` and ``extend`` methods of the list of states
+    used by default, so it can be used as the result data of a run in all integration loops.
+    """
+
+    def __init__(self, path: Text, chunk_size: int = defaults.MEMMAP_CHUNK_SIZE):
+        """
+        MemmapStore constructor.
+
+        Args:
+            path: Path of the storage file. An existing file at this path is overwritten.
+            chunk_size: Number of states the storage file grows by when it is full.
+        """
+        if chunk_size < 1:
+            raise ValueError("The chunk size of a memory-mapped store has to be positive.")
+
+        super(MemmapStore, self).__init__(data=None, variable_shapes=[])
+
+        self.path = path
+
+        self.chunk_size = chunk_size
+
+        self._mmap = None
+
+        self._size = 0
+
+        self.dtype = None
+
+    @property
+    def capacity(self):
+        return 0 if self._mmap is None else self._mmap.shape[0]
+
+    @property
+    def data(self):
+        if self._mmap is None:
+            return np.empty((0, self.num_dims))
+        return self._mmap[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def _map(self, capacity: int):
+        if self._mmap is not None:
+            self._mmap.flush()
+
+        # extending the file keeps the recorded states, mapping it again is cheap
+        with open(self.path, "r+b" if self._mmap is not None else "wb") as f:
+            f.truncate(capacity * self.num_dims * self.dtype.itemsize)
+
+        self._mmap = np.memmap(self.path, dtype=self.dtype, mode="r+",
+                               shape=(capacity, self.num_dims))
+
+    def append(self, state: ModelState):
+        """
+        Append a state to the store, growing the storage file if it is full.
+
+        Args:
+            state: ODE state to append.
+        """
+        if self._mmap is None:
+            self._set_shapes([list(np.shape(v)) for v in state])
+            self.dtype = np.result_type(float, *[np.asarray(v).dtype for v in state])
+            self._map(self.chunk_size)
+
+        elif self._size == self.capacity:
+            self._map(self.capacity + self.chunk_size)
+
+        row = self._mmap[self._size]
+        for (idx, dim, scalar), v in zip(self._slices, state):
+            if scalar:
+                row[idx] = v
+            else:
+                row[idx:idx + dim] = v
+
+        self._size += 1
+
+    def extend(self, states: List[ModelState]):
+        """
+        Append several states to the store.
+
+        Args:
+            states: ODE states to append.
+        """
+        for state in states:
+            self.append(state)
+
+    def flush(self):
+        """
+        Write the recorded states back to the storage file.
+        """
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def trim(self):
+        """
+        Shrink the storage file to the recorded states, e.g. after the integration finished.
+        """
+        if self._mmap is not None and self._size < self.capacity:
+            self._mmap.flush()
+            # drop the mapping before truncating, accessing it afterwards would fail
+            self._mmap = None
+            with open(self.path, "r+b") as f:
+                f.truncate(max(self._size, 1) * self.num_dims * self.dtype.itemsize)
+            self._mmap = np.memmap(self.path, dtype=self.dtype, mode="r+",
+                                   shape=(max(self._size, 1), self.num_dims))
+
+    def __getstate__(self):
+        # pickled e.g. in checkpoints, the recorded states stay in the storage file
+        self.flush()
+        state = self.__dict__.copy()
+        state["_mmap"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.dtype is not None and os.path.exists(self.path):
+            # states recorded after pickling are overwritten by subsequent appends
+            capacity = os.path.getsize(self.path) // (self.num_dims * self.dtype.itemsize)
+            self._mmap = np.memmap(self.path, dtype=self.dtype, mode="r+",
+                                   shape=(capacity, self.num_dims))
+
+    def delete(self):
+        """
+        Delete the storage file. The store cannot be used afterwards.
+        """
+        self._mmap = None
+        self._size = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# pandas.DataFrame.to_csv options that change how the file has to be parsed
+_CSV_READ_OPTIONS = ["sep", "decimal", "encoding", "compression", "quotechar", "na_rep",
+                     "index"]
+
+
+def csv_read_args(options: Dict[Text, Any]) -> Dict[Text, Any]:
+    """
+    Translate the options a CSV file was written with into pandas.read_csv arguments.
+
+    Args:
+        options: Options returned by ``write_result`` for a CSV file.
+
+    Returns:
+        A dict of keyword arguments for pandas.read_csv.
+    """
+    args = {k: v for k, v in options.items() if k in _CSV_READ_OPTIONS}
+
+    if "na_rep" in args:
+        args["na_values"] = [args.pop("na_rep")]
+
+    args["index_col"] = 0 if args.pop("index", True) else None
+
+    return args
+
+
+def _write_csv(block: np.ndarray, columns: List[Text], out_file: Text, **kwargs) -> Tuple[Text, Dict]:
+    import pandas as pd
+
+    out_file += ".csv"
+    pd.DataFrame(block, columns=columns, copy=False).to_csv(out_file, **kwargs)
+    return out_file, {k: v for k, v in kwargs.items() if k in _CSV_READ_OPTIONS}
+
+
+def _read_csv(in_file: Text, columns: List[Text], **options) -> np.ndarray:
+    import pandas as pd
+
+    return pd.read_csv(in_file, **csv_read_args(options))[columns].to_numpy()
+
+
+def _write_npz(block: np.ndarray, columns: List[Text], out_file: Text,
+               compressed: bool = False) -> Tuple[Text, Dict]:
+    out_file += ".npz"
+    if compressed:
+        np.savez_compressed(out_file, **{_ARRAY_NAME: block})
+    else:
+        np.savez(out_file, **{_ARRAY_NAME: block})
+    return out_file, {}
+
+
+def _read_npz(in_file: Text, columns: List[Text]) -> np.ndarray:
+    member = _ARRAY_NAME + ".npy"
+
+    with zipfile.ZipFile(in_file) as archive:
+        info = archive.getinfo(member)
+
+    if info.compress_type != zipfile.ZIP_STORED:
+        # compressed archives have to be decompressed in full
+        with np.load(in_file) as archive:
+            return archive[_ARRAY_NAME]
+
+    # uncompressed members are stored verbatim, so the array can be memory-mapped
+    # directly from the archive at the offset of its npy data
+    with open(in_file, "rb") as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_len = int.from_bytes(local_header[26:28], "little")
+        extra_len = int.from_bytes(local_header[28:30], "little")
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+
+        if np.lib.format.read_magic(f) == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    return np.memmap(in_file, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def _write_parquet(block: np.ndarray, columns: List[Text], out_file: Text, **kwargs) -> Tuple[Text, Dict]:
+    import pandas as pd
+
+    out_file += ".parquet"
+    pd.DataFrame(block, columns=columns, copy=False).to_parquet(out_file, **kwargs)
+    return out_file, {}
+
+
+def _read_parquet(in_file: Text, columns: List[Text]) -> np.ndarray:
+    import pandas as pd
+
+    return pd.read_parquet(in_file, columns=columns, memory_map=True).to_numpy()
+
+
+def _write_hdf5(block: np.ndarray, columns: List[Text], out_file: Text,
+                **kwargs) -> Tuple[Text, Dict]:
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("Writing HDF5 files requires h5py. You can install it by running "
+                          "\"pip install h5py\".")
+    out_file += ".h5"
+    with h5py.File(out_file, "w") as f:
+        dataset = f.create_dataset(_ARRAY_NAME, data=block, **kwargs)
+        dataset.attrs["columns"] = columns
+    return out_file, {}
+
+
+def _read_hdf5(in_file: Text, columns: List[Text]):
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("Reading HDF5 files requires h5py. You can install it by running "
+                          "\"pip install h5py\".")
+    # the dataset is sliced lazily, the file stays open as long as it is referenced
+    return h5py.File(in_file, "r")[_ARRAY_NAME]
+
+
+_codecs = {"zlib": (zlib.compress, zlib.decompress),
+           "lzma": (lambda data, level: lzma.compress(data, preset=level), lzma.decompress)}
+
+_compression_modes = ["lossless", "float32", "drop"]
+
+
+def _delta_encode(array: np.ndarray, codec: Text, level: int) -> np.ndarray:
+    # differences of the integer representation of consecutive floats are small for smooth
+    # data, and grouping the bytes of equal significance makes them compress well
+    ints = array.view(np.dtype(f"i{array.dtype.itemsize}"))
+    deltas = np.diff(ints, axis=0, prepend=np.zeros_like(ints[:1]))
+    shuffled = np.ascontiguousarray(deltas.view(np.uint8).reshape(-1, array.dtype.itemsize).T)
+    compress, _ = _codecs[codec]
+    return np.frombuffer(compress(shuffled.tobytes(), level), dtype=np.uint8)
+
+
+def _delta_decode(buffer: np.ndarray, dtype: Text, shape: List[int], codec: Text) -> np.ndarray:
+    _, decompress = _codecs[codec]
+    dtype = np.dtype(dtype)
+    shuffled = np.frombuffer(decompress(buffer.tobytes()), dtype=np.uint8)
+    deltas = np.ascontiguousarray(shuffled.reshape(dtype.itemsize, -1).T)
+    int_dtype = np.dtype(f"i{dtype.itemsize}")
+    ints = np.cumsum(deltas.view(int_dtype).reshape(shape), axis=0, dtype=int_dtype)
+    return ints.view(dtype)
+
+
+def _drop_points(t: np.ndarray, values: np.ndarray, tol: float) -> np.ndarray:
+    # greedily extend each linear segment as far as the skipped points stay within tol,
+    # searching the segment end exponentially and then by bisection
+    def fits(start, end):
+        weights = ((t[start + 1:end] - t[start]) / (t[end] - t[start]))[:, None]
+        line = values[start] + weights * (values[end] - values[start])
+        return np.all(np.abs(line - values[start + 1:end]) <= tol)
+
+    n = len(t)
+    kept = [0]
+    start = 0
+
+    while start < n - 1:
+        step = 1
+        good = start + 1
+        while good + step < n and fits(start, good + step):
+            good += step
+            step *= 2
+
+        bad = min(good + step, n)
+        while bad - good > 1:
+            mid = (good + bad) // 2
+            if fits(start, mid):
+                good = mid
+            else:
+                bad = mid
+
+        kept.append(good)
+        start = good
+
+    return np.asarray(kept, dtype=np.int64)
+
+
+def _write_compressed(block: np.ndarray, columns: List[Text], out_file: Text,
+                      mode: Text = "lossless", codec: Text = "zlib", level: int = 6,
+                      tol: float = 1e-6) -> Tuple[Text, Dict]:
+    if mode not in _compression_modes:
+        raise ValueError(f"Unsupported compression mode \"{mode}\". Available modes are: "
+                         f"{', '.join(_compression_modes)}.")
+
+    if codec not in _codecs:
+        raise ValueError(f"Unsupported compression codec \"{codec}\". Available codecs are: "
+                         f"{', '.join(_codecs)}.")
+
+    block = np.ascontiguousarray(block)
+
+    options = {"mode": mode, "codec": codec, "shape": list(block.shape),
+               "dtype": block.dtype.str}
+
+    if mode == "lossless":
+        arrays = {"values": _delta_encode(block, codec, level)}
+    else:
+        # the first column holds the time values, which are always kept losslessly
+        t, values = block[:, 0], block[:, 1:]
+        arrays = {"time": _delta_encode(np.ascontiguousarray(t), codec, level)}
+
+        if mode == "float32":
+            values = values.astype(np.float32)
+        else:
+            index = _drop_points(t, values, tol)
+            arrays["index"] = _delta_encode(index, codec, level)
+            values = values[index]
+            options.update({"tol": tol, "num_kept": len(index)})
+
+        options["values_dtype"] = values.dtype.str
+        arrays["values"] = _delta_encode(np.ascontiguousarray(values), codec, level)
+
+    out_file += ".npz"
+    np.savez(out_file, **arrays)
+
+    return out_file, options
+
+
+def _read_compressed(in_file: Text, columns: List[Text], mode: Text, codec: Text,
+                     shape: List[int], dtype: Text, values_dtype: Text = None,
+                     num_kept: int = None, tol: float = None) -> np.ndarray:
+    num_states, num_dims = shape
+
+    with np.load(in_file) as archive:
+        if mode == "lossless":
+            return _delta_decode(archive["values"], dtype, shape, codec)
+
+        block = np.empty(shape, dtype=dtype)
+        block[:, 0] = _delta_decode(archive["time"], dtype, [num_states], codec)
+
+        if mode == "float32":
+            block[:, 1:] = _delta_decode(archive["values"], values_dtype,
+                                         [num_states, num_dims - 1], codec)
+            return block
+
+        # interpolate the dropped points, which were within tol of the interpolant
+        index = _delta_decode(archive["index"], np.dtype(np.int64).str, [num_kept], codec)
+        values = _delta_decode(archive["values"], values_dtype, [num_kept, num_dims - 1], codec)
+
+        t = block[:, 0]
+        for j in range(num_dims - 1):
+            block[:, j + 1] = np.interp(t, t[index], values[:, j])
+
+        return block
+
+
+result_writers: Dict[Text, Callable] = {"csv": _write_csv,
+                                        "npz": _write_npz,
+                                        "parquet": _write_parquet,
+                                        "hdf5": _write_hdf5,
+                                        "compressed": _write_compressed}
+
+result_readers: Dict[Text, Callable] = {"csv": _read_csv,
+                                        "npz": _read_npz,
+                                        "parquet": _read_parquet,
+                                        "hdf5": _read_hdf5,
+                                        "compressed": _read_compressed}
+
+
+def write_result(block: np.ndarray,
+                 columns: List[Text],
+                 out_dir: Text,
+                 outfile_name: Text,
+                 output_format: Text = "csv",
+                 **kwargs) -> Tuple[Text, Dict[Text, Any]]:
+    """
+    Write stacked run result data to disk in the chosen file format.
+
+    The "compressed" format delta-encodes the integer representation of the stored floats
+    and compresses them with zlib or lzma. Its keyword arguments are:
+
+    - mode: "lossless", "float32" to store all but the time column in single precision,
+      or "drop" to drop all states that linear interpolation between the kept states
+      reproduces within an absolute tolerance. The time column is always kept in full.
+    - codec: "zlib" or "lzma".
+    - level: Compression level of the codec.
+    - tol: Absolute interpolation tolerance of the "drop" mode.
+
+    Args:
+        block: Two-dimensional array of states, one row per state.
+        columns: Column names of the result data.
+        out_dir: Designated output directory.
+        outfile_name: Designated output file name, without file extension.
+        output_format: File format, one of "csv", "npz", "parquet", "hdf5" or "compressed".
+        **kwargs: Additional keyword arguments passed to the writer, e.g. to
+         pandas.DataFrame.to_csv for CSV files.
+
+    Returns:
+        A tuple of the name of the written file, relative to the output directory, and a
+        dict of options needed to read the file, e.g. the compression mode.
+
+    Raises:
+        ValueError: If the output format is not supported.
+    """
+    if output_format not in result_writers:
+        raise ValueError(f"Unsupported output format \"{output_format}\". Available formats "
+                         f"are: {', '.join(result_writers)}.")
+
+    if not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+
+    writer = result_writers[output_format]
+
+    out_file, options = writer(block, columns, os.path.join(out_dir, outfile_name), **kwargs)
+
+    return os.path.basename(out_file), options
+
+
+def read_result(in_file: Text,
+                columns: List[Text],
+                variable_shapes: List[List[int]],
+                output_format: Text = "csv",
+                options: Dict[Text, Any] = None) -> ArrayStore:
+    """
+    Lazily read run result data written by ``write_result``. Uncompressed NPZ files are
+    memory-mapped and HDF5 datasets are sliced on access, so that no data is read
+    until the states are accessed.
+
+    Args:
+        in_file: Path to the result data file.
+        columns: Column names of the result data.
+        variable_shapes: Shapes of the state variables, [] for scalar and [n] for vector
+         variables.
+        output_format: File format the result data was written in.
+        options: Options returned by ``write_result``, needed to read the file.
+
+    Returns:
+        An ArrayStore holding the states of the run.
+
+    Raises:
+        ValueError: If the file format is not supported.
+    """
+    if output_format not in result_readers:
+        raise ValueError(f"Unsupported file format \"{output_format}\". Available formats "
+                         f"are: {', '.join(result_readers)}.")
+
+    reader = result_readers[output_format]
+
+    options = options or {}
+
+    return ArrayStore(lambda: reader(in_file, columns, **options),
+                      variable_shapes=variable_shapes)
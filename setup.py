@@ -39,5 +39,9 @@ setuptools.setup(
         "scipy",
         "tqdm",
         "tabulate"
-    ]
+    ],
+    extras_require={
+        "sympy": ["sympy"],
+        "test": ["sympy"]
+    }
 )